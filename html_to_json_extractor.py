@@ -18,37 +18,62 @@ Features:
 - JSON validation and formatting
 - Error handling and progress reporting
 - Creates output directory if it doesn't exist
+- Incremental: unchanged HTML files (same size and mtime, or same content
+  hash) are skipped, tracked in a manifest next to the JSON files
+- Files are extracted in worker processes and written atomically, so an
+  interrupted run never leaves truncated JSON behind
+- Optional compact (non-indented) output
 
 Usage:
-    python html_to_json_extractor.py
+    python html_to_json_extractor.py [--compact] [--force] [--workers N]
 
 Author: PCEP Rapid Practice System
 Date: 2025-07-30
 Version: 1.0
 """
 
+import argparse
 import json
-import re
 import os
+from functools import partial
 from pathlib import Path
 import sys
 
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+
+from ingest.embedded_data import extract_embedded_data, extract_embedded_data_from_file
+from ingest.parallel import ParallelIngestDriver
+from ingest.manifest import hash_file
+from ingest.pipeline import ConverterPipeline, JSONSink, atomic_write, keep_source
+
+MANIFEST_NAME = '.extraction_manifest.json'
+
 class HTMLToJSONExtractor:
     """Extract JSON data from HTML files containing JavaScript data objects."""
     
-    def __init__(self, input_dir="Exam_HTML_Raw_Data", output_dir="Exam_HTML_Raw_Data_JSON_ONLY"):
+    def __init__(self, input_dir="Exam_HTML_Raw_Data", output_dir="Exam_HTML_Raw_Data_JSON_ONLY", max_workers=None,
+                 compact=False, force=False):
         """
         Initialize the extractor.
         
         Args:
             input_dir (str): Directory containing HTML files
             output_dir (str): Directory to save extracted JSON files
+            max_workers (int): Worker processes for extraction (defaults to CPU count)
+            compact (bool): Write single-line JSON instead of indenting it
+            force (bool): Re-extract every file, even unchanged ones
         """
         self.input_dir = Path(input_dir)
         self.output_dir = Path(output_dir)
+        self.max_workers = max_workers
+        self.indent = None if compact else 2
+        self.force = force
+        self.manifest_path = self.output_dir / MANIFEST_NAME
+        self.manifest = {}
         self.processed_count = 0
         self.error_count = 0
         self.extracted_count = 0
+        self.skipped_count = 0
         
     def setup_output_directory(self):
         """Create output directory if it doesn't exist."""
@@ -62,7 +87,10 @@ class HTMLToJSONExtractor:
     
     def extract_json_from_html(self, html_content):
         """
-        Extract JSON data from HTML content using regex patterns.
+        Extract JSON data from HTML content.
+        
+        Finds the ``let/var/const data = {...}`` assignment with a literal scan and
+        decodes exactly one JSON object from there.
         
         Args:
             html_content (str): HTML file content
@@ -70,38 +98,12 @@ class HTMLToJSONExtractor:
         Returns:
             dict or None: Extracted JSON data or None if not found
         """
-        # Pattern to match various JavaScript data declarations
-        patterns = [
-            r'let\s+data\s*=\s*({.*?});',          # let data = {...};
-            r'var\s+data\s*=\s*({.*?});',          # var data = {...};
-            r'const\s+data\s*=\s*({.*?});',        # const data = {...};
-            r'let\s+data\s*=\s*({.*?})\s*;',       # let data = {...} ;
-            r'var\s+data\s*=\s*({.*?})\s*;',       # var data = {...} ;
-            r'const\s+data\s*=\s*({.*?})\s*;',     # const data = {...} ;
-        ]
+        json_data = extract_embedded_data(html_content)
         
-        for pattern in patterns:
-            # Use DOTALL flag to match across multiple lines
-            matches = re.findall(pattern, html_content, re.DOTALL | re.IGNORECASE)
-            
-            if matches:
-                json_str = matches[0]  # Get the first match
-                
-                try:
-                    # Clean up the JSON string
-                    json_str = json_str.strip()
-                    
-                    # Try to parse the JSON to validate it
-                    json_data = json.loads(json_str)
-                    
-                    print(f"   ✅ Found valid JSON data using pattern: {pattern[:20]}...")
-                    return json_data
-                    
-                except json.JSONDecodeError as e:
-                    print(f"   ⚠️  Found JSON-like content but parsing failed: {str(e)[:50]}...")
-                    continue
+        if json_data is not None:
+            print(f"   ✅ Found valid JSON data assigned to 'data'")
         
-        return None
+        return json_data
     
     def extract_json_from_file(self, html_file_path):
         """
@@ -114,14 +116,11 @@ class HTMLToJSONExtractor:
             dict or None: Extracted JSON data or None if extraction failed
         """
         try:
-            # Read HTML file
-            with open(html_file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                html_content = f.read()
-            
-            # Extract JSON data
-            json_data = self.extract_json_from_html(html_content)
+            # Scan the memory-mapped file instead of reading it into a string
+            json_data = extract_embedded_data_from_file(html_file_path)
             
             if json_data:
+                print(f"   ✅ Found valid JSON data assigned to 'data'")
                 return json_data
             else:
                 print(f"   ❌ No JSON data found in {html_file_path.name}")
@@ -143,8 +142,8 @@ class HTMLToJSONExtractor:
             bool: True if successful, False otherwise
         """
         try:
-            with open(output_file_path, 'w', encoding='utf-8') as f:
-                json.dump(json_data, f, indent=2, ensure_ascii=False)
+            with atomic_write(output_file_path) as f:
+                json.dump(json_data, f, indent=self.indent, ensure_ascii=False)
             
             print(f"   💾 Saved JSON to: {output_file_path.name}")
             return True
@@ -166,6 +165,58 @@ class HTMLToJSONExtractor:
         # Replace .html extension with .json
         return html_filename.replace('.html', '.json').replace('.HTML', '.json')
     
+    def load_manifest(self):
+        """Load the extraction manifest left by earlier runs, if any."""
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError):
+            self.manifest = {}
+    
+    def save_manifest(self):
+        """Write the extraction manifest atomically."""
+        with atomic_write(self.manifest_path) as f:
+            json.dump(self.manifest, f, indent=2, sort_keys=True)
+    
+    def select_files(self, html_files):
+        """
+        Filter HTML files down to the ones that need extracting.
+        
+        A file is skipped when its JSON output exists in the same format and
+        either its size and mtime match the manifest (one stat) or, after a
+        touch or copy, its content hash does.
+        
+        Args:
+            html_files (list): Candidate HTML files
+            
+        Returns:
+            tuple: (files to extract, {file name: manifest entry to record on success})
+        """
+        selected = []
+        pending = {}
+        
+        for html_file in html_files:
+            stat = html_file.stat()
+            entry = self.manifest.get(html_file.name)
+            output_exists = (self.output_dir / self.get_output_filename(html_file.name)).exists()
+            current = not self.force and entry is not None and output_exists and entry.get('indent') == self.indent
+            
+            if current and (entry['size'], entry['mtime']) == (stat.st_size, stat.st_mtime):
+                self.skipped_count += 1
+                continue
+            
+            content_hash = hash_file(html_file)
+            new_entry = {'size': stat.st_size, 'mtime': stat.st_mtime, 'sha256': content_hash, 'indent': self.indent}
+            if current and entry.get('sha256') == content_hash:
+                self.manifest[html_file.name] = new_entry
+                self.skipped_count += 1
+                continue
+            
+            pending[html_file.name] = new_entry
+            selected.append(html_file)
+        
+        return selected, pending
+    
     def process_single_file(self, html_file_path):
         """
         Process a single HTML file and extract JSON.
@@ -219,18 +270,52 @@ class HTMLToJSONExtractor:
             return False
         
         print(f"📁 Found {len(html_files)} HTML files in {self.input_dir}")
+        
+        self.load_manifest()
+        html_files, pending = self.select_files(html_files)
+        print(f"⏭️  Skipping {self.skipped_count} unchanged files, extracting {len(html_files)}")
         print("=" * 50)
         
-        # Process each file
-        for i, html_file in enumerate(html_files, 1):
-            print(f"\n[{i}/{len(html_files)}]", end=" ")
-            self.process_single_file(html_file)
-            self.processed_count += 1
+        # Extract files in worker processes, tally results here
+        driver = ParallelIngestDriver(
+            partial(extract_file_worker, output_dir=str(self.output_dir), indent=self.indent),
+            self.record_result,
+            max_workers=self.max_workers,
+            on_error=lambda html_file, error: False
+        )
+        try:
+            for i, (html_file, success) in enumerate(driver.iter_results(html_files), 1):
+                status = "✅" if success else "❌"
+                print(f"[{i}/{len(html_files)}] {status} {html_file.name}")
+                if success:
+                    self.manifest[html_file.name] = pending[html_file.name]
+                else:
+                    self.manifest.pop(html_file.name, None)
+        finally:
+            # Keep the progress of an interrupted run
+            self.save_manifest()
         
         # Print summary
         self.print_summary()
         return True
     
+    def record_result(self, success):
+        """
+        Count the outcome of one file processed by a worker.
+        
+        Args:
+            success (bool): Whether the file was extracted and saved
+            
+        Returns:
+            bool: The same success flag
+        """
+        self.processed_count += 1
+        if success:
+            self.extracted_count += 1
+        else:
+            self.error_count += 1
+        return success
+    
     def print_summary(self):
         """Print processing summary."""
         print("\n" + "=" * 50)
@@ -238,20 +323,59 @@ class HTMLToJSONExtractor:
         print("=" * 50)
         print(f"📁 Files processed: {self.processed_count}")
         print(f"✅ JSON files extracted: {self.extracted_count}")
+        print(f"⏭️  Unchanged files skipped: {self.skipped_count}")
         print(f"❌ Files with errors: {self.error_count}")
         print(f"📂 Output directory: {self.output_dir}")
         
-        if self.extracted_count > 0:
+        if self.extracted_count == 0 and self.error_count == 0 and self.skipped_count > 0:
+            print("\n✅ All JSON files are up to date.")
+        elif self.extracted_count > 0:
             print(f"\n🎉 Successfully extracted JSON from {self.extracted_count} files!")
             print(f"💡 Check the '{self.output_dir}' folder for extracted JSON files.")
         else:
             print("\n⚠️  No JSON data was successfully extracted.")
             print("💡 Check if HTML files contain 'let data = {...}' JavaScript statements.")
 
+def extract_file_worker(html_file_path, output_dir, indent=2):
+    """
+    Process-pool entry point: extract one HTML file and save its JSON.
+    
+    The exam is streamed through the shared converter pipeline into a JSON
+    sink, which writes one question at a time in the original key order to a
+    temporary file and moves it into place once complete.
+    
+    Args:
+        html_file_path (Path): Path to HTML file
+        output_dir (str): Directory to save the extracted JSON file
+        indent (int): JSON indentation, None for compact output
+        
+    Returns:
+        bool: True if successful, False otherwise
+    """
+    pipeline = ConverterPipeline(JSONSink(output_dir, indent=indent), normalizer=keep_source, exam_normalizer=None,
+                                 enrichers=(), validator=None)
+    written = pipeline.run([html_file_path])
+    
+    for error in pipeline.errors:
+        print(f"   ❌ {error['error']}")
+    for result in written:
+        print(f"   💾 Saved JSON to: {Path(result['output_file']).name}")
+    
+    return bool(written)
+
 def main():
     """Main function to run the extractor."""
+    parser = argparse.ArgumentParser(description="Extract embedded exam JSON from saved HTML pages")
+    parser.add_argument('--input-dir', default="Exam_HTML_Raw_Data", help="directory with HTML files")
+    parser.add_argument('--output-dir', default="Exam_HTML_Raw_Data_JSON_ONLY", help="directory for JSON files")
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--compact', action='store_true', help="write compact, non-indented JSON")
+    parser.add_argument('--force', action='store_true', help="re-extract unchanged files too")
+    args = parser.parse_args()
+    
     try:
-        extractor = HTMLToJSONExtractor()
+        extractor = HTMLToJSONExtractor(args.input_dir, args.output_dir, max_workers=args.workers,
+                                        compact=args.compact, force=args.force)
         extractor.process_all_files()
         
     except KeyboardInterrupt:
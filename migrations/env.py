@@ -13,7 +13,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 # Import our models
 from database import Base
-from models import user, module, exam, question, progress
+from models import user, module, exam, question, progress, import_manifest
 
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
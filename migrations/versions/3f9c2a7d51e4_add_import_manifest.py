@@ -0,0 +1,44 @@
+"""Add import manifest table for incremental imports
+
+Revision ID: 3f9c2a7d51e4
+Revises: 6b538fb010b4
+Create Date: 2026-10-19 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9c2a7d51e4'
+down_revision = '6b538fb010b4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'import_manifest',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('path', sa.String(length=500), nullable=False),
+        sa.Column('file_size', sa.Integer(), nullable=False),
+        sa.Column('mtime', sa.Float(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=True),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('last_error', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_import_manifest_path'), 'import_manifest', ['path'], unique=True)
+    op.create_index(op.f('ix_import_manifest_content_hash'), 'import_manifest', ['content_hash'], unique=False)
+    op.create_index(op.f('ix_import_manifest_exam_id'), 'import_manifest', ['exam_id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_import_manifest_exam_id'), table_name='import_manifest')
+    op.drop_index(op.f('ix_import_manifest_content_hash'), table_name='import_manifest')
+    op.drop_index(op.f('ix_import_manifest_path'), table_name='import_manifest')
+    op.drop_table('import_manifest')
@@ -0,0 +1,66 @@
+"""Add highlighted_snippets cache and backfill question code snippets
+
+Revision ID: 5c7e19a4d3b8
+Revises: 8d41e6b2c7a9
+Create Date: 2026-10-19 13:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from ingest.highlight import code_snippet, extract_code_blocks, render_snippet, snippet_hash
+
+
+# revision identifiers, used by Alembic.
+revision = '5c7e19a4d3b8'
+down_revision = '8d41e6b2c7a9'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'highlighted_snippets',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.Column('language', sa.String(length=20), nullable=False),
+        sa.Column('code', sa.Text(), nullable=False),
+        sa.Column('html', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_highlighted_snippets_content_hash'), 'highlighted_snippets', ['content_hash'], unique=True)
+
+    bind = op.get_bind()
+    texts = [text for (text,) in bind.execute(sa.text("SELECT text FROM answers"))]
+
+    # Backfill code_snippet for questions imported before it was extracted
+    updates = []
+    for question_id, text, snippet in bind.execute(sa.text("SELECT id, text, code_snippet FROM questions")):
+        texts.append(text)
+        if not snippet and code_snippet(text):
+            updates.append({'id': question_id, 'snippet': code_snippet(text)})
+    if updates:
+        bind.execute(sa.text("UPDATE questions SET code_snippet = :snippet WHERE id = :id"), updates)
+
+    # Render every distinct code block once
+    now = datetime.utcnow()
+    snippets = {snippet_hash(code): code for text in texts for code in extract_code_blocks(text)}
+    rows = [
+        {'content_hash': content_hash, 'code': code, 'html': render_snippet(code, inline=True), 'now': now}
+        for content_hash, code in snippets.items()
+    ]
+    if rows:
+        bind.execute(
+            sa.text("INSERT INTO highlighted_snippets (content_hash, language, code, html, created_at, updated_at) "
+                    "VALUES (:content_hash, 'python', :code, :html, :now, :now)"),
+            rows
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_highlighted_snippets_content_hash'), table_name='highlighted_snippets')
+    op.drop_table('highlighted_snippets')
@@ -0,0 +1,71 @@
+"""Add question content fingerprints and exam_questions association
+
+Revision ID: 8d41e6b2c7a9
+Revises: 3f9c2a7d51e4
+Create Date: 2026-10-19 11:00:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+from ingest.fingerprint import question_fingerprint
+
+
+# revision identifiers, used by Alembic.
+revision = '8d41e6b2c7a9'
+down_revision = '3f9c2a7d51e4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('questions', sa.Column('content_fingerprint', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_questions_content_fingerprint'), 'questions', ['content_fingerprint'], unique=False)
+
+    op.create_table(
+        'exam_questions',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('exam_id', sa.Integer(), nullable=False),
+        sa.Column('question_id', sa.Integer(), nullable=False),
+        sa.Column('question_order', sa.Integer(), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['exam_id'], ['exams.id'], ),
+        sa.ForeignKeyConstraint(['question_id'], ['questions.id'], ),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('exam_id', 'question_id', name='uq_exam_questions_exam_question')
+    )
+    op.create_index(op.f('ix_exam_questions_exam_id'), 'exam_questions', ['exam_id'], unique=False)
+    op.create_index(op.f('ix_exam_questions_question_id'), 'exam_questions', ['question_id'], unique=False)
+
+    # Existing questions keep their rows; each is linked to the exam that owns it
+    now = datetime.utcnow()
+    op.execute(
+        sa.text(
+            "INSERT INTO exam_questions (exam_id, question_id, question_order, created_at, updated_at) "
+            "SELECT exam_id, id, question_order, :now, :now FROM questions"
+        ).bindparams(now=now)
+    )
+
+    # Backfill fingerprints from question text and answer texts
+    bind = op.get_bind()
+    options = {}
+    for question_id, text in bind.execute(sa.text("SELECT question_id, text FROM answers")):
+        options.setdefault(question_id, []).append(text)
+
+    updates = [
+        {'id': question_id, 'fingerprint': question_fingerprint(text, options.get(question_id, []))}
+        for question_id, text in bind.execute(sa.text("SELECT id, text FROM questions"))
+    ]
+    if updates:
+        bind.execute(sa.text("UPDATE questions SET content_fingerprint = :fingerprint WHERE id = :id"), updates)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_exam_questions_question_id'), table_name='exam_questions')
+    op.drop_index(op.f('ix_exam_questions_exam_id'), table_name='exam_questions')
+    op.drop_table('exam_questions')
+    op.drop_index(op.f('ix_questions_content_fingerprint'), table_name='questions')
+    op.drop_column('questions', 'content_fingerprint')
@@ -0,0 +1,57 @@
+"""Make user_progress unique per user and topic
+
+Revision ID: a7e2d9c4f1b6
+Revises: 5c7e19a4d3b8
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7e2d9c4f1b6'
+down_revision = '5c7e19a4d3b8'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Merge duplicated (user, topic) rows into the most recently updated one
+    duplicates = bind.execute(sa.text(
+        "SELECT user_id, topic_id FROM user_progress GROUP BY user_id, topic_id HAVING COUNT(*) > 1"
+    )).all()
+    for user_id, topic_id in duplicates:
+        rows = bind.execute(sa.text(
+            "SELECT id, questions_attempted, questions_correct, average_time, last_practice_date"
+            " FROM user_progress WHERE user_id = :user_id AND topic_id = :topic_id"
+            " ORDER BY updated_at DESC, id DESC"
+        ), {'user_id': user_id, 'topic_id': topic_id}).all()
+
+        attempted = sum(row.questions_attempted or 0 for row in rows)
+        correct = sum(row.questions_correct or 0 for row in rows)
+        total_time = sum((row.average_time or 0.0) * (row.questions_attempted or 0) for row in rows)
+        practice_dates = [row.last_practice_date for row in rows if row.last_practice_date is not None]
+        bind.execute(sa.text(
+            "UPDATE user_progress SET questions_attempted = :attempted, questions_correct = :correct,"
+            " average_time = :average_time, proficiency_level = :proficiency,"
+            " last_practice_date = :last_practice_date WHERE id = :id"
+        ), {
+            'id': rows[0].id,
+            'attempted': attempted,
+            'correct': correct,
+            'average_time': total_time / attempted if attempted else 0.0,
+            # The weighted histories cannot be interleaved; restart from the merged accuracy
+            'proficiency': round(correct / attempted * 100, 2) / 100 if attempted else 0.0,
+            'last_practice_date': max(practice_dates) if practice_dates else None
+        })
+        bind.execute(sa.text(
+            "DELETE FROM user_progress WHERE user_id = :user_id AND topic_id = :topic_id AND id != :id"
+        ), {'user_id': user_id, 'topic_id': topic_id, 'id': rows[0].id})
+
+    op.create_index('uq_user_progress_user_topic', 'user_progress', ['user_id', 'topic_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_user_progress_user_topic', table_name='user_progress')
@@ -0,0 +1,49 @@
+"""Make user_responses unique per session and question
+
+Revision ID: c4d1f7a2e9b3
+Revises: a7e2d9c4f1b6
+Create Date: 2026-10-19 18:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c4d1f7a2e9b3'
+down_revision = 'a7e2d9c4f1b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    # Keep the first answer of any question answered twice in a session
+    duplicates = (
+        "SELECT id, exam_session_id FROM ("
+        "  SELECT id, exam_session_id,"
+        "         ROW_NUMBER() OVER (PARTITION BY exam_session_id, question_id ORDER BY id) AS rank"
+        "  FROM user_responses"
+        ") WHERE rank > 1"
+    )
+    session_ids = [row[0] for row in bind.execute(sa.text(f"SELECT DISTINCT exam_session_id FROM ({duplicates})"))]
+    bind.execute(sa.text(f"DELETE FROM user_responses WHERE id IN (SELECT id FROM ({duplicates}))"))
+
+    # Completed sessions that counted a duplicate get their score recomputed
+    for session_id in session_ids:
+        bind.execute(sa.text(
+            "UPDATE exam_sessions SET"
+            "  correct_answers = (SELECT COALESCE(SUM(is_correct), 0) FROM user_responses"
+            "                     WHERE exam_session_id = :id),"
+            "  score = CASE WHEN total_questions > 0 THEN ROUND("
+            "    (SELECT COALESCE(SUM(is_correct), 0) FROM user_responses WHERE exam_session_id = :id)"
+            "    * 100.0 / total_questions, 2) ELSE 0.0 END"
+            " WHERE id = :id AND is_completed"
+        ), {'id': session_id})
+
+    op.create_index('uq_user_responses_session_question', 'user_responses', ['exam_session_id', 'question_id'],
+                    unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_user_responses_session_question', table_name='user_responses')
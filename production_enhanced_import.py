@@ -98,16 +98,22 @@ def run_enhanced_import():
             logger.info("Database session obtained")
             
             # Import converter after models are available
-            from enhanced_metadata_converter import EnhancedMetadataConverter
+            from enhanced_metadata_converter import EnhancedMetadataConverter, prepare_file_with_metadata
+            from ingest.manifest import ImportManifestTracker
+            from ingest.parallel import ParallelIngestDriver
+            from models import ExamQuestion, HighlightedSnippet, ImportManifest
             
             # Create converter with dependency injection
             models = {
                 'Exam': Exam,
                 'Question': Question,
                 'Answer': Answer,
-                'Topic': Topic
+                'Topic': Topic,
+                'ExamQuestion': ExamQuestion,
+                'HighlightedSnippet': HighlightedSnippet
             }
-            converter = EnhancedMetadataConverter(session=session, models=models)
+            manifest = ImportManifestTracker(session, ImportManifest)
+            converter = EnhancedMetadataConverter(session=session, models=models, manifest=manifest)
             logger.info("Enhanced metadata converter initialized")
             
             # Find JSON files
@@ -125,43 +131,43 @@ def run_enhanced_import():
                 print("⚠️ No JSON files found")
                 return False
             
-            print(f"📁 Found {len(json_files)} exam files to import")
-            print("🔄 Starting import process...")
+            print(f"📁 Found {len(json_files)} exam files")
+            
+            # Skip files already imported (same size/mtime, or identical content)
+            file_paths = manifest.select_files(str(file_path) for file_path in json_files)
+            converter.import_summary['skipped_files'] = len(json_files) - len(file_paths)
+            print(f"⏭️  Skipping {manifest.stats['unchanged']} unchanged and "
+                  f"{manifest.stats['duplicate']} duplicate-content files")
+            print(f"🔄 Starting import of {len(file_paths)} files...")
             print()
             
-            # Process each file
+            # Parse files in worker processes; this process is the only DB writer
+            driver = ParallelIngestDriver(prepare_file_with_metadata, converter.import_prepared_file,
+                                          on_error=converter.failed_result)
+            converter.import_summary['total_files'] = len(json_files)
+            logger.info(f"Parsing with {driver.max_workers} worker processes")
+            
             results = []
-            for i, file_path in enumerate(json_files, 1):
-                print(f"[{i}/{len(json_files)}] Processing: {file_path.name}")
-                logger.info(f"Processing file {i}/{len(json_files)}: {file_path.name}")
+            for i, (file_path, result) in enumerate(driver.iter_results(file_paths), 1):
+                file_name = Path(file_path).name
+                print(f"[{i}/{len(file_paths)}] Processed: {file_name}")
+                results.append(result)
                 
-                try:
-                    result = converter.process_file_with_metadata(str(file_path))
-                    results.append(result)
-                    
-                    if result['success']:
-                        metadata = result['metadata']
-                        print(f"  ✅ Success - {metadata.get('file_type').title()}: {result['questions_imported']} questions")
-                        print(f"     ID: {metadata.get('exam_external_id')}, Time: {metadata.get('time_limit_minutes')}min")
-                        logger.info(f"Successfully imported {file_path.name}: {metadata.get('file_type')} with {result['questions_imported']} questions")
-                    else:
-                        print(f"  ❌ Failed - {len(result['errors'])} errors")
-                        for error in result['errors']:
-                            print(f"     - {error}")
-                            logger.error(f"Error in {file_path.name}: {error}")
-                
-                except Exception as e:
-                    print(f"  ❌ Exception - {str(e)}")
-                    logger.error(f"Exception processing {file_path.name}: {str(e)}")
-                    results.append({
-                        'file_path': str(file_path),
-                        'filename': file_path.name,
-                        'success': False,
-                        'errors': [str(e)]
-                    })
+                if result['success']:
+                    metadata = result['metadata']
+                    print(f"  ✅ Success - {metadata.get('file_type').title()}: {result['questions_imported']} questions")
+                    print(f"     ID: {metadata.get('exam_external_id')}, Time: {metadata.get('time_limit_minutes')}min")
+                    logger.info(f"Successfully imported {file_name}: {metadata.get('file_type')} with {result['questions_imported']} questions")
+                else:
+                    print(f"  ❌ Failed - {len(result['errors'])} errors")
+                    for error in result['errors']:
+                        print(f"     - {error}")
+                        logger.error(f"Error in {file_name}: {error}")
                 
                 print()
             
+            converter.import_summary['processing_time'] = driver.stats['wall_time']
+            
             # Generate comprehensive report
             summary = converter.get_import_summary()
             report = converter.generate_metadata_report(results)
@@ -171,6 +177,7 @@ def run_enhanced_import():
             print("📊 IMPORT SUMMARY")
             print("=" * 60)
             print(f"Total Files Processed: {summary['total_files']}")
+            print(f"Skipped (already imported): {summary['skipped_files']}")
             print(f"Successful Imports: {summary['successful_imports']}")
             print(f"Failed Imports: {summary['failed_imports']}")
             print(f"Total Exams Created: {summary['total_exams']}")
@@ -186,8 +193,9 @@ def run_enhanced_import():
             print()
             
             # Success rate
-            if summary['total_files'] > 0:
-                success_rate = (summary['successful_imports'] / summary['total_files']) * 100
+            attempted_files = summary['total_files'] - summary['skipped_files']
+            if attempted_files > 0:
+                success_rate = (summary['successful_imports'] / attempted_files) * 100
                 print(f"✅ Success Rate: {success_rate:.1f}%")
             
             # Save detailed report
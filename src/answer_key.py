@@ -0,0 +1,218 @@
+"""
+Answer-key index for PCEP Exam Accelerator.
+
+Grading a response used to mean loading a question's ``answers`` relationship
+and scanning it for ``is_correct``, and multi-select questions could not be
+graded at all. ``AnswerKeyIndex`` keeps the whole answer key in flat arrays
+indexed by primary key instead:
+
+- ``masks[question_id]``: bitmask of the correct answer positions (bit N is the
+  Nth answer in ``answer_order``); 0 when the question has no known key
+- ``required[question_id]``: number of answers the question asks for, from
+  the multi-answer detection in ``question_metadata``
+- ``answer_questions[answer_id]`` / ``answer_bits[answer_id]``: the question
+  an answer belongs to and its bit position
+
+A selection (one or several answer ids) becomes a bitmask with a few array
+reads, and a response is correct when that bitmask equals the question's key,
+so grading is O(1) per response and a whole session is graded with integer ops
+and no ORM access. Question and answer ids are dense autoincrement keys, so the
+arrays stay close to the size of the tables (about 9 bytes per question and
+5 bytes per answer).
+
+The index is built with two queries at application start and refreshed for
+each exam an import job writes.
+"""
+
+import json
+import logging
+from array import array
+
+from sqlalchemy import select
+
+from models import Answer, Question
+
+logger = logging.getLogger(__name__)
+
+# Answers past this position in a question cannot be represented in the mask
+MAX_ANSWERS = 64
+
+
+def _grow(values, size):
+    """Extend an array with zeros so that index ``size - 1`` exists."""
+    if len(values) < size:
+        values.extend(array(values.typecode, bytes(values.itemsize * (size - len(values)))))
+
+
+def _required_answers(metadata, mask):
+    """Answers a question asks for: the detected count for multi-select, else 1."""
+    try:
+        detection = json.loads(metadata or '{}')
+    except (TypeError, ValueError):
+        detection = None
+    if not isinstance(detection, dict) or detection.get('type') != 'multi-select':
+        return 1
+    try:
+        return max(1, min(int(detection['required_answers']), MAX_ANSWERS))
+    except (KeyError, TypeError, ValueError):
+        # Detected as multi-select without a count: ask for every correct answer
+        return max(1, bin(mask).count('1'))
+
+
+class AnswerKeyIndex:
+    """Array-backed map from question id to correct-answer bitmask and required count."""
+
+    def __init__(self):
+        """Initialize an empty index; use ``build`` or ``load`` to fill it."""
+        self.masks = array('Q')
+        self.required = array('B')
+        self.answer_questions = array('I')
+        self.answer_bits = array('B')
+
+    @classmethod
+    def build(cls, session, question_ids=None):
+        """
+        Build an index from the database.
+
+        Args:
+            session: SQLAlchemy session
+            question_ids (iterable): Only index these questions (default: all)
+
+        Returns:
+            AnswerKeyIndex: The index
+        """
+        index = cls()
+        index.load(session, question_ids=question_ids)
+        return index
+
+    def load(self, session, question_ids=None, exam_ids=None):
+        """
+        (Re)load the key of some or all questions with two queries.
+
+        Args:
+            session: SQLAlchemy session
+            question_ids (iterable): Questions to load
+            exam_ids (iterable): Load every question of these exams
+
+        Returns:
+            int: Number of questions loaded
+        """
+        questions = select(Question.id, Question.question_metadata)
+        answers = select(Answer.question_id, Answer.id, Answer.is_correct) \
+            .order_by(Answer.question_id, Answer.answer_order, Answer.id)
+        if question_ids is not None:
+            question_ids = list(question_ids)
+            questions = questions.where(Question.id.in_(question_ids))
+            answers = answers.where(Answer.question_id.in_(question_ids))
+        if exam_ids is not None:
+            exam_questions = select(Question.id).where(Question.exam_id.in_(list(exam_ids)))
+            questions = questions.where(Question.id.in_(exam_questions))
+            answers = answers.where(Answer.question_id.in_(exam_questions))
+
+        masks = {}
+        for question_id, answer_id, is_correct in session.execute(answers):
+            mask, position = masks.get(question_id, (0, 0))
+            if position >= MAX_ANSWERS:
+                logger.warning(f"Question {question_id} has more than {MAX_ANSWERS} answers; "
+                               f"answer {answer_id} cannot be graded")
+                continue
+            _grow(self.answer_questions, answer_id + 1)
+            _grow(self.answer_bits, answer_id + 1)
+            self.answer_questions[answer_id] = question_id
+            self.answer_bits[answer_id] = position
+            masks[question_id] = (mask | (1 << position) if is_correct else mask, position + 1)
+
+        count = 0
+        for question_id, metadata in session.execute(questions):
+            mask = masks.get(question_id, (0, 0))[0]
+            _grow(self.masks, question_id + 1)
+            _grow(self.required, question_id + 1)
+            self.masks[question_id] = mask
+            self.required[question_id] = _required_answers(metadata, mask)
+            count += 1
+        return count
+
+    def __contains__(self, question_id):
+        return 0 <= question_id < len(self.required) and self.required[question_id] > 0
+
+    def __len__(self):
+        return sum(1 for required in self.required if required)
+
+    def key(self, question_id):
+        """
+        Look up a question's answer key.
+
+        Args:
+            question_id (int): Question id
+
+        Returns:
+            tuple: (correct-answer bitmask, required answer count); (0, 0) for
+                unknown questions
+        """
+        if question_id not in self:
+            return 0, 0
+        return self.masks[question_id], self.required[question_id]
+
+    def selection_mask(self, question_id, answer_ids):
+        """
+        Turn the answers selected for a question into a bitmask.
+
+        Args:
+            question_id (int): Question answered
+            answer_ids (iterable): Selected answer ids
+
+        Returns:
+            int: Selection bitmask
+
+        Raises:
+            ValueError: If an answer does not belong to the question
+        """
+        mask = 0
+        for answer_id in answer_ids:
+            if not 0 <= answer_id < len(self.answer_questions) or self.answer_questions[answer_id] != question_id:
+                raise ValueError(f"Answer {answer_id} does not belong to question {question_id}")
+            mask |= 1 << self.answer_bits[answer_id]
+        return mask
+
+    def is_correct(self, question_id, selection):
+        """
+        Grade one response: the selection must be exactly the correct answers.
+
+        Questions without a known key (no answer marked correct) grade as wrong.
+
+        Args:
+            question_id (int): Question answered
+            selection (int): Selection bitmask
+
+        Returns:
+            bool: True if correct
+        """
+        key = self.masks[question_id] if question_id in self else 0
+        return key != 0 and selection == key
+
+    def grade(self, responses):
+        """
+        Grade a batch of responses.
+
+        Args:
+            responses (iterable): (question_id, selection bitmask) pairs
+
+        Returns:
+            list: One bool per response
+        """
+        masks = self.masks
+        size = len(masks)
+        return [0 <= question_id < size and masks[question_id] != 0 and selection == masks[question_id]
+                for question_id, selection in responses]
+
+    def score(self, responses):
+        """
+        Count the correct responses of a session.
+
+        Args:
+            responses (iterable): (question_id, selection bitmask) pairs
+
+        Returns:
+            int: Number of correct responses
+        """
+        return sum(self.grade(responses))
@@ -2,13 +2,23 @@
 Main application factory for the PCEP Exam Accelerator.
 """
 
-from flask import Flask, render_template, jsonify
+import click
+from flask import Flask, render_template, jsonify, request
 from flask_migrate import Migrate
-from database import init_database, Base
+from sqlalchemy.exc import SQLAlchemyError
+from database import init_database, Base, DatabaseManager, UPSERT_INSERTS
 # Task 19C: Import models for database integration
-from models import User, Question, Answer, Exam, ExamSession, UserProgress, UserResponse
+from models import (User, Question, Answer, Exam, ExamQuestion, ExamSession, UserProgress, UserResponse,
+                    HighlightedSnippet, ImportManifest)
 from models.module import Module as Topic
+from ingest.highlight import SnippetCache, code_snippet, extract_code_blocks, render_code_blocks, snippet_hash
+from ingest.jobs import ImportJobQueue
+from answer_key import AnswerKeyIndex
+from exam_sessions import SessionClosed, SessionNotFound, create_exam_session, grade_responses, submit_responses
+from response_buffer import ResponseBuffer
+import atexit
 import os
+from pathlib import Path
 
 # Global migrate instance
 migrate = Migrate()
@@ -34,6 +44,15 @@ def create_app(config_name='default'):
     # Initialize Flask-Migrate
     migrate.init_app(app, Base)
     
+    # Answer key for server-side grading
+    init_answer_key(app)
+    
+    # Background import jobs
+    init_import_jobs(app)
+    
+    # Write-behind buffer for per-answer responses
+    init_response_buffer(app)
+    
     # Register CLI commands
     register_cli_commands(app)
     
@@ -58,7 +77,19 @@ def configure_app(app, config_name):
         # Keep DATABASE_URL for backward compatibility
         DATABASE_URL=os.environ.get('DATABASE_URL', 'sqlite:///instance/pcep_exam.db'),
         SQLALCHEMY_ECHO=False,
-        SQLALCHEMY_TRACK_MODIFICATIONS=False
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+        # Background imports only read files below this folder
+        IMPORT_ROOT=os.environ.get('IMPORT_ROOT', str(Path(__file__).resolve().parent.parent / 'Exam_HTML_Raw_Data_JSON_ONLY')),
+        IMPORT_JOB_BATCH_SIZE=500,
+        # Fraction of wall time an import job may spend writing (1.0 = unthrottled)
+        IMPORT_JOB_DUTY_CYCLE=0.5,
+        # Commit large exams every N questions so readers are not locked out for a whole file
+        IMPORT_JOB_COMMIT_EVERY=2000,
+        # Per-answer responses are written in batches of up to N rows, at most every N ms
+        RESPONSE_BUFFER_MAX_ROWS=500,
+        RESPONSE_BUFFER_INTERVAL_MS=50,
+        # 'buffered' acknowledges answers once queued, 'flushed' once committed
+        RESPONSE_BUFFER_DURABILITY=os.environ.get('RESPONSE_BUFFER_DURABILITY', 'buffered')
     )
     
     # Environment-specific configuration
@@ -84,6 +115,99 @@ def configure_app(app, config_name):
         if app.config['SECRET_KEY'] == 'dev-secret-key-change-in-production':
             raise RuntimeError("Must set SECRET_KEY environment variable in production")
 
+def init_answer_key(app):
+    """
+    Load the answer key of every question for O(1) grading.
+    
+    A database without tables yet leaves the key empty; questions are then
+    loaded into it as sessions reference them.
+    
+    Args:
+        app: Flask application instance
+    """
+    app.answer_key = AnswerKeyIndex()
+    session = app.db_manager.get_session()
+    try:
+        count = app.answer_key.load(session)
+        print(f"Answer key loaded for {count} questions")
+    except SQLAlchemyError as e:
+        print(f"Answer key not loaded: {e.__class__.__name__}")
+    finally:
+        session.close()
+
+def reload_answer_key(app, session):
+    """
+    Replace the answer key with a fresh one built from the database.
+    
+    The new index is built aside and swapped in, so requests grading at the
+    same time never see a half-loaded key.
+    
+    Args:
+        app: Flask application instance
+        session: SQLAlchemy session
+    
+    Returns:
+        int: Number of questions in the new key
+    """
+    answer_key = AnswerKeyIndex.build(session)
+    app.answer_key = answer_key
+    return len(answer_key)
+
+def init_import_jobs(app):
+    """
+    Attach the background import job queue to the application.
+    
+    The worker gets its own database connection, because the SQLite engine
+    shares one connection across sessions and a request closing its session
+    would roll back the import's open transaction. In-memory databases exist
+    only on that one connection, so they are shared as they are.
+    
+    Args:
+        app: Flask application instance
+    """
+    database_url = app.config['DATABASE_URL']
+    import_db = app.db_manager if database_url.endswith(':memory:') else DatabaseManager(database_url=database_url)
+    
+    models = {
+        'Exam': Exam,
+        'Question': Question,
+        'Answer': Answer,
+        'ExamQuestion': ExamQuestion,
+        'HighlightedSnippet': HighlightedSnippet,
+        'ImportManifest': ImportManifest
+    }
+    app.import_jobs = ImportJobQueue(import_db.get_session, models,
+                                     batch_size=app.config['IMPORT_JOB_BATCH_SIZE'],
+                                     duty_cycle=app.config['IMPORT_JOB_DUTY_CYCLE'],
+                                     commit_every=app.config['IMPORT_JOB_COMMIT_EVERY'],
+                                     on_imported=lambda session, exam_ids: app.answer_key.load(session, exam_ids=exam_ids))
+
+def init_response_buffer(app):
+    """
+    Attach the write-behind buffer for per-answer responses.
+    
+    Like the import worker, the flusher gets its own database connection
+    unless the database is in memory. Queued responses are written at exit.
+    
+    Args:
+        app: Flask application instance
+    
+    Raises:
+        RuntimeError: If the database has no ON CONFLICT support (only SQLite
+            and PostgreSQL are supported), rather than losing answers at flush time
+    """
+    database_url = app.config['DATABASE_URL']
+    buffer_db = app.db_manager if database_url.endswith(':memory:') else DatabaseManager(database_url=database_url)
+    dialect = buffer_db.create_engine().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise RuntimeError(f"Recording answers needs SQLite or PostgreSQL; DATABASE_URL is a {dialect} database")
+    
+    app.response_buffer = ResponseBuffer(buffer_db.get_session,
+                                         max_rows=app.config['RESPONSE_BUFFER_MAX_ROWS'],
+                                         interval_ms=app.config['RESPONSE_BUFFER_INTERVAL_MS'],
+                                         durability=app.config['RESPONSE_BUFFER_DURABILITY'])
+    atexit.register(app.response_buffer.close)
+
 def register_cli_commands(app):
     """
     Register CLI commands for database management.
@@ -108,6 +232,61 @@ def register_cli_commands(app):
             print("Database tables dropped successfully!")
         except Exception as e:
             print(f"Error dropping database tables: {e}")
+    
+    @app.cli.command('regrade')
+    @click.option('--server', metavar='URL',
+                  help='Base URL of the running app, e.g. http://localhost:5000, to reload its answer key')
+    def regrade_command(server):
+        """Re-grade all responses against the current answer key and recompute scores and progress.
+        
+        A running server keeps grading with the key it loaded at startup until
+        it is reloaded: pass --server, POST /api/answer-key/reload, or restart it.
+        """
+        from regrade import regrade_responses
+        
+        session = app.db_manager.get_session()
+        try:
+            stats = regrade_responses(session)
+            reload_answer_key(app, session)
+            print(f"Re-graded {stats['responses']} responses in {stats['seconds']}s: {stats['changed']} changed, "
+                  f"{stats['sessions']} sessions and {stats['progress']} progress rows recomputed")
+        except Exception as e:
+            session.rollback()
+            print(f"Error re-grading responses: {e}")
+            return
+        finally:
+            session.close()
+        
+        if server:
+            from urllib.error import URLError
+            from urllib.request import Request, urlopen
+            try:
+                with urlopen(Request(server.rstrip('/') + '/api/answer-key/reload', method='POST'), timeout=30) as response:
+                    print(f"Server answer key reloaded: {response.read().decode()}")
+            except (URLError, OSError) as e:
+                print(f"Error reloading the server's answer key: {e}")
+        else:
+            print("Reload a running server's answer key with POST /api/answer-key/reload (or restart it)")
+    
+    @app.cli.command('render-snippets')
+    def render_snippets_command():
+        """Pre-render syntax highlighting for code blocks not yet in the snippet cache."""
+        session = app.db_manager.get_session()
+        try:
+            texts = [text for (text,) in session.query(Answer.text)]
+            for question in session.query(Question):
+                texts.append(question.text)
+                if not question.code_snippet:
+                    question.code_snippet = code_snippet(question.text)
+            
+            rendered = SnippetCache(session, HighlightedSnippet).ensure(texts)
+            session.commit()
+            print(f"Rendered {rendered} new code snippets")
+        except Exception as e:
+            session.rollback()
+            print(f"Error rendering code snippets: {e}")
+        finally:
+            session.close()
 
 def register_routes(app, config_name):
     """
@@ -192,9 +371,137 @@ def register_routes(app, config_name):
             "status": "healthy", 
             "config": config_name,
             "database_configured": bool(app.config.get("DATABASE_URL")),
+            "response_buffer_depth": app.response_buffer.depth(),
             "version": "1.0.0"
         })
     
+    @app.route('/api/imports', methods=['POST'])
+    def api_create_import():
+        """Queue a background import of exam files below IMPORT_ROOT"""
+        import_root = Path(app.config['IMPORT_ROOT']).resolve()
+        payload = request.get_json(silent=True) or {}
+        files = payload.get('files') or ['.']
+        
+        if not isinstance(files, list) or not all(isinstance(name, str) for name in files):
+            return jsonify({"error": "'files' must be a list of paths relative to the import folder"}), 400
+        
+        sources = []
+        for name in files:
+            path = (import_root / name).resolve()
+            if not path.is_relative_to(import_root):
+                return jsonify({"error": f"Path outside the import folder: {name}"}), 400
+            if not path.exists():
+                return jsonify({"error": f"File not found: {name}"}), 400
+            sources.append(path)
+        
+        try:
+            job = app.import_jobs.submit(sources)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        
+        return jsonify(job), 202
+    
+    @app.route('/api/imports')
+    def api_list_imports():
+        """List background import jobs, newest first"""
+        return jsonify(app.import_jobs.list_jobs())
+    
+    @app.route('/api/imports/<int:job_id>')
+    def api_import_status(job_id):
+        """Per-file progress, throughput and errors of a background import"""
+        job = app.import_jobs.get(job_id)
+        if job is None:
+            return jsonify({"error": f"Import job {job_id} not found"}), 404
+        return jsonify(job)
+    
+    @app.route('/api/sessions', methods=['POST'])
+    def api_create_session():
+        """Open a server-side exam session for a practice quiz"""
+        payload = request.get_json(silent=True) or {}
+        session = app.db_manager.get_session()
+        try:
+            exam_session = create_exam_session(session, exam_id=payload.get('exam_id'),
+                                               user_id=payload.get('user_id'),
+                                               question_ids=payload.get('question_ids'))
+        except ValueError as e:
+            session.rollback()
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
+        
+        return jsonify(exam_session), 201
+    
+    @app.route('/api/sessions/<int:session_id>/responses', methods=['POST'])
+    def api_submit_responses(session_id):
+        """Record a batch of responses and, unless 'complete' is false, score the session"""
+        payload = request.get_json(silent=True) or {}
+        complete = payload.get('complete', True) is not False
+        if complete:
+            # Answers recorded one by one must be stored before the session is scored
+            app.response_buffer.flush()
+        session = app.db_manager.get_session()
+        try:
+            exam_session = submit_responses(session, session_id, payload.get('responses'),
+                                            complete=complete,
+                                            answer_key=app.answer_key,
+                                            pending=app.response_buffer.pending(session_id))
+        except SessionNotFound as e:
+            return jsonify({"error": str(e)}), 404
+        except SessionClosed as e:
+            return jsonify({"error": str(e)}), 409
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
+        
+        return jsonify(exam_session)
+    
+    @app.route('/api/sessions/<int:session_id>/answers', methods=['POST'])
+    def api_record_answer(session_id):
+        """Record one answer through the write-behind buffer"""
+        payload = request.get_json(silent=True)
+        session = app.db_manager.get_session()
+        try:
+            _, rows = grade_responses(session, session_id, [payload], answer_key=app.answer_key,
+                                      pending=app.response_buffer.pending(session_id))
+        except SessionNotFound as e:
+            return jsonify({"error": str(e)}), 404
+        except SessionClosed as e:
+            return jsonify({"error": str(e)}), 409
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+        finally:
+            session.close()
+        
+        try:
+            result = app.response_buffer.put(rows)
+        except ValueError as e:
+            # Another click on the same question got into the buffer first
+            return jsonify({"error": str(e)}), 400
+        except SQLAlchemyError as e:
+            return jsonify({"error": f"Answer not stored: {e.__class__.__name__}"}), 503
+        
+        # 201 once committed, 202 when only queued
+        return jsonify({"session_id": session_id, **result}), 201 if result['flushed'] else 202
+    
+    @app.route('/api/answer-key/reload', methods=['POST'])
+    def api_reload_answer_key():
+        """Reload the answer key after answers were corrected (e.g. by flask regrade)"""
+        session = app.db_manager.get_session()
+        try:
+            count = reload_answer_key(app, session)
+        except SQLAlchemyError as e:
+            return jsonify({"error": f"Answer key not reloaded: {e.__class__.__name__}"}), 503
+        finally:
+            session.close()
+        
+        return jsonify({"questions": count})
+    
+    @app.route('/api/response-buffer')
+    def api_response_buffer():
+        """Queue depth and flush latency of the response buffer"""
+        return jsonify(app.response_buffer.stats())
+    
     @app.route('/api/questions')
     def api_questions():
         """API endpoint to get practice questions from database"""
@@ -213,33 +520,48 @@ def register_routes(app, config_name):
             db_questions = session.query(Question).order_by(Question.id).all()
             print(f"Found {len(db_questions)} questions in database")
             
+            # All answers in one query, grouped by question
+            answers_by_question = {}
+            for answer in session.query(Answer).order_by(Answer.question_id, Answer.id):
+                answers_by_question.setdefault(answer.question_id, []).append(answer)
+            
+            # Pre-rendered highlighting for every code block on the page, in one query
+            snippet_cache = SnippetCache(session, HighlightedSnippet)
+            page_texts = [db_q.text for db_q in db_questions]
+            page_texts.extend(answer.text for answers in answers_by_question.values() for answer in answers)
+            rendered = snippet_cache.lookup(
+                snippet_hash(code) for text in page_texts for code in extract_code_blocks(text)
+            )
+            
             # Convert database questions to frontend format
             questions = []
             for db_q in db_questions:
                 print(f"Processing question {db_q.id}: {db_q.text[:50]}...")
                 
-                # Get answers for this question
-                answers = session.query(Answer).filter(Answer.question_id == db_q.id).order_by(Answer.id).all()
+                answers = answers_by_question.get(db_q.id, [])
                 print(f"  Found {len(answers)} answers")
                 
                 # Find correct answer index
                 correct_index = 0
                 answer_texts = []
                 for i, answer in enumerate(answers):
-                    answer_texts.append(answer.text)
+                    answer_texts.append(render_code_blocks(answer.text, rendered))
                     if answer.is_correct:
                         correct_index = i
                 
                 # Convert to frontend format
+                required_answers = app.answer_key.key(db_q.id)[1] or 1
                 question_data = {
                     "id": db_q.id,
-                    "question": db_q.text,
+                    "question": render_code_blocks(db_q.text, rendered),
+                    "code_snippet": db_q.code_snippet,
                     "options": answer_texts,
+                    "option_ids": [answer.id for answer in answers],
                     "correct": correct_index,
                     "explanation": db_q.explanation or "No explanation available.",
                     "topic": "Database Question",  # Simplified for now
-                    "type": "single-select",
-                    "required_answers": 1
+                    "type": "multi-select" if required_answers > 1 else "single-select",
+                    "required_answers": required_answers
                 }
                 questions.append(question_data)
             
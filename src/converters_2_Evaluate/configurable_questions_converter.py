@@ -4,6 +4,8 @@ Configurable Questions Converter for PCEP Exam Practice App
 ===========================================================
 
 This script converts quiz data to Python format with configurable input and output files.
+The questions are written to a compact ``.qbank`` data file next to the output
+module, which loads them lazily (see ingest.question_bank).
 
 Usage:
     python configurable_questions_converter.py [input_file] [output_file]
@@ -20,7 +22,8 @@ Examples:
 
 Arguments:
     input_file   : Path to HTML file containing quiz data (optional, uses embedded data if not provided)
-    output_file  : Path for the generated Python questions file (default: pcep_module_4_questions.py)
+    output_file  : Path for the generated Python questions file (default: pcep_module_4_questions.py);
+                   the data goes to the same path with a .qbank suffix
 
 Dependencies:
     pip install pygments
@@ -38,8 +41,14 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 import html
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ingest.embedded_data import extract_embedded_data_from_file
+from ingest.highlight import render_snippet
+from ingest.pipeline import ConverterPipeline, iter_exam_records
+from ingest.question_bank import QuestionBankSink
+
 try:
-    from pygments import highlight
     from pygments.lexers import PythonLexer
     from pygments.formatters import HtmlFormatter
 except ImportError as e:
@@ -332,8 +341,8 @@ class ConfigurableQuestionConverter:
         for code in matches:
             clean_code = html.unescape(code).strip()
             if clean_code and len(clean_code) > 5:  # Only process substantial code blocks
-                # Apply syntax highlighting
-                highlighted = highlight(clean_code, self.python_lexer, self.html_formatter)
+                # Apply syntax highlighting (cached per distinct snippet)
+                highlighted = render_snippet(clean_code)
                 code_blocks.append({
                     'original': clean_code,
                     'highlighted': highlighted
@@ -345,57 +354,53 @@ class ConfigurableQuestionConverter:
         
         return clean_text, code_blocks
 
-    def convert_questions(self, quiz_data: dict) -> List[Dict[str, Any]]:
-        """Convert the quiz data to our format."""
-        converted_questions = []
+    def convert_question(self, q: Dict[str, Any]) -> Dict[str, Any]:
+        """Convert one quiz question to our format."""
+        # Process question text
+        question_text, question_code_blocks = self.extract_code_blocks(q["question"])
         
-        for i, q in enumerate(quiz_data["questions"], 1):
-            print(f"Processing question {i}/{len(quiz_data['questions'])}...")
-            
-            # Process question text
-            question_text, question_code_blocks = self.extract_code_blocks(q["question"])
-            
-            # Process options
-            options = []
-            for opt in q["options"]:
-                option_text, option_code_blocks = self.extract_code_blocks(opt["option"])
-                options.append({
-                    'id': opt["id"],
-                    'text': option_text,
-                    'code_blocks': option_code_blocks
-                })
-            
-            # Convert to our format
-            converted_question = {
-                'id': q["id"],
-                'question': question_text,
-                'code_blocks': question_code_blocks,
-                'options': options,
-                'type': 'multiple' if q["type"] == 'Multiple Choice' else 'single',
-                'multiple_choice': q["type"] == 'Multiple Choice',
-                'explanation': f"This question is from PE1 Module 4 Test, covering Python functions, tuples, dictionaries, and exceptions."
-            }
-            
-            converted_questions.append(converted_question)
+        # Process options
+        options = []
+        for opt in q["options"]:
+            option_text, option_code_blocks = self.extract_code_blocks(opt["option"])
+            options.append({
+                'id': opt["id"],
+                'text': option_text,
+                'code_blocks': option_code_blocks
+            })
         
-        return converted_questions
+        # Convert to our format
+        return {
+            'id': q["id"],
+            'question': question_text,
+            'code_blocks': question_code_blocks,
+            'options': options,
+            'type': 'multiple' if q["type"] == 'Multiple Choice' else 'single',
+            'multiple_choice': q["type"] == 'Multiple Choice',
+            'explanation': f"This question is from PE1 Module 4 Test, covering Python functions, tuples, dictionaries, and exceptions."
+        }
+    
+    def question_pipeline(self, sink=None) -> ConverterPipeline:
+        """Build the shared converter pipeline with convert_question as its normalizer."""
+        return ConverterPipeline(sink, normalizer=lambda question, position: self.convert_question(question),
+                                 exam_normalizer=None, enrichers=(), validator=None)
+    
+    def convert_questions(self, quiz_data: dict) -> List[Dict[str, Any]]:
+        """Convert the quiz data to our format."""
+        records = self.question_pipeline().process(iter_exam_records(quiz_data, 'quiz data'))
+        return [record['row'] for record in records]
 
     def load_quiz_data_from_html(self, html_file: str) -> Optional[Dict]:
         """Load quiz data from HTML file."""
         try:
-            with open(html_file, 'r', encoding='utf-8') as f:
-                html_content = f.read()
+            # Extract JavaScript data from the memory-mapped HTML file
+            data = extract_embedded_data_from_file(html_file)
             
-            # Extract JavaScript data from HTML
-            pattern = r'let data = ({.*?});'
-            match = re.search(pattern, html_content, re.DOTALL)
-            
-            if not match:
+            if data is None:
                 print(f"Could not find JavaScript data object in {html_file}")
                 return None
                 
-            data_str = match.group(1)
-            return json.loads(data_str)
+            return data
             
         except FileNotFoundError:
             print(f"HTML file not found: {html_file}")
@@ -408,71 +413,32 @@ class ConfigurableQuestionConverter:
             return None
 
     def generate_questions_file(self, output_file: str, quiz_data: dict) -> List[Dict[str, Any]]:
-        """Generate the Python questions file."""
+        """Generate the Python questions module and its question bank data file; returns the questions."""
         print("Converting questions...")
-        questions = self.convert_questions(quiz_data)
+        sink = QuestionBankSink(
+            output_file,
+            variable='PCEP_MODULE_4_QUESTIONS',
+            title='PCEP Module 4 Test Questions Dataset',
+            source='PE1 -- Module 4 Test HTML file',
+            generator='configurable_questions_converter.py',
+            css=self.html_formatter.get_style_defs('.highlight')
+        )
         
-        # Generate CSS for syntax highlighting
-        css = self.html_formatter.get_style_defs('.highlight')
+        # Questions are converted and written one at a time, and kept for the caller
+        pipeline = self.question_pipeline(sink)
+        questions = []
         
-        # Generate the Python file content
-        content = f'''"""
-PCEP Module 4 Test Questions Dataset
-===================================
-
-Auto-generated from PE1 -- Module 4 Test HTML file.
-Contains all {len(questions)} questions with Python syntax highlighting and clean formatting.
-
-Generated by: configurable_questions_converter.py
-Date: 2025-06-27
-Total Questions: {len(questions)}
-"""
-
-# Pygments CSS for syntax highlighting
-PYGMENTS_CSS = """
-{css}
-"""
-
-# Complete questions dataset
-PCEP_MODULE_4_QUESTIONS = {json.dumps(questions, indent=2, ensure_ascii=False)}
-
-# Helper functions
-def get_all_questions():
-    """Return all questions in the dataset."""
-    return PCEP_MODULE_4_QUESTIONS
-
-def get_question_by_id(question_id):
-    """Get a specific question by ID."""
-    for question in PCEP_MODULE_4_QUESTIONS:
-        if question['id'] == question_id:
-            return question
-    return None
-
-def get_question_count():
-    """Get the total number of questions."""
-    return len(PCEP_MODULE_4_QUESTIONS)
-
-def get_single_choice_questions():
-    """Get all single choice questions."""
-    return [q for q in PCEP_MODULE_4_QUESTIONS if not q['multiple_choice']]
-
-def get_multiple_choice_questions():
-    """Get all multiple choice questions."""
-    return [q for q in PCEP_MODULE_4_QUESTIONS if q['multiple_choice']]
-
-if __name__ == "__main__":
-    print(f"PCEP Module 4 Questions Dataset loaded successfully!")
-    print(f"Total questions: {{get_question_count()}}")
-    print(f"Single choice: {{len(get_single_choice_questions())}}")
-    print(f"Multiple choice: {{len(get_multiple_choice_questions())}}")
-    print(f"Question IDs: {{[q['id'] for q in PCEP_MODULE_4_QUESTIONS]}}")
-'''
+        def kept(records):
+            for record in records:
+                questions.append(record['row'])
+                yield record
+        
+        results = sink.write(kept(pipeline.process(iter_exam_records(quiz_data, 'quiz data'))))
         
-        # Save the file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        for error in pipeline.errors:
+            print(f"❌ {error['error']}")
         
-        print(f"✅ Questions file generated: {output_file}")
+        print(f"✅ Questions file generated: {output_file} (data: {results[0]['data_file']})")
         print(f"📊 Total questions: {len(questions)}")
         print(f"📋 Single choice: {len([q for q in questions if not q['multiple_choice']])}")
         print(f"📋 Multiple choice: {len([q for q in questions if q['multiple_choice']])}")
@@ -546,7 +512,7 @@ def main():
     print("=" * 50)
     
     # Convert and generate
-    questions = converter.generate_questions_file(output_file, quiz_data)
+    converter.generate_questions_file(output_file, quiz_data)
     print("\n✅ Conversion completed successfully!")
 
 
@@ -48,7 +48,6 @@ VERSION: 2.0 (Enhanced Metadata Edition)
 """
 
 import os
-import re
 import json
 import logging
 import traceback
@@ -60,6 +59,13 @@ from datetime import datetime
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.exc import SQLAlchemyError
 
+from ingest.bulk_loader import BulkExamLoader
+from ingest.embedded_data import extract_embedded_data
+from ingest.json_stream import read_exam_stream
+from ingest.parallel import ParallelIngestDriver
+from ingest.pipeline import ConverterPipeline
+from ingest.schema import describe, exam_validator
+
 # Model imports - Use dependency injection to avoid circular imports
 try:
     # These will be injected by the calling code to avoid circular imports
@@ -67,6 +73,8 @@ try:
     Question = None
     Answer = None
     Topic = None
+    ExamQuestion = None
+    HighlightedSnippet = None
     db = None
     print("⚠️ Models will be injected by calling code to avoid circular imports")
 except Exception as e:
@@ -75,6 +83,8 @@ except Exception as e:
     Question = None
     Answer = None
     Topic = None
+    ExamQuestion = None
+    HighlightedSnippet = None
     db = None
     Topic = None
 
@@ -83,17 +93,24 @@ class EnhancedMetadataConverter:
     Enhanced converter with intelligent metadata extraction and file type recognition.
     """
     
-    def __init__(self, session=None, models=None):
+    def __init__(self, session=None, models=None, manifest=None, commit_every=None):
         """
         Initialize the enhanced converter.
         
         Args:
             session: SQLAlchemy session object (optional)
             models: Dictionary containing model classes {'Exam': ExamClass, 'Question': QuestionClass, etc.}
+            manifest: ImportManifestTracker used to skip already-imported files (optional)
+            commit_every: Commit large exams in chunks of this many questions (optional)
         """
         self.session = session
+        self.manifest = manifest
+        self.commit_every = commit_every
+        self.pipeline = ConverterPipeline(None, normalizer=self._build_question_row, exam_normalizer=None,
+                                          validator=None)
         self.processed_files = []
         self.errors = []
+        self.rejected_questions = []
         self.import_summary = {
             'total_files': 0,
             'successful_imports': 0,
@@ -101,16 +118,20 @@ class EnhancedMetadataConverter:
             'file_types': {'quiz': 0, 'test': 0, 'exam': 0, 'assessment': 0},
             'total_questions': 0,
             'total_exams': 0,
+            'rejected_questions': 0,
+            'skipped_files': 0,
             'processing_time': 0
         }
         
         # Inject models if provided
         if models:
-            global Exam, Question, Answer, Topic
+            global Exam, Question, Answer, Topic, ExamQuestion, HighlightedSnippet
             Exam = models.get('Exam')
             Question = models.get('Question') 
             Answer = models.get('Answer')
             Topic = models.get('Topic')
+            ExamQuestion = models.get('ExamQuestion')
+            HighlightedSnippet = models.get('HighlightedSnippet')
             print("✅ Models injected successfully")
             
         self.import_summary['processing_time'] = 0
@@ -218,27 +239,15 @@ class EnhancedMetadataConverter:
         except json.JSONDecodeError:
             pass
         
-        # Try extracting from HTML/JavaScript patterns
-        patterns = [
-            r'let\s+data\s*=\s*({.*?});',
-            r'var\s+data\s*=\s*({.*?});',
-            r'const\s+data\s*=\s*({.*?});',
-            r'data\s*=\s*({.*?});'
-        ]
-        
-        for pattern in patterns:
-            matches = re.findall(pattern, content, re.DOTALL | re.IGNORECASE)
-            if matches:
-                try:
-                    return json.loads(matches[0])
-                except json.JSONDecodeError:
-                    continue
-        
-        return None
+        # Extract the object assigned to `data` in HTML/JavaScript
+        return extract_embedded_data(content)
     
     def validate_json_structure(self, data: Dict) -> Tuple[bool, str]:
         """
-        Validate that JSON data has required structure for exam processing.
+        Validate every question and option against the compiled exam schema.
+        
+        Errors and missing required fields (question text, options) reject the
+        file; other warnings are logged.
         
         Args:
             data (dict): JSON data to validate
@@ -246,61 +255,69 @@ class EnhancedMetadataConverter:
         Returns:
             tuple: (is_valid, error_message)
         """
-        if not isinstance(data, dict):
-            return False, "Data is not a dictionary"
-        
-        if 'questions' not in data:
-            return False, "Missing 'questions' key"
-        
-        if not isinstance(data['questions'], list):
-            return False, "'questions' must be a list"
+        errors = exam_validator.validate(data, fail_fast=True)
+        rejected = [error for error in errors if error['severity'] == 'error' or error['code'] == 'missing']
+        if rejected:
+            return False, describe(rejected[0])
         
-        if len(data['questions']) == 0:
-            return False, "No questions found in data"
-        
-        # Validate first question structure
-        first_question = data['questions'][0]
-        if not isinstance(first_question, dict):
-            return False, "Questions must be dictionaries"
-        
-        # Check for required fields - support both 'answers' and 'options'
-        if 'question' not in first_question:
-            return False, "Question missing required field: question"
-        
-        if 'answers' not in first_question and 'options' not in first_question:
-            return False, "Question missing required field: answers or options"
+        if errors:
+            self.logger.warning(f"{len(errors)} validation warnings, first: {describe(errors[0])}")
         
         return True, "Valid structure"
     
-    def process_file_with_metadata(self, file_path: str) -> Dict[str, Any]:
-        """
-        Process a single file with comprehensive metadata extraction.
-        
-        Args:
-            file_path (str): Path to the file to process
-            
-        Returns:
-            dict: Processing result with metadata
-        """
-        start_time = datetime.now()
-        result = {
+    def _empty_result(self, file_path: str) -> Dict[str, Any]:
+        """Create the processing result record for a file."""
+        return {
             'file_path': file_path,
             'filename': os.path.basename(file_path),
             'success': False,
             'metadata': {},
             'exam_id': None,
             'questions_imported': 0,
+            'rejected_questions': [],
             'errors': [],
-            'processing_time': 0
+            'processing_time': 0,
+            'exam': None,
+            'questions': []
         }
+    
+    def failed_result(self, file_path: str, error: Exception) -> Dict[str, Any]:
+        """
+        Build a failed processing result, e.g. when a worker process crashed.
         
-        try:
-            # Read file content
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+        Args:
+            file_path (str): Path of the file that failed
+            error (Exception): The error raised
+            
+        Returns:
+            dict: Processing result marked as failed
+        """
+        result = self._empty_result(str(file_path))
+        result['errors'].append(f"Error processing {file_path}: {str(error)}")
+        return result
+    
+    def prepare_file(self, file_path: str) -> Dict[str, Any]:
+        """
+        Read, extract, validate and normalize a single file without touching the database.
+        
+        Safe to run in a worker process: the result only holds plain data.
+        
+        Args:
+            file_path (str): Path to the file to process
             
-            # Extract JSON data
-            json_data = self.extract_json_from_content(content)
+        Returns:
+            dict: Processing result with metadata plus 'exam' fields and 'questions' rows
+        """
+        start_time = datetime.now()
+        result = self._empty_result(file_path)
+        
+        try:
+            # Extract JSON data (standalone or embedded in HTML), decoded incrementally
+            # so the file text and the parsed questions are never in memory together
+            try:
+                json_data = read_exam_stream(file_path)
+            except ValueError:
+                json_data = None
             if not json_data:
                 result['errors'].append("Failed to extract JSON data from file")
                 return result
@@ -314,29 +331,105 @@ class EnhancedMetadataConverter:
             # Extract metadata
             metadata = self.extract_exam_metadata(json_data, result['filename'])
             result['metadata'] = metadata
+            result['exam'], result['questions'] = self._build_exam_rows(json_data, metadata)
+            result['success'] = True
+            
+        except Exception as e:
+            error_msg = f"Error processing {file_path}: {str(e)}"
+            result['errors'].append(error_msg)
+            self.logger.error(error_msg)
+            self.logger.error(traceback.format_exc())
+        
+        finally:
+            result['processing_time'] = (datetime.now() - start_time).total_seconds()
+        
+        return result
+    
+    def write_prepared_file(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Import the output of prepare_file() if a session is available.
+        
+        Args:
+            result (dict): Result returned by prepare_file()
+            
+        Returns:
+            dict: The same result, with exam_id and questions_imported filled in
+        """
+        start_time = datetime.now()
+        
+        try:
+            if not result['success']:
+                return result
+            
+            metadata = result['metadata']
             
             # Import to database if session available
             if self.session:
-                exam_id = self._import_to_database(json_data, metadata)
-                result['exam_id'] = exam_id
-                result['questions_imported'] = len(json_data['questions'])
+                rejected_before = len(self.rejected_questions)
+                result['exam_id'] = self._import_prepared(result['exam'], result['questions'], metadata)
+                result['rejected_questions'] = self.rejected_questions[rejected_before:]
+                result['questions_imported'] = len(result['questions']) - len(result['rejected_questions'])
             
-            result['success'] = True
             self.logger.info(f"Successfully processed {result['filename']} - "
                            f"Type: {metadata['file_type']}, "
                            f"Questions: {metadata['question_count']}")
             
         except Exception as e:
-            error_msg = f"Error processing {file_path}: {str(e)}"
+            error_msg = f"Error processing {result['file_path']}: {str(e)}"
+            result['success'] = False
             result['errors'].append(error_msg)
             self.logger.error(error_msg)
             self.logger.error(traceback.format_exc())
         
         finally:
-            result['processing_time'] = (datetime.now() - start_time).total_seconds()
+            result['processing_time'] += (datetime.now() - start_time).total_seconds()
+            # Rows are only needed until they are written
+            result['exam'] = None
+            result['questions'] = []
         
         return result
     
+    def process_file_with_metadata(self, file_path: str) -> Dict[str, Any]:
+        """
+        Process a single file with comprehensive metadata extraction.
+        
+        Args:
+            file_path (str): Path to the file to process
+            
+        Returns:
+            dict: Processing result with metadata
+        """
+        return self.write_prepared_file(self.prepare_file(file_path))
+    
+    def _build_exam_rows(self, json_data: Dict, metadata: Dict) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+        """
+        Build exam fields and question/answer rows for the bulk loader.
+        
+        Args:
+            json_data (dict): JSON exam data
+            metadata (dict): Extracted metadata
+            
+        Returns:
+            tuple: (exam_fields, question_rows)
+        """
+        exam_name = self.derive_exam_name(metadata['source_filename'], json_data)
+        
+        exam_fields = {
+            'title': exam_name,
+            'description': f"Imported from {metadata['source_filename']} - {metadata['file_type'].title()}",
+            'time_limit': metadata.get('time_limit_minutes', 60) * 60,  # Convert to seconds
+            'total_questions': metadata['question_count'],
+            'source_file': metadata['source_filename'],
+            'version': '1.0',
+            'is_active': True,
+            'exam_metadata': json.dumps(metadata)
+        }
+        
+        # Shared enrich stage adds multi-answer metadata and content fingerprints
+        _, question_rows = self.pipeline.convert(json_data, metadata['source_filename'])
+        
+        return exam_fields, question_rows
+    
     def _import_to_database(self, json_data: Dict, metadata: Dict) -> Optional[int]:
         """
         Import exam data to database with metadata.
@@ -345,6 +438,21 @@ class EnhancedMetadataConverter:
             json_data (dict): JSON exam data
             metadata (dict): Extracted metadata
             
+        Returns:
+            int: Exam ID if successful, None otherwise
+        """
+        exam_fields, question_rows = self._build_exam_rows(json_data, metadata)
+        return self._import_prepared(exam_fields, question_rows, metadata)
+    
+    def _import_prepared(self, exam_fields: Dict, question_rows: List[Dict], metadata: Dict) -> Optional[int]:
+        """
+        Import prebuilt exam rows to database.
+        
+        Args:
+            exam_fields (dict): Exam column values
+            question_rows (list): Question rows with nested answers
+            metadata (dict): Extracted metadata
+            
         Returns:
             int: Exam ID if successful, None otherwise
         """
@@ -360,60 +468,39 @@ class EnhancedMetadataConverter:
                 self.logger.info(f"Exam with external ID {metadata['exam_external_id']} already exists")
                 return existing_exam.id
             
-            # Create new exam
-            exam_name = self.derive_exam_name(metadata['source_filename'], json_data)
-            
-            exam = Exam(
-                title=exam_name,
-                description=f"Imported from {metadata['source_filename']} - {metadata['file_type'].title()}",
-                time_limit=metadata.get('time_limit_minutes', 60) * 60,  # Convert to seconds
-                total_questions=metadata['question_count'],
-                source_file=metadata['source_filename'],
-                version='1.0',
-                is_active=True
-            )
-            
-            # Set metadata
-            exam.set_metadata(metadata)
-            
-            self.session.add(exam)
-            self.session.flush()  # Get the exam ID
+            # Insert exam, questions and answers in batches; the loader writes the exam in a
+            # savepoint and each batch in a nested one, so a bad question is skipped and
+            # a failed exam leaves the rest of the session untouched
+            loader = BulkExamLoader(self.session, {'Exam': Exam, 'Question': Question, 'Answer': Answer,
+                                                   'ExamQuestion': ExamQuestion,
+                                                   'HighlightedSnippet': HighlightedSnippet},
+                                    commit_every=self.commit_every)
+            exam_id = loader.load_exam(exam_fields, question_rows)
             
-            # Import questions
-            for idx, question_data in enumerate(json_data['questions']):
-                self._import_question(question_data, exam.id, idx + 1)
+            for rejected in loader.rejected:
+                self.rejected_questions.append(dict(rejected, source_file=exam_fields['source_file']))
+            if loader.rejected:
+                self.logger.warning(f"{len(loader.rejected)} questions of {exam_fields['title']} were rejected")
             
-            self.session.commit()
-            
-            self.logger.info(f"Successfully imported exam: {exam_name} (ID: {exam.id})")
-            return exam.id
+            self.logger.info(f"Successfully imported exam: {exam_fields['title']} (ID: {exam_id})")
+            return exam_id
             
         except Exception as e:
-            self.session.rollback()
             self.logger.error(f"Database import error: {str(e)}")
             raise
     
-    def _import_question(self, question_data: Dict, exam_id: int, order: int):
+    def _build_question_row(self, question_data: Dict, order: int) -> Dict[str, Any]:
         """
-        Import a single question with answers/options.
+        Build a question row with its answers/options for the bulk loader.
         
         Args:
             question_data (dict): Question data from JSON
-            exam_id (int): Parent exam ID
             order (int): Question order in exam
+            
+        Returns:
+            dict: Question fields with an 'answers' list of answer fields
         """
-        # Create question
-        question = Question(
-            original_id=question_data.get('id', str(order)),
-            text=question_data['question'],
-            difficulty=question_data.get('difficulty', 1),
-            exam_id=exam_id,
-            question_order=order,
-            explanation=question_data.get('explanation', '')
-        )
-        
-        self.session.add(question)
-        self.session.flush()  # Get question ID
+        answers = []
         
         # Import answers - support both 'answers' and 'options' fields
         answer_data = question_data.get('answers', question_data.get('options', []))
@@ -430,50 +517,55 @@ class EnhancedMetadataConverter:
                 is_correct = False
                 explanation = ''
             
-            answer = Answer(
-                text=answer_text,
-                is_correct=is_correct,
-                question_id=question.id,
-                explanation=explanation
-            )
-            self.session.add(answer)
+            answers.append({
+                'text': answer_text,
+                'is_correct': is_correct,
+                'explanation': explanation
+            })
+        
+        return {
+            'original_id': question_data.get('id', str(order)),
+            'text': question_data['question'],
+            'difficulty': question_data.get('difficulty', 1),
+            'question_order': order,
+            'explanation': question_data.get('explanation', ''),
+            'answers': answers
+        }
     
-    def batch_process_with_metadata(self, folder_path: str, file_pattern: str = "*.json") -> List[Dict]:
+    def batch_process_with_metadata(self, folder_path: str, file_pattern: str = "*.json",
+                                    max_workers: Optional[int] = None) -> List[Dict]:
         """
         Process multiple files in a folder with metadata extraction.
         
+        Files are parsed in a process pool; database writes happen here, one file at a time.
+        
         Args:
             folder_path (str): Path to folder containing files
             file_pattern (str): Glob pattern for files to process
+            max_workers (int): Worker processes for parsing (defaults to CPU count)
             
         Returns:
             list: List of processing results
         """
         start_time = datetime.now()
-        results = []
         
         # Find all matching files
         folder = Path(folder_path)
-        files = list(folder.glob(file_pattern))
+        files = [str(file_path) for file_path in folder.glob(file_pattern)]
         
         self.import_summary['total_files'] = len(files)
         
+        # Unchanged files and byte-identical copies are skipped before parsing
+        if self.manifest:
+            selected = self.manifest.select_files(files)
+            self.import_summary['skipped_files'] += len(files) - len(selected)
+            files = selected
+        
         self.logger.info(f"Starting batch processing of {len(files)} files...")
         
-        for file_path in files:
-            result = self.process_file_with_metadata(str(file_path))
-            results.append(result)
-            
-            # Update summary
-            if result['success']:
-                self.import_summary['successful_imports'] += 1
-                self.import_summary['total_questions'] += result['questions_imported']
-                file_type = result['metadata'].get('file_type', 'assessment')
-                self.import_summary['file_types'][file_type] += 1
-                if result['exam_id']:
-                    self.import_summary['total_exams'] += 1
-            else:
-                self.import_summary['failed_imports'] += 1
+        driver = ParallelIngestDriver(prepare_file_with_metadata, self.import_prepared_file,
+                                      max_workers=max_workers, on_error=self.failed_result)
+        results = driver.run(files)
         
         self.import_summary['processing_time'] = (datetime.now() - start_time).total_seconds()
         
@@ -483,6 +575,36 @@ class EnhancedMetadataConverter:
         
         return results
     
+    def import_prepared_file(self, prepared: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Write one prepared file and update the import summary.
+        
+        Args:
+            prepared (dict): Result returned by prepare_file()
+            
+        Returns:
+            dict: Final processing result
+        """
+        result = self.write_prepared_file(prepared)
+        
+        if self.manifest:
+            self.manifest.record(result['file_path'], result['exam_id'] if result['success'] else None,
+                                 error='; '.join(result['errors']) or None)
+        
+        # Update summary
+        if result['success']:
+            self.import_summary['successful_imports'] += 1
+            self.import_summary['total_questions'] += result['questions_imported']
+            self.import_summary['rejected_questions'] += len(result['rejected_questions'])
+            file_type = result['metadata'].get('file_type', 'assessment')
+            self.import_summary['file_types'][file_type] += 1
+            if result['exam_id']:
+                self.import_summary['total_exams'] += 1
+        else:
+            self.import_summary['failed_imports'] += 1
+        
+        return result
+    
     def get_import_summary(self) -> Dict[str, Any]:
         """
         Get comprehensive import summary with metadata breakdown.
@@ -518,6 +640,7 @@ class EnhancedMetadataConverter:
         report.append(f"Failed Imports: {summary['failed_imports']}")
         report.append(f"Total Exams Created: {summary['total_exams']}")
         report.append(f"Total Questions Imported: {summary['total_questions']}")
+        report.append(f"Questions Rejected: {summary['rejected_questions']}")
         report.append(f"Processing Time: {summary['processing_time']:.2f} seconds")
         report.append("")
         
@@ -546,6 +669,10 @@ class EnhancedMetadataConverter:
                 if result['exam_id']:
                     report.append(f"  - Database ID: {result['exam_id']}")
             
+            for rejected in result.get('rejected_questions', []):
+                report.append(f"  - REJECTED question {rejected['position']} "
+                              f"(ID {rejected['original_id']}): {rejected['error']}")
+            
             if result['errors']:
                 for error in result['errors']:
                     report.append(f"  - ERROR: {error}")
@@ -555,6 +682,19 @@ class EnhancedMetadataConverter:
         return "\n".join(report)
 
 
+def prepare_file_with_metadata(file_path: str) -> Dict[str, Any]:
+    """
+    Process-pool entry point: parse and normalize one file in a worker.
+    
+    Args:
+        file_path (str): Path to the file to process
+        
+    Returns:
+        dict: Result of EnhancedMetadataConverter.prepare_file()
+    """
+    return EnhancedMetadataConverter().prepare_file(file_path)
+
+
 def main():
     """
     Example usage of the Enhanced Metadata Converter.
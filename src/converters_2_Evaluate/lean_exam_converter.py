@@ -11,12 +11,14 @@ ETL Pipeline - EXTRACT Phase:
 - Convert to clean data structures
 - Include exam metadata (title, exam_ID, etc.)
 - Preserve HTML formatting for reliable database storage
-- Output human-readable serialized data files
+- Output line-delimited JSON (JSONL) with a sidecar question offset index
 
 Usage:
-    python lean_exam_converter.py input.html output.data [exam_title]
+    python lean_exam_converter.py input.html output.jsonl [exam_title]
 
-Output: Serialized data file with exam metadata and questions (portable format)
+Output: JSONL data file - one exam metadata line, then one question per line -
+        plus ``output.jsonl.idx`` for random access to question N (see
+        ingest.jsonl_format)
 
 Author: PCEP Rapid Practice App
 Date: 2025-06-27
@@ -30,6 +32,12 @@ import os
 from pathlib import Path
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from ingest.embedded_data import extract_embedded_data_from_file
+from ingest.jsonl_format import index_path, write_exam_jsonl
+from ingest.pipeline import ConverterPipeline
+
 
 class LeanExamExtractor:
     """Extract exam data from HTML and serialize to portable data format."""
@@ -40,22 +48,13 @@ class LeanExamExtractor:
     def extract_json_from_html(self, html_file_path):
         """Extract the JSON data embedded in the HTML file."""
         try:
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Extract the JavaScript data object
-            # Pattern to find: let data = { ... };
-            pattern = r'let\s+data\s*=\s*({.*?});'
-            match = re.search(pattern, html_content, re.DOTALL)
+            # Find `let data = { ... };` and decode the object in one pass
+            exam_data = extract_embedded_data_from_file(html_file_path)
             
-            if not match:
+            if exam_data is None:
                 print(f"❌ No JavaScript data object found in {html_file_path}")
                 return None
                 
-            json_str = match.group(1)
-            
-            # Parse JSON
-            exam_data = json.loads(json_str)
             print(f"✅ Extracted {len(exam_data.get('questions', []))} questions from HTML")
             
             return exam_data
@@ -101,64 +100,57 @@ class LeanExamExtractor:
         
         return self.exam_metadata
     
+    def convert_question_for_database(self, question, order):
+        """Convert one exam question to database-ready format."""
+        # Keep the structure simple and database-friendly
+        db_question = {
+            'question_id': question.get('id', order),
+            'question_text': question.get('question', ''),  # Keep HTML tags
+            'question_type': question.get('type', 'Single Choice'),
+            'options': [],
+            'metadata': {
+                'order': order,
+                'original_type': question.get('type')
+            }
+        }
+        
+        # Process options (keep HTML formatting)
+        for j, option in enumerate(question.get('options', [])):
+            db_option = {
+                'option_id': option.get('id', j),
+                'option_text': option.get('option', ''),  # Keep HTML tags
+                'option_order': j
+            }
+            db_question['options'].append(db_option)
+        
+        return db_question
+    
     def convert_questions_for_database(self, exam_data):
         """Convert exam questions to database-ready format."""
         if not exam_data or 'questions' not in exam_data:
             print("❌ No questions found in exam data")
             return []
         
-        converted_questions = []
+        # Shared pipeline normalize stage; no enrichment or validation at extract time
+        pipeline = ConverterPipeline(None, normalizer=self.convert_question_for_database, exam_normalizer=None,
+                                     enrichers=(), validator=None)
+        _, converted_questions = pipeline.convert(exam_data, self.exam_metadata.get('source_file', 'exam data'))
         
-        for i, question in enumerate(exam_data['questions'], 1):
-            # Keep the structure simple and database-friendly
-            db_question = {
-                'question_id': question.get('id', i),
-                'question_text': question.get('question', ''),  # Keep HTML tags
-                'question_type': question.get('type', 'Single Choice'),
-                'options': [],
-                'metadata': {
-                    'order': i,
-                    'original_type': question.get('type')
-                }
-            }
-            
-            # Process options (keep HTML formatting)
-            for j, option in enumerate(question.get('options', [])):
-                db_option = {
-                    'option_id': option.get('id', j),
-                    'option_text': option.get('option', ''),  # Keep HTML tags
-                    'option_order': j
-                }
-                db_question['options'].append(db_option)
-            
-            converted_questions.append(db_question)
+        for error in pipeline.errors:
+            print(f"❌ {error['error']}")
             
         print(f"✅ Converted {len(converted_questions)} questions for database")
         return converted_questions
     
     def serialize_exam_data(self, questions, metadata, output_file):
-        """Serialize exam data to portable text format."""
-        
-        # Create the serialized data content
-        content = f'''# PCEP Exam Data File
-# Auto-generated serialized exam data for ETL pipeline
-# Format: Human-readable Python data structures
-# Generated: {metadata['extraction_date']}
-
-# EXAM_METADATA
-{json.dumps(metadata, indent=2)}
-
-# EXAM_QUESTIONS  
-{json.dumps(questions, indent=2, ensure_ascii=False)}
-
-# END_OF_DATA
-'''
-        
-        # Write to file
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write(content)
+        """Serialize exam data to JSONL with a sidecar question index."""
+        try:
+            write_exam_jsonl(output_file, metadata, questions)
+        except (OSError, TypeError, ValueError) as e:
+            print(f"❌ Error writing {output_file}: {e}")
+            return False
         
-        print(f"✅ Serialized data: {output_file}")
+        print(f"✅ Serialized data: {output_file} (index: {index_path(output_file).name})")
         return True
 
 
@@ -167,15 +159,15 @@ def print_usage():
     print("Lean HTML Exam Data Extractor (ETL Extract Phase)")
     print("=" * 50)
     print("Usage:")
-    print("    python lean_exam_converter.py input.html output.data [exam_title]")
+    print("    python lean_exam_converter.py input.html output.jsonl [exam_title]")
     print("")
     print("Examples:")
-    print("    python lean_exam_converter.py module4.html module4_exam.data")
-    print("    python lean_exam_converter.py exam.html exam.data \"PCEP Module 3 Test\"")
+    print("    python lean_exam_converter.py module4.html module4_exam.jsonl")
+    print("    python lean_exam_converter.py exam.html exam.jsonl \"PCEP Module 3 Test\"")
     print("")
     print("Arguments:")
     print("    input.html   : HTML file containing exam data")
-    print("    output.data  : Serialized data file to generate")
+    print("    output.jsonl : JSONL data file to generate (plus a .idx sidecar index)")
     print("    exam_title   : Optional exam title (auto-detected if not provided)")
 
 
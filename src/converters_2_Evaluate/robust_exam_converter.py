@@ -12,14 +12,13 @@ Lessons Learned Integration:
 """
 
 import sys
-import json
-import re
 import os
 from datetime import datetime
 import logging
 from pathlib import Path
 
-sys.path.insert(0, 'src')
+# One import root for the app and ingest modules, wherever the script is run from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Setup logging
 logging.basicConfig(
@@ -35,149 +34,56 @@ logger = logging.getLogger(__name__)
 class RobustExamConverter:
     """Enhanced converter for processing multiple exam datasets"""
     
-    def __init__(self):
+    def __init__(self, max_workers=None, commit_every=None):
+        self.max_workers = max_workers
+        # Questions per commit for very large exams; None commits each exam once. With chunked
+        # commits a file that fails part-way keeps the chunks committed before the failure
+        self.commit_every = commit_every
         self.stats = {
             'files_processed': 0,
             'exams_created': 0,
             'questions_imported': 0,
             'answers_imported': 0,
             'errors': 0,
-            'skipped_duplicates': 0
+            'skipped_duplicates': 0,
+            'skipped_unchanged': 0,
+            'questions_linked': 0,
+            'questions_rejected': 0
         }
+        # Questions the database refused, with the exam they belong to
+        self.rejected_questions = []
         
-        # Enhanced multi-answer detection patterns with confidence scoring
-        self.multi_answer_patterns = [
-            # Explicit multi-answer instructions
-            (r'select\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.95),
-            (r'choose\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.95),
-            (r'pick\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.90),
-            (r'mark\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.90),
-            (r'identify\s+(\w+)\s+(?:correct\s+)?answers?', 0.85),
-            
-            # Parenthetical instructions
-            (r'\(\s*select\s+(\w+)\s*\)', 0.98),
-            (r'\(\s*choose\s+(\w+)\s*\)', 0.98),
-            (r'\(\s*mark\s+(\w+)\s*\)', 0.95),
-            
-            # "All that apply" patterns
-            (r'mark\s+all\s+that\s+apply', 0.99),
-            (r'select\s+all\s+that\s+apply', 0.99),
-            (r'choose\s+all\s+that\s+apply', 0.99),
-            (r'identify\s+all\s+that\s+apply', 0.95),
-            
-            # Multiple options patterns
-            (r'which\s+(\w+)\s+(?:of\s+the\s+following\s+)?(?:are\s+|statements?\s+are\s+)correct', 0.85),
-            (r'which\s+(?:of\s+the\s+following\s+)?(\w+)\s+statements?\s+are\s+true', 0.85),
-            
-            # Question patterns that suggest multiple answers
-            (r'what\s+are\s+the\s+(\w+)', 0.70),
-            (r'which\s+ones?\s+are', 0.75),
-            
-            # Checkbox indicators in options
-            (r'\[\s*\]\s*', 0.60),  # Empty checkboxes
-            (r'☐', 0.80),  # Checkbox unicode
-            (r'□', 0.80),  # Empty square unicode
-        ]
-        
-        # Enhanced number word to digit mapping
-        self.number_words = {
-            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-            'all': 99,  # Special case for "select all"
-            'any': 99,  # "any that apply"
-            'multiple': 99  # "multiple answers"
-        }
+        # All multi-answer patterns compiled once into a single-pass detector
+        from ingest.multi_answer import MultiAnswerDetector
+        from ingest.pipeline import ConverterPipeline
+        self.multi_answer_detector = MultiAnswerDetector()
+        self.pipeline = ConverterPipeline(None, validator=None)
     
     def detect_file_format(self, file_path):
-        """Enhanced format detection with multiple fallback strategies"""
-        file_path = Path(file_path)
+        """
+        Detect the file format through the shared format registry.
         
-        # 1. File extension check
-        if file_path.suffix.lower() == '.json':
-            logger.debug(f"Format detected by extension: JSON for {file_path.name}")
-            return 'json'
-        elif file_path.suffix.lower() in ['.html', '.htm']:
-            logger.debug(f"Format detected by extension: HTML for {file_path.name}")
-            return 'html'
+        The extension decides when it is known; otherwise only the first few
+        bytes are sniffed (magic numbers, first significant character).
         
-        # 2. Content-based detection with enhanced patterns
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                # Read more content for better detection
-                content = f.read(1000).strip()
-                
-                # JSON detection patterns
-                json_patterns = [
-                    r'^\s*[\{\[]',  # Starts with { or [
-                    r'"[^"]*"\s*:\s*[\{\[\"]',  # JSON key-value patterns
-                    r'^\s*{\s*"[^"]*"',  # Object with quoted keys
-                ]
-                
-                for pattern in json_patterns:
-                    if re.search(pattern, content, re.MULTILINE):
-                        logger.debug(f"Format detected by content pattern: JSON for {file_path.name}")
-                        return 'json'
-                
-                # HTML detection patterns
-                html_patterns = [
-                    r'<!DOCTYPE\s+html',
-                    r'<html[^>]*>',
-                    r'<head[^>]*>',
-                    r'<body[^>]*>',
-                    r'<div[^>]*>',
-                    r'<script[^>]*>',
-                    r'let\s+data\s*=',  # Common in our exam HTML files
-                    r'var\s+data\s*=',
-                    r'const\s+data\s*='
-                ]
-                
-                for pattern in html_patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        logger.debug(f"Format detected by content pattern: HTML for {file_path.name}")
-                        return 'html'
-                
-                # 3. Hybrid detection for embedded JSON in HTML
-                if re.search(r'<.*>.*[\{\[].*<.*>', content, re.DOTALL):
-                    logger.debug(f"Format detected as HTML with embedded data for {file_path.name}")
-                    return 'html'
-                
-                # 4. Fallback: try parsing as JSON
-                try:
-                    json.loads(content)
-                    logger.debug(f"Format detected by JSON parsing: JSON for {file_path.name}")
-                    return 'json'
-                except json.JSONDecodeError:
-                    pass
-                
-                logger.warning(f"Could not detect format for {file_path.name}, defaulting to HTML")
-                return 'html'  # Default fallback
-                
-        except Exception as e:
-            logger.error(f"Error detecting format for {file_path}: {e}")
-            # Final fallback based on common patterns in filename
-            if 'json' in file_path.name.lower():
-                return 'json'
-            else:
-                return 'html'
+        Returns:
+            str: Format name ('json', 'html', 'jsonl', 'gzip', 'zip', or a registered format)
+        """
+        from ingest.formats import detect_format
+        
+        file_format = detect_format(file_path).name
+        logger.debug(f"Format detected: {file_format} for {Path(file_path).name}")
+        return file_format
     
     def extract_data_from_html(self, html_file_path):
         """Extract JSON data from HTML file"""
+        from ingest.embedded_data import extract_embedded_data_from_file
+        
         try:
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Try multiple extraction patterns
-            patterns = [
-                r'let data = ({.*?});',
-                r'var data = ({.*?});',
-                r'const data = ({.*?});',
-                r'data\s*=\s*({.*?});'
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, html_content, re.DOTALL)
-                if match:
-                    return json.loads(match.group(1))
+            # One literal scan for the data assignment, then a single JSON decode
+            data = extract_embedded_data_from_file(html_file_path)
+            if data is not None:
+                return data
             
             raise ValueError("No JSON data pattern found in HTML file")
             
@@ -187,166 +93,62 @@ class RobustExamConverter:
     
     def extract_data_from_json(self, json_file_path):
         """Extract data from JSON file"""
+        from ingest.json_stream import read_exam_stream
+        
         try:
-            with open(json_file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            # Decoded field by field and question by question, without holding the file text
+            return read_exam_stream(json_file_path)
         except Exception as e:
             logger.error(f"Error reading JSON {json_file_path}: {e}")
             return None
     
+    def extract_data(self, file_path):
+        """Extract data from any other registered format (JSONL, gzip, zip, ...)"""
+        from ingest.formats import read_exam
+        
+        try:
+            return read_exam(file_path)
+        except Exception as e:
+            logger.error(f"Error reading {file_path}: {e}")
+            return None
+    
     def detect_multi_answer_requirement(self, question_text, options=None):
         """Enhanced automatic detection of multi-answer requirements with confidence scoring"""
-        text_lower = question_text.lower()
-        
-        # Track best match and confidence
-        best_match = None
-        highest_confidence = 0.0
-        detected_count = 1
-        
-        # 1. Pattern-based detection with confidence scoring
-        for pattern, confidence in self.multi_answer_patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE)
-            if match and confidence > highest_confidence:
-                highest_confidence = confidence
-                best_match = match
-                
-                # Extract number if pattern includes capture group
-                if match.groups():
-                    number_word = match.group(1).lower()
-                    detected_count = self.number_words.get(number_word, 1)
-                else:
-                    # Patterns without capture groups (like "mark all that apply")
-                    detected_count = 99
-        
-        # 2. Option-based analysis if available
-        option_confidence = 0.0
-        if options:
-            checkbox_indicators = 0
-            radio_indicators = 0
-            
-            for option in options:
-                option_text = str(option).lower()
-                # Count checkbox vs radio indicators
-                if any(indicator in option_text for indicator in ['[]', '☐', '□']):
-                    checkbox_indicators += 1
-                elif any(indicator in option_text for indicator in ['()', '○', '◯']):
-                    radio_indicators += 1
-            
-            if checkbox_indicators > radio_indicators:
-                option_confidence = 0.70
-                if detected_count == 1:  # Override if options suggest multi-select
-                    detected_count = 2  # Conservative default
-        
-        # 3. Structural analysis
-        structural_confidence = 0.0
-        
-        # Look for plural forms suggesting multiple answers
-        plural_patterns = [
-            r'which\s+(?:of\s+the\s+following\s+)?(?:statements?|options?|items?)\s+are',
-            r'what\s+are\s+the',
-            r'identify\s+the\s+(?:correct\s+)?(?:statements?|options?)',
-            r'select\s+(?:the\s+)?(?:correct\s+)?(?:statements?|options?)'
-        ]
-        
-        for pattern in plural_patterns:
-            if re.search(pattern, text_lower):
-                structural_confidence = 0.60
-                if detected_count == 1:
-                    detected_count = 2
-                break
-        
-        # 4. Final confidence calculation
-        final_confidence = max(highest_confidence, option_confidence, structural_confidence)
-        
-        # 5. Determine question type
-        if detected_count > 1 or final_confidence >= 0.70:
-            question_type = "multi-select"
-            required_answers = detected_count if detected_count < 99 else len(options) if options else 2
-            
-            logger.info(f"Multi-answer detected: requires {required_answers} answers (confidence: {final_confidence:.2f})")
-            
-            # Log detection details for debugging
-            if best_match:
-                logger.debug(f"Pattern matched: '{best_match.group()}' with confidence {highest_confidence}")
-            if option_confidence > 0:
-                logger.debug(f"Option analysis confidence: {option_confidence}")
-            if structural_confidence > 0:
-                logger.debug(f"Structural analysis confidence: {structural_confidence}")
-                
-            return {
-                "type": question_type,
-                "required_answers": required_answers,
-                "confidence": final_confidence,
-                "detection_method": "pattern" if highest_confidence == final_confidence else "structural"
-            }
-        else:
-            return {
-                "type": "single-select", 
-                "required_answers": 1,
-                "confidence": 1.0 - final_confidence,  # Confidence in single-select
-                "detection_method": "default"
-            }
+        return self.multi_answer_detector.detect(question_text, options)
     
     def validate_exam_data(self, exam_data, source_file):
-        """Comprehensive validation of extracted exam data"""
-        validation_errors = []
-        
-        if not exam_data:
-            validation_errors.append("No data extracted from file")
-            return False, validation_errors
+        """
+        Validate every question and option against the compiled exam schema.
         
-        # Check for required top-level fields
-        if 'questions' not in exam_data:
-            validation_errors.append("Missing 'questions' field in exam data")
+        Returns:
+            tuple: (is_valid, error records); only records with severity 'error' make the data invalid
+        """
+        from ingest.schema import blocking_errors, describe, exam_validator
         
-        questions = exam_data.get('questions', [])
-        if not questions:
-            validation_errors.append("No questions found in exam data")
-            return False, validation_errors
+        if not exam_data:
+            return False, [{'path': (), 'location': '', 'question': None, 'code': 'missing',
+                            'severity': 'error', 'message': "No data extracted from file"}]
         
-        # Validate each question
-        for i, question in enumerate(questions):
-            q_errors = self._validate_question(question, i)
-            validation_errors.extend(q_errors)
+        validation_errors = exam_validator.validate(exam_data)
+        critical_errors = blocking_errors(validation_errors)
         
         # Log validation results
         if validation_errors:
-            logger.warning(f"Validation issues found in {source_file}: {len(validation_errors)} errors")
+            logger.warning(f"Validation issues found in {source_file}: {len(validation_errors)} errors "
+                           f"({len(critical_errors)} critical)")
             for error in validation_errors[:5]:  # Log first 5 errors
-                logger.warning(f"  - {error}")
+                logger.warning(f"  - {describe(error)}")
             if len(validation_errors) > 5:
                 logger.warning(f"  ... and {len(validation_errors) - 5} more errors")
         else:
             logger.info(f"✅ Validation passed for {source_file}")
         
-        # Allow processing with warnings, but fail if critical errors
-        critical_errors = [e for e in validation_errors if 'critical' in e.lower()]
+        # Allow processing with warnings, but fail on errors the import cannot store
         return len(critical_errors) == 0, validation_errors
     
-    def _validate_question(self, question, index):
-        """Validate individual question structure"""
-        errors = []
-        
-        # Required fields
-        if not question.get('question'):
-            errors.append(f"Question {index}: Missing question text")
-        
-        if 'options' not in question:
-            errors.append(f"Question {index}: Missing options")
-        elif not question['options']:
-            errors.append(f"Question {index}: Empty options list")
-        elif len(question['options']) < 2:
-            errors.append(f"Question {index}: Insufficient options (need at least 2)")
-        
-        # Check for question ID
-        if not question.get('id'):
-            errors.append(f"Question {index}: Missing question ID")
-        
-        return errors
-    
     def check_for_duplicates(self, session, exam_title, original_id):
         """Check if exam or question already exists"""
-        from src.models import Exam, Question
+        from models import Exam, Question
         
         # Check for existing exam
         if exam_title:
@@ -362,42 +164,73 @@ class RobustExamConverter:
                 
         return None, None
     
+    def prepare_exam(self, file_path):
+        """Read, extract, validate and normalize one exam file without touching the database"""
+        prepared = {
+            'source_file': str(file_path),
+            'success': False,
+            'errors': [],
+            'exam': None,
+            'questions': []
+        }
+        
+        # Detect format and extract data
+        file_format = self.detect_file_format(file_path)
+        
+        if file_format == 'html':
+            exam_data = self.extract_data_from_html(file_path)
+        elif file_format == 'json':
+            exam_data = self.extract_data_from_json(file_path)
+        else:
+            exam_data = self.extract_data(file_path)
+        
+        if not exam_data:
+            prepared['errors'].append(f"Failed to extract data from {file_path}")
+            return prepared
+        
+        # Validate extracted data
+        is_valid, validation_errors = self.validate_exam_data(exam_data, file_path)
+        if not is_valid:
+            critical_errors = [error for error in validation_errors if error['severity'] == 'error']
+            prepared['errors'].append(f"Validation failed for {file_path}: {len(critical_errors)} critical errors")
+            return prepared
+        
+        prepared['exam'], prepared['questions'] = self.normalize_exam(exam_data, file_path)
+        prepared['success'] = True
+        return prepared
+    
+    def normalize_exam(self, exam_data, source_file):
+        """Build exam fields and question/answer rows, including multi-answer metadata"""
+        # Shared normalize + enrich stages; validation already ran in validate_exam_data
+        return self.pipeline.convert(exam_data, source_file)
+    
+    def write_prepared_exam(self, prepared, session):
+        """Write the result of prepare_exam() to the database and update statistics"""
+        file_path = prepared['source_file']
+        
+        if not prepared['success']:
+            for error in prepared['errors']:
+                logger.error(error)
+            self.stats['errors'] += 1
+            return False
+        
+        prepared['exam_id'] = self.import_prepared_exam(prepared['exam'], prepared['questions'], session)
+        success = prepared['exam_id'] is not None
+        
+        if success:
+            self.stats['files_processed'] += 1
+            logger.info(f"✅ Successfully processed {file_path}")
+        else:
+            self.stats['errors'] += 1
+            logger.error(f"❌ Failed to import {file_path}")
+        
+        return success
+    
     def process_single_file(self, file_path, session):
         """Process a single exam file (HTML or JSON)"""
         try:
             logger.info(f"Processing file: {file_path}")
-            
-            # Detect format and extract data
-            file_format = self.detect_file_format(file_path)
-            
-            if file_format == 'html':
-                exam_data = self.extract_data_from_html(file_path)
-            else:
-                exam_data = self.extract_data_from_json(file_path)
-            
-            if not exam_data:
-                logger.error(f"Failed to extract data from {file_path}")
-                self.stats['errors'] += 1
-                return False
-            
-            # Validate extracted data
-            is_valid, validation_errors = self.validate_exam_data(exam_data, file_path)
-            if not is_valid:
-                logger.error(f"Validation failed for {file_path}: {len(validation_errors)} critical errors")
-                self.stats['errors'] += 1
-                return False
-            
-            # Import to database
-            success = self.import_exam_to_database(exam_data, session, file_path)
-            
-            if success:
-                self.stats['files_processed'] += 1
-                logger.info(f"✅ Successfully processed {file_path}")
-            else:
-                self.stats['errors'] += 1
-                logger.error(f"❌ Failed to import {file_path}")
-            
-            return success
+            return self.write_prepared_exam(self.prepare_exam(file_path), session)
             
         except Exception as e:
             logger.error(f"Error processing {file_path}: {e}")
@@ -406,19 +239,38 @@ class RobustExamConverter:
     
     def import_exam_to_database(self, exam_data, session, source_file):
         """Import exam data with duplicate checking and metadata detection"""
-        from src.models import Exam, Question, Answer
-        from src.models.module import Module, Topic
+        exam_fields, question_rows = self.normalize_exam(exam_data, source_file)
+        return self.import_prepared_exam(exam_fields, question_rows, session) is not None
+    
+    def import_prepared_exam(self, exam_fields, question_rows, session):
+        """
+        Import normalized exam rows with duplicate checking; returns the exam id or None on failure.
         
+        The file is written in a savepoint, so a failure undoes it as a whole, unless
+        commit_every is set: chunks committed before the failure stay in the database
+        (the loader logs the exam as imported partially).
+        """
+        from models import Exam, Question, Answer, ExamQuestion, HighlightedSnippet
+        from models.module import Module, Topic
+        from ingest.bulk_loader import BulkExamLoader
+        
+        loader = BulkExamLoader(session, {'Exam': Exam, 'Question': Question, 'Answer': Answer,
+                                          'ExamQuestion': ExamQuestion, 'HighlightedSnippet': HighlightedSnippet},
+                                commit_every=self.commit_every)
+        
+        # Savepoint per file: a failure undoes this file only, not the whole session
+        # (or, with commit_every, only its uncommitted chunk)
+        savepoint = session.begin_nested()
         try:
-            # Generate exam title from source file
-            exam_title = f"PCEP Exam - {Path(source_file).stem}"
+            exam_title = exam_fields['title']
             
             # Check for duplicate exam
             duplicate_type, duplicate_obj = self.check_for_duplicates(session, exam_title, None)
             if duplicate_type == 'exam':
                 logger.warning(f"Exam already exists: {exam_title}")
                 self.stats['skipped_duplicates'] += 1
-                return True
+                savepoint.commit()
+                return duplicate_obj.id
             
             # Create or get module and topic
             module = session.query(Module).filter(Module.name == "Python Fundamentals").first()
@@ -442,82 +294,51 @@ class RobustExamConverter:
                 session.add(topic)
                 session.flush()
             
-            # Create exam
-            exam = Exam(
-                title=exam_title,
-                description=f"Imported from {Path(source_file).name}",
-                time_limit=exam_data.get('timeLimitInMinutes', 30),
-                total_questions=len(exam_data.get('questions', [])),
-                source_file=Path(source_file).name,
-                version="1.0",
-                is_active=True
-            )
-            session.add(exam)
-            session.flush()
-            self.stats['exams_created'] += 1
+            # Questions with known content are linked to the canonical copy; an existing
+            # original_id with different content is still skipped as before
+            existing_ids = loader.find_existing_original_ids(row['original_id'] for row in question_rows)
+            canonical = loader.find_questions_by_fingerprint(row['content_fingerprint'] for row in question_rows)
             
-            # Process questions
-            for q_data in exam_data.get('questions', []):
-                # Check for duplicate question
-                duplicate_type, duplicate_obj = self.check_for_duplicates(session, None, q_data.get('id'))
-                if duplicate_type == 'question':
-                    logger.warning(f"Question {q_data.get('id')} already exists, skipping")
+            new_rows = []
+            for row in question_rows:
+                if row['original_id'] in existing_ids and row['content_fingerprint'] not in canonical:
+                    logger.warning(f"Question {row['original_id']} already exists, skipping")
                     self.stats['skipped_duplicates'] += 1
                     continue
                 
-                # Detect multi-answer requirement with enhanced analysis
-                question_text = q_data.get('question', '')
-                options = q_data.get('options', [])
-                metadata = self.detect_multi_answer_requirement(question_text, options)
-                
-                # Create question
-                question = Question(
-                    original_id=str(q_data.get('id', '')),
-                    text=question_text,
-                    html_content=question_text,
-                    difficulty=q_data.get('difficulty', 1),
-                    topic_id=topic.id,
-                    exam_id=exam.id,
-                    explanation=q_data.get('explanation', 'Imported from exam data'),
-                    question_order=self.stats['questions_imported'] + 1,
-                    question_metadata=json.dumps(metadata)
-                )
-                session.add(question)
-                session.flush()
-                self.stats['questions_imported'] += 1
-                
-                # Create answers
-                options = q_data.get('options', [])
-                for i, option in enumerate(options):
-                    option_text = option.get('option', option) if isinstance(option, dict) else option
-                    
-                    answer = Answer(
-                        original_id=f"{q_data.get('id')}_{i}",
-                        text=option_text,
-                        html_content=option_text,
-                        is_correct=False,  # Will be updated based on correct answers
-                        question_id=question.id,
-                        answer_order=i + 1
-                    )
-                    session.add(answer)
-                    self.stats['answers_imported'] += 1
+                row = dict(row, topic_id=topic.id, question_order=self.stats['questions_imported'] + len(new_rows) + 1)
+                new_rows.append(row)
+            
+            # Create exam, questions and answers; bad questions are isolated by the loader
+            exam_id = loader.load_exam(exam_fields, new_rows, canonical=canonical)
             
-            session.commit()
-            logger.info(f"✅ Imported {exam.title} with {len(exam_data.get('questions', []))} questions")
-            return True
+            self.stats['exams_created'] += 1
+            self.stats['questions_imported'] += loader.stats['questions_inserted']
+            self.stats['questions_linked'] += loader.stats['questions_linked']
+            self.stats['answers_imported'] += loader.stats['answers_inserted']
+            self.stats['questions_rejected'] += loader.stats['questions_rejected']
+            self.rejected_questions.extend(dict(rejected, exam_title=exam_title) for rejected in loader.rejected)
+            if loader.rejected:
+                logger.warning(f"⚠️ {len(loader.rejected)} questions of {exam_title} were rejected")
+            logger.info(f"✅ Imported {exam_title} with {exam_fields['total_questions']} questions")
+            return exam_id
             
         except Exception as e:
-            session.rollback()
+            if savepoint.is_active:
+                savepoint.rollback()
             logger.error(f"Database import error: {e}")
-            return False
+            return None
     
     def process_all_datasets(self):
         """Process all exam datasets in batch"""
         logger.info("🚀 Starting batch processing of all exam datasets")
         
         # Initialize database
-        from src.app import create_app
-        from src.database import init_database
+        from app import create_app
+        from database import init_database
+        from models import ImportManifest
+        from ingest.manifest import ImportManifestTracker
+        from ingest.parallel import ParallelIngestDriver
         
         app = create_app()
         
@@ -526,24 +347,43 @@ class RobustExamConverter:
             session = app.db_manager.get_session()
             
             try:
-                # Process HTML files
+                files = []
+                
+                # Collect HTML files
                 html_dir = Path("Exam_HTML_Raw_Data")
                 if html_dir.exists():
                     logger.info(f"Processing HTML files from {html_dir}")
-                    for html_file in html_dir.glob("*.html"):
-                        self.process_single_file(str(html_file), session)
+                    files.extend(str(html_file) for html_file in html_dir.glob("*.html"))
                 else:
                     logger.warning(f"HTML directory not found: {html_dir}")
                 
-                # Process JSON files
+                # Collect JSON files
                 json_dir = Path("Exam_Raw_Data_JSON")
                 if json_dir.exists():
                     logger.info(f"Processing JSON files from {json_dir}")
-                    for json_file in json_dir.glob("*.json"):
-                        self.process_single_file(str(json_file), session)
+                    files.extend(str(json_file) for json_file in json_dir.glob("*.json"))
                 else:
                     logger.warning(f"JSON directory not found: {json_dir}")
                 
+                # Skip files whose content was already imported before parsing anything
+                manifest = ImportManifestTracker(session, ImportManifest)
+                files = manifest.select_files(files)
+                self.stats['skipped_unchanged'] = manifest.stats['unchanged'] + manifest.stats['duplicate']
+                
+                def write_and_record(prepared):
+                    success = self.write_prepared_exam(prepared, session)
+                    manifest.record(prepared['source_file'], prepared.get('exam_id'),
+                                    error='; '.join(prepared['errors']) or None)
+                    return success
+                
+                # Parse in worker processes, write from this process only
+                driver = ParallelIngestDriver(
+                    prepare_exam_file,
+                    write_and_record,
+                    max_workers=self.max_workers
+                )
+                driver.run(files)
+                
                 session.close()
                 
                 # Print final statistics
@@ -563,11 +403,20 @@ class RobustExamConverter:
         print(f"Files processed: {self.stats['files_processed']}")
         print(f"Exams created: {self.stats['exams_created']}")
         print(f"Questions imported: {self.stats['questions_imported']}")
+        print(f"Questions linked to existing copies: {self.stats['questions_linked']}")
         print(f"Answers imported: {self.stats['answers_imported']}")
+        print(f"Questions rejected: {self.stats['questions_rejected']}")
+        for rejected in self.rejected_questions:
+            print(f"   - {rejected['exam_title']}, question {rejected['position']}: {rejected['error']}")
         print(f"Duplicates skipped: {self.stats['skipped_duplicates']}")
+        print(f"Unchanged files skipped: {self.stats['skipped_unchanged']}")
         print(f"Errors: {self.stats['errors']}")
         print("="*50)
 
+def prepare_exam_file(file_path):
+    """Process-pool entry point: parse and normalize one file in a worker"""
+    return RobustExamConverter().prepare_exam(file_path)
+
 def main():
     """Main entry point"""
     converter = RobustExamConverter()
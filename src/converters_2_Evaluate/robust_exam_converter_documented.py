@@ -46,7 +46,7 @@ from robust_exam_converter_documented import RobustExamConverter
 converter = RobustExamConverter()
 
 # Initialize database session (requires Flask app context)
-from src.app import create_app
+from app import create_app
 app = create_app()
 with app.app_context():
     session = app.db_manager.get_session()
@@ -203,7 +203,8 @@ from datetime import datetime
 import logging
 from pathlib import Path
 
-sys.path.insert(0, 'src')
+# One import root for the app and ingest modules, wherever the script is run from
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
 
 # Setup logging with detailed configuration
 logging.basicConfig(
@@ -228,8 +229,7 @@ class RobustExamConverter:
     
     Attributes:
         stats (dict): Processing statistics including files processed, errors, etc.
-        multi_answer_patterns (list): Regex patterns for detecting multi-answer questions
-        number_words (dict): Mapping of number words to digits for answer counting
+        multi_answer_detector (MultiAnswerDetector): Compiled multi-answer question detector
     """
     
     def __init__(self):
@@ -238,8 +238,7 @@ class RobustExamConverter:
         
         Sets up:
         - Processing statistics tracking
-        - Multi-answer detection patterns with confidence scores
-        - Number word to digit mapping
+        - Compiled multi-answer detector
         """
         # Processing statistics for monitoring and reporting
         self.stats = {
@@ -251,50 +250,10 @@ class RobustExamConverter:
             'skipped_duplicates': 0
         }
         
-        # Enhanced multi-answer detection patterns with confidence scoring
-        # Format: (regex_pattern, confidence_score)
-        # Higher confidence scores (closer to 1.0) indicate stronger indicators
-        self.multi_answer_patterns = [
-            # Explicit multi-answer instructions (highest confidence)
-            (r'select\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.95),
-            (r'choose\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.95),
-            (r'pick\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.90),
-            (r'mark\s+(\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.90),
-            (r'identify\s+(\w+)\s+(?:correct\s+)?answers?', 0.85),
-            
-            # Parenthetical instructions (very high confidence)
-            (r'\(\s*select\s+(\w+)\s*\)', 0.98),
-            (r'\(\s*choose\s+(\w+)\s*\)', 0.98),
-            (r'\(\s*mark\s+(\w+)\s*\)', 0.95),
-            
-            # "All that apply" patterns (highest confidence)
-            (r'mark\s+all\s+that\s+apply', 0.99),
-            (r'select\s+all\s+that\s+apply', 0.99),
-            (r'choose\s+all\s+that\s+apply', 0.99),
-            (r'identify\s+all\s+that\s+apply', 0.95),
-            
-            # Multiple options patterns (medium-high confidence)
-            (r'which\s+(\w+)\s+(?:of\s+the\s+following\s+)?(?:are\s+|statements?\s+are\s+)correct', 0.85),
-            (r'which\s+(?:of\s+the\s+following\s+)?(\w+)\s+statements?\s+are\s+true', 0.85),
-            
-            # Question patterns that suggest multiple answers (medium confidence)
-            (r'what\s+are\s+the\s+(\w+)', 0.70),
-            (r'which\s+ones?\s+are', 0.75),
-            
-            # Checkbox indicators in options (medium confidence)
-            (r'\[\s*\]\s*', 0.60),  # Empty checkboxes
-            (r'☐', 0.80),  # Checkbox unicode
-            (r'□', 0.80),  # Empty square unicode
-        ]
-        
-        # Enhanced number word to digit mapping for answer counting
-        self.number_words = {
-            'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
-            'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
-            'all': 99,  # Special case for "select all"
-            'any': 99,  # "any that apply"
-            'multiple': 99  # "multiple answers"
-        }
+        # Multi-answer patterns, number words and confidence scores live in
+        # ingest.multi_answer, compiled once into a single-pass detector
+        from ingest.multi_answer import MultiAnswerDetector
+        self.multi_answer_detector = MultiAnswerDetector()
     
     def detect_file_format(self, file_path):
         """
@@ -408,24 +367,15 @@ class RobustExamConverter:
             >>> data = converter.extract_data_from_html("exam.html")
             >>> print(f"Found {len(data['questions'])} questions")
         """
+        from ingest.embedded_data import extract_embedded_data_from_file
+        
         try:
-            with open(html_file_path, 'r', encoding='utf-8') as f:
-                html_content = f.read()
-            
-            # Try multiple extraction patterns in order of specificity
-            patterns = [
-                r'let data = ({.*?});',      # Modern ES6 syntax
-                r'var data = ({.*?});',      # Traditional JavaScript
-                r'const data = ({.*?});',    # Immutable declaration
-                r'data\s*=\s*({.*?});'      # Simple assignment
-            ]
-            
-            for pattern in patterns:
-                match = re.search(pattern, html_content, re.DOTALL)
-                if match:
-                    json_str = match.group(1)
-                    logger.debug(f"Found data pattern: {pattern[:20]}...")
-                    return json.loads(json_str)
+            # Literal scan for the assignment, then json.JSONDecoder.raw_decode
+            # reads exactly one object (a "};" inside a question string is safe)
+            data = extract_embedded_data_from_file(html_file_path)
+            if data is not None:
+                logger.debug(f"Found data assignment in {html_file_path}")
+                return data
             
             raise ValueError("No JSON data pattern found in HTML file")
             
@@ -500,107 +450,8 @@ class RobustExamConverter:
                 'detection_method': 'pattern'
             }
         """
-        text_lower = question_text.lower()
-        
-        # Track best match and confidence across all detection methods
-        best_match = None
-        highest_confidence = 0.0
-        detected_count = 1  # Default to single answer
-        
-        # Method 1: Pattern-based detection with confidence scoring
-        logger.debug(f"Analyzing question: {question_text[:50]}...")
-        
-        for pattern, confidence in self.multi_answer_patterns:
-            match = re.search(pattern, text_lower, re.IGNORECASE)
-            if match and confidence > highest_confidence:
-                highest_confidence = confidence
-                best_match = match
-                
-                # Extract number if pattern includes capture group
-                if match.groups():
-                    number_word = match.group(1).lower()
-                    detected_count = self.number_words.get(number_word, 1)
-                    logger.debug(f"Found number word: '{number_word}' -> {detected_count}")
-                else:
-                    # Patterns without capture groups (like "mark all that apply")
-                    detected_count = 99  # Special value for "all"
-                    logger.debug(f"Found 'all that apply' pattern")
-        
-        # Method 2: Option-based analysis if available
-        option_confidence = 0.0
-        if options:
-            checkbox_indicators = 0
-            radio_indicators = 0
-            
-            for option in options:
-                option_text = str(option).lower()
-                # Count checkbox vs radio indicators
-                if any(indicator in option_text for indicator in ['[]', '☐', '□']):
-                    checkbox_indicators += 1
-                elif any(indicator in option_text for indicator in ['()', '○', '◯']):
-                    radio_indicators += 1
-            
-            if checkbox_indicators > radio_indicators:
-                option_confidence = 0.70
-                if detected_count == 1:  # Override if options suggest multi-select
-                    detected_count = 2  # Conservative default
-                    logger.debug(f"Option analysis suggests multi-select (checkboxes: {checkbox_indicators})")
-        
-        # Method 3: Structural analysis
-        structural_confidence = 0.0
-        
-        # Look for plural forms suggesting multiple answers
-        plural_patterns = [
-            r'which\s+(?:of\s+the\s+following\s+)?(?:statements?|options?|items?)\s+are',
-            r'what\s+are\s+the',
-            r'identify\s+the\s+(?:correct\s+)?(?:statements?|options?)',
-            r'select\s+(?:the\s+)?(?:correct\s+)?(?:statements?|options?)'
-        ]
-        
-        for pattern in plural_patterns:
-            if re.search(pattern, text_lower):
-                structural_confidence = 0.60
-                if detected_count == 1:
-                    detected_count = 2  # Conservative default for plural
-                    logger.debug(f"Structural analysis suggests multi-select (plural pattern: {pattern})")
-                break
-        
-        # Method 4: Final confidence calculation and decision
-        final_confidence = max(highest_confidence, option_confidence, structural_confidence)
-        
-        # Method 5: Determine question type based on analysis
-        if detected_count > 1 or final_confidence >= 0.70:
-            question_type = "multi-select"
-            # Handle special case where detected_count is 99 (all)
-            if detected_count >= 99:
-                required_answers = len(options) if options else 2
-            else:
-                required_answers = detected_count
-            
-            logger.info(f"✓ Multi-answer detected: requires {required_answers} answers (confidence: {final_confidence:.2f})")
-            
-            # Log detection details for debugging
-            if best_match:
-                logger.debug(f"  Pattern matched: '{best_match.group()}' with confidence {highest_confidence}")
-            if option_confidence > 0:
-                logger.debug(f"  Option analysis confidence: {option_confidence}")
-            if structural_confidence > 0:
-                logger.debug(f"  Structural analysis confidence: {structural_confidence}")
-                
-            return {
-                "type": question_type,
-                "required_answers": required_answers,
-                "confidence": final_confidence,
-                "detection_method": "pattern" if highest_confidence == final_confidence else "structural"
-            }
-        else:
-            logger.debug(f"Single-answer detected (confidence: {1.0 - final_confidence:.2f})")
-            return {
-                "type": "single-select", 
-                "required_answers": 1,
-                "confidence": 1.0 - final_confidence,  # Confidence in single-select
-                "detection_method": "default"
-            }
+        # One pass of the combined pattern; see ingest.multi_answer
+        return self.multi_answer_detector.detect(question_text, options)
     
     def validate_exam_data(self, exam_data, source_file):
         """
@@ -717,7 +568,7 @@ class RobustExamConverter:
             >>> if duplicate_type:
             ...     print(f"Found duplicate {duplicate_type}")
         """
-        from src.models import Exam, Question
+        from models import Exam, Question
         
         # Check for existing exam by title
         if exam_title:
@@ -828,8 +679,8 @@ class RobustExamConverter:
             >>> if success:
             ...     session.commit()
         """
-        from src.models import Exam, Question, Answer
-        from src.models.module import Module, Topic
+        from models import Exam, Question, Answer
+        from models.module import Module, Topic
         
         try:
             # Generate exam title from source file
@@ -882,8 +733,12 @@ class RobustExamConverter:
             self.stats['exams_created'] += 1
             logger.debug(f"Created exam with ID: {exam.id}")
             
+            # Detect multi-answer requirements for all questions in one call
+            questions = exam_data.get('questions', [])
+            detections = self.multi_answer_detector.detect_batch(questions)
+            
             # Process questions
-            for i, q_data in enumerate(exam_data.get('questions', [])):
+            for i, (q_data, metadata) in enumerate(zip(questions, detections)):
                 # Check for duplicate question
                 duplicate_type, duplicate_obj = self.check_for_duplicates(session, None, q_data.get('id'))
                 if duplicate_type == 'question':
@@ -891,10 +746,8 @@ class RobustExamConverter:
                     self.stats['skipped_duplicates'] += 1
                     continue
                 
-                # Detect multi-answer requirement with enhanced analysis
                 question_text = q_data.get('question', '')
                 options = q_data.get('options', [])
-                metadata = self.detect_multi_answer_requirement(question_text, options)
                 
                 # Create question record
                 question = Question(
@@ -972,8 +825,8 @@ class RobustExamConverter:
         logger.info("🚀 Starting batch processing of all exam datasets")
         
         # Initialize database and Flask application context
-        from src.app import create_app
-        from src.database import init_database
+        from app import create_app
+        from database import init_database
         
         app = create_app()
         
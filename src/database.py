@@ -7,6 +7,7 @@ and database initialization functions.
 
 import os
 from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, scoped_session
 from sqlalchemy.pool import StaticPool
@@ -18,6 +19,32 @@ logger = logging.getLogger(__name__)
 # Create the declarative base
 Base = declarative_base()
 
+# INSERT constructs with ON CONFLICT support, by dialect name
+UPSERT_INSERTS = {
+    'sqlite': sqlite.insert,
+    'postgresql': postgresql.insert
+}
+
+
+def upsert_insert(session, table):
+    """
+    Build an INSERT that supports ON CONFLICT clauses on the session's database.
+
+    Args:
+        session: SQLAlchemy session
+        table: Table or mapped class to insert into
+
+    Returns:
+        Insert: Statement with ``on_conflict_do_update`` / ``on_conflict_do_nothing``
+
+    Raises:
+        NotImplementedError: If the database is not SQLite or PostgreSQL
+    """
+    dialect = session.get_bind().dialect.name
+    if dialect not in UPSERT_INSERTS:
+        raise NotImplementedError(f"Upserts need SQLite or PostgreSQL, not {dialect}")
+    return UPSERT_INSERTS[dialect](table)
+
 class DatabaseManager:
     """Manages database connections and sessions."""
     
@@ -125,7 +152,7 @@ class DatabaseManager:
             os.makedirs(os.path.dirname(db_path), exist_ok=True)
             
         # Import all models to ensure they're registered
-        from .models import user, module, exam, question, progress
+        from .models import user, module, exam, question, progress, import_manifest
         
         Base.metadata.create_all(engine)
         logger.info("All database tables created")
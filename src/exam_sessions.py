@@ -0,0 +1,335 @@
+"""
+Server-side exam sessions for PCEP Exam Accelerator.
+
+A practice quiz opens an ``ExamSession`` when it starts and submits all of its
+answers in one batch when it finishes. Each step costs a fixed handful of
+statements however many questions the quiz has:
+
+- ``create_exam_session``: one lookup of the exam (if none is given, the exam
+  holding most of the questions, counting exams that link a deduplicated
+  question through ``exam_questions``), one INSERT
+- ``submit_responses``: one SELECT of the session, one SELECT of questions
+  already answered in the session (plus one to check exam membership when
+  the session has no question list), a single executemany INSERT of the
+  ``UserResponse`` rows, then - when the quiz is complete - one aggregate
+  SELECT and one UPDATE to score and close the session, and O(topics)
+  statements to fold it into the user's topic progress (``topic_progress``)
+
+Answers can also be recorded one per click: ``grade_responses`` grades them
+without storing them, and the app queues the rows in a write-behind
+``ResponseBuffer`` (``response_buffer``) that inserts them in batches.
+
+Correctness is always decided from the answer key (``answer_key``), never
+taken from the client; questions missing from the key are loaded into it with
+two more queries. Multi-select responses send ``answer_ids`` and are correct
+only when the selection is exactly the set of correct answers.
+"""
+
+import json
+import logging
+import secrets
+from datetime import datetime
+
+from sqlalchemy import case, func, select, union, update
+from sqlalchemy.exc import IntegrityError
+
+from answer_key import AnswerKeyIndex
+from models import Exam, ExamQuestion, ExamSession, Question, User, UserResponse
+from topic_progress import apply_session_progress
+
+logger = logging.getLogger(__name__)
+
+# Owner of sessions started without a signed-in user
+GUEST_USERNAME = 'guest'
+GUEST_EMAIL = 'guest@localhost'
+
+
+class SessionNotFound(LookupError):
+    """The exam session does not exist."""
+
+
+class SessionClosed(ValueError):
+    """The exam session is already completed and takes no more responses."""
+
+
+def _guest_user_id(session):
+    """Id of the shared guest user, created on first use."""
+    user_id = session.scalar(select(User.id).where(User.username == GUEST_USERNAME))
+    if user_id is not None:
+        return user_id
+
+    guest = User(username=GUEST_USERNAME, email=GUEST_EMAIL)
+    guest.set_password(secrets.token_hex(16))
+    session.add(guest)
+    session.flush()
+    return guest.id
+
+
+def _int_list(values, name):
+    """Validate a list of ids from a request payload."""
+    if not isinstance(values, list) or not all(isinstance(v, int) and not isinstance(v, bool) for v in values):
+        raise ValueError(f"'{name}' must be a list of integer ids")
+    return values
+
+
+def _exam_memberships(question_ids):
+    """(exam_id, question_id) pairs of questions: their own exam and every exam linking them."""
+    return union(
+        select(Question.exam_id.label('exam_id'), Question.id.label('question_id'))
+        .where(Question.id.in_(question_ids)),
+        select(ExamQuestion.exam_id, ExamQuestion.question_id).where(ExamQuestion.question_id.in_(question_ids))
+    ).subquery()
+
+
+def create_exam_session(session, exam_id=None, user_id=None, question_ids=None):
+    """
+    Open an exam session.
+
+    Args:
+        session: SQLAlchemy session
+        exam_id (int): Exam being taken; defaults to the exam holding most of the
+            questions (a deduplicated question keeps its first exam's ``exam_id``
+            and is linked to later exams through ``exam_questions``)
+        user_id (int): Owner; defaults to the guest user
+        question_ids (list): Questions served in this session, in order;
+            defaults to the whole exam
+
+    Returns:
+        dict: The new session
+
+    Raises:
+        ValueError: If the exam cannot be determined or the ids are malformed
+    """
+    question_ids = _int_list(question_ids, 'question_ids') if question_ids is not None else []
+    if exam_id is None and question_ids:
+        members = _exam_memberships(question_ids)
+        exam_id = session.scalar(select(members.c.exam_id).group_by(members.c.exam_id)
+                                 .order_by(func.count().desc(), members.c.exam_id).limit(1))
+    if not isinstance(exam_id, int) or isinstance(exam_id, bool):
+        raise ValueError("An 'exam_id' or known 'question_ids' are required")
+
+    exam_questions = session.scalar(select(Exam.total_questions).where(Exam.id == exam_id))
+    if exam_questions is None:
+        raise ValueError(f"Exam {exam_id} not found")
+
+    exam_session = ExamSession(
+        user_id=user_id if user_id is not None else _guest_user_id(session),
+        exam_id=exam_id,
+        total_questions=len(question_ids) or exam_questions,
+        start_time=datetime.utcnow()
+    )
+    if question_ids:
+        exam_session.set_session_data({'question_ids': question_ids})
+    session.add(exam_session)
+    session.commit()
+
+    logger.info(f"Started exam session {exam_session.id} for exam {exam_id} "
+                f"({exam_session.total_questions} questions)")
+    return exam_session.to_dict()
+
+
+def _validate_responses(responses):
+    """Check the shape of submitted responses; returns them unchanged."""
+    if not isinstance(responses, list):
+        raise ValueError("'responses' must be a list")
+
+    seen = set()
+    for entry in responses:
+        if not isinstance(entry, dict):
+            raise ValueError("Each response must be an object")
+        question_id, answer_id = entry.get('question_id'), entry.get('answer_id')
+        if not isinstance(question_id, int) or isinstance(question_id, bool):
+            raise ValueError("Each response needs an integer 'question_id'")
+        if answer_id is not None and (not isinstance(answer_id, int) or isinstance(answer_id, bool)):
+            raise ValueError(f"Response to question {question_id}: 'answer_id' must be an integer or null")
+        if 'answer_ids' in entry:
+            _int_list(entry['answer_ids'], 'answer_ids')
+        if not isinstance(entry.get('time_taken', 0), (int, float)):
+            raise ValueError(f"Response to question {question_id}: 'time_taken' must be a number")
+        if question_id in seen:
+            raise ValueError(f"Question {question_id} is answered more than once")
+        seen.add(question_id)
+    return responses
+
+
+def score_exam_session(session, session_id, start_time=None):
+    """
+    Score and close a session from its stored responses with one aggregate query.
+
+    The closing UPDATE only matches an open session, so of two concurrent
+    completions exactly one closes it; the caller rolls back on SessionClosed.
+
+    Args:
+        session: SQLAlchemy session
+        session_id (int): Session to complete
+        start_time (datetime): Session start, for the wall-clock duration
+
+    Returns:
+        dict: 'responses' and 'correct_answers'
+
+    Raises:
+        SessionClosed: If the session was completed in the meantime
+    """
+    responses, correct = session.execute(
+        select(func.count(UserResponse.id),
+               func.coalesce(func.sum(case((UserResponse.is_correct, 1), else_=0)), 0))
+        .where(UserResponse.exam_session_id == session_id)
+    ).one()
+
+    now = datetime.utcnow()
+    values = {
+        'correct_answers': correct,
+        # Out of the planned questions; unanswered ones count as wrong
+        'score': case((ExamSession.total_questions > 0,
+                       func.round(correct * 100.0 / ExamSession.total_questions, 2)), else_=0.0),
+        'is_completed': True,
+        'end_time': now,
+        'updated_at': now
+    }
+    if start_time is not None:
+        values['time_spent'] = int((now - start_time).total_seconds())
+    closed = session.execute(update(ExamSession)
+                             .where(ExamSession.id == session_id, ExamSession.is_completed.is_(False))
+                             .values(**values))
+    if closed.rowcount == 0:
+        raise SessionClosed(f"Exam session {session_id} is already completed")
+    return {'responses': responses, 'correct_answers': correct}
+
+
+def _selected_answers(entry):
+    """Answer ids selected in a response: 'answer_ids' for multi-select, else 'answer_id'."""
+    if 'answer_ids' in entry:
+        return entry['answer_ids']
+    return [] if entry.get('answer_id') is None else [entry['answer_id']]
+
+
+def grade_responses(session, session_id, responses, answer_key=None, pending=()):
+    """
+    Validate and grade responses for an open session without storing them.
+
+    Args:
+        session: SQLAlchemy session
+        session_id (int): Open exam session
+        responses (list): Response dicts as for submit_responses
+        answer_key (AnswerKeyIndex): Shared answer key; questions it lacks are
+            loaded into it (default: a key for this batch only)
+        pending (collection): Question ids answered in the session but not
+            stored yet (e.g. held by a ``ResponseBuffer``)
+
+    Returns:
+        tuple: (ExamSession, list of ``user_responses`` row dicts)
+
+    Raises:
+        SessionNotFound: If there is no such session
+        SessionClosed: If the session is already completed
+        ValueError: If a response is malformed, names a question outside the
+            session or an answer of another question, or repeats a question
+            answered earlier in the session
+    """
+    _validate_responses(responses)
+
+    exam_session = session.get(ExamSession, session_id)
+    if exam_session is None:
+        raise SessionNotFound(f"Exam session {session_id} not found")
+    if exam_session.is_completed:
+        raise SessionClosed(f"Exam session {session_id} is already completed")
+
+    question_ids = [entry['question_id'] for entry in responses]
+    if question_ids:
+        served = exam_session.get_session_data().get('question_ids')
+        if served is None:
+            # A session over a whole exam takes the exam's own and linked questions
+            members = _exam_memberships(question_ids)
+            served = session.scalars(select(members.c.question_id)
+                                     .where(members.c.exam_id == exam_session.exam_id)).all()
+        outside = set(question_ids).difference(served)
+        if outside:
+            raise ValueError(f"Questions not in exam session {session_id}: {sorted(outside)}")
+
+        repeated = set(pending).intersection(question_ids)
+        repeated.update(session.scalars(select(UserResponse.question_id).where(
+            UserResponse.exam_session_id == session_id, UserResponse.question_id.in_(question_ids))))
+        if repeated:
+            raise ValueError(f"Questions already answered in session {session_id}: {sorted(repeated)}")
+
+        if answer_key is None:
+            answer_key = AnswerKeyIndex()
+        missing = [question_id for question_id in question_ids if question_id not in answer_key]
+        if missing:
+            answer_key.load(session, question_ids=missing)
+
+    now = datetime.utcnow()
+    rows = []
+    for entry in responses:
+        question_id, selected = entry['question_id'], _selected_answers(entry)
+        selection = answer_key.selection_mask(question_id, selected)
+        rows.append({
+            'exam_session_id': session_id,
+            'question_id': question_id,
+            'answer_id': selected[0] if selected else None,
+            'is_correct': answer_key.is_correct(question_id, selection),
+            'is_skipped': not selected,
+            'is_bookmarked': bool(entry.get('is_bookmarked', False)),
+            'time_taken': float(entry.get('time_taken', 0.0)),
+            'response_data': json.dumps({'answer_ids': selected}) if len(selected) > 1 else None,
+            'created_at': now,
+            'updated_at': now
+        })
+    return exam_session, rows
+
+
+def submit_responses(session, session_id, responses, complete=True, answer_key=None, pending=()):
+    """
+    Record a batch of responses for a session, then optionally score it.
+
+    Args:
+        session: SQLAlchemy session
+        session_id (int): Open exam session
+        responses (list): Dicts with 'question_id', 'answer_id' (None when
+            skipped) or 'answer_ids' (multi-select), and optional 'time_taken'
+            and 'is_bookmarked'
+        complete (bool): Score and close the session after this batch
+        answer_key (AnswerKeyIndex): Shared answer key; questions it lacks are
+            loaded into it (default: a key for this batch only)
+        pending (collection): Question ids answered in the session but not
+            stored yet; they count as answered
+
+    Returns:
+        dict: The session after the batch, with the number of 'recorded'
+            responses, their grades as 'results' ('question_id', 'is_correct')
+            and, once completed, the session's total 'responses'
+
+    Raises:
+        SessionNotFound: If there is no such session
+        SessionClosed: If the session is already completed
+        ValueError: If a response is malformed, names a question outside the
+            session or an answer of another question, or repeats a question
+            answered earlier in the session
+    """
+    exam_session, rows = grade_responses(session, session_id, responses, answer_key, pending)
+
+    responses_total = None
+    try:
+        if rows:
+            # Core insert: one executemany for the whole batch (the ORM bulk path
+            # splits rows by which columns are None)
+            session.execute(UserResponse.__table__.insert(), rows)
+        if complete:
+            # Raises SessionClosed when a concurrent request closed the session first, so
+            # its progress is folded in once
+            responses_total = score_exam_session(session, session_id, exam_session.start_time)['responses']
+            apply_session_progress(session, session_id)
+        session.commit()
+    except IntegrityError as e:
+        # A concurrent request stored one of the questions first (unique per session)
+        session.rollback()
+        raise ValueError(f"Questions already answered in session {session_id}") from e
+    except Exception:
+        session.rollback()
+        raise
+
+    session.refresh(exam_session)
+    logger.info(f"Recorded {len(rows)} responses for exam session {session_id}"
+                + (f", score {exam_session.score}%" if complete else ""))
+    results = [{'question_id': row['question_id'], 'is_correct': row['is_correct']} for row in rows]
+    return {**exam_session.to_dict(), 'recorded': len(rows), 'results': results, 'responses': responses_total}
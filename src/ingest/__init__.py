@@ -0,0 +1,35 @@
+"""
+Shared exam ingest components for PCEP Exam Accelerator.
+
+This package holds the import-side building blocks that the converters in
+``converters_2_Evaluate`` and the root-level import scripts share, so that
+every entry point gets the same fast paths.
+"""
+
+from .bulk_loader import BulkExamLoader
+from .embedded_data import extract_embedded_data, extract_embedded_data_from_file
+from .fingerprint import normalize_content, question_fingerprint
+from .manifest import ImportManifestTracker, hash_file
+from .multi_answer import MultiAnswerDetector
+from .parallel import ParallelIngestDriver
+from .pipeline import ConverterPipeline, DatabaseSink, JSONLSink, JSONSink, iter_exam_records
+from .question_bank import QuestionBank, QuestionBankSink
+
+__all__ = [
+    'BulkExamLoader',
+    'ConverterPipeline',
+    'DatabaseSink',
+    'ImportManifestTracker',
+    'JSONLSink',
+    'JSONSink',
+    'MultiAnswerDetector',
+    'ParallelIngestDriver',
+    'QuestionBank',
+    'QuestionBankSink',
+    'extract_embedded_data',
+    'extract_embedded_data_from_file',
+    'hash_file',
+    'iter_exam_records',
+    'normalize_content',
+    'question_fingerprint'
+]
@@ -0,0 +1,42 @@
+"""
+Atomic file writes for PCEP Exam Accelerator.
+
+Converters write their output to a temporary file next to the destination and
+rename it into place, so an interrupted run never leaves a truncated file for
+the next importer to choke on.
+"""
+
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+
+@contextmanager
+def atomic_write(path, mode='w', encoding='utf-8'):
+    """
+    Open a temporary file next to ``path`` and move it into place on success.
+
+    The file is renamed over the destination with os.replace() only after it
+    was written and closed, so readers see either the old file or the complete
+    new one, never a truncated file. On error the temporary file is removed.
+
+    Args:
+        path (str or Path): Destination file
+        mode (str): 'w' for text, 'wb' for binary
+        encoding (str): Text encoding, ignored in binary mode
+
+    Yields:
+        file: File object to write to
+    """
+    path = Path(path)
+    # Same directory, so the rename never crosses filesystems; pid-named, so
+    # worker processes writing concurrently do not collide
+    temp_path = path.with_name(f'.{path.name}.{os.getpid()}.tmp')
+    try:
+        with open(temp_path, mode, encoding=None if 'b' in mode else encoding) as f:
+            yield f
+        os.replace(temp_path, path)
+    except BaseException:
+        if temp_path.exists():
+            os.unlink(temp_path)
+        raise
@@ -0,0 +1,396 @@
+"""
+Bulk exam loader for PCEP Exam Accelerator.
+
+Loads an exam, its questions and their answers with set-based Core inserts
+instead of ``session.add()`` + ``session.flush()`` per question. Question keys
+are assigned up front, so answers can reference their question without a
+round trip per question, and the whole exam is written in one transaction.
+
+When an ``ExamQuestion`` model is supplied, questions carrying a
+``content_fingerprint`` that is already in the database are linked to the new
+exam through ``exam_questions`` instead of being inserted again with their
+answers. When a ``HighlightedSnippet`` model is supplied, the code blocks of
+inserted questions and answers are highlighted once per distinct snippet.
+
+An exam can also be reloaded in place (``replace_exam_id``) when its source
+file changed: the exam keeps its id, its ``exam_questions`` links are rebuilt
+from the new version, unchanged questions are linked again by fingerprint and
+only new ones are inserted. Questions dropped from the file keep their rows,
+so sessions that answered them stay intact.
+
+Each exam is written in a savepoint and each batch in a nested one, so a
+question the database refuses is skipped and reported (``rejected``) without
+redoing the file, and very large exams can be committed in chunks
+(``commit_every``) to keep write locks short while the app is serving reads.
+"""
+
+import logging
+from itertools import chain, islice
+
+from sqlalchemy import delete, func, insert, inspect, select, update
+from sqlalchemy.exc import OperationalError, SQLAlchemyError
+
+from .highlight import SnippetCache
+
+logger = logging.getLogger(__name__)
+
+# SQLite allows 999 bound parameters per statement on older builds, keep IN lists below that
+IN_CLAUSE_CHUNK = 500
+
+
+class BulkExamLoader:
+    """Writes whole exams to the database with batched executemany inserts."""
+
+    def __init__(self, session, models, batch_size=500, commit_every=None):
+        """
+        Initialize the bulk loader.
+
+        Args:
+            session: SQLAlchemy session object
+            models (dict): Model classes {'Exam': ExamClass, 'Question': QuestionClass, 'Answer': AnswerClass},
+                optionally 'ExamQuestion' to link questions to exams by content fingerprint
+                and 'HighlightedSnippet' to pre-render code blocks
+            batch_size (int): Number of rows sent per executemany batch
+            commit_every (int): Commit after at least this many questions (rounded up to
+                whole batches) instead of once per exam; None commits once per exam
+        """
+        self.session = session
+        self.batch_size = batch_size
+        self.commit_every = commit_every
+        self.exam_table = models['Exam'].__table__
+        self.question_table = models['Question'].__table__
+        self.answer_table = models['Answer'].__table__
+        self.link_table = models['ExamQuestion'].__table__ if models.get('ExamQuestion') else None
+        self.snippet_cache = SnippetCache(session, models['HighlightedSnippet']) if models.get('HighlightedSnippet') else None
+
+        # Rows are built with model attribute names (e.g. question_metadata),
+        # Core inserts need the column keys (e.g. metadata)
+        self.column_keys = {
+            name: self._attribute_column_map(models[name])
+            for name in ('Exam', 'Question', 'Answer')
+        }
+
+        self.stats = {
+            'exams_inserted': 0,
+            'exams_replaced': 0,
+            'questions_inserted': 0,
+            'answers_inserted': 0,
+            'questions_linked': 0,
+            'questions_rejected': 0,
+            'snippets_rendered': 0,
+            'statements': 0,
+            'commits': 0
+        }
+        # Questions left out by load_exam(): {'exam_id', 'position', 'original_id', 'error'}
+        self.rejected = []
+
+    @staticmethod
+    def _attribute_column_map(model):
+        """Map mapped attribute names to table column keys for a model."""
+        return {attr.key: attr.columns[0].key for attr in inspect(model).column_attrs}
+
+    def _to_row(self, model_name, fields):
+        """Translate a dict keyed by model attributes into a Core insert row."""
+        key_map = self.column_keys[model_name]
+        return {key_map.get(key, key): value for key, value in fields.items()}
+
+    def _execute_batches(self, table, rows):
+        """Insert rows in executemany batches of ``batch_size``."""
+        for start in range(0, len(rows), self.batch_size):
+            self.session.execute(insert(table), rows[start:start + self.batch_size])
+            self.stats['statements'] += 1
+
+    def next_id(self, table):
+        """
+        Get the next free primary key for a table.
+
+        Must be called after the transaction has written at least one row so the
+        database write lock is already held (SQLite) and the range cannot be taken
+        by another writer before our inserts land.
+
+        Args:
+            table: SQLAlchemy Table object
+
+        Returns:
+            int: First unused id
+        """
+        self.stats['statements'] += 1
+        return self.session.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar() + 1
+
+    def find_existing_original_ids(self, original_ids):
+        """
+        Find which question original_ids are already in the database.
+
+        Args:
+            original_ids (iterable): Source question ids to check
+
+        Returns:
+            set: original_id values (as strings) that already exist
+        """
+        wanted = list({str(original_id) for original_id in original_ids if original_id not in (None, '')})
+        existing = set()
+        column = self.question_table.c.original_id
+
+        for start in range(0, len(wanted), IN_CLAUSE_CHUNK):
+            chunk = wanted[start:start + IN_CLAUSE_CHUNK]
+            rows = self.session.execute(select(column).where(column.in_(chunk)))
+            existing.update(row[0] for row in rows)
+            self.stats['statements'] += 1
+
+        return existing
+
+    def find_questions_by_fingerprint(self, fingerprints):
+        """
+        Find the canonical question for each content fingerprint already in the database.
+
+        Args:
+            fingerprints (iterable): Content fingerprints to look up
+
+        Returns:
+            dict: Fingerprint -> id of the oldest question with that fingerprint
+        """
+        wanted = list({fingerprint for fingerprint in fingerprints if fingerprint})
+        canonical = {}
+        columns = self.question_table.c
+
+        for start in range(0, len(wanted), IN_CLAUSE_CHUNK):
+            chunk = wanted[start:start + IN_CLAUSE_CHUNK]
+            rows = self.session.execute(
+                select(columns.content_fingerprint, func.min(columns.id))
+                .where(columns.content_fingerprint.in_(chunk))
+                .group_by(columns.content_fingerprint)
+            )
+            canonical.update((fingerprint, question_id) for fingerprint, question_id in rows)
+            self.stats['statements'] += 1
+
+        return canonical
+
+
+    def load_exam(self, exam_fields, questions, commit=True, canonical=None, replace_exam_id=None):
+        """
+        Insert an exam with all of its questions and answers.
+
+        ``questions`` may be any iterable, including a generator: rows are pulled
+        and written ``batch_size`` questions at a time, so memory stays bounded by
+        the batch size rather than the exam size.
+
+        The exam is written inside a savepoint, so a failure only undoes this
+        exam and leaves the caller's transaction usable. Every batch gets a
+        nested savepoint of its own: if a batch is refused because of bad data,
+        its questions are retried one at a time and those that still fail are
+        left out and listed in ``rejected`` instead of failing the exam. With
+        ``commit_every`` set, the transaction is committed between batches;
+        a failure after such a commit leaves the committed questions in place.
+
+        Args:
+            exam_fields (dict): Exam column values keyed by model attribute name
+            questions (iterable): Question dicts keyed by model attribute name, each
+                with an ``answers`` list of Answer attribute dicts
+            commit (bool): Commit the transaction when done (and in chunks, with commit_every)
+            canonical (dict): Result of find_questions_by_fingerprint() if the caller
+                already looked the fingerprints up
+            replace_exam_id (int): Reload this existing exam from the questions
+                instead of inserting a new one (needs the ExamQuestion model)
+
+        Returns:
+            int: Database id of the new (or replaced) exam
+
+        Raises:
+            ValueError: If an exam is to be replaced without the ExamQuestion model
+        """
+        if replace_exam_id is not None and self.link_table is None:
+            raise ValueError("Replacing an exam needs the ExamQuestion model")
+
+        lookup = self.link_table is not None and canonical is None
+        # Copied, because questions inserted below become canonical for later duplicates
+        canonical = dict(canonical or {})
+        savepoint = self.session.begin_nested()
+        exam_id = None
+        committed = 0
+
+        try:
+            if replace_exam_id is None:
+                result = self.session.execute(insert(self.exam_table).values(**self._to_row('Exam', exam_fields)))
+                exam_id = result.inserted_primary_key[0]
+                self.stats['statements'] += 1
+            else:
+                exam_id = replace_exam_id
+                self.session.execute(update(self.exam_table).where(self.exam_table.c.id == exam_id)
+                                     .values(**self._to_row('Exam', exam_fields)))
+                # The new version's questions alone make up the exam from here on
+                self.session.execute(delete(self.link_table).where(self.link_table.c.exam_id == exam_id))
+                self.stats['statements'] += 2
+
+            questions = iter(questions)
+            linked_ids = set()
+            question_id = first_new_id = None
+            position = inserted = answer_count = linked_existing = rejected = uncommitted = 0
+
+            while True:
+                batch = list(islice(questions, self.batch_size))
+                if not batch:
+                    break
+
+                if lookup:
+                    canonical.update(self.find_questions_by_fingerprint(
+                        q.get('content_fingerprint') for q in batch if q.get('content_fingerprint') not in canonical
+                    ))
+                if question_id is None:
+                    question_id = first_new_id = self.next_id(self.question_table)
+
+                groups = []
+                for question in batch:
+                    position += 1
+                    fields = dict(question)
+                    answers = fields.pop('answers', [])
+                    fingerprint = fields.get('content_fingerprint')
+                    order = fields.get('question_order', position)
+                    group = {'position': position, 'original_id': fields.get('original_id'),
+                             'fingerprint': fingerprint, 'question_row': None, 'answer_rows': [], 'link_row': None}
+
+                    if self.link_table is not None and fingerprint in canonical:
+                        existing_id = canonical[fingerprint]
+                        # A question repeated within one exam is only listed once
+                        if existing_id not in linked_ids:
+                            linked_ids.add(existing_id)
+                            group.update(question_id=existing_id, link_row={
+                                'exam_id': exam_id, 'question_id': existing_id, 'question_order': order})
+                            groups.append(group)
+                        continue
+
+                    fields['id'] = question_id
+                    fields['exam_id'] = exam_id
+                    group['question_id'] = question_id
+                    group['question_row'] = self._to_row('Question', fields)
+
+                    for answer in answers:
+                        answer_fields = dict(answer)
+                        answer_fields['question_id'] = question_id
+                        group['answer_rows'].append(self._to_row('Answer', answer_fields))
+
+                    if self.link_table is not None:
+                        linked_ids.add(question_id)
+                        group['link_row'] = {'exam_id': exam_id, 'question_id': question_id, 'question_order': order}
+                        if fingerprint:
+                            canonical[fingerprint] = question_id
+
+                    groups.append(group)
+                    question_id += 1
+
+                written = self._write_chunk(exam_id, groups, canonical, linked_ids)
+                for group in written:
+                    if group['question_row'] is not None:
+                        inserted += 1
+                        answer_count += len(group['answer_rows'])
+                    elif group['question_id'] < first_new_id:
+                        linked_existing += 1
+                rejected += len(groups) - len(written)
+                uncommitted += len(written)
+
+                if commit and self.commit_every and uncommitted >= self.commit_every:
+                    savepoint.commit()
+                    self.session.commit()
+                    self.stats['commits'] += 1
+                    committed += uncommitted
+                    uncommitted = 0
+                    savepoint = self.session.begin_nested()
+                    # Take the write lock again before choosing the next key range
+                    self.session.execute(update(self.exam_table).where(self.exam_table.c.id == exam_id)
+                                         .values(id=exam_id))
+                    question_id = max(question_id, self.next_id(self.question_table))
+
+            savepoint.commit()
+            if commit:
+                self.session.commit()
+                self.stats['commits'] += 1
+
+            self.stats['exams_inserted' if replace_exam_id is None else 'exams_replaced'] += 1
+            self.stats['questions_inserted'] += inserted
+            self.stats['answers_inserted'] += answer_count
+            self.stats['questions_linked'] += linked_existing
+            self.stats['questions_rejected'] += rejected
+            logger.debug(f"Bulk loaded exam {exam_id}: {inserted} questions, {answer_count} answers, "
+                         f"{linked_existing} linked to existing questions, {rejected} rejected")
+            return exam_id
+
+        except Exception:
+            if savepoint.is_active:
+                savepoint.rollback()
+            elif self.session.in_transaction():
+                self.session.rollback()
+            if committed:
+                logger.error(f"Exam {exam_id} was imported partially: {committed} questions had been committed")
+            raise
+
+    def _write_chunk(self, exam_id, groups, canonical, linked_ids):
+        """
+        Write one batch of questions in a savepoint, isolating bad questions on failure.
+
+        Args:
+            exam_id (int): Exam being loaded
+            groups (list): Per-question rows built by load_exam()
+            canonical (dict): Fingerprint -> question id, corrected for rejected questions
+            linked_ids (set): Question ids linked to the exam, corrected likewise
+
+        Returns:
+            list: The groups that were written
+        """
+        try:
+            with self.session.begin_nested():
+                self._write_groups(groups)
+            return groups
+        except OperationalError:
+            # Locks, disk or schema problems: no question is to blame
+            raise
+        except SQLAlchemyError as e:
+            if len(groups) == 1:
+                self._reject(exam_id, groups[0], e, canonical, linked_ids)
+                return []
+            logger.warning(f"Batch of {len(groups)} questions for exam {exam_id} failed, "
+                           f"retrying one question at a time: {getattr(e, 'orig', None) or e}")
+
+        written = []
+        rejected_ids = set()
+        for group in groups:
+            if group['question_row'] is None and group['question_id'] in rejected_ids:
+                self._reject(exam_id, group, "Duplicate of a rejected question", canonical, linked_ids)
+                continue
+            try:
+                with self.session.begin_nested():
+                    self._write_groups([group])
+            except OperationalError:
+                raise
+            except SQLAlchemyError as e:
+                rejected_ids.add(group['question_id'])
+                self._reject(exam_id, group, e, canonical, linked_ids)
+            else:
+                written.append(group)
+        return written
+
+    def _write_groups(self, groups):
+        """Insert the question, answer, link and snippet rows of some questions."""
+        question_rows = [group['question_row'] for group in groups if group['question_row'] is not None]
+        answer_rows = [row for group in groups for row in group['answer_rows']]
+        link_rows = [group['link_row'] for group in groups if group['link_row'] is not None]
+
+        self._execute_batches(self.question_table, question_rows)
+        self._execute_batches(self.answer_table, answer_rows)
+        if link_rows:
+            self._execute_batches(self.link_table, link_rows)
+        if self.snippet_cache is not None:
+            self.stats['snippets_rendered'] += self.snippet_cache.ensure(
+                row.get('text') for row in chain(question_rows, answer_rows)
+            )
+
+    def _reject(self, exam_id, group, error, canonical, linked_ids):
+        """Record a question that could not be written and forget its id."""
+        error = str(getattr(error, 'orig', None) or error)
+        if group['question_row'] is not None:
+            linked_ids.discard(group['question_id'])
+            if canonical.get(group['fingerprint']) == group['question_id']:
+                del canonical[group['fingerprint']]
+
+        self.rejected.append({'exam_id': exam_id, 'position': group['position'],
+                              'original_id': group['original_id'], 'error': error})
+        logger.error(f"Exam {exam_id}: question {group['position']} "
+                     f"(original id {group['original_id']}) rejected: {error}")
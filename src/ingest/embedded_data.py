@@ -0,0 +1,171 @@
+"""
+Embedded exam data extractor for PCEP Exam Accelerator.
+
+Saved exam pages carry their questions in a script assignment such as
+``let data = {...};``. Matching that with non-greedy DOTALL regexes like
+``let\\s+data\\s*=\\s*({.*?});`` backtracks over the whole page for every
+candidate and cuts the object short when ``};`` appears inside a question
+string.
+
+This module finds the assignment with a literal scan for the variable name and
+parses the object with ``json.JSONDecoder.raw_decode`` from that offset, which
+reads exactly one JSON value and stops at its closing brace. Files are scanned
+through ``mmap`` so the page is not copied into memory before the assignment is
+found.
+"""
+
+import json
+import mmap
+import os
+
+DECLARATION_KEYWORDS = ('let', 'var', 'const')
+
+# Bytes decoded per raw_decode attempt on mmap'd files; grown while the object is cut off
+DECODE_WINDOW = 256 * 1024
+
+_decoder = json.JSONDecoder()
+
+
+def _is_identifier_char(char):
+    """Check if a one-character str/bytes slice can be part of a JS identifier."""
+    return bool(char) and (char.isalnum() or char in ('_', '$', b'_', b'$'))
+
+
+def _skip_whitespace(buffer, pos):
+    """Return the first position at or after ``pos`` that is not whitespace."""
+    while buffer[pos:pos + 1].isspace():
+        pos += 1
+    return pos
+
+
+def _declaration_keyword(buffer, name_pos):
+    """Return the let/var/const keyword preceding the name at ``name_pos``, or None."""
+    end = name_pos
+    while end > 0 and buffer[end - 1:end].isspace():
+        end -= 1
+    if end == name_pos:
+        return None
+
+    for keyword in DECLARATION_KEYWORDS:
+        start = end - len(keyword)
+        token = buffer[start:end] if start >= 0 else ''
+        if not isinstance(token, str):
+            token = token.decode('ascii', errors='replace')
+        if token == keyword and not _is_identifier_char(buffer[start - 1:start] if start else ''):
+            return keyword
+    return None
+
+
+def find_assignment(buffer, variable='data', start=0):
+    """
+    Find where the next object literal assigned to a variable starts.
+
+    Matches ``let|var|const <variable> = {`` as well as a bare
+    ``<variable> = {``, using only literal find() calls. Property assignments
+    (``obj.data = {``), longer names (``metadata``) and comparisons are skipped.
+
+    Args:
+        buffer (str, bytes or mmap): Page content
+        variable (str): JavaScript variable name
+        start (int): Position to start scanning from
+
+    Returns:
+        tuple: (offset of the opening brace, 'let'/'var'/'const' or None for a
+            bare assignment), or (-1, None) if there is no further assignment
+    """
+    name = variable.encode('ascii') if not isinstance(buffer, str) else variable
+    equals, brace = ('=', '{') if isinstance(buffer, str) else (b'=', b'{')
+    pos = buffer.find(name, start)
+
+    while pos != -1:
+        after_name = pos + len(name)
+        before = buffer[pos - 1:pos] if pos else ''
+        if not _is_identifier_char(before) and before not in ('.', b'.') and \
+                not _is_identifier_char(buffer[after_name:after_name + 1]):
+            cursor = _skip_whitespace(buffer, after_name)
+            # Reject comparisons (==) and arrow functions (=>)
+            if buffer[cursor:cursor + 1] == equals and buffer[cursor + 1:cursor + 2] not in (equals, b'>', '>'):
+                cursor = _skip_whitespace(buffer, cursor + 1)
+                if buffer[cursor:cursor + 1] == brace:
+                    return cursor, _declaration_keyword(buffer, pos)
+        pos = buffer.find(name, after_name)
+
+    return -1, None
+
+
+def _decode_at(buffer, pos):
+    """
+    Decode one JSON value starting at ``pos``.
+
+    Strings are decoded in place. For bytes/mmap only a window is decoded to
+    text, and the window grows while the value runs past its end, so a page is
+    never copied in full just to read the object at its start.
+
+    Raises:
+        json.JSONDecodeError: If the text at ``pos`` is not a JSON value
+    """
+    if isinstance(buffer, str):
+        return _decoder.raw_decode(buffer, pos)[0]
+
+    window = DECODE_WINDOW
+    while True:
+        text = buffer[pos:pos + window].decode('utf-8', errors='replace')
+        try:
+            return _decoder.raw_decode(text)[0]
+        except json.JSONDecodeError as e:
+            cut_off = e.pos >= len(text) - 4 or e.msg.startswith('Unterminated string')
+            if not cut_off or pos + window >= len(buffer):
+                raise
+            window *= 4
+
+
+def extract_embedded_data(content, variable='data'):
+    """
+    Extract the JSON object assigned to a JavaScript variable in page content.
+
+    Candidates are ranked like the pattern lists this replaces: the first
+    ``let`` declaration holding valid JSON wins and ends the scan, otherwise the
+    first valid ``var``, then ``const``, then bare assignment is returned.
+
+    Args:
+        content (str, bytes or mmap): Page content
+        variable (str): JavaScript variable name
+
+    Returns:
+        dict: Parsed object, or None if no assignment holds valid JSON
+    """
+    best, best_rank = None, len(DECLARATION_KEYWORDS)
+    pos, keyword = find_assignment(content, variable)
+
+    while pos != -1:
+        rank = DECLARATION_KEYWORDS.index(keyword) if keyword else len(DECLARATION_KEYWORDS)
+        if best is None or rank < best_rank:
+            try:
+                best, best_rank = _decode_at(content, pos), rank
+                if rank == 0:
+                    break
+            except json.JSONDecodeError:
+                # A JavaScript (non-JSON) object literal; try the next assignment
+                pass
+        pos, keyword = find_assignment(content, variable, pos + 1)
+
+    return best
+
+
+def extract_embedded_data_from_file(file_path, variable='data'):
+    """
+    Extract the JSON object assigned to a JavaScript variable in a saved page.
+
+    Args:
+        file_path (str or Path): HTML file
+        variable (str): JavaScript variable name
+
+    Returns:
+        dict: Parsed object, or None if the file has no such assignment
+    """
+    if os.path.getsize(file_path) == 0:
+        return None
+
+    with open(file_path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return extract_embedded_data(mapped, variable)
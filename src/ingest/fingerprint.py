@@ -0,0 +1,57 @@
+"""
+Normalized content fingerprints for PCEP Exam Accelerator.
+
+The same question appears in Quiz, Test and Summary Test files and in dated
+re-exports, with cosmetic differences in markup, whitespace and option order.
+A fingerprint is the SHA-256 of the question text with markup stripped and
+whitespace collapsed, plus the sorted normalized option texts, so all copies of
+a question map to one canonical ``Question`` row.
+"""
+
+import hashlib
+import html
+import re
+
+TAG_PATTERN = re.compile(r'</?[A-Za-z!][^>]*>')
+WHITESPACE_PATTERN = re.compile(r'\s+')
+
+# Separates the question from its options and the options from each other;
+# neither can survive normalization inside the texts themselves
+FIELD_SEPARATOR = '\x1e'
+OPTION_SEPARATOR = '\x1f'
+
+
+def normalize_content(text):
+    """
+    Reduce question or option HTML to the text a student actually reads.
+
+    Tags are replaced by spaces, entities are decoded and runs of whitespace are
+    collapsed. Case is preserved because it is significant in Python code.
+
+    Args:
+        text (str): HTML or plain text
+
+    Returns:
+        str: Normalized text
+    """
+    if not text:
+        return ''
+    text = TAG_PATTERN.sub(' ', str(text))
+    text = html.unescape(text)
+    return WHITESPACE_PATTERN.sub(' ', text).strip()
+
+
+def question_fingerprint(question_html, option_texts):
+    """
+    Compute the canonical fingerprint of a question.
+
+    Args:
+        question_html (str): Question text or HTML
+        option_texts (iterable): Answer option texts or HTML, in any order
+
+    Returns:
+        str: 64-character hex digest
+    """
+    options = sorted(normalize_content(option) for option in option_texts)
+    content = normalize_content(question_html) + FIELD_SEPARATOR + OPTION_SEPARATOR.join(options)
+    return hashlib.sha256(content.encode('utf-8')).hexdigest()
@@ -0,0 +1,424 @@
+"""
+Pluggable exam file format readers for PCEP Exam Accelerator.
+
+Each supported format is a ``FormatReader`` that declares the file extensions
+and magic bytes it recognizes. ``FormatRegistry.detect`` picks the reader for
+a file:
+
+1. by extension (including compound ones like ``.tar.gz``), without opening
+   the file
+2. otherwise by the first ``SNIFF_BYTES`` bytes: magic numbers for gzip and
+   zip, the first non-blank byte for JSON (``{``/``[``) and HTML (``<``)
+3. otherwise the saved page reader, which scans any text for the embedded
+   ``data`` assignment
+
+Detection never decodes text or runs regexes, so it costs one stat or one small
+read. Container formats (gzip, zip, tar) hand their members back to the
+registry, so every member format is supported inside them too; members are
+decompressed one at a time, straight from the archive, and a member larger than
+``MAX_MEMBER_BYTES`` uncompressed is reported instead of read, so a highly
+compressed archive cannot exhaust memory. New formats plug in
+with ``register_format`` without touching the converters.
+
+Built-in readers: JSON export, saved HTML page, JSONL (``jsonl_format``),
+gzip, zip and tar (plain or compressed).
+"""
+
+import gzip
+import json
+import logging
+import tarfile
+import zipfile
+from pathlib import Path
+
+from .embedded_data import extract_embedded_data, extract_embedded_data_from_file
+from .jsonl_format import read_exam_jsonl
+
+logger = logging.getLogger(__name__)
+
+# Bytes read for content sniffing
+SNIFF_BYTES = 64
+
+# Largest archive member read into memory, uncompressed; exam files are far smaller
+MAX_MEMBER_BYTES = 64 * 1024 * 1024
+
+# Skipped before looking at the first significant byte of text formats
+_UTF8_BOM = b'\xef\xbb\xbf'
+_BLANK = b' \t\r\n'
+
+
+class MemberTooLarge(ValueError):
+    """An archive member is larger than its container's member size limit."""
+
+
+def _read_member(f, name, limit):
+    """Read a member file object, or a MemberTooLarge error if it holds more than limit bytes."""
+    data = f.read(limit + 1)
+    if len(data) > limit:
+        return MemberTooLarge(f"{name} is larger than {limit} bytes uncompressed")
+    return data
+
+
+def _first_byte(head):
+    """First non-blank byte of a text file head, after an optional BOM."""
+    head = head[len(_UTF8_BOM):] if head.startswith(_UTF8_BOM) else head
+    return head.lstrip(_BLANK)[:1]
+
+
+class FormatReader:
+    """Base reader: declares how to recognize a format and reads one exam from it."""
+
+    name = None
+    extensions = ()
+    magic = ()
+    container = False
+
+    def sniff(self, head):
+        """
+        Decide from the first bytes of a file whether it has this format.
+
+        Args:
+            head (bytes): Up to SNIFF_BYTES leading bytes
+
+        Returns:
+            bool: True if the content matches
+        """
+        return any(head.startswith(magic) for magic in self.magic)
+
+    def read(self, path):
+        """
+        Read the exam data from a file.
+
+        Args:
+            path (str or Path): File in this format
+
+        Returns:
+            dict: Exam data, or None if the file holds none
+        """
+        return self.loads(Path(path).read_bytes())
+
+    def loads(self, data):
+        """
+        Read the exam data from the content of a file (e.g. an archive member).
+
+        Args:
+            data (bytes): File content
+
+        Returns:
+            dict: Exam data, or None if the content holds none
+        """
+        raise NotImplementedError
+
+
+class JSONReader(FormatReader):
+    """JSON exam export; falls back to the embedded assignment for pages saved with a .json name."""
+
+    name = 'json'
+    extensions = ('.json',)
+
+    def sniff(self, head):
+        return _first_byte(head) in (b'{', b'[')
+
+    def read(self, path):
+        try:
+            # utf-8-sig: the sniffer accepts a leading BOM, so the decoder must too
+            with open(path, 'r', encoding='utf-8-sig') as f:
+                return json.load(f)
+        except json.JSONDecodeError:
+            return extract_embedded_data_from_file(path)
+
+    def loads(self, data):
+        try:
+            return json.loads(data)
+        except ValueError:
+            return extract_embedded_data(data)
+
+
+class HTMLReader(FormatReader):
+    """Saved exam page with a ``let/var/const data = {...}`` assignment."""
+
+    name = 'html'
+    extensions = ('.html', '.htm')
+
+    def sniff(self, head):
+        return _first_byte(head) == b'<'
+
+    def read(self, path):
+        return extract_embedded_data_from_file(path)
+
+    def loads(self, data):
+        return extract_embedded_data(data)
+
+
+class JSONLReader(FormatReader):
+    """JSONL exam file: a header line, then one question per line (recognized by extension)."""
+
+    name = 'jsonl'
+    extensions = ('.jsonl',)
+
+    def read(self, path):
+        return read_exam_jsonl(path)
+
+    def loads(self, data):
+        lines = [line for line in data.splitlines() if line.strip()]
+        if not lines:
+            return None
+        return {**json.loads(lines[0]), 'questions': [json.loads(line) for line in lines[1:]]}
+
+
+class ContainerReader(FormatReader):
+    """Base for compressed files and archives holding one or more exam files."""
+
+    container = True
+    max_member_bytes = MAX_MEMBER_BYTES
+
+    def iter_members(self, path):
+        """
+        Yield the files inside a container.
+
+        Reads are capped at ``max_member_bytes``; a larger member is yielded
+        with a ``MemberTooLarge`` error in place of its content.
+
+        Args:
+            path (str or Path): Container file
+
+        Yields:
+            tuple: (member name, content bytes or MemberTooLarge)
+        """
+        raise NotImplementedError
+
+
+class GzipReader(ContainerReader):
+    """A single gzip-compressed exam file; the member name is the file name without ``.gz``."""
+
+    name = 'gzip'
+    extensions = ('.gz',)
+    magic = (b'\x1f\x8b',)
+
+    def iter_members(self, path):
+        path = Path(path)
+        name = path.stem if path.suffix.lower() == '.gz' else path.name
+        # The size in the gzip trailer is modulo 4 GiB, so only the capped read is trusted
+        with gzip.open(path, 'rb') as f:
+            yield name, _read_member(f, name, self.max_member_bytes)
+
+
+class ZipReader(ContainerReader):
+    """Zip archive of exam files."""
+
+    name = 'zip'
+    extensions = ('.zip',)
+    magic = (b'PK\x03\x04', b'PK\x05\x06')
+
+    def iter_members(self, path):
+        with zipfile.ZipFile(path) as archive:
+            for info in archive.infolist():
+                if info.is_dir():
+                    continue
+                # The declared size skips a large member unread; the capped read covers a false one
+                if info.file_size > self.max_member_bytes:
+                    yield info.filename, MemberTooLarge(
+                        f"{info.filename} is larger than {self.max_member_bytes} bytes uncompressed")
+                    continue
+                with archive.open(info) as f:
+                    yield info.filename, _read_member(f, info.filename, self.max_member_bytes)
+
+
+class TarReader(ContainerReader):
+    """Tar archive of exam files, plain or gzip/bz2/xz-compressed, read as a stream."""
+
+    name = 'tar'
+    extensions = ('.tar', '.tgz', '.tar.gz', '.tar.bz2', '.tar.xz')
+
+    def iter_members(self, path):
+        # 'r|*' decompresses sequentially: no seeking, no temporary copy
+        with tarfile.open(path, 'r|*') as archive:
+            for info in archive:
+                if not info.isfile():
+                    continue
+                if info.size > self.max_member_bytes:
+                    yield info.name, MemberTooLarge(
+                        f"{info.name} is larger than {self.max_member_bytes} bytes uncompressed")
+                    continue
+                yield info.name, _read_member(archive.extractfile(info), info.name, self.max_member_bytes)
+
+
+class FormatRegistry:
+    """Maps files to format readers by extension or leading bytes."""
+
+    def __init__(self, fallback=None):
+        """
+        Initialize an empty registry.
+
+        Args:
+            fallback (FormatReader): Reader for files no reader recognizes
+        """
+        self.readers = []
+        self.by_name = {}
+        self.by_extension = {}
+        self.fallback = fallback
+
+    def register(self, reader):
+        """
+        Add a reader; later registrations win for shared extensions and are sniffed first.
+
+        Args:
+            reader (FormatReader): Reader to add
+
+        Returns:
+            FormatReader: The same reader
+        """
+        self.readers.insert(0, reader)
+        self.by_name[reader.name] = reader
+        for extension in reader.extensions:
+            self.by_extension[extension.lower()] = reader
+        return reader
+
+    def _by_suffix(self, name):
+        """Reader for a file name's compound (``.tar.gz``) or simple extension."""
+        path = Path(name)
+        return self.by_extension.get(''.join(path.suffixes[-2:]).lower()) or \
+            self.by_extension.get(path.suffix.lower())
+
+    def _sniff(self, head):
+        for reader in self.readers:
+            if reader.sniff(head):
+                return reader
+        return None
+
+    def detect(self, path):
+        """
+        Find the reader for a file, opening it only if the extension is unknown.
+
+        Args:
+            path (str or Path): File to classify
+
+        Returns:
+            FormatReader: The matching reader, or the fallback reader
+        """
+        reader = self._by_suffix(path)
+        if reader is not None:
+            return reader
+
+        try:
+            with open(path, 'rb') as f:
+                head = f.read(SNIFF_BYTES)
+        except OSError:
+            return self.fallback
+        return self._sniff(head) or self.fallback
+
+    def detect_content(self, name, data):
+        """
+        Find the reader for a container member; unrecognized members get None.
+
+        Args:
+            name (str): Member name
+            data (bytes): Member content
+
+        Returns:
+            FormatReader: The matching reader, or None
+        """
+        return self._by_suffix(name) or self._sniff(data[:SNIFF_BYTES])
+
+    def iter_members(self, path):
+        """
+        Yield the exam files inside a container, one at a time.
+
+        Members no reader recognizes, and nested containers, are skipped.
+        Members over the container's size limit are yielded with no reader and
+        a ``MemberTooLarge`` error in place of their content.
+
+        Args:
+            path (str or Path): Container file
+
+        Yields:
+            tuple: (source name ``<container>/<member>``, member reader or None,
+                content bytes or MemberTooLarge)
+
+        Raises:
+            ValueError: If the container is corrupt or truncated; members before
+                the damage have been yielded
+        """
+        members = self.detect(path).iter_members(path)
+        while True:
+            try:
+                name, data = next(members)
+            except StopIteration:
+                return
+            except (tarfile.TarError, zipfile.BadZipFile, EOFError, OSError) as e:
+                raise ValueError(f"Corrupt archive {path}: {e}") from e
+
+            if isinstance(data, MemberTooLarge):
+                yield f"{path}/{name}", None, data
+                continue
+            member_reader = self.detect_content(name, data)
+            if member_reader is None or member_reader.container:
+                logger.debug(f"Skipping {name} in {path}: not an exam file")
+                continue
+            yield f"{path}/{name}", member_reader, data
+
+    def iter_exams(self, path):
+        """
+        Read every exam in a file; containers yield one exam per recognized member.
+        A member over the size limit is logged and yielded with None.
+
+        Args:
+            path (str or Path): Exam file or container
+
+        Yields:
+            tuple: (source name, exam data or None); members are named
+                ``<container>/<member>``
+        """
+        reader = self.detect(path)
+        if not reader.container:
+            yield str(path), reader.read(path)
+            return
+
+        for name, member_reader, data in self.iter_members(path):
+            if member_reader is None:
+                logger.warning(f"Skipping {name}: {data}")
+                yield name, None
+                continue
+            yield name, member_reader.loads(data)
+
+    def read(self, path):
+        """
+        Read the exam data of a file holding a single exam.
+
+        Args:
+            path (str or Path): Exam file, or a container with one exam member
+
+        Returns:
+            dict: Exam data, or None if the file holds none
+
+        Raises:
+            ValueError: If a container holds more than one exam
+        """
+        reader = self.detect(path)
+        if not reader.container:
+            return reader.read(path)
+
+        exams = list(self.iter_exams(path))
+        if len(exams) > 1:
+            raise ValueError(f"{path} holds {len(exams)} exam files")
+        return exams[0][1] if exams else None
+
+
+registry = FormatRegistry(fallback=HTMLReader())
+for _reader in (registry.fallback, JSONReader(), JSONLReader(), GzipReader(), ZipReader(), TarReader()):
+    registry.register(_reader)
+
+
+def register_format(reader):
+    """Add a reader to the default registry (see FormatRegistry.register)."""
+    return registry.register(reader)
+
+
+def detect_format(path):
+    """Return the reader for a file from the default registry."""
+    return registry.detect(path)
+
+
+def read_exam(path):
+    """Read the exam data of a file through the default registry."""
+    return registry.read(path)
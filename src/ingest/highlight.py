@@ -0,0 +1,196 @@
+"""
+Pre-rendered syntax highlighting for PCEP Exam Accelerator.
+
+Question HTML carries Python code in ``<code class="codep">`` blocks. Instead
+of running Pygments for every block on every converter run and re-highlighting
+in the browser on every render, blocks are highlighted once at import and the
+markup is stored in ``highlighted_snippets`` under the SHA-256 of the code, so
+a snippet shared by many questions (or re-imported) is rendered only once. The
+API swaps the stored markup into the question HTML.
+
+Pygments is optional: without it nothing is rendered and the practice page
+falls back to its client-side highlighter.
+"""
+
+import hashlib
+import html
+import logging
+import re
+from functools import lru_cache
+
+from sqlalchemy import insert, select
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pygments import highlight
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import PythonLexer
+except ImportError:  # pragma: no cover - depends on the environment
+    highlight = None
+
+CODE_BLOCK_PATTERN = re.compile(r'<code\b[^>]*\bclass="codep"[^>]*>(.*?)</code>', re.DOTALL | re.IGNORECASE)
+
+# Class marking blocks whose markup was rendered server-side
+HIGHLIGHTED_CLASS = 'highlighted'
+
+# SQLite allows 999 bound parameters per statement on older builds, keep IN lists below that
+IN_CLAUSE_CHUNK = 500
+
+if highlight is not None:
+    _lexer = PythonLexer()
+    # Same settings the dataset converters have always used
+    _block_formatter = HtmlFormatter(style='default', cssclass='highlight', linenos=False, noclasses=False)
+    # Token spans only, placed inside the page's own <code class="codep"> block
+    _inline_formatter = HtmlFormatter(nowrap=True)
+
+
+def extract_code_blocks(html_text):
+    """
+    Extract the code of every ``<code class="codep">`` block.
+
+    Args:
+        html_text (str): Question or answer HTML
+
+    Returns:
+        list: Unescaped, stripped code strings in document order
+    """
+    if not html_text or 'codep' not in html_text:
+        return []
+    blocks = (html.unescape(match.group(1)).strip() for match in CODE_BLOCK_PATTERN.finditer(html_text))
+    return [block for block in blocks if block]
+
+
+def code_snippet(html_text):
+    """
+    Build the Question.code_snippet value from question HTML.
+
+    Args:
+        html_text (str): Question HTML
+
+    Returns:
+        str: Code of all blocks separated by blank lines, or None without code
+    """
+    blocks = extract_code_blocks(html_text)
+    return '\n\n'.join(blocks) if blocks else None
+
+
+def snippet_hash(code):
+    """Return the SHA-256 hex digest identifying a code snippet."""
+    return hashlib.sha256(code.encode('utf-8')).hexdigest()
+
+
+@lru_cache(maxsize=4096)
+def render_snippet(code, inline=False):
+    """
+    Highlight Python code with Pygments, once per distinct snippet and process.
+
+    Args:
+        code (str): Python source
+        inline (bool): Return token spans only instead of a ``div.highlight`` block
+
+    Returns:
+        str: HTML markup, or None if Pygments is not installed
+    """
+    if highlight is None:
+        return None
+    return highlight(code, _lexer, _inline_formatter if inline else _block_formatter)
+
+
+def highlight_css(selector='.highlight'):
+    """Return the Pygments stylesheet for block markup, or '' without Pygments."""
+    return _block_formatter.get_style_defs(selector) if highlight is not None else ''
+
+
+def render_code_blocks(html_text, rendered):
+    """
+    Replace ``codep`` blocks with their pre-rendered markup.
+
+    Args:
+        html_text (str): Question or answer HTML
+        rendered (dict): Snippet hash -> inline markup
+
+    Returns:
+        str: HTML with every known block replaced; unknown blocks are left as they are
+    """
+    if not rendered or not html_text or 'codep' not in html_text:
+        return html_text
+
+    def replace(match):
+        code = html.unescape(match.group(1)).strip()
+        markup = rendered.get(snippet_hash(code))
+        if markup is None:
+            return match.group(0)
+        return f'<code class="codep {HIGHLIGHTED_CLASS}">{markup.rstrip()}</code>'
+
+    return CODE_BLOCK_PATTERN.sub(replace, html_text)
+
+
+class SnippetCache:
+    """Database-backed content-hash cache of highlighted code snippets."""
+
+    def __init__(self, session, model):
+        """
+        Initialize the snippet cache.
+
+        Args:
+            session: SQLAlchemy session object
+            model: HighlightedSnippet model class
+        """
+        self.session = session
+        self.table = model.__table__
+        self.stats = {'rendered': 0, 'reused': 0}
+
+    def lookup(self, hashes):
+        """
+        Fetch stored markup for snippet hashes.
+
+        Args:
+            hashes (iterable): Snippet hashes
+
+        Returns:
+            dict: Hash -> inline markup for the hashes that are cached
+        """
+        wanted = list(set(hashes))
+        found = {}
+        columns = self.table.c
+
+        for start in range(0, len(wanted), IN_CLAUSE_CHUNK):
+            chunk = wanted[start:start + IN_CLAUSE_CHUNK]
+            rows = self.session.execute(select(columns.content_hash, columns.html).where(columns.content_hash.in_(chunk)))
+            found.update((content_hash, markup) for content_hash, markup in rows)
+
+        return found
+
+    def ensure(self, html_texts):
+        """
+        Make sure every code block in the given HTML is highlighted and stored.
+
+        Only snippets missing from the table are rendered; the caller's
+        transaction is used and not committed here.
+
+        Args:
+            html_texts (iterable): Question and answer HTML
+
+        Returns:
+            int: Number of snippets rendered and inserted
+        """
+        if highlight is None:
+            return 0
+
+        snippets = {snippet_hash(code): code for text in html_texts for code in extract_code_blocks(text)}
+        if not snippets:
+            return 0
+
+        known = self.lookup(snippets)
+        rows = [
+            {'content_hash': content_hash, 'language': 'python', 'code': code,
+             'html': render_snippet(code, inline=True)}
+            for content_hash, code in snippets.items() if content_hash not in known
+        ]
+        if rows:
+            self.session.execute(insert(self.table), rows)
+
+        self.stats['rendered'] += len(rows)
+        self.stats['reused'] += len(known)
+        return len(rows)
@@ -0,0 +1,144 @@
+"""
+Single-pass HTML-to-text normalization for PCEP Exam Accelerator.
+
+Question and option HTML in the exam exports uses a small tag set: ``p``,
+``br``, ``code`` (``class="codep"`` for code listings, plain for inline
+code), ``u`` and occasionally ``i``/``b``/``strong``, plus entities. One
+``html.parser`` traversal turns it into readable text (markdown-style
+emphasis and inline code, as html2text wrote it) and collects every code
+listing verbatim, so converters no longer build a BeautifulSoup tree and run
+html2text for every question and option, and code keeps its line breaks and
+indentation.
+"""
+
+from html.parser import HTMLParser
+
+# Text left where a code listing was, formatted with the listing's index
+CODE_PLACEHOLDER = '[CODE_BLOCK_{}]'
+
+BLOCK_TAGS = frozenset(('p', 'div', 'li', 'ul', 'ol', 'pre', 'blockquote', 'h1', 'h2', 'h3', 'h4', 'h5', 'h6'))
+EMPHASIS_MARKERS = {'u': '_', 'i': '_', 'em': '_', 'b': '**', 'strong': '**'}
+
+# Marks <br> among collected text, whose own newlines are collapsed like other whitespace
+LINE_BREAK = '\x00'
+
+
+class ExamHTMLParser(HTMLParser):
+    """Collect paragraphs of collapsed text and verbatim code listings."""
+
+    def __init__(self, code_placeholder=CODE_PLACEHOLDER):
+        """
+        Initialize the parser.
+
+        Args:
+            code_placeholder (str): Format string left in the text for each code
+                listing, or None to keep listings in the text as fenced blocks
+        """
+        super().__init__(convert_charrefs=True)
+        self.code_placeholder = code_placeholder
+        self.paragraphs = []
+        self.code_blocks = []
+        self._parts = []
+        self._code = None
+
+    def handle_starttag(self, tag, attrs):
+        if self._code is not None:
+            if tag == 'br':
+                self._code.append('\n')
+            return
+
+        if tag == 'br':
+            self._parts.append(LINE_BREAK)
+        elif tag == 'code':
+            if 'codep' in (dict(attrs).get('class') or '').split():
+                self._end_paragraph()
+                self._code = []
+            else:
+                self._parts.append('`')
+        elif tag in EMPHASIS_MARKERS:
+            self._parts.append(EMPHASIS_MARKERS[tag])
+        elif tag in BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag):
+        if self._code is not None:
+            if tag == 'code':
+                self._end_code()
+            return
+
+        if tag == 'code':
+            self._parts.append('`')
+        elif tag in EMPHASIS_MARKERS:
+            self._parts.append(EMPHASIS_MARKERS[tag])
+        elif tag in BLOCK_TAGS:
+            self._end_paragraph()
+
+    def handle_data(self, data):
+        if self._code is not None:
+            self._code.append(data)
+        else:
+            self._parts.append(data)
+
+    def close(self):
+        super().close()
+        if self._code is not None:
+            self._end_code()
+        self._end_paragraph()
+
+    def _end_paragraph(self):
+        """Collapse whitespace per line (``br`` starts a new line) and keep non-empty text."""
+        if not self._parts:
+            return
+        lines = (' '.join(line.split()) for line in ''.join(self._parts).split(LINE_BREAK))
+        text = '\n'.join(line for line in lines if line)
+        if text:
+            self.paragraphs.append(text)
+        self._parts = []
+
+    def _end_code(self):
+        code = ''.join(self._code).strip()
+        self._code = None
+        if not code:
+            return
+        if self.code_placeholder is None:
+            self.paragraphs.append(f"```python\n{code}\n```")
+        else:
+            self.paragraphs.append(self.code_placeholder.format(len(self.code_blocks)))
+        self.code_blocks.append(code)
+
+
+def normalize_html(html_text, code_placeholder=CODE_PLACEHOLDER):
+    """
+    Convert exam HTML to text and code listings in one pass.
+
+    Args:
+        html_text (str): Question or option HTML
+        code_placeholder (str): Format string left in the text for each
+            ``code.codep`` listing, or None to keep listings as fenced blocks
+
+    Returns:
+        tuple: (text with paragraphs separated by blank lines, list of code strings)
+    """
+    if not html_text:
+        return "", []
+
+    parser = ExamHTMLParser(code_placeholder)
+    parser.feed(html_text)
+    parser.close()
+    return '\n\n'.join(parser.paragraphs), parser.code_blocks
+
+
+def html_to_text(html_text):
+    """
+    Convert exam HTML to readable text, keeping code listings as fenced blocks.
+
+    Args:
+        html_text (str): Question or option HTML
+
+    Returns:
+        str: Normalized text
+    """
+    return normalize_html(html_text, code_placeholder=None)[0]
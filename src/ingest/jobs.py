@@ -0,0 +1,283 @@
+"""
+Background import jobs for PCEP Exam Accelerator.
+
+Lets the Flask app import exam files without blocking a request or shelling
+out to the root-level import scripts. Jobs are queued in memory and run one at
+a time on a daemon worker thread with its own database session; their progress
+(per file, plus overall throughput and errors) can be polled while they run.
+
+With an ``ImportManifest`` model, unchanged files are skipped and a file that
+changed since its last import reloads the exam it created, instead of being
+skipped because an exam with its title exists.
+
+Imports are throttled with a duty cycle: after each file the worker sleeps in
+proportion to the time the file took, outside any transaction, so a large
+re-import leaves the database free for request traffic most of the time.
+"""
+
+import itertools
+import logging
+import queue
+import threading
+import time
+from datetime import datetime
+
+from .manifest import ImportManifestTracker
+from .pipeline import ConverterPipeline, DatabaseSink, iter_source_files
+
+logger = logging.getLogger(__name__)
+
+# Job states: queued -> running -> completed | failed
+# File states: pending -> running -> imported | skipped | failed
+
+
+class ImportJobQueue:
+    """In-process import job queue served by a single worker thread."""
+
+    def __init__(self, session_factory, models, batch_size=500, duty_cycle=0.5, commit_every=None,
+                 on_imported=None):
+        """
+        Initialize the job queue; the worker thread starts with the first job.
+
+        Args:
+            session_factory (callable): Returns a SQLAlchemy session; called on the worker thread
+            models (dict): Model classes as for DatabaseSink, plus optional 'ImportManifest'
+                to skip files that were already imported
+            batch_size (int): Questions inserted per statement batch
+            duty_cycle (float): Fraction of wall time the worker may spend importing
+                (1.0 disables throttling)
+            commit_every (int): Commit large exams in chunks of this many questions, so
+                the write lock is released regularly during long files
+            on_imported (callable): Called as ``on_imported(session, exam_ids)`` on the
+                worker thread after a file imported new exams (e.g. to refresh caches)
+        """
+        if not 0 < duty_cycle <= 1:
+            raise ValueError("duty_cycle must be in (0, 1]")
+
+        self.session_factory = session_factory
+        self.models = models
+        self.batch_size = batch_size
+        self.duty_cycle = duty_cycle
+        self.commit_every = commit_every
+        self.on_imported = on_imported
+
+        self.jobs = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._worker = None
+
+    def submit(self, sources):
+        """
+        Queue an import of files and directories.
+
+        Args:
+            sources (iterable): File or directory paths; directories contribute their
+                exam files and archives (.zip, .tar.gz, .gz)
+
+        Returns:
+            dict: Snapshot of the new job
+
+        Raises:
+            ValueError: If the sources contain no exam files
+        """
+        paths = [str(path) for path in iter_source_files(sources)]
+        if not paths:
+            raise ValueError("No exam files or archives to import")
+
+        with self._lock:
+            job_id = next(self._ids)
+            self.jobs[job_id] = {
+                'id': job_id,
+                'status': 'queued',
+                'created_at': datetime.utcnow().isoformat(),
+                'started_at': None,
+                'finished_at': None,
+                'files': [
+                    {'path': path, 'status': 'pending', 'questions': 0, 'total_questions': None,
+                     'rejected': 0, 'exam_id': None, 'error': None}
+                    for path in paths
+                ],
+                'errors': []
+            }
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name='import-jobs', daemon=True)
+                self._worker.start()
+
+        self._queue.put(job_id)
+        logger.info(f"Queued import job {job_id} with {len(paths)} files")
+        return self.get(job_id)
+
+    def get(self, job_id):
+        """
+        Report a job's progress.
+
+        Args:
+            job_id (int): Job id from submit()
+
+        Returns:
+            dict: Job state with per-file progress and throughput, or None for unknown ids
+        """
+        with self._lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job, files=[dict(entry) for entry in job['files']], errors=list(job['errors']))
+
+        snapshot.update(self._throughput(snapshot))
+        return snapshot
+
+    def list_jobs(self):
+        """Return snapshots of all jobs, newest first."""
+        with self._lock:
+            job_ids = sorted(self.jobs, reverse=True)
+        return [self.get(job_id) for job_id in job_ids]
+
+    def join(self, timeout=None):
+        """
+        Wait until every queued job has finished.
+
+        Args:
+            timeout (float): Seconds to wait, or None to wait indefinitely
+
+        Returns:
+            bool: True if the queue drained within the timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    @staticmethod
+    def _throughput(job):
+        """Counts, elapsed time and rates for a job snapshot."""
+        files = job['files']
+        done = [entry for entry in files if entry['status'] in ('imported', 'skipped', 'failed')]
+        questions = sum(entry['questions'] for entry in files)
+
+        elapsed = 0.0
+        if job['started_at']:
+            end = datetime.fromisoformat(job['finished_at']) if job['finished_at'] else datetime.utcnow()
+            elapsed = (end - datetime.fromisoformat(job['started_at'])).total_seconds()
+
+        return {
+            'files_total': len(files),
+            'files_done': len(done),
+            'files_failed': sum(entry['status'] == 'failed' for entry in files),
+            'questions_processed': questions,
+            'elapsed_seconds': round(elapsed, 3),
+            'files_per_second': round(len(done) / elapsed, 2) if elapsed else 0.0,
+            'questions_per_second': round(questions / elapsed, 1) if elapsed else 0.0
+        }
+
+    def _update(self, entry, **fields):
+        """Change a job or file entry under the lock."""
+        with self._lock:
+            entry.update(fields)
+
+    def _work(self):
+        """Worker thread: run queued jobs one after another."""
+        while True:
+            job_id = self._queue.get()
+            job = self.jobs[job_id]
+            status = 'completed'
+            try:
+                self._update(job, status='running', started_at=datetime.utcnow().isoformat())
+                self._run(job)
+            except Exception as e:
+                logger.exception(f"Import job {job_id} failed")
+                status = 'failed'
+                with self._lock:
+                    job['errors'].append({'source_file': None, 'error': str(e)})
+            finally:
+                self._update(job, status=status, finished_at=datetime.utcnow().isoformat())
+                self._queue.task_done()
+
+    def _run(self, job):
+        """Import a job's files on this thread's session."""
+        session = self.session_factory()
+        try:
+            sink = DatabaseSink(session, self.models, batch_size=self.batch_size, commit_every=self.commit_every)
+            pipeline = ConverterPipeline(sink)
+
+            manifest = None
+            selected = None
+            if 'ImportManifest' in self.models:
+                manifest = ImportManifestTracker(session, self.models['ImportManifest'])
+                selected = set(manifest.select_files(entry['path'] for entry in job['files']))
+
+            for entry in job['files']:
+                if selected is not None and entry['path'] not in selected:
+                    self._update(entry, status='skipped')
+                    continue
+
+                if manifest is not None:
+                    # A changed file reloads the exam it created before instead of being skipped by title
+                    previous = manifest.imported_exam_id(entry['path'])
+                    sink.replace_exam_ids = {previous} if previous else set()
+
+                start = time.perf_counter()
+                result = self._import_file(job, entry, pipeline, sink)
+                if manifest is not None:
+                    manifest.record(entry['path'], result['exam_id'], result['error'])
+
+                # Throttle outside the transaction so readers get the database in between
+                if self.duty_cycle < 1:
+                    busy = time.perf_counter() - start
+                    time.sleep(busy * (1 - self.duty_cycle) / self.duty_cycle)
+        finally:
+            session.close()
+
+    def _import_file(self, job, entry, pipeline, sink):
+        """Stream one file into the database, counting questions as they are written."""
+        self._update(entry, status='running')
+        errors_before = len(pipeline.errors)
+        results_before = len(sink.results)
+
+        exam_sizes = {}
+
+        def counted(records):
+            for record in records:
+                exam = record['exam']
+                with self._lock:
+                    entry['questions'] += 1
+                    exam_sizes[exam['sequence']] = exam['question_count']
+                    entry['total_questions'] = sum(exam_sizes.values())
+                yield record
+
+        sink.write(counted(pipeline.stream([entry['path']])))
+
+        # An archive yields one result per exam member
+        results = sink.results[results_before:]
+        error = None
+        if not results:
+            read_errors = pipeline.errors[errors_before:]
+            error = read_errors[0]['error'] if read_errors else "No questions found"
+            result = {'exam_id': None, 'questions': 0, 'rejected': 0, 'skipped': False, 'error': error}
+        else:
+            error = next((r['error'] for r in results if r['error']), None)
+            result = {'exam_id': next((r['exam_id'] for r in results if r['exam_id']), None),
+                      'rejected': sum(r['rejected'] for r in results),
+                      'skipped': all(r['skipped'] for r in results)}
+
+        with self._lock:
+            entry.update(exam_id=result['exam_id'], error=error, rejected=result['rejected'],
+                         status='failed' if error else 'skipped' if result['skipped'] else 'imported')
+            if error:
+                job['errors'].append({'source_file': entry['path'], 'error': error})
+
+        if error:
+            logger.error(f"Import job {job['id']}: {entry['path']} failed: {error}")
+
+        exam_ids = [r['exam_id'] for r in results if r['exam_id'] and not r['skipped']]
+        if exam_ids and self.on_imported is not None:
+            try:
+                self.on_imported(sink.session, exam_ids)
+            except Exception:
+                logger.exception(f"Import job {job['id']}: post-import hook failed for {entry['path']}")
+        if result['skipped'] and not error:
+            # Its exams already exist under another file: nothing of this content was imported
+            return {'exam_id': None, 'error': "Skipped: an exam with the same title already exists"}
+        return {'exam_id': result['exam_id'], 'error': error}
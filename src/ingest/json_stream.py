@@ -0,0 +1,298 @@
+"""
+Incremental exam file reader for PCEP Exam Accelerator.
+
+``json.load`` and ``f.read()`` hold the whole file text and every parsed
+question at once, several times the file size. This module reads the
+top-level exam object piece by piece instead: the file is decoded in chunks,
+each top-level field is decoded on its own with ``json.JSONDecoder.raw_decode``
+and the elements of the ``questions`` array are handed out one at a time, so
+memory is bounded by the largest single question rather than the file.
+
+It reads JSON exports as well as saved exam pages, where the object is the
+``data = {...}`` assignment located by ``find_assignment``; the rest of the
+page is never decoded.
+"""
+
+import io
+import json
+import mmap
+import re
+
+from .embedded_data import DECLARATION_KEYWORDS, find_assignment
+
+# Characters decoded per read; a value longer than this grows the buffer
+CHUNK_SIZE = 256 * 1024
+
+_decoder = json.JSONDecoder()
+_NON_WHITESPACE = re.compile(r'\S')
+
+
+class JSONStreamReader:
+    """Pull parser for one JSON value at a time from a text stream."""
+
+    def __init__(self, stream, chunk_size=CHUNK_SIZE):
+        """
+        Initialize the reader.
+
+        Args:
+            stream: Text stream positioned at the first value
+            chunk_size (int): Characters read from the stream at a time
+        """
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Append the next chunk, dropping what was consumed; False at end of input."""
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it, '' at end of input."""
+        while True:
+            match = _NON_WHITESPACE.search(self.buffer, self.pos)
+            if match:
+                self.pos = match.start()
+                return self.buffer[self.pos]
+            self.pos = len(self.buffer)
+            if not self._fill():
+                return ''
+
+    def expect(self, chars):
+        """
+        Consume the next non-whitespace character, which must be one of ``chars``.
+
+        Returns:
+            str: The character
+
+        Raises:
+            json.JSONDecodeError: For any other character or end of input
+        """
+        char = self.peek()
+        if not char or char not in chars:
+            expected = ' or '.join(repr(c) for c in chars)
+            raise json.JSONDecodeError(f"Expecting {expected}", self.buffer, self.pos)
+        self.pos += 1
+        return char
+
+    def value(self):
+        """
+        Decode the next JSON value.
+
+        Raises:
+            json.JSONDecodeError: If the input at this point is not a JSON value
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+                # A number ending at the buffer end may continue in the next chunk
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self._fill()
+
+
+def _iter_events(reader):
+    """
+    Walk the top-level object.
+
+    Yields:
+        tuple: ('field', (key, value)) for every field but the questions array,
+            ('questions', None) where the array starts, ('question', question)
+            for each of its elements
+    """
+    reader.expect('{')
+    if reader.peek() == '}':
+        return
+
+    while True:
+        key = reader.value()
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", reader.buffer, reader.pos)
+        reader.expect(':')
+
+        if key == 'questions' and reader.peek() == '[':
+            reader.pos += 1
+            yield 'questions', None
+            if reader.peek() == ']':
+                reader.pos += 1
+            else:
+                while True:
+                    yield 'question', reader.value()
+                    if reader.expect(',]') == ']':
+                        break
+        else:
+            yield 'field', (key, reader.value())
+
+        if reader.expect(',}') == '}':
+            return
+
+
+class ExamStream:
+    """Locates the exam object in a JSON export or saved page and streams its parts."""
+
+    def __init__(self, path, variable='data', chunk_size=CHUNK_SIZE):
+        """
+        Initialize the stream; nothing is read until events() is iterated.
+
+        Args:
+            path (str or Path): JSON export or saved exam page
+            variable (str): JavaScript variable holding the data in pages
+            chunk_size (int): Characters decoded at a time
+        """
+        self.path = path
+        self.variable = variable
+        self.chunk_size = chunk_size
+
+    def _candidates(self):
+        """
+        Byte offsets where the exam object may start, with the decode error mode.
+
+        A file starting with ``{`` is a JSON export. Otherwise the ``data``
+        assignments are tried in the order extract_embedded_data() ranks them:
+        ``let``, ``var``, ``const``, then bare assignments.
+        """
+        with open(self.path, 'rb') as f:
+            head = f.read(1024)
+            if not head:
+                return []
+            bom = 3 if head.startswith(b'\xef\xbb\xbf') else 0
+            stripped = head[bom:].lstrip()
+            if stripped[:1] == b'{':
+                return [(len(head) - len(stripped), 'strict')]
+
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                found = []
+                pos, keyword = find_assignment(buffer, self.variable)
+                while pos != -1:
+                    rank = DECLARATION_KEYWORDS.index(keyword) if keyword else len(DECLARATION_KEYWORDS)
+                    found.append((rank, pos))
+                    pos, keyword = find_assignment(buffer, self.variable, pos + 1)
+
+        # Pages are decoded leniently, as extract_embedded_data() does
+        return [(pos, 'replace') for _, pos in sorted(found)]
+
+    def events(self):
+        """
+        Yield the parts of the exam object in file order, as _iter_events() describes.
+
+        Raises:
+            ValueError: If the file holds no readable exam object
+                (json.JSONDecodeError and UnicodeDecodeError are ValueErrors)
+        """
+        error = None
+        for offset, errors in self._candidates():
+            raw = open(self.path, 'rb')
+            raw.seek(offset)
+            with io.TextIOWrapper(raw, encoding='utf-8', errors=errors) as text:
+                events = _iter_events(JSONStreamReader(text, self.chunk_size))
+                try:
+                    first = next(events, None)
+                except json.JSONDecodeError as e:
+                    # A JavaScript (non-JSON) object literal; try the next assignment
+                    error = e
+                    continue
+                if first is not None:
+                    yield first
+                yield from events
+                return
+
+        raise error or ValueError(f"No exam data found in {self.path}")
+
+
+def iter_exam_stream(path, variable='data', chunk_size=CHUNK_SIZE):
+    """
+    Yield an exam file's top-level fields first, then its questions one at a time.
+
+    The first item is a dict of the fields that precede the ``questions``
+    array (id, timeLimitInMinutes, ... in exports). Fields that follow the
+    array are added to that same dict once the questions are exhausted.
+
+    Args:
+        path (str or Path): JSON export or saved exam page
+        variable (str): JavaScript variable holding the data in pages
+        chunk_size (int): Characters decoded at a time
+
+    Yields:
+        dict: Exam fields, then each question
+
+    Raises:
+        ValueError: If the file holds no readable exam object
+    """
+    metadata = {}
+    announced = False
+    for kind, value in ExamStream(path, variable, chunk_size).events():
+        if kind == 'field':
+            metadata[value[0]] = value[1]
+        elif kind == 'questions':
+            announced = True
+            yield metadata
+        else:
+            yield value
+    if not announced:
+        yield metadata
+
+
+def scan_exam_stream(path, variable='data', chunk_size=CHUNK_SIZE):
+    """
+    Read every top-level field and count the questions without keeping them.
+
+    Also checks that the whole object decodes, so a later pass over the
+    questions will not fail halfway.
+
+    Args:
+        path (str or Path): JSON export or saved exam page
+        variable (str): JavaScript variable holding the data in pages
+        chunk_size (int): Characters decoded at a time
+
+    Returns:
+        dict: {'metadata' (fields except the questions), 'key_order' (all keys in
+            file order), 'question_count' (None if there is no questions array)}
+    """
+    metadata = {}
+    key_order = []
+    question_count = None
+    for kind, value in ExamStream(path, variable, chunk_size).events():
+        if kind == 'field':
+            metadata[value[0]] = value[1]
+            key_order.append(value[0])
+        elif kind == 'questions':
+            key_order.append('questions')
+            question_count = 0
+        else:
+            question_count += 1
+    return {'metadata': metadata, 'key_order': key_order, 'question_count': question_count}
+
+
+def read_exam_stream(path, variable='data', chunk_size=CHUNK_SIZE):
+    """
+    Read a whole exam object without holding the file text in memory.
+
+    Args:
+        path (str or Path): JSON export or saved exam page
+        variable (str): JavaScript variable holding the data in pages
+        chunk_size (int): Characters decoded at a time
+
+    Returns:
+        dict: Exam data in file key order, as json.load would return it
+    """
+    exam_data = {}
+    for kind, value in ExamStream(path, variable, chunk_size).events():
+        if kind == 'field':
+            exam_data[value[0]] = value[1]
+        elif kind == 'questions':
+            exam_data['questions'] = []
+        else:
+            exam_data['questions'].append(value)
+    return exam_data
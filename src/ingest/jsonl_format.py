@@ -0,0 +1,235 @@
+"""
+Random-access JSONL exam files for PCEP Exam Accelerator.
+
+An exam is stored as line-delimited JSON:
+
+- line 1: the exam's top-level fields (or converter metadata), without the
+  questions
+- every further line: one question, in order
+
+Next to each ``<name>.jsonl`` the writer puts a sidecar ``<name>.jsonl.idx``
+holding the byte offset of every question line, so a reader can seek to
+question N directly, read a range of questions, or split an exam into chunks
+for parallel import without scanning the file. The index records the size of
+the data file it describes; a missing or stale index is rebuilt with one scan
+of the data file.
+
+Both files are written atomically. All converters read and write JSONL through
+this module (see ``JSONLSink`` and ``read_exam_file`` in ``pipeline``).
+"""
+
+import json
+import logging
+import mmap
+import struct
+from array import array
+from pathlib import Path
+
+from .atomic import atomic_write
+
+logger = logging.getLogger(__name__)
+
+JSONL_SUFFIX = '.jsonl'
+INDEX_SUFFIX = '.idx'
+
+INDEX_MAGIC = b'PCEPJX01'
+
+# magic, question count, data file size; followed by count + 1 uint64 offsets
+# (the start of each question line, then the end of the data)
+INDEX_HEADER = struct.Struct('<8sQQ')
+
+
+def index_path(path):
+    """Return the sidecar index path of a JSONL exam file."""
+    path = Path(path)
+    return path.with_name(path.name + INDEX_SUFFIX)
+
+
+def _dumps(value):
+    return json.dumps(value, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def _write_index(path, offsets):
+    """Write the sidecar index for ``offsets`` (question starts plus the end of data)."""
+    with atomic_write(index_path(path), mode='wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, len(offsets) - 1, offsets[-1]))
+        f.write(array('Q', offsets).tobytes())
+
+
+def write_exam_jsonl(path, header, questions):
+    """
+    Write an exam as JSONL with its sidecar index, one question at a time.
+
+    Args:
+        path (str or Path): JSONL file to write
+        header (dict): First line: exam fields or metadata, without the questions
+        questions (iterable): Question dicts
+
+    Returns:
+        int: Number of questions written
+    """
+    offsets = array('Q')
+    with atomic_write(path, mode='wb') as f:
+        position = f.write(_dumps(header))
+        for question in questions:
+            offsets.append(position)
+            position += f.write(_dumps(question))
+        offsets.append(position)
+
+    _write_index(path, offsets)
+    return len(offsets) - 1
+
+
+def _scan_offsets(path):
+    """Question line offsets followed by the end of data, from one scan of the file."""
+    offsets = array('Q')
+    with open(path, 'rb') as f:
+        position = len(f.readline())
+        for line in f:
+            if line.strip():
+                offsets.append(position)
+            position += len(line)
+    offsets.append(position)
+    return offsets
+
+
+def build_index(path):
+    """
+    Rebuild the sidecar index of a JSONL exam file by scanning it once.
+
+    Args:
+        path (str or Path): JSONL file
+
+    Returns:
+        array: Question line offsets followed by the end of data
+    """
+    offsets = _scan_offsets(path)
+    _write_index(path, offsets)
+    return offsets
+
+
+class ExamJSONLReader:
+    """Random access to the questions of a JSONL exam file."""
+
+    def __init__(self, path):
+        """
+        Open a JSONL exam file and its index.
+
+        Args:
+            path (str or Path): JSONL file
+
+        Raises:
+            ValueError: If the file is empty
+        """
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            self.header = json.loads(f.readline() or 'null')
+            size = f.seek(0, 2)
+        if not isinstance(self.header, dict):
+            raise ValueError(f"{self.path} has no JSONL exam header")
+
+        self.offsets = self._load_index(size)
+        self._file = open(self.path, 'rb')
+
+    def _load_index(self, size):
+        """Read the sidecar index, rebuilding it if it is missing or does not match the data."""
+        try:
+            data = index_path(self.path).read_bytes()
+            magic, count, indexed_size = INDEX_HEADER.unpack_from(data)
+            if magic == INDEX_MAGIC and indexed_size == size:
+                offsets = array('Q')
+                offsets.frombytes(data[INDEX_HEADER.size:INDEX_HEADER.size + 8 * (count + 1)])
+                if len(offsets) == count + 1:
+                    return offsets
+        except (OSError, struct.error):
+            pass
+
+        logger.info(f"Rebuilding JSONL index for {self.path}")
+        offsets = _scan_offsets(self.path)
+        try:
+            _write_index(self.path, offsets)
+        except OSError as e:
+            # Read-only location: the index still works for this reader
+            logger.warning(f"Could not save JSONL index for {self.path}: {e}")
+        return offsets
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def close(self):
+        """Close the data file."""
+        self._file.close()
+
+    def question(self, number):
+        """
+        Read one question by its 0-based number.
+
+        Args:
+            number (int): Question number
+
+        Returns:
+            dict: The question
+
+        Raises:
+            IndexError: If there is no such question
+        """
+        if not 0 <= number < len(self):
+            raise IndexError(f"{self.path} has no question {number}")
+        self._file.seek(self.offsets[number])
+        return json.loads(self._file.read(self.offsets[number + 1] - self.offsets[number]))
+
+    def iter_questions(self, start=0, stop=None):
+        """
+        Yield questions ``start`` to ``stop`` (exclusive) in order.
+
+        The range is read with one sequential pass over its bytes.
+
+        Args:
+            start (int): First question number
+            stop (int): End of the range (defaults to the last question)
+
+        Yields:
+            dict: Questions
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        if start >= stop:
+            return
+        with mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            for number in range(start, stop):
+                yield json.loads(data[self.offsets[number]:self.offsets[number + 1]])
+
+    def chunks(self, size):
+        """
+        Split the questions into ranges for chunked or parallel reads.
+
+        Args:
+            size (int): Questions per chunk
+
+        Returns:
+            list: (start, stop) tuples covering all questions
+        """
+        return [(start, min(start + size, len(self))) for start in range(0, len(self), size)]
+
+    def read(self):
+        """Return the header fields with a 'questions' list, like a JSON export."""
+        return {**self.header, 'questions': list(self.iter_questions())}
+
+
+def read_exam_jsonl(path):
+    """
+    Read a whole JSONL exam file.
+
+    Args:
+        path (str or Path): JSONL file
+
+    Returns:
+        dict: Header fields plus 'questions'
+    """
+    with ExamJSONLReader(path) as reader:
+        return reader.read()
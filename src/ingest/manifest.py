@@ -0,0 +1,187 @@
+"""
+Content-hash import manifest for PCEP Exam Accelerator.
+
+Decides, before any parsing happens, which source files actually need to be
+imported:
+
+- **unchanged**: path already imported and size + mtime match; costs one stat()
+- **duplicate**: new or changed path whose bytes hash to content that was
+  already imported (e.g. dated re-exports with identical content)
+- **new**: anything else, including files whose last import failed
+
+Results are stored in the ``import_manifest`` table so the next run over a
+large archive only stats files it has seen before.
+"""
+
+import hashlib
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def hash_file(path):
+    """
+    Compute the SHA-256 hex digest of a file without reading it into memory at once.
+
+    Args:
+        path (str): File to hash
+
+    Returns:
+        str: Hex digest
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImportManifestTracker:
+    """Filters file lists against the import manifest and records import outcomes."""
+
+    def __init__(self, session, manifest_model):
+        """
+        Initialize the tracker and load the manifest in one query.
+
+        Args:
+            session: SQLAlchemy session object
+            manifest_model: The ImportManifest model class
+        """
+        self.session = session
+        self.model = manifest_model
+        self.entries_by_path = {}
+        self.exam_by_hash = {}
+
+        # Files selected for import in this run: path -> (size, mtime, hash)
+        self.pending = {}
+        # Hashes selected in this run -> paths with the same content waiting for the exam id
+        self.waiting_duplicates = {}
+
+        self.stats = {'unchanged': 0, 'duplicate': 0, 'new': 0}
+
+        for entry in self.session.query(self.model).all():
+            self.entries_by_path[entry.path] = entry
+            if entry.exam_id and entry.status != 'failed':
+                self.exam_by_hash.setdefault(entry.content_hash, entry.exam_id)
+
+    def classify(self, path):
+        """
+        Classify a file without parsing it.
+
+        Args:
+            path (str): File to check
+
+        Returns:
+            tuple: (status, content_hash) where status is 'unchanged', 'duplicate' or 'new';
+                content_hash is None for unchanged files (they are never read)
+        """
+        path = os.path.abspath(path)
+        stat = os.stat(path)
+        entry = self.entries_by_path.get(path)
+
+        if entry and entry.status != 'failed' and entry.is_unchanged(stat.st_size, stat.st_mtime):
+            return 'unchanged', None
+
+        content_hash = hash_file(path)
+        self.pending[path] = (stat.st_size, stat.st_mtime, content_hash)
+
+        if content_hash in self.exam_by_hash or content_hash in self.waiting_duplicates:
+            return 'duplicate', content_hash
+
+        return 'new', content_hash
+
+    def select_files(self, paths):
+        """
+        Filter a list of files down to the ones that need importing.
+
+        Duplicates of already-imported content are recorded immediately; duplicates
+        of content selected earlier in the same run are recorded once that import
+        finishes (see record()).
+
+        Args:
+            paths (iterable): Candidate files
+
+        Returns:
+            list: Paths (as given) that must be parsed and imported
+        """
+        selected = []
+
+        for path in paths:
+            status, content_hash = self.classify(path)
+            self.stats[status] += 1
+
+            if status == 'new':
+                self.waiting_duplicates[content_hash] = []
+                selected.append(path)
+            elif status == 'duplicate':
+                abs_path = os.path.abspath(path)
+                if content_hash in self.exam_by_hash:
+                    self._save(abs_path, self.exam_by_hash[content_hash], 'duplicate')
+                else:
+                    self.waiting_duplicates[content_hash].append(abs_path)
+
+        if self.stats['duplicate']:
+            self.session.commit()
+
+        logger.info(f"Import manifest: {len(selected)} new/changed, "
+                    f"{self.stats['unchanged']} unchanged, {self.stats['duplicate']} duplicate content")
+        return selected
+
+    def imported_exam_id(self, path):
+        """
+        Exam a file created the last time it was imported.
+
+        Args:
+            path (str): Source file
+
+        Returns:
+            int: Exam id, or None if the file was never imported itself (new,
+                failed, or recorded as a duplicate of another file)
+        """
+        entry = self.entries_by_path.get(os.path.abspath(path))
+        return entry.exam_id if entry is not None and entry.status == 'imported' else None
+
+    def record(self, path, exam_id, error=None):
+        """
+        Record the outcome of importing a file returned by select_files().
+
+        Args:
+            path (str): Imported file
+            exam_id (int): Exam created for the file, or None if the import failed
+            error (str): Error message for failed imports
+        """
+        path = os.path.abspath(path)
+        if path not in self.pending:
+            return
+
+        status = 'imported' if exam_id else 'failed'
+        content_hash = self._save(path, exam_id, status, error)
+
+        waiting = self.waiting_duplicates.pop(content_hash, [])
+        if exam_id:
+            self.exam_by_hash[content_hash] = exam_id
+            for duplicate_path in waiting:
+                self._save(duplicate_path, exam_id, 'duplicate')
+
+        self.session.commit()
+
+    def _save(self, path, exam_id, status, error=None):
+        """Insert or update the manifest row for a pending path; returns its content hash."""
+        file_size, mtime, content_hash = self.pending.pop(path)
+
+        entry = self.entries_by_path.get(path)
+        if entry is None:
+            entry = self.model(path=path)
+            self.session.add(entry)
+            self.entries_by_path[path] = entry
+
+        entry.file_size = file_size
+        entry.mtime = mtime
+        entry.content_hash = content_hash
+        entry.exam_id = exam_id
+        entry.status = status
+        entry.last_error = error
+        return content_hash
@@ -0,0 +1,200 @@
+"""
+Multi-answer question detection for PCEP Exam Accelerator.
+
+Decides whether a question is single-select or multi-select ("Select two
+answers", "Mark all that apply", checkbox options, plural phrasing) and how
+many answers it requires.
+
+All instruction patterns are compiled into one alternation of named groups,
+ordered by confidence, inside a lookahead. A single ``finditer`` pass per
+question reports, at every position where something matches, the strongest
+pattern starting there; the structural (plural phrasing) patterns ride along in
+the same expression. A two-character keyword guard in front keeps the engine
+from trying the alternatives at positions where no pattern can start. The
+result is identical to searching each pattern separately and keeping the
+highest-confidence hit.
+"""
+
+import re
+
+# (pattern, confidence); ``(?P<count>\w+)`` captures the number word
+MULTI_ANSWER_PATTERNS = [
+    # Explicit multi-answer instructions
+    (r'select\s+(?P<count>\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.95),
+    (r'choose\s+(?P<count>\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.95),
+    (r'pick\s+(?P<count>\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.90),
+    (r'mark\s+(?P<count>\w+)\s+(?:of\s+the\s+)?(?:correct\s+)?answers?', 0.90),
+    (r'identify\s+(?P<count>\w+)\s+(?:correct\s+)?answers?', 0.85),
+
+    # Parenthetical instructions
+    (r'\(\s*select\s+(?P<count>\w+)\s*\)', 0.98),
+    (r'\(\s*choose\s+(?P<count>\w+)\s*\)', 0.98),
+    (r'\(\s*mark\s+(?P<count>\w+)\s*\)', 0.95),
+
+    # "All that apply" patterns
+    (r'mark\s+all\s+that\s+apply', 0.99),
+    (r'select\s+all\s+that\s+apply', 0.99),
+    (r'choose\s+all\s+that\s+apply', 0.99),
+    (r'identify\s+all\s+that\s+apply', 0.95),
+
+    # Multiple options patterns
+    (r'which\s+(?P<count>\w+)\s+(?:of\s+the\s+following\s+)?(?:are\s+|statements?\s+are\s+)correct', 0.85),
+    (r'which\s+(?:of\s+the\s+following\s+)?(?P<count>\w+)\s+statements?\s+are\s+true', 0.85),
+
+    # Question patterns that suggest multiple answers
+    (r'what\s+are\s+the\s+(?P<count>\w+)', 0.70),
+    (r'which\s+ones?\s+are', 0.75),
+
+    # Checkbox indicators in options
+    (r'\[\s*\]\s*', 0.60),  # Empty checkboxes
+    (r'☐', 0.80),  # Checkbox unicode
+    (r'□', 0.80),  # Empty square unicode
+]
+
+# Plural phrasing suggesting more than one answer
+STRUCTURAL_PATTERNS = [
+    r'which\s+(?:of\s+the\s+following\s+)?(?:statements?|options?|items?)\s+are',
+    r'what\s+are\s+the',
+    r'identify\s+the\s+(?:correct\s+)?(?:statements?|options?)',
+    r'select\s+(?:the\s+)?(?:correct\s+)?(?:statements?|options?)'
+]
+STRUCTURAL_CONFIDENCE = 0.60
+OPTION_CONFIDENCE = 0.70
+
+NUMBER_WORDS = {
+    'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5,
+    'six': 6, 'seven': 7, 'eight': 8, 'nine': 9, 'ten': 10,
+    'all': 99,  # Special case for "select all"
+    'any': 99,  # "any that apply"
+    'multiple': 99  # "multiple answers"
+}
+
+# Every pattern above starts with one of these (lowercase) prefixes
+KEYWORD_GUARD = r'(?=se|ch|pi|ma|id|wh|\(|\[|☐|□)'
+
+CHECKBOX_INDICATORS = ('[]', '☐', '□')
+RADIO_INDICATORS = ('()', '○', '◯')
+
+
+def _compile_detector(patterns, structural_patterns):
+    """
+    Build the combined expression.
+
+    Pattern ``i`` becomes group ``p{i}`` with its number word in ``n{i}``.
+    Alternatives are ordered by confidence (then list order), so at any position
+    the reported group is the best pattern starting there. Structural phrasing
+    is captured as ``s`` alongside an instruction match, or as ``s_only``.
+    """
+    ranked = sorted(range(len(patterns)), key=lambda i: (-patterns[i][1], i))
+    instructions = '|'.join(
+        f"(?P<p{i}>{patterns[i][0].replace('(?P<count>', f'(?P<n{i}>')})" for i in ranked
+    )
+    structural = '|'.join(f"(?:{pattern})" for pattern in structural_patterns)
+    expression = (f"{KEYWORD_GUARD}(?:(?=(?:{instructions}))(?=(?P<s>{structural}))?"
+                  f"|(?=(?P<s_only>{structural})))")
+    # Text is lowercased before matching, so the guard can stay case-sensitive
+    return re.compile(expression), ranked
+
+
+class MultiAnswerDetector:
+    """Single-pass, batch-capable multi-answer requirement detector."""
+
+    _pattern, _ranked = _compile_detector(MULTI_ANSWER_PATTERNS, STRUCTURAL_PATTERNS)
+    # Rank of each pattern index: lower is stronger
+    _rank = {index: rank for rank, index in enumerate(_ranked)}
+
+    def detect(self, question_text, options=None):
+        """
+        Detect whether a question requires multiple answers.
+
+        Args:
+            question_text (str): Question text or HTML
+            options (list): Answer options (strings or dicts), optional
+
+        Returns:
+            dict: {'type', 'required_answers', 'confidence', 'detection_method'}
+        """
+        best_index = best_match = None
+        structural = False
+
+        for match in self._pattern.finditer((question_text or '').lower()):
+            if match.group('s') is not None or match.group('s_only') is not None:
+                structural = True
+            # lastgroup is unreliable with several groups set; find the instruction group
+            for name, value in match.groupdict().items():
+                if value is not None and name[0] == 'p':
+                    index = int(name[1:])
+                    if best_index is None or self._rank[index] < self._rank[best_index]:
+                        best_index, best_match = index, match
+                    break
+
+        highest_confidence = 0.0
+        detected_count = 1
+        if best_index is not None:
+            highest_confidence = MULTI_ANSWER_PATTERNS[best_index][1]
+            number_word = best_match.group(f'n{best_index}') if f'n{best_index}' in self._pattern.groupindex else None
+            # Patterns without a number word (like "mark all that apply") mean all
+            detected_count = NUMBER_WORDS.get(number_word, 1) if number_word else 99
+
+        # Option-based analysis
+        option_confidence = 0.0
+        if options:
+            checkbox_indicators = 0
+            radio_indicators = 0
+
+            for option in options:
+                option_text = str(option).lower()
+                if any(indicator in option_text for indicator in CHECKBOX_INDICATORS):
+                    checkbox_indicators += 1
+                elif any(indicator in option_text for indicator in RADIO_INDICATORS):
+                    radio_indicators += 1
+
+            if checkbox_indicators > radio_indicators:
+                option_confidence = OPTION_CONFIDENCE
+                if detected_count == 1:  # Override if options suggest multi-select
+                    detected_count = 2  # Conservative default
+
+        # Structural analysis
+        structural_confidence = 0.0
+        if structural:
+            structural_confidence = STRUCTURAL_CONFIDENCE
+            if detected_count == 1:
+                detected_count = 2
+
+        final_confidence = max(highest_confidence, option_confidence, structural_confidence)
+
+        if detected_count > 1 or final_confidence >= 0.70:
+            required_answers = detected_count if detected_count < 99 else len(options) if options else 2
+            return {
+                "type": "multi-select",
+                "required_answers": required_answers,
+                "confidence": final_confidence,
+                "detection_method": "pattern" if highest_confidence == final_confidence else "structural"
+            }
+
+        return {
+            "type": "single-select",
+            "required_answers": 1,
+            "confidence": 1.0 - final_confidence,  # Confidence in single-select
+            "detection_method": "default"
+        }
+
+    def detect_batch(self, questions):
+        """
+        Detect multi-answer requirements for many questions.
+
+        Args:
+            questions (iterable): Question dicts with 'question' and optional
+                'options' keys, or (question_text, options) tuples
+
+        Returns:
+            list: One detect() result per question, in input order
+        """
+        results = []
+        for question in questions:
+            if isinstance(question, dict):
+                results.append(self.detect(question.get('question', ''), question.get('options')))
+            else:
+                question_text, options = question
+                results.append(self.detect(question_text, options))
+        return results
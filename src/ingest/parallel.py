@@ -0,0 +1,135 @@
+"""
+Parallel multi-file ingest driver for PCEP Exam Accelerator.
+
+Reading, extracting, validating and normalizing exam files is CPU-bound and
+independent per file, so it is fanned out to a process pool. Database writes
+stay in the calling process and run one at a time, because a SQLAlchemy
+session (and SQLite itself) only supports a single writer.
+
+The number of files in flight is bounded: once ``max_pending`` parsed results
+are waiting, no new files are submitted until the writer catches up, so memory
+stays flat no matter how many files are queued.
+"""
+
+import logging
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+logger = logging.getLogger(__name__)
+
+
+class ParallelIngestDriver:
+    """Runs a parse function in worker processes and feeds results to a single writer."""
+
+    def __init__(self, parse_func, writer, max_workers=None, max_pending=None, on_error=None):
+        """
+        Initialize the ingest driver.
+
+        Args:
+            parse_func (callable): Module-level function ``parse_func(path) -> result``;
+                runs in worker processes, so it and its result must be picklable
+            writer (callable): ``writer(result) -> value``; runs serially in this process
+            max_workers (int): Worker process count (defaults to CPU count)
+            max_pending (int): Maximum files submitted but not yet written
+                (defaults to twice the worker count)
+            on_error (callable): ``on_error(path, exception) -> result`` builds the
+                result handed to the writer when a worker raised
+        """
+        self.parse_func = parse_func
+        self.writer = writer
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 2
+        self.on_error = on_error
+        self.stats = {
+            'files_submitted': 0,
+            'files_written': 0,
+            'parse_errors': 0,
+            'write_time': 0.0,
+            'wall_time': 0.0
+        }
+
+    def _write(self, path, result):
+        """Hand one parsed result to the writer and record timing."""
+        start = time.perf_counter()
+        value = self.writer(result)
+        self.stats['write_time'] += time.perf_counter() - start
+        self.stats['files_written'] += 1
+        return path, value
+
+    def _parse_error(self, path, error):
+        """Build the result passed to the writer when a worker raised."""
+        logger.error(f"Worker failed on {path}: {error}")
+        self.stats['parse_errors'] += 1
+        if self.on_error:
+            return self.on_error(path, error)
+        return {'source_file': str(path), 'success': False, 'errors': [str(error)]}
+
+    def iter_results(self, file_paths):
+        """
+        Parse files in parallel and write them one at a time as they complete.
+
+        Args:
+            file_paths (iterable): Paths to process
+
+        Yields:
+            tuple: (path, writer return value) in completion order
+        """
+        start = time.perf_counter()
+        file_paths = list(file_paths)
+
+        try:
+            # A pool is pure overhead for a single file or a single worker
+            if self.max_workers <= 1 or len(file_paths) <= 1:
+                for path in file_paths:
+                    self.stats['files_submitted'] += 1
+                    try:
+                        result = self.parse_func(path)
+                    except Exception as e:
+                        result = self._parse_error(path, e)
+                    yield self._write(path, result)
+                return
+
+            with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                pending = {}
+                paths = iter(file_paths)
+                exhausted = False
+
+                while pending or not exhausted:
+                    # Keep the pipeline full up to the backpressure limit
+                    while not exhausted and len(pending) < self.max_pending:
+                        path = next(paths, None)
+                        if path is None:
+                            exhausted = True
+                            break
+                        pending[pool.submit(self.parse_func, path)] = path
+                        self.stats['files_submitted'] += 1
+
+                    if not pending:
+                        break
+
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        path = pending.pop(future)
+                        try:
+                            result = future.result()
+                        except Exception as e:
+                            result = self._parse_error(path, e)
+                        yield self._write(path, result)
+        finally:
+            self.stats['wall_time'] = time.perf_counter() - start
+
+    def run(self, file_paths):
+        """
+        Process all files and collect the writer results.
+
+        Args:
+            file_paths (iterable): Paths to process
+
+        Returns:
+            list: Writer return values in completion order
+        """
+        results = [value for _, value in self.iter_results(file_paths)]
+        logger.info(f"Ingested {self.stats['files_written']} files in {self.stats['wall_time']:.2f}s "
+                    f"({self.max_workers} workers, write time {self.stats['write_time']:.2f}s)")
+        return results
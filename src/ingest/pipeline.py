@@ -0,0 +1,905 @@
+"""
+Streaming converter pipeline for PCEP Exam Accelerator.
+
+Every converter used to run its own read -> extract -> validate -> load loop
+over whole files. This module provides that loop once, as a chain of generator
+stages over question records::
+
+    source -> extract -> normalize -> enrich -> validate -> sink
+
+A record is a dict holding the question as read from the file (``source``), the
+row built from it (``row``), its 1-based ``position`` and the shared ``exam``
+context of the file it came from. Stages pull one record at a time, the enrich
+stage a batch of up to ``ENRICH_BATCH_SIZE``, and sinks write in batches, so
+only the questions of the current enrich and sink batches are alive at once. Files of ``STREAM_THRESHOLD`` bytes or more are
+also read incrementally (see ``json_stream``) rather than loaded whole.
+
+Sinks write to the database through ``BulkExamLoader`` or to JSON or JSONL
+files; ``question_bank.QuestionBankSink`` writes a question bank with a
+generated loader module.
+"""
+
+import hashlib
+import json
+import logging
+import os
+from itertools import chain, count, groupby
+from pathlib import Path
+
+from .atomic import atomic_write
+from .bulk_loader import BulkExamLoader
+from .fingerprint import question_fingerprint
+from .formats import detect_format, read_exam, registry
+from .highlight import code_snippet
+from .json_stream import iter_exam_stream, scan_exam_stream
+from .jsonl_format import ExamJSONLReader, write_exam_jsonl
+from .multi_answer import MultiAnswerDetector
+from .schema import describe, exam_validator
+
+logger = logging.getLogger(__name__)
+
+SOURCE_PATTERNS = ('*.html', '*.json', '*.jsonl', '*.zip', '*.gz', '*.tgz', '*.tar')
+
+# Files at least this large are streamed question by question instead of loaded whole
+STREAM_THRESHOLD = 16 * 1024 * 1024
+
+# Formats json_stream can read incrementally
+STREAMED_FORMATS = ('json', 'html')
+
+# Records enriched together, so batch-capable enrichers (e.g. multi-answer detection) run once per batch
+ENRICH_BATCH_SIZE = 500
+
+# Distinguishes exam contexts in the record stream; ids of freed dicts can be reused
+_exam_sequence = count()
+
+_multi_answer_detector = MultiAnswerDetector()
+
+
+# ---------------------------------------------------------------------------
+# Source and extract stages
+# ---------------------------------------------------------------------------
+
+def iter_source_files(sources, patterns=SOURCE_PATTERNS):
+    """
+    Expand files and directories into the exam files to convert.
+
+    Args:
+        sources (iterable): File or directory paths
+        patterns (tuple): Glob patterns matched inside directories
+
+    Yields:
+        Path: Exam files, directory matches in sorted order
+    """
+    for source in sources:
+        source = Path(source)
+        if source.is_dir():
+            yield from sorted({path for pattern in patterns for path in source.glob(pattern)})
+        else:
+            yield source
+
+
+def read_exam_file(path):
+    """
+    Read the exam data from any registered format (see ``formats``).
+
+    Args:
+        path (str or Path): Saved exam page, JSON export, JSONL file, or a
+            gzip/zip file holding one of them
+
+    Returns:
+        dict: Exam data, or None if the file holds none
+    """
+    return read_exam(path)
+
+
+def exam_context(exam_data, source_file):
+    """
+    Build the exam context shared by all records of one file.
+
+    Args:
+        exam_data (dict): Exam data as read from the file
+        source_file (str or Path): File the data came from
+
+    Returns:
+        dict: {'sequence', 'source_file', 'data' (top-level fields without the
+            questions), 'key_order', 'question_count'}
+    """
+    return _new_exam_context(source_file,
+                             {key: value for key, value in exam_data.items() if key != 'questions'},
+                             list(exam_data.keys()), len(exam_data.get('questions') or []))
+
+
+def _new_exam_context(source_file, data, key_order, question_count):
+    """Exam context from its parts, for exams that are not in memory as one dict."""
+    return {
+        'sequence': next(_exam_sequence),
+        'source_file': str(source_file),
+        'data': data,
+        'key_order': key_order,
+        'question_count': question_count
+    }
+
+
+def _iter_question_records(exam, questions):
+    """Yield records for ``questions``, which must be a reversed list owned by the caller."""
+    position = 0
+    # Popping from the end hands each question over and drops our reference to it
+    while questions:
+        position += 1
+        yield {'exam': exam, 'position': position, 'source': questions.pop(), 'row': None}
+
+
+def iter_exam_records(exam_data, source_file):
+    """
+    Stream the questions of exam data that is already in memory.
+
+    Args:
+        exam_data (dict): Exam data with a 'questions' list
+        source_file (str or Path): Name recorded as the exam's source
+
+    Yields:
+        dict: Question records
+    """
+    exam = exam_context(exam_data, source_file)
+    yield from _iter_question_records(exam, list(reversed(exam_data.get('questions') or [])))
+
+
+def extract_records(paths, reader=read_exam_file, errors=None, stream_threshold=STREAM_THRESHOLD,
+                    seen_members=None, duplicates=None):
+    """
+    Extract stage: read each file and stream its questions.
+
+    Files that cannot be read or hold no questions are skipped and reported
+    in ``errors``. With the default reader, JSONL files and files of
+    ``stream_threshold`` bytes or more are read incrementally (see
+    stream_jsonl_records() and stream_exam_records()), and archives are read
+    member by member (see archive_records()).
+
+    Args:
+        paths (iterable): Exam files
+        reader (callable): ``reader(path) -> exam data dict or None``
+        errors (list): Collects {'source_file', 'position', 'error'} dicts
+        stream_threshold (int): Size from which files are streamed; None never streams
+        seen_members (dict): Content hash -> source name of archive members
+            already extracted; pass the same dict to deduplicate across calls
+        duplicates (list): Collects {'source_file', 'duplicate_of'} dicts for
+            skipped archive members
+
+    Yields:
+        dict: Question records
+    """
+    seen_members = {} if seen_members is None else seen_members
+    for path in paths:
+        # Custom readers hand back whole exams, only the default one can stream
+        file_format = detect_format(path) if reader is read_exam_file else None
+        if file_format is not None and file_format.container:
+            yield from archive_records(path, errors, seen_members, duplicates)
+            continue
+        if file_format is not None and file_format.name == 'jsonl':
+            yield from stream_jsonl_records(path, errors)
+            continue
+        if file_format is not None and file_format.name in STREAMED_FORMATS and stream_threshold is not None \
+                and _file_size(path) >= stream_threshold:
+            yield from stream_exam_records(path, errors)
+            continue
+
+        try:
+            exam_data = reader(path)
+        except (OSError, ValueError) as e:
+            _report(errors, path, None, f"Failed to read {path}: {e}")
+            continue
+        yield from _exam_data_records(exam_data, path, errors)
+
+
+def archive_records(path, errors=None, seen_members=None, duplicates=None):
+    """
+    Stream the questions of every exam file inside a zip, tar or gzip archive.
+
+    Members are decompressed one at a time straight from the archive. Each
+    member is hashed before it is parsed; content already seen (in this
+    archive or, through ``seen_members``, an earlier one) is skipped.
+
+    Args:
+        path (str or Path): Archive
+        errors (list): Collects {'source_file', 'position', 'error'} dicts
+        seen_members (dict): Content hash -> source name, updated in place
+        duplicates (list): Collects {'source_file', 'duplicate_of'} dicts
+
+    Yields:
+        dict: Question records; the source file of a member is ``<archive>/<member>``
+    """
+    seen_members = {} if seen_members is None else seen_members
+    members = registry.iter_members(path)
+    while True:
+        try:
+            member = next(members, None)
+        except (OSError, ValueError) as e:
+            # Corrupt or truncated archive; the members read so far were imported
+            _report(errors, path, None, f"Failed to read {path}: {e}")
+            return
+        if member is None:
+            return
+
+        name, member_reader, data = member
+        if member_reader is None:
+            # Over the member size limit: reported, never read into memory
+            _report(errors, name, None, f"Failed to read {name}: {data}")
+            continue
+        digest = hashlib.sha256(data).hexdigest()
+        if digest in seen_members:
+            logger.info(f"Skipping {name}: same content as {seen_members[digest]}")
+            if duplicates is not None:
+                duplicates.append({'source_file': name, 'duplicate_of': seen_members[digest]})
+            continue
+        seen_members[digest] = name
+
+        try:
+            exam_data = member_reader.loads(data)
+        except ValueError as e:
+            _report(errors, name, None, f"Failed to read {name}: {e}")
+            continue
+        del member, data
+        yield from _exam_data_records(exam_data, name, errors)
+
+
+def _exam_data_records(exam_data, source_file, errors):
+    """Check exam data read in one piece and stream its questions."""
+    if not isinstance(exam_data, dict) or not isinstance(exam_data.get('questions'), list):
+        _report(errors, source_file, None, f"No exam data found in {source_file}")
+        return
+    if not exam_data['questions']:
+        _report(errors, source_file, None, f"No questions found in {source_file}")
+        return
+
+    exam = exam_context(exam_data, source_file)
+    questions = exam_data.pop('questions')
+    questions.reverse()
+    del exam_data
+    yield from _iter_question_records(exam, questions)
+
+
+def stream_exam_records(path, errors=None):
+    """
+    Stream the questions of one file in constant memory.
+
+    A first pass reads the top-level fields and counts the questions without
+    keeping them, so the exam context is complete before the first record; a
+    second pass decodes the questions one at a time.
+
+    Args:
+        path (str or Path): JSON export or saved exam page
+        errors (list): Collects {'source_file', 'position', 'error'} dicts
+
+    Yields:
+        dict: Question records
+    """
+    try:
+        scan = scan_exam_stream(path)
+    except (OSError, ValueError) as e:
+        _report(errors, path, None, f"Failed to read {path}: {e}")
+        return
+
+    if scan['question_count'] is None:
+        _report(errors, path, None, f"No exam data found in {path}")
+        return
+    if not scan['question_count']:
+        _report(errors, path, None, f"No questions found in {path}")
+        return
+
+    exam = _new_exam_context(path, scan['metadata'], scan['key_order'], scan['question_count'])
+    position = 0
+    try:
+        questions = iter_exam_stream(path)
+        next(questions)  # Top-level fields, already in the context
+        for position, question in enumerate(questions, 1):
+            yield {'exam': exam, 'position': position, 'source': question, 'row': None}
+    except (OSError, ValueError) as e:
+        # Only if the file changed since the first pass
+        _report(errors, path, position + 1, f"Failed to read {path} after question {position}: {e}")
+
+
+def stream_jsonl_records(path, errors=None, start=0, stop=None):
+    """
+    Stream the questions of a JSONL exam file, or a range of them.
+
+    The header line and the sidecar index give the exam context up front, so
+    only one question is decoded at a time.
+
+    Args:
+        path (str or Path): JSONL file
+        errors (list): Collects {'source_file', 'position', 'error'} dicts
+        start (int): First question number (0-based)
+        stop (int): End of the range, exclusive (defaults to all questions)
+
+    Yields:
+        dict: Question records; positions count from 1 at the file's first question
+    """
+    try:
+        reader = ExamJSONLReader(path)
+    except (OSError, ValueError) as e:
+        _report(errors, path, None, f"Failed to read {path}: {e}")
+        return
+
+    with reader:
+        if not len(reader):
+            _report(errors, path, None, f"No questions found in {path}")
+            return
+
+        header = reader.header
+        exam = _new_exam_context(path, header, list(header) + ['questions'], len(reader))
+        position = start
+        try:
+            for position, question in enumerate(reader.iter_questions(start, stop), start + 1):
+                yield {'exam': exam, 'position': position, 'source': question, 'row': None}
+        except ValueError as e:
+            _report(errors, path, position + 1, f"Failed to read {path} after question {position}: {e}")
+
+
+def _file_size(path):
+    """Size of a file in bytes, 0 if it cannot be read (the reader reports that)."""
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def _report(errors, source_file, position, message):
+    """Log a stage error and collect it if the caller asked for errors."""
+    logger.warning(message)
+    if errors is not None:
+        errors.append({'source_file': str(source_file), 'position': position, 'error': message})
+
+
+# ---------------------------------------------------------------------------
+# Normalize stage
+# ---------------------------------------------------------------------------
+
+def keep_source(question, position):
+    """Normalizer that passes the question through unchanged (JSON/JSONL export)."""
+    return question
+
+
+def question_row(question, position):
+    """
+    Normalizer building a question row with nested answers for the bulk loader.
+
+    Args:
+        question (dict): Question as read from the exam file
+        position (int): 1-based position in the exam
+
+    Returns:
+        dict: Question fields keyed by model attribute name with an 'answers' list
+    """
+    question_id = question.get('id')
+    question_text = question.get('question', '')
+    answers = []
+
+    # Exports use 'options'; hand-made files sometimes use 'answers'
+    for i, option in enumerate(question.get('answers', question.get('options')) or []):
+        if isinstance(option, dict):
+            option_text = option.get('text', option.get('option', ''))
+            is_correct = bool(option.get('correct', option.get('isCorrect', False)))
+        else:
+            option_text = str(option)
+            is_correct = False
+
+        answers.append({
+            'original_id': f"{question_id}_{i}",
+            'text': option_text,
+            'html_content': option_text,
+            'is_correct': is_correct,
+            'answer_order': i + 1
+        })
+
+    return {
+        'original_id': str(question_id if question_id is not None else ''),
+        'text': question_text,
+        'html_content': question_text,
+        'difficulty': question.get('difficulty', 1),
+        'explanation': question.get('explanation', 'Imported from exam data'),
+        'question_order': position,
+        'answers': answers
+    }
+
+
+def exam_row(exam):
+    """
+    Exam normalizer building the Exam fields for a file.
+
+    Args:
+        exam (dict): Exam context from exam_context()
+
+    Returns:
+        dict: Exam fields keyed by model attribute name
+    """
+    source = Path(exam['source_file'])
+    return {
+        'title': f"PCEP Exam - {source.stem}",
+        'description': f"Imported from {source.name}",
+        'time_limit': exam['data'].get('timeLimitInMinutes', 30),
+        'total_questions': exam['question_count'],
+        'source_file': source.name,
+        'version': "1.0",
+        'is_active': True
+    }
+
+
+def normalize_records(records, normalizer=question_row, exam_normalizer=None, errors=None):
+    """
+    Normalize stage: build each record's row, and each exam's fields once.
+
+    A question the normalizer raises on is skipped and reported in ``errors``.
+
+    Args:
+        records (iterable): Question records
+        normalizer (callable): ``normalizer(question, position) -> row``
+        exam_normalizer (callable): ``exam_normalizer(exam) -> exam fields``, stored as exam['fields']
+        errors (list): Collects {'source_file', 'position', 'error'} dicts
+
+    Yields:
+        dict: Records with 'row' set
+    """
+    for record in records:
+        exam = record['exam']
+        if exam_normalizer is not None and 'fields' not in exam:
+            exam['fields'] = exam_normalizer(exam)
+
+        try:
+            record['row'] = normalizer(record['source'], record['position'])
+        except Exception as e:
+            _report(errors, exam['source_file'], record['position'],
+                    f"Error processing question {record['position']} of {exam['source_file']}: {e}")
+            continue
+        yield record
+
+
+# ---------------------------------------------------------------------------
+# Enrich stage
+# ---------------------------------------------------------------------------
+
+def detect_multi_answer(record):
+    """Enricher storing the multi-answer detection as the row's question_metadata."""
+    detect_multi_answer.batch([record])
+
+
+def _detect_multi_answer_batch(records):
+    """Batch form of detect_multi_answer: one detect_batch call for a list of records."""
+    detections = _multi_answer_detector.detect_batch(
+        (record['source'].get('question', ''), record['source'].get('options')) for record in records
+    )
+    for record, detection in zip(records, detections):
+        record['row']['question_metadata'] = json.dumps(detection)
+
+
+detect_multi_answer.batch = _detect_multi_answer_batch
+
+
+def add_fingerprint(record):
+    """Enricher storing the content fingerprint of the row's question and answer texts."""
+    row = record['row']
+    row['content_fingerprint'] = question_fingerprint(row['text'], [answer['text'] for answer in row['answers']])
+
+
+def add_code_snippet(record):
+    """Enricher storing the question's code blocks as the row's code_snippet."""
+    row = record['row']
+    if not row.get('code_snippet'):
+        row['code_snippet'] = code_snippet(row['text'])
+
+
+# Enrichers for rows headed to the database
+DATABASE_ENRICHERS = (detect_multi_answer, add_fingerprint, add_code_snippet)
+
+
+def enrich_records(records, enrichers=DATABASE_ENRICHERS, batch_size=ENRICH_BATCH_SIZE):
+    """
+    Enrich stage: apply each enricher to every record.
+
+    Records are enriched in batches of up to ``batch_size`` questions of one
+    exam. An enricher with a ``batch`` attribute is called once per batch as
+    ``enricher.batch(records)``; the others once per record.
+
+    Args:
+        records (iterable): Normalized question records
+        enrichers (iterable): Callables ``enricher(record)`` that update record['row']
+        batch_size (int): Most records enriched together
+
+    Yields:
+        dict: Enriched records
+    """
+    enrichers = tuple(enrichers)
+
+    def enrich(batch):
+        for enricher in enrichers:
+            batch_enricher = getattr(enricher, 'batch', None)
+            if batch_enricher is not None:
+                batch_enricher(batch)
+            else:
+                for record in batch:
+                    enricher(record)
+        return batch
+
+    batch = []
+    for record in records:
+        if batch and (len(batch) >= batch_size or record['exam'] is not batch[0]['exam']):
+            yield from enrich(batch)
+            batch = []
+        batch.append(record)
+    if batch:
+        yield from enrich(batch)
+
+
+# ---------------------------------------------------------------------------
+# Validate stage
+# ---------------------------------------------------------------------------
+
+def question_issues(record):
+    """
+    Validator checking a record's source question against the compiled question schema.
+
+    Args:
+        record (dict): Question record
+
+    Returns:
+        list: Error records from ingest.schema, empty if the question is fine
+    """
+    return exam_validator.validate_question(record['source'])
+
+
+def validate_records(records, validator=question_issues, strict=False, issues=None):
+    """
+    Validate stage: check every record and drop invalid ones.
+
+    Records with a schema error of severity 'error' are always dropped, since
+    they cannot be stored meaningfully; in strict mode any issue drops the record.
+
+    Args:
+        records (iterable): Enriched question records
+        validator (callable): ``validator(record) -> list`` of issue strings or
+            ingest.schema error records
+        strict (bool): Drop records with issues instead of passing them on
+        issues (list): Collects {'source_file', 'position', 'error', 'severity'} dicts
+
+    Yields:
+        dict: Records that passed
+    """
+    for record in records:
+        found = validator(record)
+        if found:
+            position = record['position']
+            messages = []
+            blocking = False
+            for issue in found:
+                if isinstance(issue, str):
+                    messages.append((issue, 'warning'))
+                else:
+                    messages.append((describe(issue, f"Question {position}"), issue['severity']))
+                    blocking = blocking or issue['severity'] == 'error'
+
+            record['warnings'] = [message for message, _ in messages]
+            if issues is not None:
+                issues.extend({'source_file': record['exam']['source_file'], 'position': position,
+                               'error': message, 'severity': severity} for message, severity in messages)
+            if strict or blocking:
+                continue
+        yield record
+
+
+# ---------------------------------------------------------------------------
+# Pipeline
+# ---------------------------------------------------------------------------
+
+class ConverterPipeline:
+    """Chains the stages from source files to a sink."""
+
+    def __init__(self, sink, normalizer=question_row, exam_normalizer=exam_row, enrichers=DATABASE_ENRICHERS,
+                 validator=question_issues, strict=False, reader=read_exam_file, stream_threshold=STREAM_THRESHOLD):
+        """
+        Initialize the pipeline.
+
+        Args:
+            sink: Object with ``write(records)``, e.g. one of the sinks below
+            normalizer (callable): ``normalizer(question, position) -> row``
+            exam_normalizer (callable): ``exam_normalizer(exam) -> exam fields``, or None
+            enrichers (iterable): Callables ``enricher(record)``, optionally with a
+                ``batch(records)`` form (see enrich_records)
+            validator (callable): ``validator(record) -> issues``, or None to skip validation
+            strict (bool): Drop questions that fail validation
+            reader (callable): ``reader(path) -> exam data``
+            stream_threshold (int): File size from which the default reader streams
+                questions instead of loading the file; None never streams
+        """
+        self.sink = sink
+        self.normalizer = normalizer
+        self.exam_normalizer = exam_normalizer
+        self.enrichers = tuple(enrichers or ())
+        self.validator = validator
+        self.strict = strict
+        self.reader = reader
+        self.stream_threshold = stream_threshold
+        self.errors = []
+        self.issues = []
+        # Archive members seen by this pipeline (content hash -> source name) and the duplicates skipped
+        self.seen_members = {}
+        self.duplicates = []
+
+    def process(self, records):
+        """
+        Run the normalize, enrich and validate stages over a record stream.
+
+        Args:
+            records (iterable): Records from extract_records() or iter_exam_records()
+
+        Returns:
+            generator: Processed records
+        """
+        records = normalize_records(records, self.normalizer, self.exam_normalizer, self.errors)
+        if self.enrichers:
+            records = enrich_records(records, self.enrichers)
+        if self.validator is not None:
+            records = validate_records(records, self.validator, self.strict, self.issues)
+        return records
+
+    def stream(self, sources):
+        """
+        Lazily convert files and directories.
+
+        Args:
+            sources (iterable): File or directory paths
+
+        Returns:
+            generator: Processed records
+        """
+        return self.process(extract_records(iter_source_files(sources), self.reader, self.errors,
+                                            self.stream_threshold, self.seen_members, self.duplicates))
+
+    def run(self, sources):
+        """
+        Convert files and directories into the sink.
+
+        Args:
+            sources (iterable): File or directory paths
+
+        Returns:
+            The sink's write() result
+        """
+        return self.sink.write(self.stream(sources))
+
+    def convert(self, exam_data, source_file):
+        """
+        Convert one in-memory exam into (exam_fields, question_rows).
+
+        For callers that need the whole exam as plain data, e.g. to send it
+        back from a worker process.
+
+        Args:
+            exam_data (dict): Exam data with a 'questions' list
+            source_file (str or Path): Name recorded as the exam's source
+
+        Returns:
+            tuple: (exam fields or None without an exam normalizer, list of rows)
+        """
+        exam = exam_context(exam_data, source_file)
+        questions = list(reversed(exam_data.get('questions') or []))
+        rows = [record['row'] for record in self.process(_iter_question_records(exam, questions))]
+
+        if 'fields' not in exam and self.exam_normalizer is not None:
+            exam['fields'] = self.exam_normalizer(exam)
+        return exam.get('fields'), rows
+
+
+# ---------------------------------------------------------------------------
+# Sinks
+# ---------------------------------------------------------------------------
+
+class ExamSink:
+    """Base sink: hands the record stream over one exam at a time."""
+
+    def __init__(self):
+        self.results = []
+
+    def write(self, records):
+        """
+        Consume a record stream.
+
+        Args:
+            records (iterable): Processed question records
+
+        Returns:
+            list: One result per exam written
+        """
+        for _, exam_records in groupby(records, key=lambda record: record['exam']['sequence']):
+            first = next(exam_records)
+            rows = chain((first['row'],), (record['row'] for record in exam_records))
+            self.write_exam(first['exam'], rows)
+        return self.results
+
+    def write_exam(self, exam, rows):
+        """
+        Write one exam.
+
+        Args:
+            exam (dict): Exam context
+            rows (iterator): The exam's rows, produced lazily
+        """
+        raise NotImplementedError
+
+
+class DatabaseSink(ExamSink):
+    """Writes each exam through BulkExamLoader, pulling questions in loader batches."""
+
+    def __init__(self, session, models, batch_size=500, question_defaults=None, skip_existing_titles=True,
+                 commit_every=None, replace_exam_ids=()):
+        """
+        Initialize the database sink.
+
+        Args:
+            session: SQLAlchemy session object
+            models (dict): Model classes as for BulkExamLoader
+            batch_size (int): Questions pulled and inserted per batch
+            question_defaults (dict): Fields added to rows that lack them (e.g. topic_id)
+            skip_existing_titles (bool): Skip exams whose title is already in the database
+            commit_every (int): Commit large exams in chunks of this many questions
+            replace_exam_ids (iterable): Existing exams to reload instead of skipping
+                when an exam with the same title is written (e.g. the exam a changed
+                file imported before)
+        """
+        super().__init__()
+        self.session = session
+        self.exam_model = models['Exam']
+        self.loader = BulkExamLoader(session, models, batch_size=batch_size, commit_every=commit_every)
+        self.question_defaults = question_defaults or {}
+        self.skip_existing_titles = skip_existing_titles
+        self.replace_exam_ids = set(replace_exam_ids)
+
+    def write_exam(self, exam, rows):
+        """Insert the exam and its questions; questions the database refuses are counted as rejected."""
+        fields = exam['fields']
+        result = {'source_file': exam['source_file'], 'exam_id': None, 'questions': 0, 'rejected': 0,
+                  'skipped': False, 'replaced': False, 'error': None}
+
+        replace_exam_id = None
+        if self.skip_existing_titles:
+            existing = self.session.query(self.exam_model.id).filter(self.exam_model.title == fields['title']).first()
+            if existing and existing[0] in self.replace_exam_ids:
+                replace_exam_id = existing[0]
+                result['replaced'] = True
+            elif existing:
+                logger.warning(f"Exam already exists: {fields['title']}")
+                result.update(exam_id=existing[0], skipped=True)
+                self.results.append(result)
+                return
+
+        if self.question_defaults:
+            rows = ({**self.question_defaults, **row} for row in rows)
+
+        inserted_before = self.loader.stats['questions_inserted'] + self.loader.stats['questions_linked']
+        rejected_before = self.loader.stats['questions_rejected']
+        try:
+            result['exam_id'] = self.loader.load_exam(fields, rows, replace_exam_id=replace_exam_id)
+            result['questions'] = (self.loader.stats['questions_inserted'] + self.loader.stats['questions_linked']
+                                   - inserted_before)
+            result['rejected'] = self.loader.stats['questions_rejected'] - rejected_before
+        except Exception as e:
+            logger.error(f"Database import error for {exam['source_file']}: {e}")
+            result['error'] = str(e)
+        self.results.append(result)
+
+
+class JSONSink(ExamSink):
+    """
+    Writes each exam to ``<output_dir>/<source stem>.json``, streaming the questions.
+
+    Files are written atomically (see ``atomic_write``).
+    """
+
+    def __init__(self, output_dir, indent=2, suffix='.json'):
+        """
+        Initialize the JSON sink.
+
+        Args:
+            output_dir (str or Path): Directory for the JSON files
+            indent (int): Indentation, as for json.dump; None writes compact
+                single-line JSON
+            suffix (str): Output file suffix
+        """
+        super().__init__()
+        self.output_dir = Path(output_dir)
+        self.indent = indent
+        self.suffix = suffix
+
+    def output_path(self, exam):
+        """Return the output file for an exam."""
+        return self.output_dir / (Path(exam['source_file']).stem + self.suffix)
+
+    def _dumps(self, value, level):
+        """Serialize a value as json.dump(indent=...) would at nesting ``level``."""
+        text = json.dumps(value, indent=self.indent, ensure_ascii=False)
+        return text.replace('\n', '\n' + ' ' * (self.indent * level))
+
+    def write_exam(self, exam, rows):
+        """
+        Write the exam in its original key order.
+
+        The output is byte-identical to json.dump(exam_data, indent=...,
+        ensure_ascii=False), but only one question is serialized at a time.
+        """
+        path = self.output_path(exam)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        if self.indent is None:
+            self._write_compact(path, exam, rows)
+            return
+
+        pad = ' ' * self.indent
+        questions = 0
+
+        with atomic_write(path) as f:
+            f.write('{')
+            for i, key in enumerate(exam['key_order']):
+                f.write(',\n' if i else '\n')
+                f.write(f"{pad}{json.dumps(key, ensure_ascii=False)}: ")
+                if key != 'questions':
+                    f.write(self._dumps(exam['data'][key], 1))
+                    continue
+
+                for row in rows:
+                    f.write(',\n' if questions else '[\n')
+                    f.write(pad * 2 + self._dumps(row, 2))
+                    questions += 1
+                f.write(f"\n{pad}]" if questions else '[]')
+            f.write('\n}' if exam['key_order'] else '}')
+
+        logger.debug(f"Wrote {questions} questions to {path}")
+        self.results.append({'source_file': exam['source_file'], 'output_file': str(path), 'questions': questions})
+
+    def _write_compact(self, path, exam, rows):
+        """Write the exam as json.dump(exam_data, ensure_ascii=False) would, without indentation."""
+        questions = 0
+
+        with atomic_write(path) as f:
+            f.write('{')
+            for i, key in enumerate(exam['key_order']):
+                f.write(f"{', ' if i else ''}{json.dumps(key, ensure_ascii=False)}: ")
+                if key != 'questions':
+                    f.write(json.dumps(exam['data'][key], ensure_ascii=False))
+                    continue
+
+                f.write('[')
+                for row in rows:
+                    f.write((', ' if questions else '') + json.dumps(row, ensure_ascii=False))
+                    questions += 1
+                f.write(']')
+            f.write('}')
+
+        logger.debug(f"Wrote {questions} questions to {path}")
+        self.results.append({'source_file': exam['source_file'], 'output_file': str(path), 'questions': questions})
+
+
+class JSONLSink(ExamSink):
+    """
+    Writes each exam to ``<output_dir>/<source stem>.jsonl``.
+
+    The first line holds the exam's top-level fields without 'questions';
+    every further line is one question. A sidecar index of question offsets
+    is written next to it (see ``jsonl_format``).
+    """
+
+    def __init__(self, output_dir, suffix='.jsonl'):
+        """
+        Initialize the JSONL sink.
+
+        Args:
+            output_dir (str or Path): Directory for the JSONL files
+            suffix (str): Output file suffix
+        """
+        super().__init__()
+        self.output_dir = Path(output_dir)
+        self.suffix = suffix
+
+    def write_exam(self, exam, rows):
+        """Write the header line, then one line per question, plus the sidecar index."""
+        path = self.output_dir / (Path(exam['source_file']).stem + self.suffix)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        questions = write_exam_jsonl(path, exam['data'], rows)
+
+        self.results.append({'source_file': exam['source_file'], 'output_file': str(path), 'questions': questions})
@@ -0,0 +1,371 @@
+"""
+Compact question bank files for PCEP Exam Accelerator.
+
+The question converters used to generate Python modules holding the whole
+question set as one literal, so every consumer paid for compiling and
+importing all questions just to look one up. A question bank instead stores
+the questions in a single ``.qbank`` data file that is memory-mapped and read
+on demand:
+
+- a fixed header: magic, question count, hash table size and section offsets
+- the questions, one compact JSON object per line, in their original order
+- one metadata JSON line (title, Pygments CSS, ...)
+- an open-addressing hash table mapping question id -> line offset
+
+Opening a bank reads only the header; looking a question up by id probes the
+mapped table (O(1)) and decodes a single line, so startup time and memory do
+not grow with the size of the bank. Question ids must be integers, as in the
+exam exports.
+
+``QuestionBankSink`` writes a bank plus a small, dependency-free loader module
+(``LOADER_TEMPLATE``) that exposes the helper functions of the old generated
+modules.
+"""
+
+import json
+import mmap
+import struct
+from pathlib import Path
+
+from .atomic import atomic_write
+from .pipeline import ExamSink
+
+MAGIC = b'PCEPQB01'
+
+# magic, question count, hash table slots, metadata offset, hash table offset
+HEADER = struct.Struct('<8sQQQQ')
+
+# question id, line offset + 1 (0 marks an empty slot)
+SLOT = struct.Struct('<qQ')
+
+# Multiplier of the Fibonacci hash used for the id table
+HASH_MULTIPLIER = 0x9E3779B97F4A7C15
+
+
+def _slot_bits(count):
+    """Table size exponent: at least twice as many slots as questions."""
+    return max(3, (2 * count - 1).bit_length())
+
+
+def _home_slot(question_id, bits):
+    """Fibonacci hash of an id onto a table of 2 ** bits slots."""
+    return ((question_id * HASH_MULTIPLIER) & 0xFFFFFFFFFFFFFFFF) >> (64 - bits)
+
+
+def write_question_bank(path, rows, metadata=None):
+    """
+    Write questions to a question bank file, one at a time.
+
+    The file is written atomically; ids must be unique, since each is looked
+    up through a single hash table slot.
+
+    Args:
+        path (str or Path): Data file to write
+        rows (iterable): Question dicts with integer 'id' values
+        metadata (dict): JSON-serializable data stored with the questions
+
+    Returns:
+        int: Number of questions written
+
+    Raises:
+        ValueError: If a question id is not an integer or occurs twice
+            (the previous file, if any, is left in place)
+    """
+    offsets = {}
+    count = 0
+
+    with atomic_write(path, mode='wb') as f:
+        f.write(HEADER.pack(MAGIC, 0, 0, 0, 0))
+        for row in rows:
+            question_id = row.get('id')
+            if not isinstance(question_id, int) or isinstance(question_id, bool):
+                raise ValueError(f"Question {count + 1}: id must be an integer, got {question_id!r}")
+            if question_id in offsets:
+                raise ValueError(f"Question {count + 1}: duplicate id {question_id}")
+            offsets[question_id] = f.tell()
+            f.write(json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+            count += 1
+
+        metadata_offset = f.tell()
+        f.write(json.dumps(metadata or {}, ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n')
+
+        bits = _slot_bits(len(offsets))
+        mask = (1 << bits) - 1
+        table = [None] * (1 << bits)
+        for question_id, offset in offsets.items():
+            slot = _home_slot(question_id, bits)
+            while table[slot] is not None:
+                slot = (slot + 1) & mask
+            table[slot] = (question_id, offset + 1)
+
+        index_offset = f.tell()
+        empty = SLOT.pack(0, 0)
+        f.write(b''.join(SLOT.pack(*entry) if entry else empty for entry in table))
+
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, count, len(table), metadata_offset, index_offset))
+
+    return count
+
+
+class QuestionBank:
+    """Read-only, memory-mapped access to a question bank file."""
+
+    def __init__(self, path):
+        """
+        Open a question bank; only the header is read.
+
+        Args:
+            path (str or Path): Data file written by write_question_bank()
+
+        Raises:
+            ValueError: If the file is not a question bank
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._map) < HEADER.size:
+            self._map.close()
+            raise ValueError(f"{path} is not a question bank")
+        magic, self.count, self.slots, self.metadata_offset, self.index_offset = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a question bank")
+        self._bits = self.slots.bit_length() - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        """Yield the questions in their original order, decoding one line at a time."""
+        offset = HEADER.size
+        while offset < self.metadata_offset:
+            end = self._map.find(b'\n', offset)
+            yield json.loads(self._map[offset:end])
+            offset = end + 1
+
+    def close(self):
+        """Release the memory map."""
+        self._map.close()
+
+    def _line(self, offset):
+        return json.loads(self._map[offset:self._map.find(b'\n', offset)])
+
+    @property
+    def metadata(self):
+        """The metadata dict stored with the questions."""
+        return self._line(self.metadata_offset)
+
+    def get(self, question_id):
+        """
+        Look a question up by id.
+
+        Args:
+            question_id (int): Question id
+
+        Returns:
+            dict or None: The question, or None if the id is not in the bank
+        """
+        if not isinstance(question_id, int):
+            return None
+        mask = self.slots - 1
+        slot = _home_slot(question_id, self._bits)
+        while True:
+            stored_id, offset = SLOT.unpack_from(self._map, self.index_offset + slot * SLOT.size)
+            if offset == 0:
+                return None
+            if stored_id == question_id:
+                return self._line(offset - 1)
+            slot = (slot + 1) & mask
+
+
+LOADER_TEMPLATE = '''"""
+{title}
+{underline}
+
+Auto-generated from {source}.
+Contains all questions with Python syntax highlighting and clean formatting.
+
+The questions live in {data_name}, which is memory-mapped on first use:
+importing this module reads nothing, and get_question_by_id() decodes only
+the requested question.
+
+Generated by: {generator}
+Total Questions: {total_questions}
+"""
+
+import json
+import mmap
+import os
+import struct
+
+DATA_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), {data_name!r})
+
+_HEADER = struct.Struct('<8sQQQQ')
+_SLOT = struct.Struct('<qQ')
+_bank = None
+
+
+def _open():
+    """Map the data file and read its header, once."""
+    global _bank
+    if _bank is None:
+        with open(DATA_FILE, 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, count, slots, metadata_offset, index_offset = _HEADER.unpack_from(data)
+        if magic != {magic!r}:
+            raise ValueError(f"{{DATA_FILE}} is not a question bank")
+        _bank = (data, count, slots, metadata_offset, index_offset)
+    return _bank
+
+
+def _line(data, offset):
+    return json.loads(data[offset:data.find(b'\\n', offset)])
+
+
+def iter_questions():
+    """Yield all questions in order, one at a time."""
+    data, _, _, metadata_offset, _ = _open()
+    offset = _HEADER.size
+    while offset < metadata_offset:
+        end = data.find(b'\\n', offset)
+        yield json.loads(data[offset:end])
+        offset = end + 1
+
+
+# Helper functions
+def get_all_questions():
+    """Return all questions in the dataset."""
+    return list(iter_questions())
+
+def get_question_by_id(question_id):
+    """Get a specific question by ID."""
+    data, _, slots, _, index_offset = _open()
+    if not isinstance(question_id, int):
+        return None
+    slot = ((question_id * {multiplier:#x}) & 0xFFFFFFFFFFFFFFFF) >> (64 - (slots.bit_length() - 1))
+    while True:
+        stored_id, offset = _SLOT.unpack_from(data, index_offset + slot * _SLOT.size)
+        if offset == 0:
+            return None
+        if stored_id == question_id:
+            return _line(data, offset - 1)
+        slot = (slot + 1) & (slots - 1)
+
+def get_question_count():
+    """Get the total number of questions."""
+    return _open()[1]
+
+def get_single_choice_questions():
+    """Get all single choice questions."""
+    return [q for q in iter_questions() if not q.get('multiple_choice')]
+
+def get_multiple_choice_questions():
+    """Get all multiple choice questions."""
+    return [q for q in iter_questions() if q.get('multiple_choice')]
+
+
+def __getattr__(name):
+    # The old generated modules defined these as module constants
+    if name == {variable!r}:
+        return get_all_questions()
+    if name == 'PYGMENTS_CSS':
+        data, _, _, metadata_offset, _ = _open()
+        return _line(data, metadata_offset).get('css') or ''
+    raise AttributeError(f"module {{__name__!r}} has no attribute {{name!r}}")
+
+
+if __name__ == "__main__":
+    print(f"{title} loaded successfully!")
+    print(f"Total questions: {{get_question_count()}}")
+    print(f"Single choice: {{len(get_single_choice_questions())}}")
+    print(f"Multiple choice: {{len(get_multiple_choice_questions())}}")
+    print(f"Question IDs: {{[q['id'] for q in iter_questions()]}}")
+'''
+
+
+def render_loader(data_name, variable='QUESTIONS', title='PCEP Questions Dataset', source='exam files',
+                  generator='ingest.question_bank', total_questions=0):
+    """
+    Render the loader module for a question bank.
+
+    Args:
+        data_name (str): Data file name, relative to the loader module
+        variable (str): Module attribute that returns the whole list, for
+            compatibility with the old generated modules
+        title (str): Module docstring title
+        source (str): Description of the input, for the docstring
+        generator (str): Name of the generating script, for the docstring
+        total_questions (int): Question count, for the docstring
+
+    Returns:
+        str: Python source of the loader module
+    """
+    return LOADER_TEMPLATE.format(title=title, underline='=' * len(title), source=source, data_name=data_name,
+                                  generator=generator, total_questions=total_questions, magic=MAGIC,
+                                  multiplier=HASH_MULTIPLIER, variable=variable)
+
+
+class QuestionBankSink(ExamSink):
+    """Writes all questions of the stream into a question bank and its loader module."""
+
+    def __init__(self, output_path, variable='QUESTIONS', title='PCEP Questions Dataset',
+                 source='exam files', generator='ingest.question_bank', css=None, data_path=None):
+        """
+        Initialize the question bank sink.
+
+        Args:
+            output_path (str or Path): Loader module to generate
+            variable (str): Module attribute returning the whole question list
+            title (str): Module docstring title
+            source (str): Description of the input, for the docstring
+            generator (str): Name of the generating script, for the docstring
+            css (str): Pygments CSS, returned by the module's PYGMENTS_CSS
+            data_path (str or Path): Data file (defaults to the module path with
+                a ``.qbank`` suffix); must be in the module's directory
+        """
+        super().__init__()
+        self.output_path = Path(output_path)
+        self.data_path = Path(data_path) if data_path else self.output_path.with_suffix('.qbank')
+        self.variable = variable
+        self.title = title
+        self.source = source
+        self.generator = generator
+        self.css = css
+
+    def write(self, records):
+        """
+        Consume a record stream into the bank.
+
+        Returns:
+            list: [{'output_file', 'data_file', 'questions'}]
+        """
+        return self.write_rows(record['row'] for record in records)
+
+    def write_rows(self, rows):
+        """
+        Write question dicts into the bank, one at a time, then the loader module.
+
+        Args:
+            rows (iterable): Question dicts with integer ids
+
+        Returns:
+            list: [{'output_file', 'data_file', 'questions'}]
+        """
+        metadata = {'title': self.title, 'source': self.source, 'generator': self.generator, 'css': self.css}
+        questions = write_question_bank(self.data_path, rows, metadata)
+
+        with atomic_write(self.output_path) as f:
+            f.write(render_loader(self.data_path.name, variable=self.variable, title=self.title, source=self.source,
+                                  generator=self.generator, total_questions=questions))
+
+        self.results.append({'output_file': str(self.output_path), 'data_file': str(self.data_path),
+                             'questions': questions})
+        return self.results
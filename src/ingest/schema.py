@@ -0,0 +1,349 @@
+"""
+Compiled schema validation for exam files.
+
+The exam, question and option structure is declared once as nested specs
+(``EXAM_SCHEMA``). ``ExamValidator`` compiles a spec once into a generated
+Python function with the field lookups, type tuples and limits inlined in
+nested loops, so validating a file checks every question and option rather
+than spot-checking the first question, at well under a second per 100k
+questions.
+
+Problems are reported as structured records::
+
+    {'path': ('questions', 4, 'options'), 'location': 'questions[4].options',
+     'question': 4, 'code': 'min_items', 'severity': 'warning',
+     'message': 'Insufficient options (need at least 2)'}
+
+Severity ``error`` marks data the converters cannot normalize (wrong types,
+no questions at all); ``warning`` marks content that imports but is probably
+incomplete (missing text or id, fewer than two options). In fail-fast mode
+validation stops at the first error.
+"""
+
+# Spec keys for a field:
+#   type       type or tuple of types the value must have (None allowed only if listed)
+#   required   report 'missing' when no key (name or alias) is present
+#   aliases    alternative keys, tried after the name
+#   non_empty  report 'empty' for falsy values
+#   min_items  report 'min_items' for shorter lists
+#   items      spec applied to every list element
+#   severity   'error' (default) or 'warning'
+#   messages   message per code, overriding the generated ones
+# Object specs have a 'type' and a 'fields' dict.
+
+NONE_TYPE = type(None)
+
+OPTION_SCHEMA = {
+    # Hand-made files sometimes list options as plain strings
+    'type': (dict, str),
+    'fields': {
+        'option': {
+            'type': str, 'aliases': ('text',), 'required': True, 'severity': 'warning',
+            'messages': {'missing': "Missing option text"}
+        },
+        'id': {'type': (int, str)}
+    }
+}
+
+QUESTION_SCHEMA = {
+    'type': dict,
+    'fields': {
+        'question': {
+            'type': str, 'required': True, 'non_empty': True, 'severity': 'warning',
+            'messages': {'missing': "Missing question text", 'empty': "Missing question text"}
+        },
+        'options': {
+            # Exports use 'options'; hand-made files sometimes use 'answers'
+            'type': list, 'aliases': ('answers',), 'required': True, 'non_empty': True, 'min_items': 2,
+            'items': OPTION_SCHEMA, 'severity': 'warning',
+            'messages': {'missing': "Missing options", 'empty': "Empty options list",
+                         'min_items': "Insufficient options (need at least 2)"}
+        },
+        'id': {
+            'type': (int, str), 'required': True, 'non_empty': True, 'severity': 'warning',
+            'messages': {'missing': "Missing question ID", 'empty': "Missing question ID"}
+        },
+        'type': {'type': (str, NONE_TYPE)},
+        'explanation': {'type': (str, NONE_TYPE)},
+        'difficulty': {'type': (int, NONE_TYPE)}
+    }
+}
+
+EXAM_SCHEMA = {
+    'type': dict,
+    'fields': {
+        'questions': {
+            'type': list, 'required': True, 'non_empty': True, 'items': QUESTION_SCHEMA,
+            'messages': {'missing': "Missing 'questions' field in exam data",
+                         'empty': "No questions found in exam data"}
+        },
+        'timeLimitInMinutes': {'type': (int, float, NONE_TYPE)}
+    }
+}
+
+# Label of the elements of a list field, for describe()
+ITEM_LABELS = {'questions': 'Question', 'options': 'Option', 'answers': 'Option'}
+
+_MISSING = object()
+
+
+class SchemaValidationError(ValueError):
+    """Raised in fail-fast mode at the first error; carries the records found so far."""
+
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__(describe(errors[-1]))
+
+
+def _type_names(types):
+    return ' or '.join('null' if t is NONE_TYPE else t.__name__ for t in types)
+
+
+def _location(path):
+    """Render a path tuple as ``questions[4].options[1].option``."""
+    location = ''
+    for part in path:
+        if isinstance(part, int):
+            location += f'[{part}]'
+        else:
+            location += f'.{part}' if location else part
+    return location
+
+
+def describe(error, prefix=None):
+    """
+    Format an error record for logs and reports.
+
+    Args:
+        error (dict): Error record
+        prefix (str): Label of the object the path is relative to, e.g. "Question 3"
+
+    Returns:
+        str: Text like "Question 5: Option 2: Missing option text" (items are 1-based)
+    """
+    labels = [prefix] if prefix else []
+    path = error['path']
+    for i, part in enumerate(path):
+        if isinstance(part, int):
+            parent = path[i - 1] if i else None
+            labels.append(f"{ITEM_LABELS.get(parent, 'Item')} {part + 1}")
+    labels.append(error['message'])
+    return ': '.join(labels)
+
+
+class _Collector:
+    """Collects error records; stops the run at the first error in fail-fast mode."""
+
+    def __init__(self, fail_fast):
+        self.fail_fast = fail_fast
+        self.errors = []
+
+    def __call__(self, path, code, severity, message):
+        self.errors.append({
+            'path': path,
+            'location': _location(path),
+            'question': path[1] if len(path) > 1 and path[0] == 'questions' else None,
+            'code': code,
+            'severity': severity,
+            'message': message
+        })
+        if self.fail_fast and severity == 'error':
+            raise SchemaValidationError(self.errors)
+
+
+class _SchemaCompiler:
+    """
+    Generates the source of one ``check(value, report)`` function for a spec.
+
+    Every object level and list becomes inline code with nested ``for``
+    loops, so validating a question costs a handful of dict lookups and
+    isinstance() calls with no per-item function calls. Path tuples are only
+    built when something is reported.
+    """
+
+    def __init__(self):
+        self.lines = []
+        self.constants = {'MISSING': _MISSING}
+        self._names = 0
+
+    def name(self, prefix):
+        self._names += 1
+        return f"{prefix}{self._names}"
+
+    def constant(self, value):
+        name = self.name('C')
+        self.constants[name] = value
+        return name
+
+    def emit(self, depth, line):
+        self.lines.append('    ' * depth + line)
+
+    def compile(self, spec):
+        """Return the compiled check function."""
+        self.emit(0, 'def check(value, report):')
+        self.object(spec, 'value', [], 1)
+        namespace = dict(self.constants)
+        exec('\n'.join(self.lines), namespace)
+        return namespace['check']
+
+    def object(self, spec, var, path, depth):
+        """Emit the checks of an object spec for the value in ``var``."""
+        types = spec['type'] if isinstance(spec['type'], tuple) else (spec['type'],)
+        message = self.constant(f"Expected {_type_names(types)}, got {{}}")
+        self.emit(depth, f"if not isinstance({var}, {self.constant(types)}):")
+        self.emit(depth + 1, f"report({_path(path)}, 'type', 'error', {message}.format(type({var}).__name__))")
+        fields = spec.get('fields', {})
+        if not fields:
+            return
+        self.emit(depth, f"elif isinstance({var}, dict):")
+        for name, field in fields.items():
+            self.field(name, field, var, path, depth + 1)
+
+    def field(self, name, spec, parent, path, depth):
+        """Emit the checks of one field of the dict in ``parent``."""
+        value = self.name('v')
+        key = repr(name)
+        self.emit(depth, f"{value} = {parent}.get({key}, MISSING)")
+
+        aliases = spec.get('aliases', ())
+        if aliases:
+            key = self.name('k')
+            self.emit(depth, f"{key} = {name!r}")
+            for alias in aliases:
+                self.emit(depth, f"if {value} is MISSING:")
+                self.emit(depth + 1, f"{key} = {alias!r}")
+                self.emit(depth + 1, f"{value} = {parent}.get({alias!r}, MISSING)")
+
+        types = spec.get('type')
+        if types is not None and not isinstance(types, tuple):
+            types = (types,)
+        severity = repr(spec.get('severity', 'error'))
+        messages = spec.get('messages', {})
+        field_path = path + [key]
+
+        self.emit(depth, f"if {value} is MISSING:")
+        if spec.get('required'):
+            message = self.constant(messages.get('missing', f"Missing '{name}'"))
+            self.emit(depth + 1, f"report({_path(path + [repr(name)])}, 'missing', {severity}, {message})")
+        else:
+            self.emit(depth + 1, "pass")
+
+        if types is not None:
+            # Wrong types always block: the converters would crash or store garbage
+            message = self.constant(f"'{name}' must be {_type_names(types)}, got {{}}")
+            self.emit(depth, f"elif not isinstance({value}, {self.constant(types)}):")
+            self.emit(depth + 1, f"report({_path(field_path)}, 'type', 'error', {message}.format(type({value}).__name__))")
+
+        if spec.get('non_empty'):
+            message = self.constant(messages.get('empty', f"Empty '{name}'"))
+            self.emit(depth, f"elif not {value}:")
+            self.emit(depth + 1, f"report({_path(field_path)}, 'empty', {severity}, {message})")
+
+        min_items = spec.get('min_items')
+        items = spec.get('items')
+        if min_items is None and items is None:
+            return
+
+        self.emit(depth, "else:")
+        if min_items is not None:
+            message = self.constant(messages.get('min_items', f"'{name}' needs at least {min_items} items"))
+            self.emit(depth + 1, f"if len({value}) < {min_items}:")
+            self.emit(depth + 2, f"report({_path(field_path)}, 'min_items', {severity}, {message})")
+        if items is not None:
+            index = self.name('i')
+            item = self.name('v')
+            self.emit(depth + 1, f"for {index}, {item} in enumerate({value}):")
+            self.object(items, item, field_path + [index], depth + 2)
+
+
+def _path(parts):
+    """Source of a path tuple from key reprs and index variable names."""
+    return f"({', '.join(parts)},)" if parts else "()"
+
+
+def compile_schema(spec):
+    """
+    Compile an object spec into ``check(value, report)``.
+
+    ``report(path, code, severity, message)`` is called for every problem.
+
+    Args:
+        spec (dict): Object spec
+
+    Returns:
+        callable: The check function
+    """
+    return _SchemaCompiler().compile(spec)
+
+
+class ExamValidator:
+    """Validates exam data against a schema compiled once at construction."""
+
+    def __init__(self, schema=EXAM_SCHEMA):
+        """
+        Compile the schema.
+
+        Args:
+            schema (dict): Exam object spec; its 'questions' field spec is used by validate_question()
+        """
+        self.schema = schema
+        self._check_exam = compile_schema(schema)
+        self._check_question = compile_schema(schema['fields']['questions']['items'])
+
+    def validate(self, exam_data, fail_fast=False):
+        """
+        Check an exam with every question and option.
+
+        Args:
+            exam_data (dict): Exam data as read from an export
+            fail_fast (bool): Stop at the first error instead of collecting all records
+
+        Returns:
+            list: Error records in document order, empty if the exam is valid
+        """
+        report = _Collector(fail_fast)
+        try:
+            self._check_exam(exam_data, report)
+        except SchemaValidationError:
+            pass
+        return report.errors
+
+    def validate_question(self, question):
+        """
+        Check one question; paths in the records are relative to the question.
+
+        Args:
+            question (dict): Question as read from an export
+
+        Returns:
+            list: Error records
+        """
+        report = _Collector(False)
+        self._check_question(question, report)
+        return report.errors
+
+    def check(self, exam_data):
+        """
+        Validate in fail-fast mode and raise on the first error.
+
+        Args:
+            exam_data (dict): Exam data as read from an export
+
+        Returns:
+            list: Warning records
+
+        Raises:
+            SchemaValidationError: At the first error
+        """
+        report = _Collector(True)
+        self._check_exam(exam_data, report)
+        return report.errors
+
+
+def blocking_errors(errors):
+    """Return the records with severity 'error'."""
+    return [error for error in errors if error['severity'] == 'error']
+
+
+# Default validator shared by the converters and the pipeline
+exam_validator = ExamValidator()
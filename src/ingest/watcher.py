@@ -0,0 +1,245 @@
+"""
+Watch-folder ingest for PCEP Exam Accelerator.
+
+Instead of re-running the extractor and an import script over whole folders,
+a long-running watcher notices new or changed exam files and pushes only
+those through extraction and import:
+
+- ``FolderWatcher`` polls the input directories and reports a file once its
+  size and modification time have stayed the same for ``settle_seconds``, so
+  a page still being saved or copied is never read half-written. If the
+  optional ``watchdog`` package is installed (inotify on Linux), file events
+  wake the poll loop early; the debounce rules are the same either way.
+- ``WatchIngestor`` extracts ready HTML pages to JSON and queues the JSON
+  files on an ``ImportJobQueue``, which skips content it has already imported.
+"""
+
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from .pipeline import SOURCE_PATTERNS, ConverterPipeline, JSONSink, keep_source
+
+logger = logging.getLogger(__name__)
+
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+except ImportError:  # pragma: no cover - depends on the environment
+    Observer = None
+
+# Editors, browsers and atomic writers use these while a file is incomplete
+PARTIAL_SUFFIXES = ('.tmp', '.part', '.crdownload', '.partial', '.swp')
+
+
+def _is_partial(path):
+    """True for hidden or temporary files that must never be picked up."""
+    return path.name.startswith('.') or path.name.endswith(PARTIAL_SUFFIXES)
+
+
+class FolderWatcher:
+    """Reports new or changed files once they have stopped changing."""
+
+    def __init__(self, directories, patterns=SOURCE_PATTERNS, settle_seconds=2.0, poll_interval=1.0,
+                 include_existing=True, clock=time.monotonic):
+        """
+        Initialize the watcher.
+
+        Args:
+            directories (iterable): Directories to watch (not recursive)
+            patterns (tuple): Glob patterns of the files to report
+            settle_seconds (float): How long size and mtime must stay unchanged
+            poll_interval (float): Seconds between scans when no event arrives
+            include_existing (bool): Report files already present at start-up;
+                otherwise they are only reported after they change
+            clock (callable): Monotonic time source
+        """
+        self.directories = [Path(directory) for directory in directories]
+        self.patterns = patterns
+        self.settle_seconds = settle_seconds
+        self.poll_interval = poll_interval
+        self.clock = clock
+
+        # path -> (size, mtime_ns) last reported
+        self.reported = {}
+        # path -> ((size, mtime_ns), time the signature was first seen)
+        self.pending = {}
+        self._wake = threading.Event()
+
+        if not include_existing:
+            self.reported = dict(self._snapshot())
+
+    def _snapshot(self):
+        """Yield (path, (size, mtime_ns)) for every matching file."""
+        for directory in self.directories:
+            if not directory.is_dir():
+                continue
+            for pattern in self.patterns:
+                for path in directory.glob(pattern):
+                    if _is_partial(path):
+                        continue
+                    try:
+                        stat = path.stat()
+                    except OSError:  # Removed between glob and stat
+                        continue
+                    yield path, (stat.st_size, stat.st_mtime_ns)
+
+    def mark_reported(self, path):
+        """Treat a file's current state as reported, e.g. an output this process wrote."""
+        path = Path(path)
+        try:
+            stat = path.stat()
+        except OSError:
+            return
+        self.reported[path] = (stat.st_size, stat.st_mtime_ns)
+        self.pending.pop(path, None)
+
+    def scan(self):
+        """
+        Check the directories once.
+
+        Returns:
+            list: Paths that are new or changed and have settled, sorted
+        """
+        now = self.clock()
+        current = dict(self._snapshot())
+        ready = []
+
+        for path, signature in current.items():
+            if self.reported.get(path) == signature:
+                self.pending.pop(path, None)
+                continue
+
+            seen = self.pending.get(path)
+            if seen is None or seen[0] != signature:
+                # New file, or still being written: restart the settle timer
+                self.pending[path] = (signature, now)
+            elif now - seen[1] >= self.settle_seconds:
+                del self.pending[path]
+                self.reported[path] = signature
+                ready.append(path)
+
+        # Forget deleted files so a file restored later is picked up again
+        for path in set(self.reported) - set(current):
+            del self.reported[path]
+        for path in set(self.pending) - set(current):
+            del self.pending[path]
+
+        return sorted(ready)
+
+    def wake(self):
+        """Run the next scan now instead of after the poll interval."""
+        self._wake.set()
+
+    def run(self, callback, stop_event=None):
+        """
+        Scan until ``stop_event`` is set, calling ``callback(paths)`` with each ready batch.
+
+        Args:
+            callback (callable): Receives a list of settled paths
+            stop_event (threading.Event): Stops the loop when set
+        """
+        stop_event = stop_event or threading.Event()
+        observer = self._start_observer()
+        try:
+            while not stop_event.is_set():
+                ready = self.scan()
+                if ready:
+                    callback(ready)
+                # While files are settling, look again as soon as they may be ready
+                timeout = min(self.poll_interval, self.settle_seconds) if self.pending else self.poll_interval
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            if observer is not None:
+                observer.stop()
+                observer.join()
+
+    def _start_observer(self):
+        """Start a watchdog observer that wakes the loop on file events, if available."""
+        if Observer is None:
+            logger.info("watchdog not installed, polling every %.1fs", self.poll_interval)
+            return None
+
+        watcher = self
+
+        class WakeHandler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                watcher.wake()
+
+        observer = Observer()
+        for directory in self.directories:
+            if directory.is_dir():
+                observer.schedule(WakeHandler(), str(directory), recursive=False)
+        observer.start()
+        return observer
+
+
+class WatchIngestor:
+    """Extracts ready HTML pages to JSON and queues new exam files for import."""
+
+    def __init__(self, jobs, json_dir, watcher=None):
+        """
+        Initialize the ingestor.
+
+        Args:
+            jobs (ImportJobQueue): Queue importing the files
+            json_dir (str or Path): Folder the extracted JSON files are written to
+            watcher (FolderWatcher): Told about extracted files, so they are not
+                reported again when json_dir is watched too
+        """
+        self.jobs = jobs
+        self.json_dir = Path(json_dir)
+        self.watcher = watcher
+        self.stats = {'extracted': 0, 'extract_errors': 0, 'jobs': 0}
+
+    def extract(self, html_path):
+        """
+        Extract one saved exam page to ``json_dir``.
+
+        Returns:
+            Path: The JSON file, or None if the page holds no exam data
+        """
+        pipeline = ConverterPipeline(JSONSink(self.json_dir), normalizer=keep_source, exam_normalizer=None,
+                                     enrichers=(), validator=None)
+        written = pipeline.run([html_path])
+
+        for error in pipeline.errors:
+            logger.error(f"Extraction failed for {html_path}: {error['error']}")
+        if not written:
+            self.stats['extract_errors'] += 1
+            return None
+
+        output = Path(written[0]['output_file'])
+        self.stats['extracted'] += 1
+        if self.watcher is not None:
+            self.watcher.mark_reported(output)
+        return output
+
+    def __call__(self, paths):
+        """
+        Handle a batch of settled files.
+
+        Args:
+            paths (list): Settled HTML and JSON files
+
+        Returns:
+            dict: Snapshot of the queued import job, or None if nothing was importable
+        """
+        sources = []
+        for path in paths:
+            path = Path(path)
+            if path.suffix.lower() in ('.html', '.htm'):
+                path = self.extract(path)
+            if path is not None:
+                sources.append(os.path.abspath(path))
+
+        if not sources:
+            return None
+
+        job = self.jobs.submit(sources)
+        self.stats['jobs'] += 1
+        logger.info(f"Queued import job {job['id']} for {len(sources)} new or changed files")
+        return job
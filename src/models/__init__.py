@@ -115,12 +115,15 @@ class JSONMixin:
 from .user import User
 from .module import Module, Topic
 from .exam import Exam, ExamSession
-from .question import Question, Answer
+from .question import Question, Answer, ExamQuestion
 from .progress import UserProgress, UserResponse
+from .import_manifest import ImportManifest
+from .highlighted_snippet import HighlightedSnippet
 
 # List of all models for easy access
 __all__ = [
     'BaseModel', 'TimestampMixin', 'JSONMixin',
     'User', 'Module', 'Topic', 'Exam', 'ExamSession', 
-    'Question', 'Answer', 'UserProgress', 'UserResponse'
+    'Question', 'Answer', 'ExamQuestion', 'UserProgress', 'UserResponse', 'ImportManifest',
+    'HighlightedSnippet'
 ]
@@ -33,6 +33,8 @@ class Exam(BaseModel, JSONMixin):
     
     # Relationships
     questions = relationship("Question", back_populates="exam", cascade="all, delete-orphan")
+    question_links = relationship("ExamQuestion", back_populates="exam", cascade="all, delete-orphan",
+                                  order_by="ExamQuestion.question_order")
     exam_sessions = relationship("ExamSession", back_populates="exam")
     
     def get_metadata(self):
@@ -53,6 +55,17 @@ class Exam(BaseModel, JSONMixin):
         """
         self.set_json_field('exam_metadata', data)
     
+    def get_exam_questions(self):
+        """
+        Get all questions in this exam, including canonical questions shared with other exams.
+        
+        Returns:
+            list: Question objects in exam order
+        """
+        if self.question_links:
+            return [link.question for link in self.question_links]
+        return sorted(self.questions, key=lambda q: q.question_order)
+    
     def get_difficulty_distribution(self):
         """
         Get distribution of questions by difficulty level.
@@ -61,7 +74,7 @@ class Exam(BaseModel, JSONMixin):
             dict: Difficulty levels as keys, counts as values
         """
         distribution = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
-        for question in self.questions:
+        for question in self.get_exam_questions():
             if question.difficulty in distribution:
                 distribution[question.difficulty] += 1
         return distribution
@@ -74,7 +87,7 @@ class Exam(BaseModel, JSONMixin):
             dict: Topic names as keys, counts as values
         """
         distribution = {}
-        for question in self.questions:
+        for question in self.get_exam_questions():
             if question.topic:
                 topic_name = question.topic.name
                 distribution[topic_name] = distribution.get(topic_name, 0) + 1
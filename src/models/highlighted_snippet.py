@@ -0,0 +1,24 @@
+"""
+HighlightedSnippet model for PCEP Exam Accelerator.
+
+Caches syntax-highlighted markup for question code blocks by content hash, so
+each distinct snippet is rendered once at import and served as-is.
+"""
+
+from sqlalchemy import Column, String, Text
+
+from . import BaseModel
+
+class HighlightedSnippet(BaseModel):
+    """
+    HighlightedSnippet model holding the pre-rendered markup of one code snippet.
+    """
+    __tablename__ = 'highlighted_snippets'
+    
+    content_hash = Column(String(64), unique=True, nullable=False, index=True)  # SHA-256 of the code
+    language = Column(String(20), default='python', nullable=False)
+    code = Column(Text, nullable=False)  # Code as extracted from the question HTML
+    html = Column(Text)  # Pygments token markup, placed inside <code class="codep">
+    
+    def __repr__(self):
+        return f"<HighlightedSnippet(hash='{self.content_hash[:12]}', language='{self.language}')>"
@@ -0,0 +1,44 @@
+"""
+ImportManifest model for PCEP Exam Accelerator.
+
+Tracks which source files have been imported so unchanged or duplicate files
+can be skipped before they are parsed.
+"""
+
+from sqlalchemy import Column, Integer, String, Text, Float, ForeignKey
+from sqlalchemy.orm import relationship
+
+from . import BaseModel
+
+class ImportManifest(BaseModel):
+    """
+    ImportManifest model recording the size, mtime and content hash of every imported file.
+    """
+    __tablename__ = 'import_manifest'
+    
+    path = Column(String(500), unique=True, nullable=False, index=True)  # Absolute source file path
+    file_size = Column(Integer, nullable=False)  # Size in bytes at import time
+    mtime = Column(Float, nullable=False)  # Modification time at import time
+    content_hash = Column(String(64), nullable=False, index=True)  # SHA-256 of file content
+    exam_id = Column(Integer, ForeignKey('exams.id'), index=True)  # Exam created from (or shared by) this file
+    status = Column(String(20), default='imported', nullable=False)  # imported/duplicate/failed
+    last_error = Column(Text)  # Error message of the last failed import
+    
+    # Relationships
+    exam = relationship("Exam")
+    
+    def is_unchanged(self, file_size, mtime):
+        """
+        Check if a file still has the size and mtime recorded at import.
+        
+        Args:
+            file_size (int): Current size in bytes
+            mtime (float): Current modification time
+            
+        Returns:
+            bool: True if neither size nor mtime changed
+        """
+        return self.file_size == file_size and self.mtime == mtime
+    
+    def __repr__(self):
+        return f"<ImportManifest(path='{self.path}', status='{self.status}', exam_id={self.exam_id})>"
@@ -4,7 +4,7 @@ UserProgress and UserResponse models for PCEP Exam Accelerator.
 Handles user progress tracking and individual question responses.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, Float, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 
@@ -15,6 +15,8 @@ class UserProgress(BaseModel):
     UserProgress model for tracking user proficiency across topics.
     """
     __tablename__ = 'user_progress'
+    # One row per user and topic; the target of the progress UPSERT
+    __table_args__ = (Index('uq_user_progress_user_topic', 'user_id', 'topic_id', unique=True),)
     
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False, index=True)
     topic_id = Column(Integer, ForeignKey('topics.id'), nullable=False, index=True)
@@ -111,6 +113,7 @@ class UserResponse(BaseModel, JSONMixin):
     UserResponse model for tracking individual question responses in exam sessions.
     """
     __tablename__ = 'user_responses'
+    __table_args__ = (Index('uq_user_responses_session_question', 'exam_session_id', 'question_id', unique=True),)
     
     exam_session_id = Column(Integer, ForeignKey('exam_sessions.id'), nullable=False, index=True)
     question_id = Column(Integer, ForeignKey('questions.id'), nullable=False, index=True)
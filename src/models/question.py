@@ -4,7 +4,7 @@ Question and Answer models for PCEP Exam Accelerator.
 Handles exam questions with multiple choice answers and rich content support.
 """
 
-from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Boolean, ForeignKey, UniqueConstraint
 from sqlalchemy.orm import relationship
 
 from . import BaseModel
@@ -30,9 +30,13 @@ class Question(BaseModel):
     source_exam_external_id = Column(Integer)  # Links to original exam's external ID
     original_question_number = Column(Integer)  # Original question number in source
     
+    # Normalized question + sorted options hash, shared by all copies of a question
+    content_fingerprint = Column(String(64), index=True)
+    
     # Relationships
     topic = relationship("Topic", back_populates="questions")
-    exam = relationship("Exam", back_populates="questions")
+    exam = relationship("Exam", back_populates="questions")  # Exam that first imported the question
+    exam_links = relationship("ExamQuestion", back_populates="question", cascade="all, delete-orphan")
     answers = relationship("Answer", back_populates="question", cascade="all, delete-orphan")
     user_responses = relationship("UserResponse", back_populates="question")
     
@@ -91,6 +95,17 @@ class Question(BaseModel):
         }
         return difficulty_labels.get(self.difficulty, "Unknown")
     
+    def get_exams(self):
+        """
+        Get every exam this question appears in.
+        
+        Returns:
+            list: Exam objects linked to this question, or the owning exam if unlinked
+        """
+        if self.exam_links:
+            return [link.exam for link in self.exam_links]
+        return [self.exam] if self.exam else []
+    
     def __repr__(self):
         return f"<Question(id={self.id}, exam='{self.exam.title if self.exam else None}', difficulty={self.difficulty})>"
 
@@ -132,3 +147,21 @@ class Answer(BaseModel):
     
     def __repr__(self):
         return f"<Answer(id={self.id}, question_id={self.question_id}, is_correct={self.is_correct})>"
+
+class ExamQuestion(BaseModel):
+    """
+    ExamQuestion association placing a canonical question in an exam at a given position.
+    """
+    __tablename__ = 'exam_questions'
+    __table_args__ = (UniqueConstraint('exam_id', 'question_id', name='uq_exam_questions_exam_question'),)
+    
+    exam_id = Column(Integer, ForeignKey('exams.id'), nullable=False, index=True)
+    question_id = Column(Integer, ForeignKey('questions.id'), nullable=False, index=True)
+    question_order = Column(Integer, default=0, nullable=False)  # Position within this exam
+    
+    # Relationships
+    exam = relationship("Exam", back_populates="question_links")
+    question = relationship("Question", back_populates="exam_links")
+    
+    def __repr__(self):
+        return f"<ExamQuestion(exam_id={self.exam_id}, question_id={self.question_id}, order={self.question_order})>"
@@ -0,0 +1,263 @@
+"""
+Batch re-grading for PCEP Exam Accelerator.
+
+When an answer key is corrected after import (the converters insert every
+answer as incorrect when the source does not mark them), the stored grades of
+all earlier responses, the session scores and the topic progress built on them
+are stale. ``regrade_responses`` brings them back in line:
+
+1. the answer key is loaded into an ``AnswerKeyIndex`` and viewed as NumPy
+   arrays (no copy)
+2. responses are read in id-ordered chunks into NumPy arrays and graded in
+   vectorized form: the selected answer's bit is compared with the question's
+   key mask; only multi-select responses (full selection in
+   ``response_data``) are graded one by one
+3. only rows whose grade changed are written back, with one executemany
+   UPDATE per chunk
+4. completed sessions with a changed response get their ``correct_answers``
+   and ``score`` recomputed with one correlated UPDATE per batch of sessions,
+   and the ``UserProgress`` rows of their users are rebuilt from the
+   responses: counters and the weighted proficiency of ``topic_progress``
+
+Re-grading millions of responses costs a few seconds; see
+``tests/benchmark_regrade.py``.
+"""
+
+import itertools
+import json
+import logging
+import time
+from datetime import datetime
+
+import numpy as np
+from sqlalchemy import bindparam, case, func, select, update
+
+from answer_key import AnswerKeyIndex
+from models import ExamSession, Question, UserProgress, UserResponse
+from topic_progress import ewma_proficiency
+
+logger = logging.getLogger(__name__)
+
+# Responses graded per chunk
+CHUNK_SIZE = 100_000
+
+# Ids per IN (...) list, below SQLite's bound parameter limit
+IN_BATCH = 900
+
+
+def _as_numpy(values):
+    """View a stdlib array as an unsigned NumPy array without copying."""
+    dtype = np.dtype(f'u{values.itemsize}')
+    if not len(values):
+        return np.zeros(1, dtype=dtype)
+    return np.frombuffer(values, dtype=dtype)
+
+
+def grade_selections(answer_key, question_ids, answer_ids):
+    """
+    Grade single-answer responses in vectorized form.
+
+    Args:
+        answer_key (AnswerKeyIndex): Answer key
+        question_ids (numpy.ndarray): Question of each response
+        answer_ids (numpy.ndarray): Selected answer of each response, 0 when skipped
+
+    Returns:
+        numpy.ndarray: Boolean grade per response
+    """
+    masks = _as_numpy(answer_key.masks)
+    answer_questions = _as_numpy(answer_key.answer_questions)
+    answer_bits = _as_numpy(answer_key.answer_bits)
+
+    known = question_ids < len(masks)
+    key = np.where(known, masks[np.where(known, question_ids, 0)], np.uint64(0))
+
+    # An answer of another question (or unknown to the key) selects nothing
+    answered = (answer_ids > 0) & (answer_ids < len(answer_questions))
+    safe_answers = np.where(answered, answer_ids, 0)
+    belongs = answered & (answer_questions[safe_answers] == question_ids)
+    selection = np.where(belongs, np.left_shift(np.uint64(1), answer_bits[safe_answers].astype(np.uint64)),
+                         np.uint64(0))
+
+    return (key != 0) & (selection == key)
+
+
+def _stored_selection(response_data):
+    """Full selection stored for a multi-select response, or None."""
+    try:
+        selected = json.loads(response_data).get('answer_ids')
+    except (AttributeError, TypeError, ValueError):
+        return None
+    return selected if isinstance(selected, list) else None
+
+
+def _batches(ids, size=IN_BATCH):
+    ids = sorted(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _count_correct():
+    return func.coalesce(func.sum(case((UserResponse.is_correct, 1), else_=0)), 0)
+
+
+def rescore_sessions(session, session_ids):
+    """
+    Recompute correct_answers and score of completed sessions from their responses.
+
+    Args:
+        session: SQLAlchemy session
+        session_ids (iterable): Sessions to rescore
+
+    Returns:
+        int: Number of sessions updated
+    """
+    # SUM over the session's rows rather than a filtered COUNT: a condition on the
+    # low-selectivity is_correct index would lead SQLite to scan half the table
+    correct = select(_count_correct()).where(UserResponse.exam_session_id == ExamSession.id).scalar_subquery()
+    updated = 0
+    for batch in _batches(session_ids):
+        updated += session.execute(
+            update(ExamSession)
+            .where(ExamSession.id.in_(batch), ExamSession.is_completed)
+            .values(correct_answers=correct,
+                    score=case((ExamSession.total_questions > 0,
+                                func.round(correct * 100.0 / ExamSession.total_questions, 2)), else_=0.0),
+                    updated_at=datetime.utcnow())
+            .execution_options(synchronize_session=False)
+        ).rowcount
+    return updated
+
+
+def recompute_progress(session, user_ids):
+    """
+    Recompute the UserProgress rows of users from their completed sessions.
+
+    Attempts and correct answers are counted per topic from the responses,
+    and the proficiency is replayed over the corrected grades in response
+    order with the same weighting as completing the sessions
+    (``topic_progress.ewma_proficiency``). One SELECT of the responses and
+    one executemany UPDATE per batch of users.
+
+    Args:
+        session: SQLAlchemy session
+        user_ids (iterable): Users whose progress to recompute
+
+    Returns:
+        int: Number of progress rows updated
+    """
+    progress = UserProgress.__table__
+    write_back = progress.update() \
+        .where(progress.c.user_id == bindparam('b_user'), progress.c.topic_id == bindparam('b_topic')) \
+        .values(questions_attempted=bindparam('b_attempted'), questions_correct=bindparam('b_correct'),
+                proficiency_level=bindparam('b_proficiency'), updated_at=func.current_timestamp())
+
+    updated = 0
+    for batch in _batches(user_ids):
+        outcomes = {}
+        for user_id, topic_id, is_correct in session.execute(
+                select(ExamSession.user_id, Question.topic_id, UserResponse.is_correct)
+                .join(ExamSession, ExamSession.id == UserResponse.exam_session_id)
+                .join(Question, Question.id == UserResponse.question_id)
+                .where(ExamSession.user_id.in_(batch), ExamSession.is_completed, Question.topic_id.is_not(None))
+                .order_by(UserResponse.id)):
+            outcomes.setdefault((user_id, topic_id), []).append(is_correct)
+
+        values = []
+        for user_id, topic_id in session.execute(select(progress.c.user_id, progress.c.topic_id)
+                                                 .where(progress.c.user_id.in_(batch))):
+            history = outcomes.get((user_id, topic_id), [])
+            positions = [n for n, is_correct in enumerate(history, 1) if is_correct]
+            values.append({'b_user': user_id, 'b_topic': topic_id, 'b_attempted': len(history),
+                           'b_correct': len(positions),
+                           'b_proficiency': ewma_proficiency(0, 0, 0.0, len(history), positions)})
+        if values:
+            session.execute(write_back, values)
+            updated += len(values)
+    return updated
+
+
+def regrade_responses(session, answer_key=None, chunk_size=CHUNK_SIZE):
+    """
+    Re-grade every stored response against the current answer key.
+
+    Each chunk is committed on its own, so readers are not locked out for the
+    whole run; sessions and progress are recomputed at the end.
+
+    Args:
+        session: SQLAlchemy session
+        answer_key (AnswerKeyIndex): Current key (default: loaded from the database)
+        chunk_size (int): Responses graded per chunk
+
+    Returns:
+        dict: Counts of 'responses' graded, 'changed' responses, 'sessions' and
+            'progress' rows recomputed, and 'seconds' taken
+    """
+    started = time.perf_counter()
+    if answer_key is None:
+        answer_key = AnswerKeyIndex.build(session)
+
+    responses = UserResponse.__table__
+    write_back = responses.update() \
+        .where(responses.c.id == bindparam('b_id')) \
+        .values(is_correct=bindparam('b_correct'), updated_at=func.current_timestamp())
+
+    stats = {'responses': 0, 'changed': 0, 'sessions': 0, 'progress': 0}
+    changed_sessions = set()
+    last_id = 0
+    while True:
+        rows = session.execute(
+            select(responses.c.id, responses.c.exam_session_id, responses.c.question_id,
+                   func.coalesce(responses.c.answer_id, 0), responses.c.is_correct,
+                   responses.c.response_data.is_not(None))
+            .where(responses.c.id > last_id).order_by(responses.c.id).limit(chunk_size)
+        ).all()
+        if not rows:
+            break
+
+        # One flat pass into an integer matrix, a column per selected field
+        chunk = np.fromiter(itertools.chain.from_iterable(rows), dtype=np.int64,
+                            count=len(rows) * 6).reshape(len(rows), 6)
+        ids, session_ids, question_ids, answer_ids, stored, has_data = chunk.T
+        grades = grade_selections(answer_key, question_ids, answer_ids)
+
+        with_data = np.flatnonzero(has_data)
+        if len(with_data):
+            stored_data = {}
+            for batch in _batches(ids[with_data].tolist()):
+                stored_data.update(session.execute(select(responses.c.id, responses.c.response_data)
+                                                   .where(responses.c.id.in_(batch))).all())
+            for i in with_data:
+                selected = _stored_selection(stored_data.get(int(ids[i])))
+                if selected is not None:
+                    question_id = int(question_ids[i])
+                    try:
+                        grades[i] = answer_key.is_correct(question_id,
+                                                          answer_key.selection_mask(question_id, selected))
+                    except ValueError:
+                        grades[i] = False
+
+        changed = np.flatnonzero(grades != stored.astype(bool))
+        if len(changed):
+            session.execute(write_back, [{'b_id': b_id, 'b_correct': b_correct} for b_id, b_correct
+                                         in zip(ids[changed].tolist(), grades[changed].tolist())])
+            changed_sessions.update(session_ids[changed].tolist())
+            session.commit()
+
+        stats['responses'] += len(rows)
+        stats['changed'] += len(changed)
+        last_id = int(ids[-1])
+
+    if changed_sessions:
+        stats['sessions'] = rescore_sessions(session, changed_sessions)
+        user_ids = set()
+        for batch in _batches(changed_sessions):
+            user_ids.update(session.scalars(select(ExamSession.user_id).where(ExamSession.id.in_(batch))))
+        stats['progress'] = recompute_progress(session, user_ids)
+        session.commit()
+
+    stats['seconds'] = round(time.perf_counter() - started, 3)
+    logger.info(f"Re-graded {stats['responses']} responses: {stats['changed']} changed, "
+                f"{stats['sessions']} sessions and {stats['progress']} progress rows recomputed "
+                f"in {stats['seconds']}s")
+    return stats
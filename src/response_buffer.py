@@ -0,0 +1,301 @@
+"""
+Write-behind buffer for UserResponse rows in PCEP Exam Accelerator.
+
+When answers are recorded per click, a class sitting an exam at the same time
+sends a burst of single-row inserts that SQLite serializes one by one, each
+with its own commit. ``ResponseBuffer`` accepts graded rows immediately and a
+flusher thread writes them with one executemany INSERT and one commit per
+batch:
+
+- a batch is written when ``max_rows`` rows are waiting or the oldest waiting
+  row is ``interval_ms`` old, whichever comes first
+- ``close()`` (registered with ``atexit`` by the app) writes what is left
+- durability ``'buffered'`` acknowledges a row as soon as it is queued (a
+  crash loses at most one interval of answers); ``'flushed'`` holds the caller
+  until the batch holding its rows has been committed
+
+A question is queued at most once per session: ``put()`` rejects rows whose
+(session, question) pair is already pending, and a pair that was committed in
+the meantime is skipped by the insert (unique index, ``ON CONFLICT DO
+NOTHING``) instead of failing the batch, and counted as skipped, not written.
+
+``stats()`` reports the queue depth and flush latency. A batch that fails to
+insert (typically "database is locked" during a burst) is rolled back and put
+back at the front of the queue, then retried with exponential backoff. Rows
+still failing after ``retries`` attempts are logged and counted as failed;
+callers waiting on them in ``'flushed'`` mode get the error.
+"""
+
+import logging
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+from database import upsert_insert
+from models import UserResponse
+
+logger = logging.getLogger(__name__)
+
+DURABILITY_MODES = ('buffered', 'flushed')
+
+# A queued row; 'future' is shared by the rows of one put() in 'flushed' mode and
+# resolved by its 'last' row, 'attempts' counts failed inserts
+_Entry = namedtuple('_Entry', 'row enqueued future last attempts')
+
+
+class ResponseBuffer:
+    """In-process write-behind buffer served by a single flusher thread."""
+
+    def __init__(self, session_factory, max_rows=500, interval_ms=50, durability='buffered',
+                 retries=3, retry_backoff_ms=100):
+        """
+        Initialize the buffer; the flusher thread starts with the first row.
+
+        Args:
+            session_factory (callable): Returns a SQLAlchemy session; called on the flusher thread
+            max_rows (int): Rows that trigger a flush without waiting for the interval
+            interval_ms (float): Longest time a row waits before it is flushed
+            durability (str): 'buffered' to acknowledge rows once queued, 'flushed'
+                to acknowledge them once committed
+            retries (int): Times a failed batch is retried before its rows are dropped
+            retry_backoff_ms (float): Delay before the first retry; doubled for each further one
+        """
+        if durability not in DURABILITY_MODES:
+            raise ValueError(f"durability must be one of {DURABILITY_MODES}")
+        if max_rows < 1 or interval_ms <= 0:
+            raise ValueError("max_rows and interval_ms must be positive")
+        if retries < 0 or retry_backoff_ms < 0:
+            raise ValueError("retries and retry_backoff_ms must not be negative")
+
+        self.session_factory = session_factory
+        self.max_rows = max_rows
+        self.interval = interval_ms / 1000.0
+        self.durability = durability
+        self.retries = retries
+        self.retry_backoff = retry_backoff_ms / 1000.0
+
+        # Built for the database's dialect on the first flush
+        self._insert = None
+
+        self._rows = deque()
+        self._pending = {}
+        # Rows taken off the queue by a flush that has not finished yet
+        self._in_flight = 0
+        # No batch is written before this time after a failed one
+        self._retry_at = 0.0
+        self._condition = threading.Condition()
+        self._flush_lock = threading.Lock()
+        self._closed = False
+        self._worker = None
+        self._stats = {'flushes': 0, 'flushed_rows': 0, 'skipped_rows': 0, 'retries': 0, 'failed_rows': 0,
+                       'max_depth': 0,
+                       'flush_seconds': 0.0, 'last_flush_ms': 0.0, 'max_flush_ms': 0.0, 'max_wait_ms': 0.0}
+
+    def put(self, rows, timeout=None):
+        """
+        Queue ``user_responses`` rows for writing.
+
+        Args:
+            rows (list): Row dicts, e.g. from ``exam_sessions.grade_responses``
+            timeout (float): In 'flushed' mode, seconds to wait for the commit
+
+        Returns:
+            dict: 'accepted' row count, the 'durability' mode and whether the rows
+                are 'flushed' already
+
+        Raises:
+            RuntimeError: If the buffer is closed
+            ValueError: If a row's question is already queued for its session
+                (nothing of the call is queued then)
+            Exception: In 'flushed' mode, the error of a failed flush
+        """
+        future = Future() if self.durability == 'flushed' and rows else None
+        now = time.monotonic()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Response buffer is closed")
+            keys = set()
+            for row in rows:
+                key = (row['exam_session_id'], row['question_id'])
+                if key in keys or key[1] in self._pending.get(key[0], ()):
+                    raise ValueError(f"Question {key[1]} is already answered in session {key[0]}")
+                keys.add(key)
+            for i, row in enumerate(rows):
+                self._rows.append(_Entry(row, now, future, i == len(rows) - 1, 0))
+                self._pending.setdefault(row['exam_session_id'], set()).add(row['question_id'])
+            self._stats['max_depth'] = max(self._stats['max_depth'], len(self._rows) + self._in_flight)
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._work, name='response-buffer', daemon=True)
+                self._worker.start()
+            # Wakes the flusher for a full batch, or to time the first row of an empty queue
+            self._condition.notify_all()
+
+        if future is not None:
+            future.result(timeout)
+        return {'accepted': len(rows), 'durability': self.durability, 'flushed': future is not None}
+
+    def pending(self, exam_session_id):
+        """
+        Question ids of a session that are queued but not committed yet.
+
+        Args:
+            exam_session_id (int): Exam session
+
+        Returns:
+            set: Question ids
+        """
+        with self._condition:
+            return set(self._pending.get(exam_session_id, ()))
+
+    def depth(self):
+        """Number of rows not committed yet, including a batch being written."""
+        with self._condition:
+            return len(self._rows) + self._in_flight
+
+    def flush(self):
+        """
+        Write every queued row now, on the calling thread.
+
+        Also waits for a batch the flusher thread is writing, so every row put
+        before the call is committed (or failed for good) when it returns.
+        Failed batches are retried here too, after their backoff.
+
+        Returns:
+            int: Number of rows written by this call
+        """
+        written = 0
+        while True:
+            with self._condition:
+                while not self._rows and self._in_flight:
+                    self._condition.wait()
+                if not self._rows:
+                    return written
+                delay = self._retry_at - time.monotonic()
+            if delay > 0:
+                time.sleep(delay)
+            written += self._flush_batch(self.max_rows)
+
+    def close(self):
+        """Stop accepting rows, write what is queued and stop the flusher thread."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
+        logger.info(f"Response buffer closed after {self._stats['flushed_rows']} rows")
+
+    def stats(self):
+        """
+        Report queue depth and flush latency.
+
+        Returns:
+            dict: Current 'depth', peak 'max_depth', 'flushes', 'flushed_rows',
+                rows already stored as 'skipped_rows', failed attempts that were
+                'retries', rows dropped as 'failed_rows',
+                flush latency in ms (last, average, max) and the longest time a
+                row waited from put to commit
+        """
+        with self._condition:
+            stats = dict(self._stats, depth=len(self._rows) + self._in_flight, durability=self.durability,
+                         max_rows=self.max_rows, interval_ms=self.interval * 1000.0)
+        flush_seconds = stats.pop('flush_seconds')
+        stats['avg_flush_ms'] = round(flush_seconds * 1000.0 / stats['flushes'], 3) if stats['flushes'] else 0.0
+        return stats
+
+    def _work(self):
+        """Flusher thread: write a batch when it is full or its oldest row is due."""
+        while True:
+            with self._condition:
+                while not self._closed:
+                    wait = None
+                    if self._rows:
+                        due = time.monotonic() if len(self._rows) >= self.max_rows \
+                            else self._rows[0].enqueued + self.interval
+                        wait = max(due, self._retry_at) - time.monotonic()
+                        if wait <= 0:
+                            break
+                    self._condition.wait(wait)
+                if self._closed:
+                    return
+            self._flush_batch(self.max_rows)
+
+    def _flush_batch(self, count):
+        """Insert up to count queued rows with one executemany and commit; returns the rows written."""
+        error = None
+        written = 0
+        # Batches are taken and written under one lock, so they commit in queue order
+        with self._flush_lock:
+            with self._condition:
+                batch = [self._rows.popleft() for _ in range(min(count, len(self._rows)))]
+                self._in_flight += len(batch)
+            if not batch:
+                return 0
+            started = time.perf_counter()
+            session = self.session_factory()
+            try:
+                if self._insert is None:
+                    # Answers stored in the meantime are skipped, so a late duplicate cannot fail a whole batch
+                    self._insert = upsert_insert(session, UserResponse.__table__).on_conflict_do_nothing(
+                        index_elements=['exam_session_id', 'question_id'])
+                result = session.execute(self._insert, [entry.row for entry in batch])
+                session.commit()
+                # Skipped rows are not in the rowcount; drivers without a reliable executemany count get the batch size
+                written = result.rowcount if session.get_bind().dialect.supports_sane_multi_rowcount else len(batch)
+            except Exception as e:
+                session.rollback()
+                error = e
+            finally:
+                session.close()
+            elapsed = time.perf_counter() - started
+
+        if error is None:
+            done, retry, failed = batch, [], []
+        else:
+            retry = [entry._replace(attempts=entry.attempts + 1) for entry in batch if entry.attempts < self.retries]
+            failed = [entry for entry in batch if entry.attempts >= self.retries]
+            done = failed
+
+        now = time.monotonic()
+        with self._condition:
+            for entry in done:
+                questions = self._pending.get(entry.row['exam_session_id'])
+                if questions is not None:
+                    questions.discard(entry.row['question_id'])
+                    if not questions:
+                        del self._pending[entry.row['exam_session_id']]
+            stats = self._stats
+            if error is None:
+                stats['flushes'] += 1
+                stats['flushed_rows'] += written
+                stats['skipped_rows'] += len(batch) - written
+                stats['flush_seconds'] += elapsed
+                stats['last_flush_ms'] = round(elapsed * 1000.0, 3)
+                stats['max_flush_ms'] = max(stats['max_flush_ms'], stats['last_flush_ms'])
+                stats['max_wait_ms'] = max(stats['max_wait_ms'], round((now - batch[0].enqueued) * 1000.0, 3))
+            if retry:
+                # Back at the front, so rows still commit in the order they were put
+                self._rows.extendleft(reversed(retry))
+                delay = self.retry_backoff * 2 ** (max(entry.attempts for entry in retry) - 1)
+                self._retry_at = now + delay
+                stats['retries'] += 1
+                logger.warning(f"Failed to write {len(batch)} buffered responses ({error}); "
+                               f"retrying in {delay * 1000:.0f}ms")
+            if failed:
+                stats['failed_rows'] += len(failed)
+                logger.error(f"Dropped {len(failed)} buffered responses after {self.retries} retries",
+                             exc_info=error)
+            self._in_flight -= len(batch)
+            self._condition.notify_all()
+
+        for entry in done:
+            if entry.future is None or entry.future.done():
+                continue
+            if error is not None:
+                entry.future.set_exception(error)
+            elif entry.last:
+                entry.future.set_result(len(batch))
+        return written
@@ -0,0 +1,183 @@
+"""
+Set-based topic progress updates for PCEP Exam Accelerator.
+
+``UserProgress.update_progress`` applies one response at a time: it bumps the
+counters, keeps a running average time and moves the proficiency with
+
+    p(n) = accuracy(n)                          for n <= 5
+    p(n) = 0.7 * p(n - 1) + 0.3 * accuracy(n)    for n > 5
+
+where ``accuracy(n)`` is the (rounded) share of correct answers after attempt
+``n``. Applying a session that way costs a load and a flush per response.
+
+``apply_session_progress`` applies a completed session per topic instead:
+
+1. one GROUP BY over the session's responses gives each topic's attempted,
+   correct and time deltas, plus the positions of the correct responses
+   within the topic (``ROW_NUMBER`` over response id)
+2. one SELECT reads the user's current progress for those topics
+3. the new proficiency comes from the unrolled recurrence (``ewma_proficiency``)
+
+       p(N) = 0.7^(N - s) * p(s) + 0.3 * sum(0.7^(N - k) * accuracy(k), k = s+1..N)
+
+   with ``s = max(n0, 5)``, which gives the same value as applying the
+   responses one by one
+4. one UPSERT per topic writes the row (``INSERT ... ON CONFLICT``; SQLite or
+   PostgreSQL)
+
+so a session costs O(topics) statements instead of O(responses).
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import String, case, cast, func, select
+
+from database import upsert_insert
+from models import ExamSession, Question, UserProgress, UserResponse
+
+logger = logging.getLogger(__name__)
+
+# Attempts during which proficiency is the plain accuracy
+WARMUP_ATTEMPTS = 5
+
+# Weight of the previous proficiency after the warm-up
+DECAY = 0.7
+
+
+def _accuracy(correct, attempted):
+    """Accuracy on a 0.0-1.0 scale, rounded like UserProgress.calculate_accuracy."""
+    return round((correct / attempted) * 100, 2) / 100.0
+
+
+def ewma_proficiency(attempted, correct, proficiency, count, correct_positions):
+    """
+    Proficiency after a batch of attempts, equal to calling update_progress per attempt.
+
+    Args:
+        attempted (int): Attempts before the batch
+        correct (int): Correct attempts before the batch
+        proficiency (float): Proficiency before the batch
+        count (int): Attempts in the batch
+        correct_positions (iterable): 1-based positions of the correct attempts
+            within the batch, in any order
+
+    Returns:
+        float: Proficiency after the batch
+    """
+    total = attempted + count
+    if count == 0:
+        return proficiency
+    positions = sorted(correct_positions)
+    if total <= WARMUP_ATTEMPTS:
+        return _accuracy(correct + len(positions), total)
+
+    start = max(attempted, WARMUP_ATTEMPTS)
+    # Correct answers up to attempt k (within the batch: position k - attempted)
+    running = correct + sum(1 for position in positions if position <= start - attempted)
+    base = proficiency if attempted >= WARMUP_ATTEMPTS else _accuracy(running, start)
+
+    weighted = 0.0
+    next_position = running - correct
+    for k in range(start + 1, total + 1):
+        while next_position < len(positions) and positions[next_position] == k - attempted:
+            running += 1
+            next_position += 1
+        weighted += DECAY ** (total - k) * _accuracy(running, k)
+
+    return DECAY ** (total - start) * base + (1 - DECAY) * weighted
+
+
+def topic_deltas(session, exam_session_id):
+    """
+    Per-topic attempt deltas of a session, with one GROUP BY.
+
+    Args:
+        session: SQLAlchemy session
+        exam_session_id (int): Session whose responses to aggregate
+
+    Returns:
+        dict: topic_id -> {'attempted', 'correct', 'time', 'positions'}
+    """
+    ranked = select(
+        Question.topic_id.label('topic_id'),
+        UserResponse.is_correct.label('is_correct'),
+        UserResponse.time_taken.label('time_taken'),
+        func.row_number().over(partition_by=Question.topic_id, order_by=UserResponse.id).label('position')
+    ).join(Question, Question.id == UserResponse.question_id) \
+        .where(UserResponse.exam_session_id == exam_session_id, Question.topic_id.is_not(None)) \
+        .subquery()
+
+    correct_position = case((ranked.c.is_correct, ranked.c.position))
+    if session.get_bind().dialect.name == 'postgresql':
+        positions = func.string_agg(cast(correct_position, String), ',')
+    else:
+        positions = func.group_concat(correct_position)
+
+    rows = session.execute(
+        select(ranked.c.topic_id,
+               func.count(),
+               func.sum(case((ranked.c.is_correct, 1), else_=0)),
+               func.sum(ranked.c.time_taken),
+               positions)
+        .group_by(ranked.c.topic_id)
+    )
+    return {
+        topic_id: {'attempted': attempted, 'correct': correct, 'time': time_taken or 0.0,
+                   'positions': [int(p) for p in positions.split(',')] if positions else []}
+        for topic_id, attempted, correct, time_taken, positions in rows
+    }
+
+
+def apply_session_progress(session, exam_session_id):
+    """
+    Fold a completed session's responses into the user's topic progress.
+
+    The caller commits. Responses to questions without a topic are ignored.
+
+    Args:
+        session: SQLAlchemy session
+        exam_session_id (int): Completed session
+
+    Returns:
+        int: Number of topics updated
+    """
+    user_id = session.scalar(select(ExamSession.user_id).where(ExamSession.id == exam_session_id))
+    deltas = topic_deltas(session, exam_session_id)
+    if user_id is None or not deltas:
+        return 0
+
+    current = {
+        row.topic_id: row for row in session.execute(
+            select(UserProgress.topic_id, UserProgress.questions_attempted, UserProgress.questions_correct,
+                   UserProgress.proficiency_level, UserProgress.average_time)
+            .where(UserProgress.user_id == user_id, UserProgress.topic_id.in_(list(deltas))))
+    }
+
+    now = datetime.utcnow()
+    for topic_id, delta in deltas.items():
+        row = current.get(topic_id)
+        attempted, correct = (row.questions_attempted, row.questions_correct) if row else (0, 0)
+        proficiency, average_time = (row.proficiency_level, row.average_time) if row else (0.0, 0.0)
+
+        total = attempted + delta['attempted']
+        values = {
+            'user_id': user_id,
+            'topic_id': topic_id,
+            'questions_attempted': total,
+            'questions_correct': correct + delta['correct'],
+            'average_time': (average_time * attempted + delta['time']) / total,
+            'proficiency_level': ewma_proficiency(attempted, correct, proficiency,
+                                                  delta['attempted'], delta['positions']),
+            'last_practice_date': now,
+            'created_at': now,
+            'updated_at': now
+        }
+        statement = upsert_insert(session, UserProgress).values(**values)
+        session.execute(statement.on_conflict_do_update(
+            index_elements=['user_id', 'topic_id'],
+            set_={name: statement.excluded[name] for name in values if name not in ('user_id', 'topic_id',
+                                                                                    'created_at')}))
+
+    logger.info(f"Applied exam session {exam_session_id} to {len(deltas)} topics of user {user_id}")
+    return len(deltas)
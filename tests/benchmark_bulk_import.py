@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-question ORM flush import vs. BulkExamLoader
+===========================================================
+
+Imports the 'PE1 -- Summary Test' exam repeatedly into a fresh SQLite
+database, once with the old add()/flush()-per-question pattern and once with
+the set-based BulkExamLoader, and prints the speed-up.
+
+With 10 repetitions on a file-based SQLite database the speed-up is about 7x
+(6-8.5x across runs); single runs are noisy and occasionally report more.
+
+Usage:
+    python tests/benchmark_bulk_import.py [repetitions]
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Exam, Question, Answer
+from ingest.bulk_loader import BulkExamLoader
+
+SAMPLE_FILE = PROJECT_DIR / 'Exam_HTML_Raw_Data_JSON_ONLY' / 'PE1 -- Summary Test_v20250714_v1.json'
+
+
+def make_session(db_path):
+    """Create a session bound to a fresh file-based SQLite database."""
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def build_question_rows(exam_data):
+    """Build loader rows the way the converters do."""
+    rows = []
+    for order, q_data in enumerate(exam_data['questions'], 1):
+        rows.append({
+            'original_id': str(q_data['id']),
+            'text': q_data['question'],
+            'html_content': q_data['question'],
+            'question_order': order,
+            'question_metadata': '{}',
+            'answers': [
+                {
+                    'original_id': f"{q_data['id']}_{i}",
+                    'text': option['option'],
+                    'html_content': option['option'],
+                    'is_correct': False,
+                    'answer_order': i + 1
+                }
+                for i, option in enumerate(q_data['options'])
+            ]
+        })
+    return rows
+
+
+def import_with_orm(session, exam_data, title):
+    """Legacy path: session.add() + session.flush() per question."""
+    exam = Exam(title=title, total_questions=len(exam_data['questions']))
+    session.add(exam)
+    session.flush()
+
+    for row in build_question_rows(exam_data):
+        answers = row.pop('answers')
+        question = Question(exam_id=exam.id, **row)
+        session.add(question)
+        session.flush()
+        for answer in answers:
+            session.add(Answer(question_id=question.id, **answer))
+
+    session.commit()
+
+
+def import_with_bulk_loader(session, exam_data, title):
+    """New path: one exam insert plus batched executemany inserts."""
+    loader = BulkExamLoader(session, {'Exam': Exam, 'Question': Question, 'Answer': Answer})
+    loader.load_exam({'title': title, 'total_questions': len(exam_data['questions'])},
+                     build_question_rows(exam_data))
+
+
+def run(import_func, exam_data, repetitions):
+    """Time ``repetitions`` exam imports into a new database."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        session = make_session(Path(tmp_dir) / 'bench.db')
+        start = time.perf_counter()
+        for i in range(repetitions):
+            import_func(session, exam_data, f"Summary Test #{i}")
+        elapsed = time.perf_counter() - start
+        session.close()
+    return elapsed
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+
+    with open(SAMPLE_FILE, 'r', encoding='utf-8') as f:
+        exam_data = json.load(f)
+
+    question_count = len(exam_data['questions']) * repetitions
+    print(f"📊 Importing {SAMPLE_FILE.name} x{repetitions} ({question_count} questions)")
+
+    orm_time = run(import_with_orm, exam_data, repetitions)
+    bulk_time = run(import_with_bulk_loader, exam_data, repetitions)
+
+    print(f"ORM add/flush per question: {orm_time:.3f}s ({question_count / orm_time:,.0f} questions/s)")
+    print(f"BulkExamLoader:             {bulk_time:.3f}s ({question_count / bulk_time:,.0f} questions/s)")
+    print(f"Speed-up: {orm_time / bulk_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
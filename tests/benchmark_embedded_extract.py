@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Benchmark: `{.*?};` regex extraction vs. literal scan + raw_decode
+==================================================================
+
+Builds multi-MB saved pages from the Python Institute page and its script
+assets in SDLC/Input_Data_(PCEP Exam)_Requirements, embeds a real exam as
+``let data = {...};`` after the scripts, and times the old pattern list
+against the shared extractor. Also checks both on a page whose questions
+contain ``};``.
+
+Usage:
+    python tests/benchmark_embedded_extract.py [repetitions]
+"""
+
+import json
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+
+from ingest.embedded_data import extract_embedded_data_from_file
+
+INPUT_DIR = PROJECT_DIR / 'SDLC' / 'Input_Data_(PCEP Exam)_Requirements'
+SAMPLE_EXAM = PROJECT_DIR / 'Exam_HTML_Raw_Data_JSON_ONLY' / 'PE1 -- Summary Test_v20250714_v1.json'
+
+# The pattern list the converters used before the shared extractor
+LEGACY_PATTERNS = [
+    r'let data = ({.*?});',
+    r'var data = ({.*?});',
+    r'const data = ({.*?});',
+    r'data\s*=\s*({.*?});'
+]
+
+
+def legacy_extract(file_path):
+    """Old path: read the file, try each non-greedy DOTALL pattern in turn."""
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        html_content = f.read()
+
+    for pattern in LEGACY_PATTERNS:
+        match = re.search(pattern, html_content, re.DOTALL)
+        if match:
+            try:
+                return json.loads(match.group(1))
+            except json.JSONDecodeError:
+                return None
+    return None
+
+
+def build_page(exam_data):
+    """Saved page: the real HTML page, its script assets inline, then the exam data."""
+    parts = [(INPUT_DIR / 'PCEP_Information_Page_PythonInstitute.html').read_text(encoding='utf-8', errors='ignore')]
+    for asset_dir in sorted(INPUT_DIR.glob('*_files')):
+        for asset in sorted(asset_dir.iterdir()):
+            if asset.suffix in ('.png', '.jpg', '.gif', '.svg', '.woff', '.woff2'):
+                continue
+            parts.append(f"<script>{asset.read_text(encoding='utf-8', errors='ignore')}</script>")
+    parts.append(f"<script>\nlet data = {json.dumps(exam_data)};\n</script></body></html>")
+    return '\n'.join(parts)
+
+
+def time_extract(extract, path, repetitions):
+    """Return (seconds per call, result)."""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        result = extract(path)
+    return (time.perf_counter() - start) / repetitions, result
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+
+    with open(SAMPLE_EXAM, 'r', encoding='utf-8') as f:
+        exam_data = json.load(f)
+
+    tricky_exam = json.loads(json.dumps(exam_data))
+    tricky_exam['questions'][0]['question'] += '<code>d = {"k": 1};</code>'
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        cases = {
+            'saved page': build_page(exam_data),
+            'saved page, "};" in a question': build_page(tricky_exam),
+            'saved page, no exam data': build_page(exam_data).replace('let data = ', 'let other = ')
+                                                             .replace('var data = ', 'var other = ')
+        }
+        expected = {'saved page': exam_data, 'saved page, "};" in a question': tricky_exam,
+                    'saved page, no exam data': None}
+
+        for name, page in cases.items():
+            path = Path(tmp_dir) / 'page.html'
+            path.write_text(page, encoding='utf-8')
+            size_mb = path.stat().st_size / (1024 * 1024)
+
+            legacy_time, legacy_result = time_extract(legacy_extract, path, repetitions)
+            scan_time, scan_result = time_extract(extract_embedded_data_from_file, path, repetitions)
+
+            print(f"📄 {name} ({size_mb:.1f} MB)")
+            print(f"   Regex patterns:     {legacy_time * 1000:8.1f} ms  correct={legacy_result == expected[name]}")
+            print(f"   Scan + raw_decode:  {scan_time * 1000:8.1f} ms  correct={scan_result == expected[name]}")
+            print(f"   Speed-up: {legacy_time / scan_time:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Benchmark: BeautifulSoup + html2text vs. single-pass html.parser normalizer
+==========================================================================
+
+Runs every question and option HTML fragment of the exams in
+Exam_HTML_Raw_Data_JSON_ONLY through the converter's old cleaning path and
+the shared normalizer, and reports:
+
+- Throughput of each path.
+- Text fidelity: fragments whose text is the same once markdown markers and
+  whitespace are ignored.
+- Code fidelity: ``code.codep`` listings that survive with their line breaks
+  and indentation. The reference is the raw listing, so a listing with inline
+  markup (a ``<mark>`` highlight) counts as lost even though only the tag is.
+- A few fragments where the text differs, to inspect by eye.
+
+Usage:
+    python tests/benchmark_html_text.py [repetitions]
+"""
+
+import html
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+
+import html2text
+from bs4 import BeautifulSoup
+
+from ingest.highlight import extract_code_blocks
+from ingest.html_text import html_to_text, normalize_html
+
+EXAM_DIR = PROJECT_DIR / 'Exam_HTML_Raw_Data_JSON_ONLY'
+
+MARKUP = re.compile(r'```python|```|[`_*]')
+
+
+def legacy_clean(converter, html_content):
+    """Old QuestionConverter.clean_html_content: unescape, soup, html2text."""
+    if not html_content:
+        return ""
+    content = html.unescape(html_content)
+    soup = BeautifulSoup(content, 'html.parser')
+    text = converter.handle(str(soup))
+    text = re.sub(r'\n\s*\n', '\n\n', text)
+    return text.strip()
+
+
+def load_fragments():
+    """Every question and option HTML string of the exported exams."""
+    fragments = []
+    for path in sorted(EXAM_DIR.glob('*.json')):
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                exam = json.load(f)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            continue
+        for question in exam.get('questions', []) if isinstance(exam, dict) else []:
+            if not isinstance(question, dict):
+                continue
+            fragments.append(question.get('question') or '')
+            fragments.extend(option.get('option') or '' for option in question.get('options', [])
+                             if isinstance(option, dict))
+    return fragments
+
+
+def comparable(text):
+    """Text with markdown markers dropped and whitespace collapsed."""
+    return ' '.join(MARKUP.sub('', text).split())
+
+
+def time_path(clean, fragments, repetitions):
+    """Return (seconds for one pass over all fragments, outputs)."""
+    start = time.perf_counter()
+    for _ in range(repetitions):
+        outputs = [clean(fragment) for fragment in fragments]
+    return (time.perf_counter() - start) / repetitions, outputs
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    converter = html2text.HTML2Text()
+    converter.ignore_links = True
+    converter.ignore_images = True
+
+    fragments = load_fragments()
+    print(f"📄 {len(fragments)} fragments from {EXAM_DIR.name}")
+
+    legacy_time, legacy_texts = time_path(lambda fragment: legacy_clean(converter, fragment), fragments, repetitions)
+    parser_time, parser_texts = time_path(html_to_text, fragments, repetitions)
+    split_time, _ = time_path(normalize_html, fragments, repetitions)
+
+    print(f"   BeautifulSoup + html2text: {legacy_time * 1000:8.1f} ms  "
+          f"({len(fragments) / legacy_time:,.0f} fragments/s)")
+    print(f"   html.parser (text):        {parser_time * 1000:8.1f} ms  "
+          f"({len(fragments) / parser_time:,.0f} fragments/s)")
+    print(f"   html.parser (text + code): {split_time * 1000:8.1f} ms")
+    print(f"   Speed-up: {legacy_time / parser_time:.1f}x")
+
+    same_text = sum(comparable(old) == comparable(new) for old, new in zip(legacy_texts, parser_texts))
+    print(f"\n🔍 Text fidelity: {same_text}/{len(fragments)} fragments identical ignoring markup and whitespace")
+
+    listings = legacy_kept = parser_kept = 0
+    for fragment, old, new in zip(fragments, legacy_texts, parser_texts):
+        for code in extract_code_blocks(fragment):
+            listings += 1
+            legacy_kept += code in old
+            parser_kept += code in new
+    print(f"   Code listings kept verbatim: html2text {legacy_kept}/{listings}, html.parser {parser_kept}/{listings}")
+
+    differing = [(fragment, old, new) for fragment, old, new in zip(fragments, legacy_texts, parser_texts)
+                 if comparable(old) != comparable(new) and not extract_code_blocks(fragment)]
+    print(f"   Fragments without code listings whose text differs: {len(differing)}")
+    for fragment, old, new in differing[:5]:
+        print(f"\n   HTML:        {fragment[:120]!r}")
+        print(f"   html2text:   {old[:120]!r}")
+        print(f"   html.parser: {new[:120]!r}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,298 @@
+#!/usr/bin/env python3
+"""
+Benchmark: import throughput of the converters on a synthetic corpus
+===================================================================
+
+Generates a deterministic corpus with tests/synthetic_corpus.py and runs each
+converter's import path over it, timing the stages separately:
+
+- extract:  read the file and find the exam data (JSON or saved page)
+- validate: schema validation
+- detect:   normalization plus enrichment (multi-answer detection,
+            fingerprints, code snippets)
+- load:     database writes into a fresh SQLite file
+
+Converters:
+
+- robust:   RobustExamConverter (extract_data_from_*, validate_exam_data,
+            normalize_exam, import_prepared_exam)
+- enhanced: EnhancedMetadataConverter (read_exam_stream, validate_json_structure,
+            _build_exam_rows, _import_prepared)
+- pipeline: ingest.pipeline stages with DatabaseSink
+
+Each converter runs in a fresh interpreter, so its peak RSS is its own.
+Results are reported in questions per second and compared with the stored
+baseline (tests/benchmark_baseline.json). The script exits with status 1 when a
+stage is slower, or a converter uses more memory, than the baseline allows.
+Baselines depend on the machine: refresh them with --update-baseline.
+
+Usage:
+    python tests/benchmark_import_throughput.py [--questions N] [--converters robust,enhanced,pipeline]
+        [--tolerance 0.3] [--update-baseline] [--baseline PATH]
+"""
+
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+TESTS_DIR = Path(__file__).resolve().parent
+BASELINE_FILE = TESTS_DIR / 'benchmark_baseline.json'
+
+STAGES = ('extract', 'validate', 'detect', 'load')
+CONVERTERS = ('robust', 'enhanced', 'pipeline')
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def _setup_child(work_dir):
+    """Paths and logging for a converter run in a fresh interpreter."""
+    sys.path.insert(0, str(PROJECT_DIR / 'src' / 'converters_2_Evaluate'))
+    sys.path.insert(0, str(PROJECT_DIR / 'src'))
+    sys.path.insert(0, str(PROJECT_DIR))
+    # The robust converter opens a log file in the working directory on import
+    os.chdir(work_dir)
+    logging.disable(logging.WARNING)
+
+
+def _session(db_path, metadata):
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+class StageTimer:
+    """Accumulates wall time per stage."""
+
+    def __init__(self):
+        self.seconds = dict.fromkeys(STAGES, 0.0)
+        self._stage = None
+        self._start = None
+
+    def __call__(self, stage):
+        self._stage = stage
+        return self
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        self.seconds[self._stage] += time.perf_counter() - self._start
+
+
+def run_robust(paths, db_path):
+    from robust_exam_converter import RobustExamConverter
+    from src.models import Exam
+
+    session = _session(db_path, Exam.metadata)
+    converter = RobustExamConverter()
+    timer = StageTimer()
+    questions = 0
+
+    for path in paths:
+        with timer('extract'):
+            if converter.detect_file_format(path) == 'html':
+                exam_data = converter.extract_data_from_html(path)
+            else:
+                exam_data = converter.extract_data_from_json(path)
+        with timer('validate'):
+            valid, _ = converter.validate_exam_data(exam_data, path)
+        assert valid, path
+        with timer('detect'):
+            fields, rows = converter.normalize_exam(exam_data, path)
+        with timer('load'):
+            assert converter.import_prepared_exam(fields, rows, session) is not None, path
+        questions += len(rows)
+
+    return timer.seconds, questions
+
+
+def run_enhanced(paths, db_path):
+    from enhanced_metadata_converter import EnhancedMetadataConverter
+    from ingest.json_stream import read_exam_stream
+    from models import Answer, Exam, ExamQuestion, HighlightedSnippet, Question
+
+    session = _session(db_path, Exam.metadata)
+    converter = EnhancedMetadataConverter(session, {'Exam': Exam, 'Question': Question, 'Answer': Answer,
+                                                    'ExamQuestion': ExamQuestion,
+                                                    'HighlightedSnippet': HighlightedSnippet})
+    timer = StageTimer()
+    questions = 0
+
+    for path in paths:
+        with timer('extract'):
+            exam_data = read_exam_stream(path)
+        with timer('validate'):
+            valid, message = converter.validate_json_structure(exam_data)
+        assert valid, (path, message)
+        with timer('detect'):
+            metadata = converter.extract_exam_metadata(exam_data, path.name)
+            fields, rows = converter._build_exam_rows(exam_data, metadata)
+        with timer('load'):
+            assert converter._import_prepared(fields, rows, metadata) is not None, path
+        questions += len(rows)
+
+    return timer.seconds, questions
+
+
+def run_pipeline(paths, db_path):
+    from ingest.pipeline import (DatabaseSink, enrich_records, exam_row, extract_records, normalize_records,
+                                 validate_records)
+    from models import Answer, Exam, ExamQuestion, HighlightedSnippet, Question
+
+    session = _session(db_path, Exam.metadata)
+    sink = DatabaseSink(session, {'Exam': Exam, 'Question': Question, 'Answer': Answer,
+                                  'ExamQuestion': ExamQuestion, 'HighlightedSnippet': HighlightedSnippet})
+    timer = StageTimer()
+    questions = 0
+
+    for path in paths:
+        # Each stage is drained before the next so it can be timed on its own
+        with timer('extract'):
+            records = list(extract_records([path]))
+        with timer('validate'):
+            records = list(validate_records(records))
+        with timer('detect'):
+            records = list(enrich_records(normalize_records(records, exam_normalizer=exam_row)))
+        with timer('load'):
+            sink.write(records)
+        assert sink.results[-1]['exam_id'] is not None, path
+        questions += len(records)
+
+    return timer.seconds, questions
+
+
+RUNNERS = {'robust': run_robust, 'enhanced': run_enhanced, 'pipeline': run_pipeline}
+
+
+def run_converter(name, paths, work_dir):
+    """Child process entry point: run one converter and report times and peak memory."""
+    _setup_child(work_dir)
+    seconds, questions = RUNNERS[name]([Path(path) for path in paths], Path(work_dir) / f'{name}.db')
+    peak_mib = None
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux, bytes on macOS
+        scale = 1 if sys.platform == 'darwin' else 1024
+        peak_mib = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+    return {'seconds': seconds, 'questions': questions, 'peak_mib': peak_mib}
+
+
+def measure(converters, questions, per_exam):
+    """Generate the corpus and run every converter on it in a fresh interpreter."""
+    sys.path.insert(0, str(TESTS_DIR))
+    from synthetic_corpus import generate_corpus
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths, stats = generate_corpus(Path(tmp_dir) / 'corpus', questions, questions_per_exam=per_exam, seed=40)
+        print(f"📄 {len(paths)} files, {stats['questions']:,} questions "
+              f"({stats['code_snippets']:,} code snippets, {stats['multi_select']:,} multi-select, "
+              f"{stats['duplicates']:,} duplicates)")
+
+        context = multiprocessing.get_context('spawn')
+        for name in converters:
+            work_dir = Path(tmp_dir) / name
+            work_dir.mkdir()
+            with context.Pool(1) as pool:
+                run = pool.apply(run_converter, (name, [str(path) for path in paths], str(work_dir)))
+            assert run['questions'] == questions, (name, run['questions'])
+
+            total = sum(run['seconds'].values())
+            results[name] = {stage: round(questions / seconds, 1) for stage, seconds in run['seconds'].items()}
+            results[name]['total'] = round(questions / total, 1)
+            results[name]['peak_mib'] = round(run['peak_mib'], 1) if run['peak_mib'] is not None else None
+
+    return results
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regression messages."""
+    regressions = []
+    for name, current in results.items():
+        expected = baseline.get(name)
+        if not expected:
+            continue
+        for stage in STAGES + ('total',):
+            if stage in expected and current[stage] < expected[stage] * (1 - tolerance):
+                regressions.append(f"{name} {stage}: {current[stage]:,.0f} q/s vs. baseline {expected[stage]:,.0f}")
+        if expected.get('peak_mib') and current['peak_mib'] and \
+                current['peak_mib'] > expected['peak_mib'] * (1 + tolerance):
+            regressions.append(f"{name} peak memory: {current['peak_mib']:.0f} MiB "
+                               f"vs. baseline {expected['peak_mib']:.0f} MiB")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import throughput benchmark with regression check")
+    parser.add_argument('--questions', type=int, default=5000, help="corpus size (default: 5000)")
+    parser.add_argument('--per-exam', type=int, default=60, help="questions per file (default: 60)")
+    parser.add_argument('--converters', default=','.join(CONVERTERS), help="comma-separated converters")
+    parser.add_argument('--tolerance', type=float, default=0.3,
+                        help="allowed slowdown / memory growth before failing (default: 0.3)")
+    parser.add_argument('--baseline', type=Path, default=BASELINE_FILE)
+    parser.add_argument('--update-baseline', action='store_true', help="store this run as the baseline")
+    args = parser.parse_args()
+
+    converters = [name.strip() for name in args.converters.split(',') if name.strip()]
+    unknown = set(converters) - set(CONVERTERS)
+    if unknown:
+        parser.error(f"unknown converters: {', '.join(sorted(unknown))}")
+
+    results = measure(converters, args.questions, args.per_exam)
+
+    print(f"\n{'converter':10s}" + ''.join(f"{stage:>12s}" for stage in STAGES + ('total',)) + f"{'peak MiB':>10s}")
+    for name, current in results.items():
+        peak = f"{current['peak_mib']:10.1f}" if current['peak_mib'] is not None else f"{'n/a':>10s}"
+        print(f"{name:10s}" + ''.join(f"{current[stage]:12,.0f}" for stage in STAGES + ('total',)) + peak)
+    print("(questions per second)")
+
+    if args.update_baseline:
+        stored = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        # Converters not run this time keep their numbers if the scale is unchanged
+        kept = stored.get('results', {}) if (stored.get('questions'), stored.get('per_exam')) == \
+            (args.questions, args.per_exam) else {}
+        stored = {
+            'questions': args.questions,
+            'per_exam': args.per_exam,
+            'machine': f"{platform.system()} {platform.machine()}, Python {platform.python_version()}",
+            'results': {**kept, **results}
+        }
+        args.baseline.write_text(json.dumps(stored, indent=2) + '\n')
+        print(f"\n💾 Baseline written to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print("\n⚠️ No baseline stored yet, run with --update-baseline")
+        return
+
+    baseline = json.loads(args.baseline.read_text())
+    if baseline.get('questions') != args.questions or baseline.get('per_exam') != args.per_exam:
+        print(f"\n⚠️ Baseline was measured with {baseline.get('questions')} questions "
+              f"({baseline.get('per_exam')} per exam); not comparing")
+        return
+
+    regressions = compare(results, baseline['results'], args.tolerance)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regressions against {args.baseline.name} "
+              f"(tolerance {args.tolerance:.0%}, baseline from {baseline.get('machine')}):")
+        for message in regressions:
+            print(f"   - {message}")
+        sys.exit(1)
+    print(f"\n✅ No regressions against {args.baseline.name} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark: json.load vs. incremental exam reader
+================================================
+
+Writes a synthetic exam export with many questions, modeled on the real
+files, and compares for each way of reading it:
+
+- Wall time (measured without tracing).
+- Peak Python memory traced with tracemalloc.
+
+Paths compared:
+
+- ``json.load``: the whole file text plus every parsed question.
+- ``read_exam_stream``: the same dict, but without the file text.
+- ``iter_exam_stream``: one question at a time (constant memory).
+- ``extract_records`` streaming: the pipeline's extract stage for large
+  files (scan pass + question pass).
+
+Usage:
+    python tests/benchmark_json_stream.py [questions]
+"""
+
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+
+from ingest.json_stream import iter_exam_stream, read_exam_stream
+from ingest.pipeline import extract_records
+
+
+def write_exam(path, count):
+    """Write an export with ``count`` questions, one question at a time."""
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('{"id": 1, "timeLimitInMinutes": 60, "questions": [')
+        for i in range(count):
+            question = {
+                'id': 100000 + i,
+                'question': f"<p>What is the output of the following snippet? ({i})</p>"
+                            f"<pre><code class=\"codep\">x = {i}\nfor i in range(3):\n    x += i\nprint(x)</code></pre>",
+                'options': [{'id': 10 * i + j, 'option': f"<p><code>{i + j}</code></p>"} for j in range(4)]
+            }
+            f.write((',' if i else '') + json.dumps(question))
+        f.write('], "sections": [], "classId": 42}')
+
+
+def load_whole(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return len(json.load(f)['questions'])
+
+
+def read_streamed(path):
+    return len(read_exam_stream(path)['questions'])
+
+
+def iterate_streamed(path):
+    stream = iter_exam_stream(path)
+    next(stream)
+    return sum(1 for _ in stream)
+
+
+def extract_streamed(path):
+    return sum(1 for _ in extract_records([path], stream_threshold=0))
+
+
+def measure(read, path):
+    """Return (seconds, peak traced bytes, questions read)."""
+    start = time.perf_counter()
+    questions = read(path)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    read(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, questions
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'vendor_dump.json'
+        write_exam(path, count)
+        size = path.stat().st_size
+        print(f"📄 {count:,} questions, {size / 2**20:.1f} MiB")
+
+        for label, read in (('json.load', load_whole), ('read_exam_stream', read_streamed),
+                            ('iter_exam_stream', iterate_streamed), ('extract_records (stream)', extract_streamed)):
+            elapsed, peak, questions = measure(read, path)
+            assert questions == count, (label, questions)
+            print(f"   {label:26s} {elapsed:7.2f} s  {count / elapsed:>10,.0f} q/s  "
+                  f"peak {peak / 2**20:8.1f} MiB ({peak / size:.2f}x file)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-row ORM re-grading vs. the vectorized regrade engine
+==================================================================
+
+Fills a fresh SQLite database with an exam of 45 questions and the given
+number of responses spread over 45-question sessions, corrects the answer key
+(every answer was imported as incorrect), then re-grades everything once by
+loading each response with its answer through the ORM and once with
+``regrade_responses``. The ORM pass only runs on the first 50,000 responses and
+is extrapolated.
+
+Usage:
+    python tests/benchmark_regrade.py [responses]
+"""
+
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Answer, Exam, ExamSession, Question, User, UserResponse
+from regrade import regrade_responses
+
+QUESTIONS = 45
+ORM_SAMPLE = 50_000
+
+
+def build(db_path, responses):
+    """Create the exam, sessions and responses; returns (session, ids of the answers to mark correct)."""
+    engine = create_engine(f'sqlite:///{db_path}')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    user = User(username="bench", email="bench@example.com", password_hash="x")
+    exam = Exam(title="Benchmark Exam", total_questions=QUESTIONS)
+    session.add_all([user, exam])
+    session.flush()
+
+    answers = {}
+    for i in range(QUESTIONS):
+        question = Question(text=f"Question {i}?", exam_id=exam.id)
+        session.add(question)
+        session.flush()
+        rows = [Answer(text=f"Option {j}", is_correct=False, question_id=question.id, answer_order=j)
+                for j in range(4)]
+        session.add_all(rows)
+        session.flush()
+        answers[question.id] = [answer.id for answer in rows]
+
+    now = datetime.utcnow()
+    sessions = -(-responses // QUESTIONS)
+    session.execute(ExamSession.__table__.insert(), [
+        {'user_id': user.id, 'exam_id': exam.id, 'start_time': now, 'is_completed': True, 'score': 0.0,
+         'total_questions': QUESTIONS, 'correct_answers': 0, 'time_spent': 0, 'created_at': now, 'updated_at': now}
+        for _ in range(sessions)])
+    session_ids = [session_id for (session_id,) in session.query(ExamSession.id).order_by(ExamSession.id)]
+
+    rng = random.Random(42)
+    question_ids = list(answers)
+    rows = []
+    for n in range(responses):
+        question_id = question_ids[n % QUESTIONS]
+        rows.append({'exam_session_id': session_ids[n // QUESTIONS], 'question_id': question_id,
+                     'answer_id': rng.choice(answers[question_id]), 'is_correct': False, 'is_bookmarked': False,
+                     'is_skipped': False, 'time_taken': 10.0, 'response_data': None,
+                     'created_at': now, 'updated_at': now})
+        if len(rows) == 100_000:
+            session.execute(UserResponse.__table__.insert(), rows)
+            rows = []
+    if rows:
+        session.execute(UserResponse.__table__.insert(), rows)
+    session.commit()
+    return session, [ids[0] for ids in answers.values()]
+
+
+def regrade_with_orm(session, limit):
+    """Per-row baseline: load each response's answer and flush a changed grade."""
+    start = time.perf_counter()
+    for response in session.query(UserResponse).order_by(UserResponse.id).limit(limit):
+        is_correct = bool(response.answer and response.answer.is_correct)
+        if response.is_correct != is_correct:
+            response.is_correct = is_correct
+    session.rollback()
+    return time.perf_counter() - start
+
+
+def main():
+    responses = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        print(f"📊 Building {responses:,} responses...")
+        session, correct_answers = build(Path(tmp_dir) / 'regrade.db', responses)
+        session.execute(update(Answer).where(Answer.id.in_(correct_answers)).values(is_correct=True))
+        session.commit()
+
+        sample = min(responses, ORM_SAMPLE)
+        orm_time = regrade_with_orm(session, sample) * responses / sample
+        stats = regrade_responses(session)
+        session.close()
+
+    print(f"ORM per response (extrapolated): {orm_time:.3f}s ({responses / orm_time:,.0f} responses/s)")
+    print(f"regrade_responses:               {stats['seconds']:.3f}s "
+          f"({responses / stats['seconds']:,.0f} responses/s, {stats['changed']:,} changed)")
+    print(f"Speed-up: {orm_time / stats['seconds']:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
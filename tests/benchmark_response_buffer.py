@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-answer commits vs. the write-behind response buffer
+==================================================================
+
+Simulates a class answering at the same time: the given number of student
+threads each record 45 answers, first with one INSERT and commit per answer
+on a shared SQLite file, then through a ``ResponseBuffer`` in both durability
+modes. Reports wall time, answers per second and the buffer's flush metrics.
+
+Each simulated student answers as fast as it is acknowledged, so in
+'flushed' mode a student's answers are paced by the flush interval; real
+students answer seconds apart and only see that latency once per click.
+
+Usage:
+    python tests/benchmark_response_buffer.py [students]
+"""
+
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+sys.path.insert(0, str(PROJECT_DIR / 'tests'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import ExamSession, User, UserResponse
+from response_buffer import ResponseBuffer
+from test_exam_sessions import add_exam
+from test_response_buffer import response_row
+
+QUESTIONS = 45
+
+
+def build(db_path, students):
+    """Exam plus one open session per student; returns (session factory, session ids, question ids)."""
+    engine = create_engine(f'sqlite:///{db_path}', connect_args={'timeout': 60})
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    session = Session()
+    exam_id, key = add_exam(session, QUESTIONS)
+    users = [User(username=f"student{i}", email=f"student{i}@example.com", password_hash="x")
+             for i in range(students)]
+    session.add_all(users)
+    session.flush()
+    sessions = [ExamSession(user_id=user.id, exam_id=exam_id, total_questions=QUESTIONS) for user in users]
+    session.add_all(sessions)
+    session.commit()
+    session_ids = [exam_session.id for exam_session in sessions]
+    session.close()
+    return Session, session_ids, list(key)
+
+
+def run_students(session_ids, question_ids, record):
+    """Run one thread per student calling record(session_id, question_id); returns seconds."""
+    threads = [threading.Thread(target=lambda sid=sid: [record(sid, qid) for qid in question_ids])
+               for sid in session_ids]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main():
+    students = int(sys.argv[1]) if len(sys.argv) > 1 else 30
+    answers = students * QUESTIONS
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        Session, session_ids, question_ids = build(Path(tmp_dir) / 'responses.db', students)
+
+        def insert_one(session_id, question_id):
+            session = Session()
+            try:
+                session.execute(UserResponse.__table__.insert(), [response_row(session_id, question_id)])
+                session.commit()
+            finally:
+                session.close()
+
+        print(f"📊 {students} students x {QUESTIONS} answers = {answers:,} answers")
+        direct = run_students(session_ids, question_ids, insert_one)
+        print(f"Per-answer commit: {direct:.3f}s ({answers / direct:,.0f} answers/s), {answers:,} commits")
+
+        for durability in ('buffered', 'flushed'):
+            session = Session()
+            session.query(UserResponse).delete()
+            session.commit()
+            session.close()
+
+            buffer = ResponseBuffer(Session, durability=durability)
+            start = time.perf_counter()
+            acknowledged = run_students(session_ids, question_ids,
+                                        lambda sid, qid: buffer.put([response_row(sid, qid)]))
+            buffer.close()
+            stored = time.perf_counter() - start
+            stats = buffer.stats()
+            print(f"Buffer ({durability}): {acknowledged:.3f}s to acknowledge, {stored:.3f}s until stored "
+                  f"({answers / stored:,.0f} answers/s), {stats['flushes']} commits, "
+                  f"peak depth {stats['max_depth']}, flush {stats['avg_flush_ms']:.1f}ms avg / "
+                  f"{stats['max_flush_ms']:.1f}ms max, longest wait {stats['max_wait_ms']:.1f}ms")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Benchmark: per-question string validation vs. compiled schema validator
+======================================================================
+
+Builds an exam with 100k questions (four options each), makes one late
+question malformed, and times the robust converter's old per-question checks
+against the compiled validator in collect-all and fail-fast mode. The old
+checks also show what they missed.
+
+Usage:
+    python tests/benchmark_schema_validation.py [questions]
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.schema import blocking_errors, describe, exam_validator
+
+
+def legacy_validate_question(question, index):
+    """Old RobustExamConverter._validate_question."""
+    errors = []
+    if not question.get('question'):
+        errors.append(f"Question {index}: Missing question text")
+    if 'options' not in question:
+        errors.append(f"Question {index}: Missing options")
+    elif not question['options']:
+        errors.append(f"Question {index}: Empty options list")
+    elif len(question['options']) < 2:
+        errors.append(f"Question {index}: Insufficient options (need at least 2)")
+    if not question.get('id'):
+        errors.append(f"Question {index}: Missing question ID")
+    return errors
+
+
+def legacy_validate(exam_data):
+    """Old validate_exam_data loop: strings, filtered by 'critical' afterwards."""
+    errors = []
+    for i, question in enumerate(exam_data['questions']):
+        errors.extend(legacy_validate_question(question, i))
+    return [e for e in errors if 'critical' in e.lower()], errors
+
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    exam = {
+        'id': 1,
+        'timeLimitInMinutes': 45,
+        'questions': [
+            {'id': i + 1, 'question': f"<p>Question {i}?</p>", 'type': 'Single Choice',
+             'options': [{'id': i * 10 + j, 'option': f"<p>Option {j}</p>"} for j in range(4)]}
+            for i in range(count)
+        ]
+    }
+    exam['questions'][-10]['options'][1] = {'id': 3, 'option': None}
+
+    print(f"📄 {count:,} questions, {count * 4:,} options")
+
+    legacy_time, (legacy_critical, legacy_errors) = timed(legacy_validate, exam)
+    print(f"   Per-question strings:      {legacy_time * 1000:8.1f} ms  "
+          f"{len(legacy_errors)} issues, {len(legacy_critical)} critical")
+
+    full_time, errors = timed(exam_validator.validate, exam)
+    print(f"   Compiled, collect-all:     {full_time * 1000:8.1f} ms  "
+          f"{len(errors)} issues, {len(blocking_errors(errors))} blocking")
+
+    fast_time, fast_errors = timed(exam_validator.validate, exam, fail_fast=True)
+    print(f"   Compiled, fail-fast:       {fast_time * 1000:8.1f} ms")
+
+    for error in errors:
+        print(f"   - {error['severity']}: {describe(error)} ({error['location']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Synthetic exam corpus generator
+===============================
+
+Writes exam exports that look like the files in Exam_HTML_Raw_Data_JSON_ONLY,
+at any scale, for benchmarks and load tests:
+
+- The same top-level and per-question keys as the real exports (sections,
+  htmlType, shuffleOptions, ...), with unique exam, question and option ids.
+- Question stems modeled on the PE1 quizzes and tests: "What is the output of
+  the following snippet?" with a ``<code class="codep">`` listing, inline
+  ``<code >`` operators, and true/false statements.
+- Multi-select questions phrased as in the real files ("(Select <u>two</u>
+  answers)") plus the other phrasings the detector knows.
+- Duplicates across exams, as when the same quiz is exported twice: exact
+  copies with new ids, copies with shuffled options, and copies with
+  different markup.
+- Saved-page HTML files (``let data = {...};``) next to the JSON exports.
+
+Generation is deterministic for a seed, and exams are written one at a time,
+so a corpus of a million questions needs no more memory than one exam.
+
+Usage:
+    python tests/synthetic_corpus.py OUTPUT_DIR [--questions N] [--per-exam N]
+        [--html-ratio R] [--duplicate-rate R] [--multi-select-rate R] [--seed N]
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+
+# Exam-level keys of the real exports, in order; 'questions' is filled in
+EXAM_TEMPLATE = {
+    'id': None, 'showCodeHonor': False, 'showNDA': False, 'timeLimitInMinutes': 15, 'timeWarningInMinutes': 1,
+    'shuffleAnswers': True, 'unlimitedAttempts': True, 'allowedAttempts': 1, 'showReview': True,
+    'showReviewAfterSubmitting': True, 'showAnswers': True, 'showWelcomePage': False, 'welcomePageContent': None,
+    'hasTimedSections': False, 'showIndependentSections': False, 'questions': None, 'sections': [],
+    'token': None, 'lastStableState': [], 'launchPresentationReturnUrl': None, 'fullScreenExitLimit': None,
+    'windowExitLimit': None, 'noInternetLimit': None, 'screenshotLimit': None, 'webcamDetectionLimit': None,
+    'wrongGazeDirectionDurationLimit': None, 'aceEditorMode': 'ace/mode/python', 'showCalculator': False,
+    'showScratchpad': False, 'photosTaken': False, 'recordVideo': False, 'recordAudio': False,
+    'recordScreen': False, 'allowNoRecording': None, 'showScore': True, 'showTutorials': False,
+    'testingProgramId': False, 'classId': None
+}
+
+EXAM_KINDS = ('Quiz', 'Test', 'Summary Test')
+
+NUMBERS = ('one', 'two', 'three')
+
+MULTI_SELECT_PHRASES = (
+    "(Select <u>{count}</u> answers)",
+    "(Select <u>{count}</u> answers)",
+    "(Select <u>{count}</u> answers)",
+    "Choose {count} correct answers.",
+    "(select all that apply)"
+)
+
+TOPICS = (
+    'compilation', 'interpretation', 'the <code >print()</code> function', 'keywords', 'literals',
+    'the <code >input()</code> function', 'lists', 'tuples', 'dictionaries', 'functions', 'exceptions',
+    'the <code >while</code> loop', 'the <code >for</code> loop', 'string slicing', 'operators'
+)
+
+STATEMENTS = (
+    "it is executed by the interpreter", "it cannot be changed once created", "it raises an exception",
+    "it returns <code >None</code>", "it can be used as a variable name", "it is evaluated from right to left",
+    "it creates a new object", "it modifies the list in place", "it tends to be faster", "it is a keyword",
+    "it accepts any number of arguments", "it is stored as a string", "it is mutable", "it is ignored"
+)
+
+OPERATORS = (('//', 'performs integer division'), ('**', 'raises to a power'), ('%', 'computes the remainder'),
+             ('!=', 'compares for inequality'), ('and', 'performs logical conjunction'),
+             ('<<', 'shifts bits to the left'), ('is', 'compares identities'), ('in', 'tests membership'))
+
+OPERATOR_DISTRACTORS = ('performs regular division', 'does not exist', 'concatenates strings',
+                        'raises a SyntaxError', 'rounds to the nearest integer')
+
+
+def _snippet(rng):
+    """A short Python listing and its printed output."""
+    kind = rng.randrange(5)
+    a, b, c = rng.randrange(1, 10), rng.randrange(1, 10), rng.randrange(2, 5)
+    if kind == 0:
+        code = f"def fun(inp={a}, out={b}):\n    return inp * out\n\n\nprint(fun(out={c}))"
+        output = a * c
+    elif kind == 1:
+        code = f"my_list = [{a}, {b}, {c}, {a + b}]\nprint(my_list[-{c - 1}:])"
+        output = [a, b, c, a + b][-(c - 1):]
+    elif kind == 2:
+        code = f"x = {a}\nwhile x < {a + 3 * b}:\n    x += {b}\nprint(x)"
+        x = a
+        while x < a + 3 * b:
+            x += b
+        output = x
+    elif kind == 3:
+        code = f"d = {{'a': {a}, 'b': {b}}}\nfor key in d:\n    d[key] *= {c}\nprint(d['b'])"
+        output = b * c
+    else:
+        code = f"try:\n    print({a} / ({b} - {b}))\nexcept ZeroDivisionError:\n    print({c})"
+        output = c
+    return code, str(output)
+
+
+class CorpusGenerator:
+    """Generates exam data with realistic questions, ids and duplicates."""
+
+    def __init__(self, seed=0, duplicate_rate=0.1, multi_select_rate=0.1, duplicate_pool=2000):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int): Random seed; the same seed gives the same corpus
+            duplicate_rate (float): Share of questions copied from earlier exams
+            multi_select_rate (float): Share of new questions that are multi-select
+            duplicate_pool (int): Number of recent questions duplicates are drawn from
+        """
+        self.rng = random.Random(seed)
+        self.duplicate_rate = duplicate_rate
+        self.multi_select_rate = multi_select_rate
+        self.duplicate_pool = duplicate_pool
+        self.pool = []
+        self.next_exam_id = 11000
+        self.next_question_id = 65000
+        self.next_option_id = 246000
+        self.next_section_id = 3000
+        self.stats = {'exams': 0, 'questions': 0, 'code_snippets': 0, 'multi_select': 0, 'duplicates': 0}
+
+    def _content(self):
+        """New question content: (stem HTML, option HTML list, multi-select)."""
+        rng = self.rng
+        kind = rng.random()
+
+        if kind < 0.35:
+            code, output = _snippet(rng)
+            self.stats['code_snippets'] += 1
+            stem = f"<p>What is the output of the following snippet?</p>\n\n<code class=\"codep\">{code}\n\n</code>\n<br>"
+            wrong = {output + '0', output[::-1] + '1', 'the code is erroneous', 'None'} - {output}
+            options = [f"<p><code >{output}</code></p>"] + [f"<p>{value}</p>" for value in sorted(wrong)[:3]]
+            return stem, options, False
+
+        if kind < 0.55:
+            operator, meaning = rng.choice(OPERATORS)
+            stem = f"<p>The <code >{operator}</code> operator:</p>"
+            options = [f"<p>{meaning}</p>"] + [f"<p>{value}</p>" for value in rng.sample(OPERATOR_DISTRACTORS, 2)]
+            return stem, options, False
+
+        topic = rng.choice(TOPICS)
+        option_count = rng.choice((3, 4, 4, 5))
+        options = [f"<p>{statement}</p>" for statement in rng.sample(STATEMENTS, option_count)]
+        if rng.random() < self.multi_select_rate:
+            self.stats['multi_select'] += 1
+            phrase = rng.choice(MULTI_SELECT_PHRASES).format(count=rng.choice(NUMBERS[1:]))
+            return f"<p>What is <u>true</u> about {topic}? {phrase}</p>", options, True
+        return f"<p>Only one of the following statements about {topic} is <u>true</u> - which one?</p>", options, False
+
+    def _variant(self, content):
+        """A duplicate of earlier content, exact or with cosmetic differences."""
+        stem, options, multi = content
+        kind = self.rng.random()
+        if kind < 0.4:
+            options = self.rng.sample(options, len(options))
+        elif kind < 0.6:
+            stem = stem.replace('<p>', '<p><span>', 1).replace('</p>', '</span></p>', 1)
+        return stem, options, multi
+
+    def question(self, section_id):
+        """Generate one question in the export format."""
+        if self.pool and self.rng.random() < self.duplicate_rate:
+            stem, options, multi = self._variant(self.rng.choice(self.pool))
+            self.stats['duplicates'] += 1
+        else:
+            stem, options, multi = self._content()
+            self.pool.append((stem, options, multi))
+            if len(self.pool) > self.duplicate_pool:
+                self.pool.pop(0)
+
+        question_id = self.next_question_id
+        self.next_question_id += 1
+        option_rows = []
+        for option in options:
+            option_rows.append({'id': self.next_option_id, 'option': option})
+            self.next_option_id += 1
+
+        self.stats['questions'] += 1
+        return {
+            'id': question_id, 'question': stem,
+            'type': 'Multiple Choice' if multi else 'Single Choice',
+            'htmlType': 'checkbox' if multi else 'radio',
+            'optionsText': None, 'options': option_rows, 'shuffleOptions': True,
+            'timeLimitInMinutes': 0, 'timeLimitInSeconds': 0, 'timeWarningInMinutes': 0, 'timeWarningInSeconds': 0,
+            'audioSrc': None, 'audioPlayLimit': 0, 'maxResponses': None, 'sectionId': section_id
+        }
+
+    def exam(self, question_count):
+        """Generate one exam in the export format."""
+        exam = dict(EXAM_TEMPLATE)
+        exam['id'] = self.next_exam_id
+        self.next_exam_id += 1
+        section_id = self.next_section_id
+        self.next_section_id += 1
+
+        exam['timeLimitInMinutes'] = max(15, question_count // 2)
+        exam['questions'] = [self.question(section_id) for _ in range(question_count)]
+        self.stats['exams'] += 1
+        return exam
+
+    def file_name(self, index):
+        """Name modeled on the real exports, e.g. 'PE1 -- Module 3 Quiz_s000042_v1'."""
+        kind = EXAM_KINDS[index % len(EXAM_KINDS)]
+        module = index // len(EXAM_KINDS) % 4 + 1
+        return f"PE1 -- Module {module} {kind}_s{index:06d}_v1"
+
+
+def saved_page(exam):
+    """Wrap exam data in a saved exam page."""
+    return ("<!DOCTYPE html>\n<html>\n<head><title>Exam</title></head>\n<body>\n"
+            "<div id=\"app\"></div>\n<script>\n"
+            f"    let data = {json.dumps(exam)};\n"
+            "    window.app = new ExamApp(data);\n</script>\n</body>\n</html>\n")
+
+
+def generate_corpus(output_dir, total_questions, questions_per_exam=60, html_ratio=0.25, seed=0,
+                    duplicate_rate=0.1, multi_select_rate=0.1):
+    """
+    Write a corpus of exam files.
+
+    Args:
+        output_dir (str or Path): Directory for the files (created if missing)
+        total_questions (int): Questions across all files
+        questions_per_exam (int): Questions per file (the last file may have fewer)
+        html_ratio (float): Share of files written as saved HTML pages
+        seed (int): Random seed
+        duplicate_rate (float): Share of questions copied from earlier exams
+        multi_select_rate (float): Share of new questions that are multi-select
+
+    Returns:
+        tuple: (list of written paths, generator stats dict)
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    generator = CorpusGenerator(seed=seed, duplicate_rate=duplicate_rate, multi_select_rate=multi_select_rate)
+    layout = random.Random(seed + 1)
+
+    paths = []
+    remaining = total_questions
+    index = 0
+    while remaining > 0:
+        count = min(questions_per_exam, remaining)
+        exam = generator.exam(count)
+        name = generator.file_name(index)
+        if layout.random() < html_ratio:
+            path = output_dir / f"{name}.html"
+            path.write_text(saved_page(exam), encoding='utf-8')
+        else:
+            path = output_dir / f"{name}.json"
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(exam, f, indent=2, ensure_ascii=False)
+        paths.append(path)
+        remaining -= count
+        index += 1
+
+    return paths, generator.stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic PCEP exam corpus")
+    parser.add_argument('output_dir')
+    parser.add_argument('--questions', type=int, default=1000, help="total questions (default: 1000)")
+    parser.add_argument('--per-exam', type=int, default=60, help="questions per exam file (default: 60)")
+    parser.add_argument('--html-ratio', type=float, default=0.25, help="share of saved HTML pages (default: 0.25)")
+    parser.add_argument('--duplicate-rate', type=float, default=0.1, help="share of duplicated questions")
+    parser.add_argument('--multi-select-rate', type=float, default=0.1, help="share of multi-select questions")
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    paths, stats = generate_corpus(args.output_dir, args.questions, args.per_exam, args.html_ratio, args.seed,
+                                   args.duplicate_rate, args.multi_select_rate)
+    print(f"✅ Wrote {len(paths)} files to {args.output_dir}")
+    print(f"   {stats['questions']:,} questions, {stats['code_snippets']:,} with code snippets, "
+          f"{stats['multi_select']:,} multi-select, {stats['duplicates']:,} duplicates")
+
+
+if __name__ == "__main__":
+    main()
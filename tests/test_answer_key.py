@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the answer-key bitmask index and multi-select grading.
+
+Usage:
+    python -m pytest tests/test_answer_key.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from answer_key import AnswerKeyIndex
+from database import Base
+from exam_sessions import create_exam_session, submit_responses
+from models import Answer, Exam, Question, UserResponse
+
+MULTI_SELECT = json.dumps({'type': 'multi-select', 'required_answers': 2, 'confidence': 0.9})
+
+
+def make_session():
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    return engine, sessionmaker(bind=engine)()
+
+
+def add_question(session, exam_id, correct, metadata='{}', options=4):
+    """A question whose answers at the ``correct`` positions are marked correct; returns answer ids."""
+    question = Question(text="Which?", exam_id=exam_id, question_metadata=metadata)
+    session.add(question)
+    session.flush()
+    # Inserted out of display order: positions follow answer_order, not ids
+    answers = [Answer(text=f"Option {j}", is_correct=j in correct, question_id=question.id, answer_order=j)
+               for j in reversed(range(options))]
+    session.add_all(answers)
+    session.flush()
+    return question.id, [answer.id for answer in reversed(answers)]
+
+
+def test_bitmask_grading_without_the_orm():
+    """Keys are bitmasks over answer_order; a selection is correct only if it matches exactly."""
+    engine, session = make_session()
+    exam = Exam(title="Module 2")
+    session.add(exam)
+    session.flush()
+    single, single_answers = add_question(session, exam.id, {2})
+    multi, multi_answers = add_question(session, exam.id, {0, 3}, metadata=MULTI_SELECT)
+    unkeyed, unkeyed_answers = add_question(session, exam.id, set())
+    session.commit()
+
+    index = AnswerKeyIndex.build(session)
+    assert len(index) == 3 and 999 not in index
+    assert index.key(single) == (0b0100, 1) and index.key(multi) == (0b1001, 2) and index.key(unkeyed) == (0, 1)
+
+    statements = []
+    event.listen(engine, 'before_cursor_execute', lambda *args: statements.append(args[2]))
+    selections = [(single, index.selection_mask(single, [single_answers[2]])),
+                  (single, index.selection_mask(single, [single_answers[1]])),
+                  (multi, index.selection_mask(multi, [multi_answers[3], multi_answers[0]])),
+                  (multi, index.selection_mask(multi, [multi_answers[0]])),
+                  (multi, index.selection_mask(multi, multi_answers)),
+                  (unkeyed, index.selection_mask(unkeyed, [unkeyed_answers[0]])),
+                  (999, 1)]
+    assert index.grade(selections) == [True, False, True, False, False, False, False]
+    assert index.score(selections) == 2
+    assert not statements
+
+    try:
+        index.selection_mask(single, [multi_answers[0]])
+        assert False, "answers of another question are rejected"
+    except ValueError:
+        pass
+
+    # A corrected key is picked up by reloading the exam
+    session.execute(update(Answer).where(Answer.id == unkeyed_answers[1]).values(is_correct=True))
+    session.commit()
+    assert index.load(session, exam_ids=[exam.id]) == 3
+    assert index.is_correct(unkeyed, index.selection_mask(unkeyed, [unkeyed_answers[1]]))
+
+
+def test_multi_select_session_submission():
+    """Sessions grade multi-select responses from 'answer_ids' and keep the full selection."""
+    _, session = make_session()
+    exam = Exam(title="Module 3", total_questions=2)
+    session.add(exam)
+    session.flush()
+    single, single_answers = add_question(session, exam.id, {1})
+    multi, multi_answers = add_question(session, exam.id, {0, 2}, metadata=MULTI_SELECT)
+    session.commit()
+
+    exam_session = create_exam_session(session, question_ids=[single, multi])
+    result = submit_responses(session, exam_session['id'], [
+        {'question_id': single, 'answer_id': single_answers[1]},
+        {'question_id': multi, 'answer_ids': [multi_answers[2], multi_answers[0]]}
+    ])
+    assert result['correct_answers'] == 2 and result['score'] == 100.0
+
+    stored = session.query(UserResponse).filter_by(question_id=multi).one()
+    assert stored.is_correct and stored.get_response_data() == {'answer_ids': [multi_answers[2], multi_answers[0]]}
+
+
+if __name__ == "__main__":
+    test_bitmask_grading_without_the_orm()
+    test_multi_select_session_submission()
+    print("✅ All answer key tests passed")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for importing exam files straight out of zip, tar.gz and gz archives.
+
+Usage:
+    python -m pytest tests/test_archive_import.py
+"""
+
+import gzip
+import io
+import json
+import sys
+import tarfile
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Answer, Exam, ExamQuestion, Question
+from ingest.formats import ContainerReader
+from ingest.pipeline import ConverterPipeline, DatabaseSink, ExamSink
+
+MODELS = {'Exam': Exam, 'Question': Question, 'Answer': Answer, 'ExamQuestion': ExamQuestion}
+
+
+class CollectingSink(ExamSink):
+    def write_exam(self, exam, rows):
+        self.results.append((exam['source_file'], len(list(rows))))
+
+
+def make_exam(exam_id, count):
+    return {'id': exam_id, 'timeLimitInMinutes': 30,
+            'questions': [{'id': 100 * exam_id + i, 'question': f"<p>Exam {exam_id} question {i}?</p>",
+                           'options': [{'id': j, 'option': f"<p>{j}</p>"} for j in range(4)]} for i in range(count)]}
+
+
+def page(exam):
+    return f"<html><script>let data = {json.dumps(exam)};</script></html>".encode()
+
+
+def write_tar(path, members):
+    with tarfile.open(path, 'w:gz') as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+
+
+def test_members_are_streamed_and_deduplicated():
+    """Exams in zip, tar.gz and gz archives are extracted once per distinct content."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        with zipfile.ZipFile(tmp / 'batch_a.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr('exams/module1.html', page(make_exam(1, 3)))
+            archive.writestr('exams/module1_copy.html', page(make_exam(1, 3)))
+            archive.writestr('exams/module2.json', json.dumps(make_exam(2, 2)))
+            archive.writestr('exams/notes.txt', "not an exam")
+        # Re-export of module 2 plus a new exam
+        write_tar(tmp / 'batch_b.tar.gz', {'module2.json': json.dumps(make_exam(2, 2)).encode(),
+                                           'module3.html': page(make_exam(3, 4))})
+        (tmp / 'module4.json.gz').write_bytes(gzip.compress(json.dumps(make_exam(4, 1)).encode()))
+
+        pipeline = ConverterPipeline(CollectingSink(), exam_normalizer=None, enrichers=(), validator=None)
+        results = pipeline.run([tmp])
+
+        assert results == [(f"{tmp / 'batch_a.zip'}/exams/module1.html", 3),
+                           (f"{tmp / 'batch_a.zip'}/exams/module2.json", 2),
+                           (f"{tmp / 'batch_b.tar.gz'}/module3.html", 4),
+                           (f"{tmp / 'module4.json.gz'}/module4.json", 1)]
+        assert [(Path(d['source_file']).name, Path(d['duplicate_of']).name) for d in pipeline.duplicates] == \
+            [('module1_copy.html', 'module1.html'), ('module2.json', 'module2.json')]
+        assert not pipeline.errors
+
+
+def test_archive_import_into_database():
+    """Archive members go through the same validate/load stages; a truncated archive keeps earlier members."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine, autoflush=False)()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive_path = Path(tmp_dir) / 'exports.tar.gz'
+        write_tar(archive_path, {'a.json': json.dumps(make_exam(5, 3)).encode(),
+                                 'b.json': json.dumps(make_exam(6, 2)).encode()})
+        truncated = Path(tmp_dir) / 'partial.tar.gz'
+        write_tar(truncated, {'c.json': json.dumps(make_exam(7, 2)).encode(), 'd.bin': bytes(range(256)) * 400})
+        truncated.write_bytes(truncated.read_bytes()[:-200])
+
+        pipeline = ConverterPipeline(DatabaseSink(session, MODELS))
+        results = pipeline.run([archive_path, truncated])
+
+    assert [r['questions'] for r in results] == [3, 2, 2]
+    assert session.query(Exam).count() == 3 and session.query(Question).count() == 7
+    assert [Path(error['source_file']).name for error in pipeline.errors] == ['partial.tar.gz']
+
+
+def test_oversized_members_are_reported_not_read():
+    """Members over the uncompressed size limit become errors; the rest of the archive still imports."""
+    small = json.dumps(make_exam(8, 1)).encode()
+    # Compresses to a few KB, far over the limit once inflated
+    bomb = b'{"questions": [' + b' ' * 200000 + b']}'
+    limit = ContainerReader.max_member_bytes
+    ContainerReader.max_member_bytes = 10000
+    try:
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp = Path(tmp_dir)
+            with zipfile.ZipFile(tmp / 'bomb.zip', 'w', zipfile.ZIP_DEFLATED) as archive:
+                archive.writestr('big.json', bomb)
+                archive.writestr('small.json', small)
+            write_tar(tmp / 'bomb.tar.gz', {'big.json': bomb})
+            (tmp / 'big.json.gz').write_bytes(gzip.compress(bomb))
+
+            pipeline = ConverterPipeline(CollectingSink(), exam_normalizer=None, enrichers=(), validator=None)
+            results = pipeline.run([tmp])
+    finally:
+        ContainerReader.max_member_bytes = limit
+
+    assert results == [(f"{tmp / 'bomb.zip'}/small.json", 1)]
+    assert sorted(Path(error['source_file']).relative_to(tmp).as_posix() for error in pipeline.errors) == \
+        ['big.json.gz/big.json', 'bomb.tar.gz/big.json', 'bomb.zip/big.json']
+    assert all('larger than 10000 bytes' in error['error'] for error in pipeline.errors)
+
+
+if __name__ == "__main__":
+    test_members_are_streamed_and_deduplicated()
+    test_archive_import_into_database()
+    test_oversized_members_are_reported_not_read()
+    print("✅ All archive import tests passed")
@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for the BulkExamLoader set-based exam import.
+
+Usage:
+    python -m pytest tests/test_bulk_loader.py
+"""
+
+import json
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Exam, Question, Answer
+from ingest.bulk_loader import BulkExamLoader
+
+MODELS = {'Exam': Exam, 'Question': Question, 'Answer': Answer}
+
+
+def make_session():
+    """Create a session on a fresh in-memory database."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def sample_questions(count, answers_per_question=4):
+    """Build loader rows for ``count`` questions."""
+    return [
+        {
+            'original_id': str(1000 + i),
+            'text': f"<p>Question {i}?</p>",
+            'question_order': i + 1,
+            'question_metadata': json.dumps({'type': 'single-select'}),
+            'answers': [
+                {'text': f"Option {j}", 'is_correct': j == 0, 'answer_order': j + 1}
+                for j in range(answers_per_question)
+            ]
+        }
+        for i in range(count)
+    ]
+
+
+def test_load_exam_links_answers_to_questions():
+    """Answers must reference the pre-assigned question ids."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS, batch_size=7)
+
+    exam_id = loader.load_exam({'title': 'Bulk Exam', 'total_questions': 25}, sample_questions(25))
+
+    questions = session.query(Question).filter(Question.exam_id == exam_id).order_by(Question.question_order).all()
+    assert len(questions) == 25
+    assert all(len(q.answers) == 4 for q in questions)
+    assert questions[3].answers[0].text == "Option 0"
+    assert questions[0].get_correct_answer().answer_order == 1
+    assert json.loads(questions[0].question_metadata)['type'] == 'single-select'
+    assert questions[0].created_at is not None
+    assert loader.stats['questions_inserted'] == 25
+    assert loader.stats['answers_inserted'] == 100
+
+
+def test_second_exam_continues_key_sequence():
+    """Keys assigned for a second exam must not collide with the first."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS)
+
+    first = loader.load_exam({'title': 'First'}, sample_questions(3))
+    second = loader.load_exam({'title': 'Second'}, sample_questions(3))
+
+    assert first != second
+    assert session.query(Question).count() == 6
+    assert session.query(Answer).count() == 24
+
+
+def test_find_existing_original_ids():
+    """Duplicate check is one set lookup instead of a query per question."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS)
+    loader.load_exam({'title': 'Existing'}, sample_questions(2))
+
+    existing = loader.find_existing_original_ids([1000, '1001', 5555, None])
+
+    assert existing == {'1000', '1001'}
+
+
+def test_bad_question_is_rejected_without_failing_the_exam():
+    """A question the database refuses is reported; the rest of its batch is still written."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS, batch_size=4)
+    questions = sample_questions(10)
+    questions[5]['text'] = None  # NOT NULL
+
+    exam_id = loader.load_exam({'title': 'Partly Bad'}, questions)
+
+    stored = session.query(Question).filter(Question.exam_id == exam_id).order_by(Question.question_order).all()
+    assert [q.original_id for q in stored] == [str(1000 + i) for i in range(10) if i != 5]
+    assert all(len(q.answers) == 4 for q in stored)
+    assert session.query(Answer).count() == 36
+    assert loader.stats['questions_inserted'] == 9 and loader.stats['questions_rejected'] == 1
+    assert [(r['exam_id'], r['position'], r['original_id']) for r in loader.rejected] == [(exam_id, 6, '1005')]
+    assert 'NOT NULL' in loader.rejected[0]['error']
+
+    # A failing exam only rolls back its own savepoint, not the caller's pending work
+    session.add(Exam(title='Pending'))
+    session.flush()
+    try:
+        loader.load_exam({'title': None}, sample_questions(2), commit=False)
+        assert False, "exam without a title must fail"
+    except Exception:
+        pass
+    session.commit()
+    assert sorted(exam.title for exam in session.query(Exam)) == ['Partly Bad', 'Pending']
+
+
+def test_large_exam_commits_in_chunks():
+    """With commit_every the exam is committed between batches with contiguous keys."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS, batch_size=5, commit_every=5)
+
+    exam_id = loader.load_exam({'title': 'Huge'}, iter(sample_questions(12)))
+
+    assert loader.stats['commits'] == 3
+    ids = [q.id for q in session.query(Question).filter(Question.exam_id == exam_id).order_by(Question.id)]
+    assert ids == list(range(ids[0], ids[0] + 12))
+    assert session.query(Answer).count() == 48
+
+
+if __name__ == "__main__":
+    test_load_exam_links_answers_to_questions()
+    test_second_exam_continues_key_sequence()
+    test_find_existing_original_ids()
+    test_bad_question_is_rejected_without_failing_the_exam()
+    test_large_exam_commits_in_chunks()
+    print("✅ All bulk loader tests passed")
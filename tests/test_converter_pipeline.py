@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the streaming converter pipeline and its sinks.
+
+Usage:
+    python -m pytest tests/test_converter_pipeline.py
+"""
+
+import importlib.util
+import json
+import sys
+import tempfile
+from itertools import chain
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Exam, Question, Answer, ExamQuestion
+from ingest import pipeline as pipeline_module
+from ingest.pipeline import (ConverterPipeline, DatabaseSink, JSONLSink, JSONSink, enrich_records, iter_exam_records,
+                             keep_source, normalize_records)
+from ingest.question_bank import QuestionBankSink
+
+MODELS = {'Exam': Exam, 'Question': Question, 'Answer': Answer, 'ExamQuestion': ExamQuestion}
+
+
+def make_session():
+    """Create a session on a fresh in-memory database."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def make_exam(exam_id, count, start=0):
+    """Exam data in the export format: questions between other top-level keys."""
+    return {
+        'id': exam_id,
+        'timeLimitInMinutes': 45,
+        'questions': [
+            {'id': 1000 + i, 'question': f"<p>Question {i}? (Select two answers)</p>", 'type': 'Multiple Choice',
+             'options': [{'id': 5000 + i * 10 + j, 'option': f"<p>Option {j} é</p>"} for j in range(4)]}
+            for i in range(start, start + count)
+        ],
+        'sections': [{'id': 1, 'title': None}]
+    }
+
+
+def write_sources(directory, exams):
+    """Write exams as a JSON export and a saved HTML page; return the paths."""
+    paths = []
+    for i, exam in enumerate(exams):
+        if i % 2:
+            path = Path(directory) / f"exam_{i}.html"
+            path.write_text(f"<html><script>let data = {json.dumps(exam)};</script></html>", encoding='utf-8')
+        else:
+            path = Path(directory) / f"exam_{i}.json"
+            path.write_text(json.dumps(exam), encoding='utf-8')
+        paths.append(path)
+    return paths
+
+
+def test_database_sink_streams_exams_in_batches():
+    """Rows reach the loader in batches with multi-answer metadata and fingerprints."""
+    session = make_session()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths = write_sources(tmp_dir, [make_exam(1, 7), make_exam(2, 5, start=5)])
+        broken = Path(tmp_dir) / "broken.json"
+        broken.write_text('{"questions": [', encoding='utf-8')
+
+        pipeline = ConverterPipeline(DatabaseSink(session, MODELS, batch_size=3))
+        results = pipeline.run(paths + [broken])
+
+    assert [r['questions'] for r in results] == [7, 5]
+    assert len(pipeline.errors) == 1 and pipeline.errors[0]['source_file'] == str(broken)
+
+    exam = session.query(Exam).filter(Exam.title == "PCEP Exam - exam_0").one()
+    assert exam.time_limit == 45 and exam.total_questions == 7
+    first = session.query(Question).filter(Question.original_id == '1000').one()
+    assert json.loads(first.question_metadata)['required_answers'] == 2
+    assert len(first.answers) == 4 and first.answers[0].text == "<p>Option 0 é</p>"
+
+    # Questions 5 and 6 are shared, so the second exam links to the first copies
+    assert session.query(Question).count() == 10
+    assert session.query(ExamQuestion).filter(ExamQuestion.exam_id == results[1]['exam_id']).count() == 5
+
+    # Running again skips the exams by title
+    rerun = ConverterPipeline(DatabaseSink(session, MODELS)).run(paths)
+    assert all(r['skipped'] for r in rerun)
+
+
+def test_json_sink_matches_json_dump():
+    """The streamed JSON file is byte-identical to json.dump(indent=2) of the source."""
+    exam = make_exam(3, 4)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        html_path = write_sources(tmp_dir, [{}, exam])[1]
+        pipeline = ConverterPipeline(JSONSink(Path(tmp_dir) / 'out'), normalizer=keep_source, exam_normalizer=None,
+                                     enrichers=(), validator=None)
+        results = pipeline.run([html_path])
+
+        written = Path(results[0]['output_file'])
+        assert written.name == "exam_1.json"
+        assert written.read_text(encoding='utf-8') == json.dumps(exam, indent=2, ensure_ascii=False)
+
+        lines_sink = JSONLSink(Path(tmp_dir) / 'lines')
+        lines_sink.write(pipeline.process(iter_exam_records(exam, 'exam_1.html')))
+        lines = (Path(tmp_dir) / 'lines' / 'exam_1.jsonl').read_text(encoding='utf-8').splitlines()
+        assert json.loads(lines[0]) == {'id': 3, 'timeLimitInMinutes': 45, 'sections': [{'id': 1, 'title': None}]}
+        assert [json.loads(line) for line in lines[1:]] == exam['questions']
+
+
+def test_multi_answer_detection_is_batched_per_exam():
+    """The enrich stage runs one detect_batch call per batch of one exam's questions."""
+    exam = make_exam(5, 3)
+    exam['questions'][2]['question'] = "<p>What does len('ab') return?</p>"
+    records = chain(iter_exam_records(exam, 'a.json'), iter_exam_records(make_exam(6, 2), 'b.json'))
+
+    detector = pipeline_module._multi_answer_detector
+    calls = []
+    original = detector.detect_batch
+
+    def counting_detect_batch(questions):
+        calls.append(list(questions))
+        return original(calls[-1])
+
+    detector.detect_batch = counting_detect_batch
+    try:
+        enriched = list(enrich_records(normalize_records(records), batch_size=2))
+    finally:
+        del detector.detect_batch
+
+    assert [len(batch) for batch in calls] == [2, 1, 2]
+    assert [json.loads(record['row']['question_metadata'])['type'] for record in enriched] == \
+        ['multi-select', 'multi-select', 'single-select', 'multi-select', 'multi-select']
+    assert all(json.loads(record['row']['question_metadata']) ==
+               detector.detect(record['source']['question'], record['source']['options']) for record in enriched)
+
+
+def test_strict_validation_and_question_bank_sink():
+    """Strict mode drops invalid questions; the generated loader module imports cleanly."""
+    exam = make_exam(4, 3)
+    exam['questions'][1]['options'] = exam['questions'][1]['options'][:1]
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        module_path = Path(tmp_dir) / 'questions_dataset.py'
+        sink = QuestionBankSink(module_path, variable='QUESTIONS', css='.highlight { color: red }')
+        pipeline = ConverterPipeline(
+            sink,
+            normalizer=lambda question, position: {'id': question['id'], 'multiple_choice': True, 'hint': None},
+            exam_normalizer=None, enrichers=(), strict=True
+        )
+        results = sink.write(pipeline.process(iter_exam_records(exam, 'exam.json')))
+
+        assert results == [{'output_file': str(module_path), 'data_file': str(module_path.with_suffix('.qbank')),
+                            'questions': 2}]
+        assert pipeline.issues[0]['error'] == "Question 2: Insufficient options (need at least 2)"
+
+        spec = importlib.util.spec_from_file_location('questions_dataset', module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        assert module.get_question_count() == 2
+        assert module.get_question_by_id(1002) == {'id': 1002, 'multiple_choice': True, 'hint': None}
+        assert module.PYGMENTS_CSS == '.highlight { color: red }'
+
+
+if __name__ == "__main__":
+    test_database_sink_streams_exams_in_batches()
+    test_json_sink_matches_json_dump()
+    test_multi_answer_detection_is_batched_per_exam()
+    test_strict_validation_and_question_bank_sink()
+    print("✅ All converter pipeline tests passed")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Tests for the literal-scan embedded exam data extractor.
+
+Usage:
+    python -m pytest tests/test_embedded_data.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.embedded_data import extract_embedded_data, extract_embedded_data_from_file, find_assignment
+
+EXAM = {
+    'id': 42,
+    'questions': [
+        {'id': 1, 'question': '<code>d = {"a": 1};\nprint(d)</code>', 'options': ['{"a": 1}', 'None']},
+        {'id': 2, 'question': 'Which loop ends with };?', 'options': ['for', 'while']}
+    ]
+}
+
+
+def make_page(before='', after=''):
+    """Build a saved exam page around the embedded data assignment."""
+    return (f"<html><head><script>{before}</script></head><body>\n"
+            f"<script>\n  let data = {json.dumps(EXAM)};\n  render(data);\n{after}</script></body></html>")
+
+
+def test_semicolon_brace_inside_strings():
+    """A '};' inside question text must not end the object early."""
+    assert extract_embedded_data(make_page()) == EXAM
+
+
+def test_skips_similar_names_and_non_json_assignments():
+    """metadata = {...}, data == {...} and JS object literals are not the exam data."""
+    noise = "var metadata = {\"x\": 1}; if (data == {}) {} ; data = {notJson: true}; var data = {\"tag\": 1};"
+    page = make_page(before=noise)
+
+    assert extract_embedded_data(page) == EXAM
+    assert find_assignment("const data={}", 'data') == (11, 'const')
+    assert find_assignment("obj.data = {}", 'data') == (-1, None)
+    assert extract_embedded_data("<html>no data here</html>") is None
+
+
+def test_file_extraction_uses_bytes_scan():
+    """The mmap path returns the same object as the string path, including non-ASCII text."""
+    page = make_page(before="// " + "x" * 100000) + "<!-- été -->"
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / "exam.html"
+        path.write_text(page, encoding='utf-8')
+        empty = Path(tmp_dir) / "empty.html"
+        empty.write_text('', encoding='utf-8')
+
+        assert extract_embedded_data_from_file(path) == EXAM
+        assert extract_embedded_data_from_file(empty) is None
+
+
+if __name__ == "__main__":
+    test_semicolon_brace_inside_strings()
+    test_skips_similar_names_and_non_json_assignments()
+    test_file_extraction_uses_bytes_scan()
+    print("✅ All embedded data extractor tests passed")
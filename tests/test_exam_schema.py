@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Tests for the compiled exam schema validator.
+
+Usage:
+    python -m pytest tests/test_exam_schema.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.pipeline import ConverterPipeline, iter_exam_records
+from ingest.schema import SchemaValidationError, blocking_errors, describe, exam_validator
+
+
+def make_exam(count):
+    """Well-formed exam data in the export format."""
+    return {
+        'id': 7,
+        'timeLimitInMinutes': 45,
+        'questions': [
+            {'id': 100 + i, 'question': f"<p>Question {i}?</p>", 'type': 'Single Choice',
+             'options': [{'id': 1000 + i * 10 + j, 'option': f"<p>Option {j}</p>"} for j in range(4)]}
+            for i in range(count)
+        ]
+    }
+
+
+def test_every_question_and_option_is_checked():
+    """Problems late in the exam are found, with paths and severities."""
+    exam = make_exam(500)
+    exam['questions'][420]['options'][2] = {'id': 5, 'option': 42}
+    exam['questions'][499] = {'id': '', 'question': "<p>Last?</p>", 'answers': ["A"]}
+
+    assert exam_validator.validate(make_exam(500)) == []
+
+    errors = exam_validator.validate(exam)
+    assert [(e['location'], e['code'], e['severity']) for e in errors] == [
+        ('questions[420].options[2].option', 'type', 'error'),
+        ('questions[499].answers', 'min_items', 'warning'),
+        ('questions[499].id', 'empty', 'warning'),
+    ]
+    assert errors[0]['question'] == 420
+    assert describe(errors[0]) == "Question 421: Option 3: 'option' must be str, got int"
+    assert describe(errors[1]) == "Question 500: Insufficient options (need at least 2)"
+    assert blocking_errors(errors) == errors[:1]
+
+
+def test_fail_fast_and_exam_level_errors():
+    """Fail-fast stops at the first error; check() raises it."""
+    exam = make_exam(10)
+    exam['questions'][3] = "not a question"
+    exam['questions'][8]['options'] = None
+
+    errors = exam_validator.validate(exam, fail_fast=True)
+    assert [e['location'] for e in errors] == ['questions[3]']
+    assert len(exam_validator.validate(exam)) == 2
+
+    try:
+        exam_validator.check(exam)
+        raise AssertionError("check() should raise")
+    except SchemaValidationError as e:
+        assert str(e) == "Question 4: Expected dict, got str"
+
+    assert exam_validator.validate({})[0]['message'] == "Missing 'questions' field in exam data"
+    assert exam_validator.validate({'questions': []})[0]['code'] == 'empty'
+    assert exam_validator.validate([])[0]['message'] == "Expected dict, got list"
+
+
+def test_pipeline_drops_questions_with_errors():
+    """Questions with blocking errors never reach a sink; warnings pass outside strict mode."""
+    exam = make_exam(4)
+    exam['questions'][1]['question'] = ['<p>not text</p>']
+    exam['questions'][2]['options'] = exam['questions'][2]['options'][:1]
+
+    pipeline = ConverterPipeline(None, exam_normalizer=None, enrichers=())
+    positions = [record['position'] for record in pipeline.process(iter_exam_records(exam, 'exam.json'))]
+
+    assert positions == [1, 3, 4]
+    assert [(issue['position'], issue['severity'], issue['error']) for issue in pipeline.issues] == [
+        (2, 'error', "Question 2: 'question' must be str, got list"),
+        (3, 'warning', "Question 3: Insufficient options (need at least 2)"),
+    ]
+
+
+if __name__ == "__main__":
+    test_every_question_and_option_is_checked()
+    test_fail_fast_and_exam_level_errors()
+    test_pipeline_drops_questions_with_errors()
+    print("✅ All exam schema tests passed")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Tests for server-side exam sessions and batched response submission.
+
+Usage:
+    python -m pytest tests/test_exam_sessions.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import create_app
+from database import Base
+from answer_key import AnswerKeyIndex
+from exam_sessions import SessionClosed, create_exam_session, submit_responses
+from models import Answer, Exam, ExamQuestion, ExamSession, Module, Question, Topic, UserProgress, UserResponse
+
+
+def add_exam(session, count):
+    """An exam with ``count`` questions of three answers; the second answer is correct."""
+    exam = Exam(title="Module 1 Test", total_questions=count)
+    session.add(exam)
+    session.flush()
+    key = {}
+    for i in range(count):
+        question = Question(text=f"Question {i}?", exam_id=exam.id, question_order=i)
+        session.add(question)
+        session.flush()
+        answers = [Answer(text=f"Option {j}", is_correct=j == 1, question_id=question.id, answer_order=j)
+                   for j in range(3)]
+        session.add_all(answers)
+        session.flush()
+        key[question.id] = [answer.id for answer in answers]
+    session.commit()
+    return exam.id, key
+
+
+def test_batch_submission_uses_a_fixed_number_of_statements():
+    """A 45-question submission is one INSERT plus a handful of lookups, graded from the answer key."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    exam_id, key = add_exam(session, 45)
+    question_ids = list(key)
+
+    exam_session = create_exam_session(session, question_ids=question_ids)
+    assert exam_session['exam_id'] == exam_id and exam_session['total_questions'] == 45
+
+    # 30 right, 10 wrong, 5 skipped; the client's own grading is ignored
+    responses = [{'question_id': qid, 'answer_id': key[qid][1] if i < 30 else key[qid][0] if i < 40 else None,
+                  'time_taken': 12.5, 'is_correct': True} for i, qid in enumerate(question_ids)]
+
+    answer_key = AnswerKeyIndex.build(session)
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    result = submit_responses(session, exam_session['id'], responses, answer_key=answer_key)
+    event.remove(engine, 'before_cursor_execute', count_statement)
+
+    assert len(statements) <= 8
+    assert sum(statement.lstrip().upper().startswith('INSERT') for statement in statements) == 1
+    assert result['recorded'] == result['responses'] == 45
+    assert [r['question_id'] for r in result['results']] == question_ids
+    assert sum(r['is_correct'] for r in result['results']) == result['correct_answers'] == 30
+    assert result['correct_answers'] == 30 and result['score'] == 66.67 and result['is_completed']
+    assert session.query(UserResponse).filter_by(is_skipped=True).count() == 5
+
+    try:
+        submit_responses(session, exam_session['id'], responses[:1])
+        assert False, "a completed session takes no more responses"
+    except SessionClosed:
+        pass
+
+
+def test_sessions_follow_linked_questions():
+    """A quiz starting with a question deduplicated into another exam is recorded against the right exam."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    exam_a, key_a = add_exam(session, 2)
+    exam_b, key_b = add_exam(session, 1)
+    (q1, answers_1), (q2, answers_2) = key_a.items()
+    (q3, answers_3), = key_b.items()
+    # q1 was deduplicated: it keeps exam A's exam_id and is linked to exam B
+    session.add_all([ExamQuestion(exam_id=exam_b, question_id=q1, question_order=0),
+                     ExamQuestion(exam_id=exam_b, question_id=q3, question_order=1)])
+    session.commit()
+
+    listed = create_exam_session(session, question_ids=[q1, q3])
+    assert listed['exam_id'] == exam_b
+    try:
+        submit_responses(session, listed['id'], [{'question_id': q2, 'answer_id': answers_2[1]}])
+        assert False, "a question outside the session is rejected"
+    except ValueError as e:
+        assert str(q2) in str(e)
+
+    whole_exam = create_exam_session(session, exam_id=exam_b)
+    try:
+        submit_responses(session, whole_exam['id'], [{'question_id': q2, 'answer_id': answers_2[1]}])
+        assert False, "a question of another exam is rejected"
+    except ValueError:
+        pass
+    result = submit_responses(session, whole_exam['id'], [{'question_id': q1, 'answer_id': answers_1[1]},
+                                                         {'question_id': q3, 'answer_id': answers_3[1]}])
+    assert result['correct_answers'] == 2 and result['exam_id'] == exam_b
+
+
+def test_session_is_completed_once():
+    """Of two completions racing on one session, the later one is rejected and progress counts once."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'race.db'}")
+        Base.metadata.create_all(engine)
+        factory = sessionmaker(bind=engine)
+        first, second = factory(), factory()
+        exam_id, key = add_exam(first, 1)
+        module = Module(name="Module 1")
+        first.add(module)
+        first.flush()
+        topic = Topic(name="Data types", module_id=module.id)
+        first.add(topic)
+        first.flush()
+        (question_id, answers), = key.items()
+        first.get(Question, question_id).topic_id = topic.id
+        first.commit()
+
+        exam_session = create_exam_session(first, exam_id=exam_id)
+        # The second request has seen the session open before the first one closes it
+        stale = second.get(ExamSession, exam_session['id'])
+        assert not stale.is_completed
+        submit_responses(first, exam_session['id'], [{'question_id': question_id, 'answer_id': answers[1]}])
+        try:
+            submit_responses(second, exam_session['id'], [])
+            assert False, "a session is completed only once"
+        except SessionClosed:
+            pass
+
+        progress = first.query(UserProgress).one()
+        assert (progress.questions_attempted, progress.questions_correct) == (1, 1)
+        first.close()
+        second.close()
+        engine.dispose()
+
+
+def test_session_endpoints():
+    """The quiz opens a session, submits in batches and gets its score; bad input is rejected."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{Path(tmp_dir) / 'pcep_exam.db'}"
+        try:
+            app = create_app()
+        finally:
+            del os.environ['DATABASE_URL']
+        Base.metadata.create_all(app.db_manager.create_engine())
+        client = app.test_client()
+        _, key = add_exam(app.db_manager.get_session(), 4)
+        (q1, a1), (q2, a2), (q3, a3), (q4, _) = [(qid, answers) for qid, answers in key.items()]
+
+        assert client.post('/api/sessions', json={}).status_code == 400
+        created = client.post('/api/sessions', json={'question_ids': [q1, q2, q3, q4]})
+        assert created.status_code == 201
+        session_id = created.get_json()['id']
+        url = f'/api/sessions/{session_id}/responses'
+
+        assert client.post(url, json={'responses': [{'question_id': q1, 'answer_id': a2[1]}]}).status_code == 400
+        assert client.post('/api/sessions/999/responses', json={'responses': []}).status_code == 404
+
+        partial = client.post(url, json={'responses': [{'question_id': q1, 'answer_id': a1[1]}], 'complete': False})
+        assert partial.status_code == 200 and not partial.get_json()['is_completed']
+        assert client.post(url, json={'responses': [{'question_id': q1, 'answer_id': a1[0]}]}).status_code == 400
+
+        done = client.post(url, json={'responses': [{'question_id': q2, 'answer_id': a2[1], 'time_taken': 20},
+                                                    {'question_id': q3, 'answer_id': a3[2]},
+                                                    {'question_id': q4, 'answer_id': None}]}).get_json()
+        assert done['is_completed'] and done['correct_answers'] == 2 and done['score'] == 50.0
+        assert done['results'] == [{'question_id': q2, 'is_correct': True}, {'question_id': q3, 'is_correct': False},
+                                   {'question_id': q4, 'is_correct': False}]
+        assert client.post(url, json={'responses': []}).status_code == 409
+
+        session = app.db_manager.get_session()
+        stored = session.get(ExamSession, session_id)
+        assert stored.is_completed and len(stored.user_responses) == 4
+        session.close()
+
+
+if __name__ == "__main__":
+    test_batch_submission_uses_a_fixed_number_of_statements()
+    test_sessions_follow_linked_questions()
+    test_session_is_completed_once()
+    test_session_endpoints()
+    print("✅ All exam session tests passed")
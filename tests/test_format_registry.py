@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Tests for the format reader registry and byte-level format sniffing.
+
+Usage:
+    python -m pytest tests/test_format_registry.py
+"""
+
+import gzip
+import json
+import sys
+import tempfile
+import zipfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.formats import FormatReader, FormatRegistry, HTMLReader, JSONReader, detect_format, read_exam, registry
+from ingest.jsonl_format import write_exam_jsonl
+from ingest.pipeline import extract_records
+
+EXAM = {'id': 7, 'questions': [{'id': 1, 'question': "<p>Q?</p>", 'options': [{'id': 2, 'option': "A"}]}]}
+PAGE = f"<!DOCTYPE html>\n<html><script>let data = {json.dumps(EXAM)};</script></html>"
+
+
+def test_detection_by_extension_and_leading_bytes():
+    """Known extensions decide without reading; otherwise the first bytes do."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tmp = Path(tmp_dir)
+        (tmp / 'exam.json').write_text(PAGE, encoding='utf-8')
+        (tmp / 'export').write_bytes(b'\xef\xbb\xbf\n  ' + json.dumps(EXAM).encode())
+        (tmp / 'page').write_text(PAGE, encoding='utf-8')
+        (tmp / 'packed').write_bytes(gzip.compress(json.dumps(EXAM).encode()))
+        with zipfile.ZipFile(tmp / 'bundle', 'w') as archive:
+            archive.writestr('exam.html', PAGE)
+        write_exam_jsonl(tmp / 'exam.jsonl', {'id': 7}, EXAM['questions'])
+        # Neither a known extension nor recognizable leading bytes
+        (tmp / 'notes.txt').write_text(f"Saved from the portal: let data = {json.dumps(EXAM)};", encoding='utf-8')
+
+        detected = {name: detect_format(tmp / name).name
+                    for name in ('exam.json', 'export', 'page', 'packed', 'bundle', 'exam.jsonl', 'notes.txt')}
+        assert detected == {'exam.json': 'json', 'export': 'json', 'page': 'html', 'packed': 'gzip',
+                            'bundle': 'zip', 'exam.jsonl': 'jsonl', 'notes.txt': 'html'}
+
+        # Every one of them reads back the same exam, a page with a .json name included
+        for name in detected:
+            exam = read_exam(tmp / name)
+            assert exam == EXAM, name
+
+
+def test_containers_and_custom_formats():
+    """Archive members are read through the registry; registered formats plug into the pipeline."""
+    class YAMLishReader(FormatReader):
+        name = 'exam-text'
+        extensions = ('.exam',)
+        magic = (b'EXAM ',)
+
+        def loads(self, data):
+            exam_id, *questions = data.decode('utf-8').split('\n')
+            return {'id': int(exam_id[5:]), 'questions': [{'id': i, 'question': text}
+                                                           for i, text in enumerate(questions, 1)]}
+
+    custom = FormatRegistry(fallback=HTMLReader())
+    for reader in (custom.fallback, JSONReader(), YAMLishReader()):
+        custom.register(reader)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        archive_path = Path(tmp_dir) / 'exams.zip'
+        with zipfile.ZipFile(archive_path, 'w') as archive:
+            archive.writestr('a.json', json.dumps(EXAM))
+            archive.writestr('b.exam', "EXAM 9\nFirst?\nSecond?")
+            archive.writestr('README.md', "not an exam")
+        custom.register(registry.by_name['zip'])
+
+        exams = dict(custom.iter_exams(archive_path))
+        assert exams == {f"{archive_path}/a.json": EXAM,
+                         f"{archive_path}/b.exam": {'id': 9, 'questions': [{'id': 1, 'question': "First?"},
+                                                                            {'id': 2, 'question': "Second?"}]}}
+        try:
+            custom.read(archive_path)
+            assert False, "an archive with two exams is not a single exam"
+        except ValueError:
+            pass
+
+        plain = Path(tmp_dir) / 'c.data'
+        plain.write_text("EXAM 3\nOnly?", encoding='utf-8')
+        assert custom.detect(plain).name == 'exam-text'
+        records = list(extract_records([plain], reader=custom.read))
+        assert [(record['exam']['data'], record['source']) for record in records] == \
+            [({'id': 3}, {'id': 1, 'question': "Only?"})]
+
+
+if __name__ == "__main__":
+    test_detection_by_extension_and_leading_bytes()
+    test_containers_and_custom_formats()
+    print("✅ All format registry tests passed")
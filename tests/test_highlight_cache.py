@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Tests for import-time syntax highlighting and the snippet cache.
+
+Usage:
+    python -m pytest tests/test_highlight_cache.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app import create_app
+from database import Base
+from models import Exam, Question, Answer, ExamQuestion, HighlightedSnippet
+from ingest.highlight import code_snippet, extract_code_blocks, render_code_blocks, snippet_hash
+from ingest.pipeline import ConverterPipeline, DatabaseSink, iter_exam_records
+
+MODELS = {'Exam': Exam, 'Question': Question, 'Answer': Answer, 'ExamQuestion': ExamQuestion,
+          'HighlightedSnippet': HighlightedSnippet}
+
+SHARED = '<p>What is printed?</p><code class="codep">x = 1\nprint(x &lt; 2)</code>'
+
+
+def make_session():
+    """Create a session on a fresh in-memory database."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def make_exam(exam_id, extra_code):
+    """Exam data whose first question code block is shared between exams."""
+    return {
+        'id': exam_id,
+        'questions': [
+            {'id': exam_id * 100, 'question': SHARED,
+             'options': [{'id': exam_id * 1000, 'option': 'True'}, {'id': exam_id * 1000 + 1, 'option': 'False'}]},
+            {'id': exam_id * 100 + 1, 'question': f'<p>Output?</p><code class="codep">{extra_code}</code>',
+             'options': [{'id': exam_id * 1000 + 2, 'option': '<code class="codep">print(1)</code>'},
+                         {'id': exam_id * 1000 + 3, 'option': 'None'}]}
+        ]
+    }
+
+
+def test_code_block_extraction():
+    """Blocks are unescaped and stripped; questions without code have no snippet."""
+    html = SHARED + '<code class="codep">\n  y = 2  \n</code><code>z = 3</code>'
+
+    assert extract_code_blocks(html) == ['x = 1\nprint(x < 2)', 'y = 2']
+    assert code_snippet(html) == 'x = 1\nprint(x < 2)\n\ny = 2'
+    assert code_snippet('<p>No code here</p>') is None
+
+
+def test_loader_renders_each_distinct_snippet_once():
+    """Shared snippets are rendered at import once and reused by later exams."""
+    session = make_session()
+    exams = [make_exam(1, 'print(len("ab"))'), make_exam(2, 'print(3 // 2)')]
+
+    results = []
+    for i, exam in enumerate(exams):
+        sink = DatabaseSink(session, MODELS)
+        results.extend(sink.write(ConverterPipeline(sink).process(iter_exam_records(exam, f'exam_{i}.json'))))
+
+    assert [r['questions'] for r in results] == [2, 2]
+    # SHARED, two question-specific blocks and the answer block
+    assert session.query(HighlightedSnippet).count() == 4
+    assert session.query(Question).filter(Question.original_id == '100').one().code_snippet == 'x = 1\nprint(x < 2)'
+
+    stored = session.query(HighlightedSnippet).filter(
+        HighlightedSnippet.content_hash == snippet_hash('x = 1\nprint(x < 2)')).one()
+    assert '<span' in stored.html and 'print' in stored.html
+
+
+def test_render_code_blocks_substitutes_known_markup():
+    """Known blocks get the stored markup; unknown blocks are left for the client."""
+    rendered = {snippet_hash('x = 1\nprint(x < 2)'): '<span class="n">x</span>\n'}
+    html = SHARED + '<code class="codep">other()</code>'
+
+    result = render_code_blocks(html, rendered)
+
+    assert '<code class="codep highlighted"><span class="n">x</span></code>' in result
+    assert result.endswith('<code class="codep">other()</code>')
+    assert render_code_blocks(html, {}) == html
+
+
+def test_questions_api_queries_do_not_grow_with_questions():
+    """The practice question list costs the same statements for one exam as for three."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{Path(tmp_dir) / 'pcep_exam.db'}"
+        try:
+            app = create_app()
+        finally:
+            del os.environ['DATABASE_URL']
+        engine = app.db_manager.create_engine()
+        Base.metadata.create_all(engine)
+        client = app.test_client()
+
+        statements = []
+
+        def count_select(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append(statement)
+
+        def import_exam(exam_id):
+            session = app.db_manager.get_session()
+            sink = DatabaseSink(session, MODELS)
+            sink.write(ConverterPipeline(sink).process(
+                iter_exam_records(make_exam(exam_id, f'print({exam_id})'), f'exam_{exam_id}.json')))
+            session.close()
+
+        def selects_for_page():
+            statements.clear()
+            event.listen(engine, 'before_cursor_execute', count_select)
+            questions = client.get('/api/questions').get_json()
+            event.remove(engine, 'before_cursor_execute', count_select)
+            return len(statements), questions
+
+        import_exam(1)
+        small, _ = selects_for_page()
+        import_exam(2)
+        import_exam(3)
+        large, questions = selects_for_page()
+
+        assert small == large
+        # Answer code blocks come highlighted from the same lookup
+        assert any('codep highlighted' in option for question in questions for option in question['options'])
+
+
+if __name__ == "__main__":
+    test_code_block_extraction()
+    test_loader_renders_each_distinct_snippet_once()
+    test_render_code_blocks_substitutes_known_markup()
+    test_questions_api_queries_do_not_grow_with_questions()
+    print("✅ All highlight cache tests passed")
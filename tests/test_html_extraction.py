@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Tests for incremental, atomic HTML to JSON extraction.
+
+Usage:
+    python -m pytest tests/test_html_extraction.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(PROJECT_DIR / 'src'))
+sys.path.insert(0, str(PROJECT_DIR))
+
+from html_to_json_extractor import HTMLToJSONExtractor
+from ingest.pipeline import ConverterPipeline, JSONSink, iter_exam_records, keep_source
+
+
+def make_exam(exam_id, count):
+    return {
+        'id': exam_id,
+        'questions': [{'id': 100 * exam_id + i, 'question': f"<p>Question {i} é?</p>",
+                       'options': [{'id': j, 'option': f"<p>{j}</p>"} for j in range(4)]} for i in range(count)],
+        'sections': []
+    }
+
+
+def write_page(path, exam):
+    path.write_text(f"<html><script>let data = {json.dumps(exam)};</script></html>", encoding='utf-8')
+
+
+def test_compact_output_and_failed_writes_keep_the_old_file():
+    """Compact output matches json.dumps; a write that fails midway leaves the previous file intact."""
+    exam = make_exam(1, 3)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sink = JSONSink(tmp_dir, indent=None)
+        pipeline = ConverterPipeline(sink, normalizer=keep_source, exam_normalizer=None, enrichers=(), validator=None)
+        sink.write(pipeline.process(iter_exam_records(exam, 'exam_1.html')))
+        output = Path(tmp_dir) / 'exam_1.json'
+        assert output.read_text(encoding='utf-8') == json.dumps(exam, ensure_ascii=False)
+
+        def failing_rows():
+            yield exam['questions'][0]
+            raise RuntimeError("interrupted")
+
+        context = {'source_file': 'exam_1.html', 'data': exam, 'key_order': list(exam)}
+        try:
+            JSONSink(tmp_dir).write_exam(context, failing_rows())
+            assert False, "the write must fail"
+        except RuntimeError:
+            pass
+
+        assert output.read_text(encoding='utf-8') == json.dumps(exam, ensure_ascii=False)
+        assert sorted(os.listdir(tmp_dir)) == ['exam_1.json']
+
+
+def test_unchanged_files_are_skipped():
+    """Re-runs skip unchanged and touched files; edits and a format change re-extract."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        html_dir, json_dir = Path(tmp_dir) / 'html', Path(tmp_dir) / 'json'
+        html_dir.mkdir()
+        for exam_id in (1, 2):
+            write_page(html_dir / f'exam_{exam_id}.html', make_exam(exam_id, 2))
+
+        def run(**options):
+            extractor = HTMLToJSONExtractor(html_dir, json_dir, max_workers=1, **options)
+            extractor.process_all_files()
+            return extractor.extracted_count, extractor.skipped_count
+
+        assert run() == (2, 0)
+        assert json.loads((json_dir / 'exam_1.json').read_text(encoding='utf-8')) == make_exam(1, 2)
+
+        # Same content with a new mtime is recognized by its hash
+        stat = (html_dir / 'exam_1.html').stat()
+        os.utime(html_dir / 'exam_1.html', (stat.st_atime, stat.st_mtime + 10))
+        assert run() == (0, 2)
+
+        write_page(html_dir / 'exam_2.html', make_exam(2, 5))
+        assert run() == (1, 1)
+        assert len(json.loads((json_dir / 'exam_2.json').read_text(encoding='utf-8'))['questions']) == 5
+
+        assert run(compact=True) == (2, 0)
+        assert '\n' not in (json_dir / 'exam_1.json').read_text(encoding='utf-8')
+        assert run(compact=True, force=True) == (2, 0)
+
+
+if __name__ == "__main__":
+    test_compact_output_and_failed_writes_keep_the_old_file()
+    test_unchanged_files_are_skipped()
+    print("✅ All HTML extraction tests passed")
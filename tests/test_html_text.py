@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass HTML-to-text normalizer.
+
+Usage:
+    python -m pytest tests/test_html_text.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.html_text import html_to_text, normalize_html
+
+QUESTION = ('<p>Which of the following sentences are <u>true</u> about the code? &nbsp;&nbsp;(Select <u>two</u> answers)</p>'
+            '\n\n<code class="codep">var = 1\nwhile var &lt; 10:\n    print("#")\n    var = var &lt;&lt; 1\n\n</code>\n<br>')
+
+
+def test_text_and_code_listings_in_one_pass():
+    """Prose is collapsed with markdown emphasis; listings keep lines, indentation and entities."""
+    text, code = normalize_html(QUESTION)
+
+    assert text == ("Which of the following sentences are _true_ about the code? (Select _two_ answers)"
+                    "\n\n[CODE_BLOCK_0]")
+    assert code == ['var = 1\nwhile var < 10:\n    print("#")\n    var = var << 1']
+
+    assert html_to_text(QUESTION).endswith('```python\nvar = 1\nwhile var < 10:\n    print("#")\n    var = var << 1\n```')
+
+
+def test_inline_code_entities_and_line_breaks():
+    """Inline code is backticked, escaped operators survive, br starts a new line."""
+    assert html_to_text('<p><code >&lt;&gt;</code></p>') == '`<>`'
+    assert html_to_text('<p>Line one<br>line\n   two</p><p></p><p>Next</p>') == 'Line one\nline two\n\nNext'
+    assert normalize_html('') == ("", [])
+
+
+def test_markup_inside_listings_and_unclosed_blocks():
+    """Tags inside a listing are dropped, a listing left open is still collected."""
+    text, code = normalize_html('<code class="codep">k = d[i]\n<mark>    # Insert</mark></code>'
+                                '<p>Then:</p><code class="codep">print(k)')
+
+    assert text == '[CODE_BLOCK_0]\n\nThen:\n\n[CODE_BLOCK_1]'
+    assert code == ['k = d[i]\n    # Insert', 'print(k)']
+
+
+if __name__ == "__main__":
+    test_text_and_code_listings_in_one_pass()
+    test_inline_code_entities_and_line_breaks()
+    test_markup_inside_listings_and_unclosed_blocks()
+    print("✅ All HTML-to-text tests passed")
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Tests for background import jobs and the /api/imports endpoints.
+
+Usage:
+    python -m pytest tests/test_import_jobs.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from app import create_app
+from database import Base
+from models import Exam, ExamQuestion, ImportManifest, Question
+
+
+def make_exam(exam_id, count):
+    """Exam data in the export format."""
+    return {
+        'id': exam_id,
+        'questions': [
+            {'id': exam_id * 100 + i, 'question': f"<p>Exam {exam_id} question {i}?</p>",
+             'options': [{'id': exam_id * 1000 + i * 10 + j, 'option': f"<p>Option {j}</p>"} for j in range(3)]}
+            for i in range(count)
+        ]
+    }
+
+
+def make_app(tmp_dir):
+    """App on a file database in tmp_dir, importing from tmp_dir/exams."""
+    import_root = Path(tmp_dir) / 'exams'
+    import_root.mkdir()
+    os.environ['DATABASE_URL'] = f"sqlite:///{Path(tmp_dir) / 'pcep_exam.db'}"
+    os.environ['IMPORT_ROOT'] = str(import_root)
+    try:
+        app = create_app()
+    finally:
+        del os.environ['DATABASE_URL'], os.environ['IMPORT_ROOT']
+    Base.metadata.create_all(app.db_manager.create_engine())
+    app.import_jobs.duty_cycle = 1.0
+    return app, import_root
+
+
+def test_import_job_reports_per_file_progress():
+    """A queued job imports its files in the background and reports each outcome."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app, import_root = make_app(tmp_dir)
+        (import_root / 'module_1.json').write_text(json.dumps(make_exam(1, 4)), encoding='utf-8')
+        (import_root / 'module_2.json').write_text(json.dumps(make_exam(2, 3)), encoding='utf-8')
+        (import_root / 'broken.json').write_text('{"questions": [', encoding='utf-8')
+        client = app.test_client()
+
+        response = client.post('/api/imports', json={'files': ['.']})
+        assert response.status_code == 202
+        job_id = response.get_json()['id']
+        assert app.import_jobs.join(timeout=30)
+
+        job = client.get(f'/api/imports/{job_id}').get_json()
+        assert job['status'] == 'completed'
+        assert job['files_total'] == 3 and job['files_done'] == 3 and job['files_failed'] == 1
+        assert job['questions_processed'] == 7 and job['questions_per_second'] > 0
+        files = {Path(entry['path']).name: entry for entry in job['files']}
+        assert files['module_1.json']['status'] == 'imported'
+        assert files['module_1.json']['questions'] == files['module_1.json']['total_questions'] == 4
+        assert files['broken.json']['status'] == 'failed'
+        assert [Path(error['source_file']).name for error in job['errors']] == ['broken.json']
+
+        session = app.db_manager.get_session()
+        assert session.query(Exam).count() == 2 and session.query(Question).count() == 7
+        # Imported questions are added to the answer key for grading
+        assert all(question.id in app.answer_key for question in session.query(Question))
+
+        # Unchanged files are skipped through the import manifest
+        rerun_id = client.post('/api/imports', json={'files': ['module_1.json']}).get_json()['id']
+        assert app.import_jobs.join(timeout=30)
+        rerun = client.get(f'/api/imports/{rerun_id}').get_json()
+        assert rerun['files'][0]['status'] == 'skipped'
+        assert [job['id'] for job in client.get('/api/imports').get_json()] == [rerun_id, job_id]
+
+
+def test_changed_file_reloads_its_exam():
+    """A file that grew is reloaded into the exam it created; unchanged questions keep their rows."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app, import_root = make_app(tmp_dir)
+        source = import_root / 'module_1.json'
+        source.write_text(json.dumps(make_exam(1, 2)), encoding='utf-8')
+        client = app.test_client()
+
+        client.post('/api/imports', json={'files': ['module_1.json']})
+        assert app.import_jobs.join(timeout=30)
+        session = app.db_manager.get_session()
+        exam_id = session.query(Exam.id).scalar()
+        first_ids = {question.id for question in session.query(Question)}
+        session.close()
+
+        source.write_text(json.dumps(make_exam(1, 5)), encoding='utf-8')
+        job_id = client.post('/api/imports', json={'files': ['module_1.json']}).get_json()['id']
+        assert app.import_jobs.join(timeout=30)
+        entry = client.get(f'/api/imports/{job_id}').get_json()['files'][0]
+        assert entry['status'] == 'imported' and entry['exam_id'] == exam_id
+
+        session = app.db_manager.get_session()
+        assert session.query(Exam).count() == 1 and session.query(Question).count() == 5
+        linked = {link.question_id for link in session.query(ExamQuestion).filter_by(exam_id=exam_id)}
+        assert len(linked) == 5 and first_ids < linked
+        manifest = session.query(ImportManifest).one()
+        assert (manifest.status, manifest.exam_id) == ('imported', exam_id)
+        assert all(question.id in app.answer_key for question in session.query(Question))
+        session.close()
+
+        # Another file with the same title is skipped, and not recorded as imported
+        (import_root / 'other').mkdir()
+        (import_root / 'other' / 'module_1.json').write_text(json.dumps(make_exam(2, 3)), encoding='utf-8')
+        job_id = client.post('/api/imports', json={'files': ['other']}).get_json()['id']
+        assert app.import_jobs.join(timeout=30)
+        assert client.get(f'/api/imports/{job_id}').get_json()['files'][0]['status'] == 'skipped'
+        session = app.db_manager.get_session()
+        other = session.query(ImportManifest).filter(ImportManifest.path.like('%other%')).one()
+        assert (other.status, other.exam_id) == ('failed', None) and 'same title' in other.last_error
+        assert session.query(Question).count() == 5
+        session.close()
+
+
+def test_import_request_validation():
+    """Paths must exist below the import folder; unknown jobs are 404."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        app, import_root = make_app(tmp_dir)
+        client = app.test_client()
+
+        assert client.post('/api/imports', json={'files': ['../pcep_exam.db']}).status_code == 400
+        assert client.post('/api/imports', json={'files': ['missing.json']}).status_code == 400
+        assert client.post('/api/imports', json={'files': 'module_1.json'}).status_code == 400
+        # The import folder has no exam files yet
+        assert client.post('/api/imports', json={}).status_code == 400
+        assert client.get('/api/imports/99').status_code == 404
+
+
+if __name__ == "__main__":
+    test_import_job_reports_per_file_progress()
+    test_changed_file_reloads_its_exam()
+    test_import_request_validation()
+    print("✅ All import job tests passed")
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Tests for the content-hash import manifest.
+
+Usage:
+    python -m pytest tests/test_import_manifest.py
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Exam, ImportManifest
+from ingest.manifest import ImportManifestTracker
+
+
+def make_session():
+    """Create a session on a fresh in-memory database."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def write_file(folder, name, content):
+    """Write a small exam file and return its path."""
+    path = os.path.join(folder, name)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    return path
+
+
+def import_all(session, tracker, paths):
+    """Simulate an import run: one exam per selected file."""
+    for path in paths:
+        exam = Exam(title=os.path.basename(path))
+        session.add(exam)
+        session.flush()
+        tracker.record(path, exam.id)
+
+
+def test_second_run_skips_unchanged_files():
+    """Files imported once are skipped on the next run without being re-read."""
+    session = make_session()
+    with tempfile.TemporaryDirectory() as folder:
+        paths = [write_file(folder, f"exam_{i}.json", f'{{"id": {i}}}') for i in range(3)]
+
+        tracker = ImportManifestTracker(session, ImportManifest)
+        selected = tracker.select_files(paths)
+        assert selected == paths
+        import_all(session, tracker, selected)
+
+        rerun = ImportManifestTracker(session, ImportManifest)
+        assert rerun.select_files(paths) == []
+        assert rerun.stats['unchanged'] == 3
+
+
+def test_identical_content_is_imported_once():
+    """Copies of the same bytes share one exam, within a run and across runs."""
+    session = make_session()
+    with tempfile.TemporaryDirectory() as folder:
+        original = write_file(folder, "exam_v1.json", '{"id": 7}')
+        same_run_copy = write_file(folder, "exam_v1 (copy).json", '{"id": 7}')
+
+        tracker = ImportManifestTracker(session, ImportManifest)
+        selected = tracker.select_files([original, same_run_copy])
+        assert selected == [original]
+        import_all(session, tracker, selected)
+
+        entries = {entry.path: entry for entry in session.query(ImportManifest).all()}
+        assert entries[same_run_copy].status == 'duplicate'
+        assert entries[same_run_copy].exam_id == entries[original].exam_id
+
+        later_copy = write_file(folder, "exam_v2.json", '{"id": 7}')
+        rerun = ImportManifestTracker(session, ImportManifest)
+        assert rerun.select_files([original, same_run_copy, later_copy]) == []
+        assert rerun.stats['duplicate'] == 1
+
+
+def test_changed_and_failed_files_are_retried():
+    """Edited files and files whose import failed are selected again."""
+    session = make_session()
+    with tempfile.TemporaryDirectory() as folder:
+        edited = write_file(folder, "edited.json", '{"id": 1}')
+        broken = write_file(folder, "broken.json", '{"id": 2')
+
+        tracker = ImportManifestTracker(session, ImportManifest)
+        tracker.select_files([edited, broken])
+        import_all(session, tracker, [edited])
+        tracker.record(broken, None, error="Invalid JSON")
+
+        write_file(folder, "edited.json", '{"id": 1, "title": "updated"}')
+
+        rerun = ImportManifestTracker(session, ImportManifest)
+        assert sorted(rerun.select_files([edited, broken])) == sorted([edited, broken])
+
+
+if __name__ == "__main__":
+    test_second_run_skips_unchanged_files()
+    test_identical_content_is_imported_once()
+    test_changed_and_failed_files_are_retried()
+    print("✅ All import manifest tests passed")
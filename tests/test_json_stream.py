@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Tests for the incremental exam file reader and streamed pipeline extraction.
+
+Usage:
+    python -m pytest tests/test_json_stream.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.json_stream import iter_exam_stream, read_exam_stream, scan_exam_stream
+from ingest.pipeline import extract_records
+
+
+def make_exam(count):
+    """Exam data with fields before and after the questions, like the exports."""
+    return {
+        'id': 1234567,
+        'timeLimitInMinutes': 45.5,
+        'welcomePageContent': "<p>Good luck, \"candidate\" ✓</p>",
+        'questions': [
+            {'id': 10 + i, 'question': f"<p>Question {i}?</p><pre><code>print({i} ** 2)\n</code></pre>",
+             'options': [{'id': 100 * i + j, 'option': f"<p>Option {j}</p>", 'isCorrect': j == 0}
+                         for j in range(4)]}
+            for i in range(count)
+        ],
+        'sections': [],
+        'classId': 987654321
+    }
+
+
+def test_fields_come_first_then_questions_one_at_a_time():
+    """The stream yields the leading fields, then each question; trailing fields follow."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exam = make_exam(25)
+        path = Path(tmp_dir) / 'exam.json'
+        path.write_text(json.dumps(exam, indent=2, ensure_ascii=False), encoding='utf-8')
+
+        # Tiny chunks split keys, strings and numbers across reads
+        stream = iter_exam_stream(path, chunk_size=7)
+        metadata = next(stream)
+        assert metadata == {key: exam[key] for key in ('id', 'timeLimitInMinutes', 'welcomePageContent')}
+        assert next(stream) == exam['questions'][0]
+        assert list(stream) == exam['questions'][1:]
+        assert metadata['classId'] == 987654321 and metadata['sections'] == []
+
+        scan = scan_exam_stream(path, chunk_size=7)
+        assert scan['question_count'] == 25 and scan['key_order'] == list(exam)
+        assert 'questions' not in scan['metadata']
+
+        loaded = read_exam_stream(path, chunk_size=11)
+        assert loaded == exam and list(loaded) == list(exam)
+
+
+def test_embedded_page_data_is_streamed():
+    """Saved pages are read from the first data assignment that holds JSON."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exam = make_exam(3)
+        path = Path(tmp_dir) / 'exam.html'
+        path.write_text("<html><script>let data = {mode: 'preview'};\n"
+                        f"var data = {json.dumps(exam)};\nconsole.log(data);</script></html>", encoding='utf-8')
+
+        assert read_exam_stream(path, chunk_size=16) == exam
+
+        page = Path(tmp_dir) / 'empty.html'
+        page.write_text("<html><p>No exam here</p></html>", encoding='utf-8')
+        try:
+            read_exam_stream(page)
+            assert False, "a page without data must fail"
+        except ValueError:
+            pass
+
+
+def test_pipeline_streams_large_files():
+    """Above the threshold, extraction yields the same records without loading the file."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        exam = make_exam(12)
+        path = Path(tmp_dir) / 'exam.json'
+        path.write_text(json.dumps(exam), encoding='utf-8')
+        broken = Path(tmp_dir) / 'broken.json'
+        broken.write_text('{"id": 1, "questions": [{"id": 1}, {"id": ', encoding='utf-8')
+
+        loaded = list(extract_records([path], stream_threshold=None))
+        errors = []
+        streamed = list(extract_records([path, broken], errors=errors, stream_threshold=0))
+
+        assert [r['source'] for r in streamed] == [r['source'] for r in loaded]
+        assert [r['position'] for r in streamed] == list(range(1, 13))
+        exam_context = streamed[0]['exam']
+        assert exam_context['question_count'] == 12 and exam_context['key_order'] == list(exam)
+        assert exam_context['data'] == loaded[0]['exam']['data']
+        # The first pass catches the truncated file before any of its questions are emitted
+        assert [Path(error['source_file']).name for error in errors] == ['broken.json']
+
+
+if __name__ == "__main__":
+    test_fields_come_first_then_questions_one_at_a_time()
+    test_embedded_page_data_is_streamed()
+    test_pipeline_streams_large_files()
+    print("✅ All JSON stream tests passed")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Tests for the random-access JSONL exam format and its use in the converter pipeline.
+
+Usage:
+    python -m pytest tests/test_jsonl_format.py
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.jsonl_format import ExamJSONLReader, index_path, read_exam_jsonl, write_exam_jsonl
+from ingest.pipeline import (ConverterPipeline, JSONLSink, extract_records, iter_exam_records, iter_source_files,
+                             keep_source, stream_jsonl_records)
+
+
+def make_questions(count):
+    return [{'id': 100 + i, 'question': f"<p>Question {i}\nwith a line break ✓</p>",
+             'options': [{'id': j, 'option': f"<p>{j}</p>"} for j in range(4)]} for i in range(count)]
+
+
+def test_random_access_and_index_rebuild():
+    """Question N is read through the index; a missing or stale index is rebuilt."""
+    questions = make_questions(10)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'exam.jsonl'
+        assert write_exam_jsonl(path, {'title': "Module 4"}, iter(questions)) == 10
+        assert len(path.read_text(encoding='utf-8').splitlines()) == 11
+
+        with ExamJSONLReader(path) as reader:
+            assert reader.header == {'title': "Module 4"} and len(reader) == 10
+            assert reader.question(7) == questions[7]
+            assert list(reader.iter_questions(3, 6)) == questions[3:6]
+            assert reader.chunks(4) == [(0, 4), (4, 8), (8, 10)]
+            try:
+                reader.question(10)
+                assert False, "out of range"
+            except IndexError:
+                pass
+
+        index_path(path).unlink()
+        assert read_exam_jsonl(path) == {'title': "Module 4", 'questions': questions}
+        assert index_path(path).exists()
+
+        # Appending a question makes the stored index stale
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps({'id': 999}) + '\n')
+        with ExamJSONLReader(path) as reader:
+            assert len(reader) == 11 and reader.question(10) == {'id': 999}
+
+
+def test_pipeline_round_trip():
+    """JSONLSink output is read back by the pipeline, also in ranges, with the exam fields intact."""
+    exam = {'id': 5, 'timeLimitInMinutes': 30, 'questions': make_questions(6)}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        sink = JSONLSink(tmp_dir)
+        pipeline = ConverterPipeline(sink, normalizer=keep_source, exam_normalizer=None, enrichers=(), validator=None)
+        sink.write(pipeline.process(iter_exam_records(exam, 'exam_5.json')))
+        path = Path(tmp_dir) / 'exam_5.jsonl'
+        assert index_path(path).exists()
+
+        errors = []
+        (Path(tmp_dir) / 'empty.jsonl').write_text('', encoding='utf-8')
+        records = list(extract_records(iter_source_files([tmp_dir]), errors=errors))
+        assert [record['source'] for record in records] == exam['questions']
+        assert [record['position'] for record in records] == list(range(1, 7))
+        context = records[0]['exam']
+        assert context['data'] == {'id': 5, 'timeLimitInMinutes': 30} and context['question_count'] == 6
+        assert [Path(error['source_file']).name for error in errors] == ['empty.jsonl']
+
+        chunk = list(stream_jsonl_records(path, start=2, stop=4))
+        assert [(record['position'], record['source']) for record in chunk] == [(3, exam['questions'][2]),
+                                                                                  (4, exam['questions'][3])]
+        assert read_exam_jsonl(path) == exam
+
+
+if __name__ == "__main__":
+    test_random_access_and_index_rebuild()
+    test_pipeline_round_trip()
+    print("✅ All JSONL format tests passed")
@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Tests for the single-pass multi-answer detector.
+
+Usage:
+    python -m pytest tests/test_multi_answer_detector.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.multi_answer import MultiAnswerDetector
+
+detector = MultiAnswerDetector()
+
+
+def test_instruction_patterns():
+    """Explicit instructions set the type, count and pattern confidence."""
+    result = detector.detect("Which of the following are Python keywords? (Select two answers)",
+                             ["def", "class", "hello", "world"])
+    assert result == {'type': 'multi-select', 'required_answers': 2,
+                      'confidence': 0.95, 'detection_method': 'pattern'}
+
+    result = detector.detect("Mark all that apply: Which are valid Python data types?",
+                             ["int", "str", "list", "array"])
+    assert result['required_answers'] == 4
+    assert result['confidence'] == 0.99
+
+    single = detector.detect("What is the output of print('Hello World')?", ["Hello World", "Error"])
+    assert single == {'type': 'single-select', 'required_answers': 1,
+                      'confidence': 1.0, 'detection_method': 'default'}
+
+
+def test_strongest_pattern_wins_regardless_of_position():
+    """A later, stronger instruction beats an earlier, weaker one."""
+    result = detector.detect("What are the values printed? (choose three)")
+    assert result['required_answers'] == 3
+    assert result['confidence'] == 0.98
+
+
+def test_structural_phrasing_overlapping_an_instruction():
+    """Plural phrasing is still seen when an instruction match starts at the same place."""
+    result = detector.detect("Which statements are correct about Python variables?")
+    assert result['type'] == 'multi-select'
+    assert result['required_answers'] == 2
+    assert result['confidence'] == 0.85
+
+
+def test_checkbox_options_and_batch_input_forms():
+    """detect_batch accepts question dicts or (text, options) tuples, in order."""
+    results = detector.detect_batch([
+        {'question': "Pick the valid names:", 'options': ["[] x1", "[] _y", "() 2z"]},
+        ("What does len('abc') return?", ["3", "2"]),
+        {'question': "SELECT TWO ANSWERS"}
+    ])
+
+    assert [r['type'] for r in results] == ['multi-select', 'single-select', 'multi-select']
+    assert results[0]['required_answers'] == 2
+    assert results[0]['detection_method'] == 'structural'
+    assert results[2]['required_answers'] == 2
+
+
+if __name__ == "__main__":
+    test_instruction_patterns()
+    test_strongest_pattern_wins_regardless_of_position()
+    test_structural_phrasing_overlapping_an_instruction()
+    test_checkbox_options_and_batch_input_forms()
+    print("✅ All multi-answer detector tests passed")
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Tests for the memory-mapped question bank format and its generated loader module.
+
+Usage:
+    python -m pytest tests/test_question_bank.py
+"""
+
+import importlib.util
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from ingest.pipeline import ConverterPipeline, iter_exam_records
+from ingest.question_bank import QuestionBank, QuestionBankSink, write_question_bank
+
+
+def make_questions(ids):
+    return [{'id': question_id, 'question': f"Question {question_id} é?", 'multiple_choice': question_id % 3 == 0,
+             'options': [{'id': j, 'text': str(j)} for j in range(4)]} for question_id in ids]
+
+
+def test_lookup_by_id_and_ordered_iteration():
+    """Every id is found through the hash table; iteration keeps order; bad or repeated ids are rejected."""
+    # Ids spaced by the table size land in the same home slot and must probe
+    ids = [7 + 64 * i for i in range(20)] + [-5, 0, 2**40]
+    questions = make_questions(ids)
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = Path(tmp_dir) / 'bank.qbank'
+        assert write_question_bank(path, iter(questions), {'title': "Bank"}) == 23
+
+        with QuestionBank(path) as bank:
+            assert len(bank) == 23 and bank.metadata == {'title': "Bank"}
+            assert list(bank) == questions
+            for question in questions:
+                assert bank.get(question['id']) == question
+            assert bank.get(8) is None and bank.get('7') is None
+
+        for bad_rows in ([{'id': '1'}], [{'id': 1}, {'id': 1}]):
+            try:
+                write_question_bank(path, bad_rows)
+                assert False, f"ids of {bad_rows} must be rejected"
+            except ValueError:
+                pass
+        # The failed writes left the previous bank in place
+        assert len(QuestionBank(path)) == 23
+
+
+def test_generated_loader_module():
+    """The loader module exposes the old helpers without loading the questions on import."""
+    exam = {'id': 1, 'questions': make_questions(range(100, 130))}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        module_path = Path(tmp_dir) / 'questions_dataset.py'
+        sink = QuestionBankSink(module_path, variable='QUESTIONS', css='.highlight { color: red }')
+        pipeline = ConverterPipeline(sink, normalizer=lambda question, position: question, exam_normalizer=None,
+                                     enrichers=(), validator=None)
+        results = sink.write(pipeline.process(iter_exam_records(exam, 'exam.json')))
+        assert results == [{'output_file': str(module_path), 'data_file': str(module_path.with_suffix('.qbank')),
+                            'questions': 30}]
+
+        spec = importlib.util.spec_from_file_location('questions_dataset', module_path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+
+        assert module._bank is None
+        assert module.get_question_by_id(117) == exam['questions'][17]
+        assert module.get_question_by_id(99) is None
+        assert module.get_question_count() == 30
+        assert len(module.get_multiple_choice_questions()) == 10
+        assert module.QUESTIONS == exam['questions']
+        assert module.PYGMENTS_CSS == '.highlight { color: red }'
+
+
+if __name__ == "__main__":
+    test_lookup_by_id_and_ordered_iteration()
+    test_generated_loader_module()
+    print("✅ All question bank tests passed")
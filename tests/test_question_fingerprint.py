@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Tests for normalized question fingerprints and cross-exam question linking.
+
+Usage:
+    python -m pytest tests/test_question_fingerprint.py
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from models import Exam, Question, Answer, ExamQuestion
+from ingest.bulk_loader import BulkExamLoader
+from ingest.fingerprint import normalize_content, question_fingerprint
+
+MODELS = {'Exam': Exam, 'Question': Question, 'Answer': Answer, 'ExamQuestion': ExamQuestion}
+
+
+def make_session():
+    """Create a session on a fresh in-memory database."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine, autoflush=False)()
+
+
+def question_row(text, options, order):
+    """Build a loader row with its fingerprint, first option correct."""
+    return {
+        'original_id': f"{order}",
+        'text': text,
+        'question_order': order,
+        'content_fingerprint': question_fingerprint(text, options),
+        'answers': [
+            {'text': option, 'is_correct': i == 0, 'answer_order': i + 1}
+            for i, option in enumerate(options)
+        ]
+    }
+
+
+def test_fingerprint_ignores_markup_and_option_order():
+    """Cosmetic differences between exports must not change the fingerprint."""
+    first = question_fingerprint("<p>What is   printed?</p><pre>print(1 &lt; 2)</pre>", ["True", "False"])
+    second = question_fingerprint("What is printed?\n<pre>print(1 < 2)</pre>", ["<b>False</b>", "True"])
+
+    assert first == second
+    assert normalize_content("<p>a&nbsp;<br/>b</p>") == "a b"
+    assert question_fingerprint("print(True)", ["x"]) != question_fingerprint("print(true)", ["x"])
+    assert question_fingerprint("Q", ["a", "b"]) != question_fingerprint("Q", ["a b"])
+
+
+def test_second_exam_links_shared_questions():
+    """A question already imported by another exam is linked, not copied."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS)
+
+    quiz_id = loader.load_exam({'title': 'Quiz'}, [
+        question_row("<p>Shared?</p>", ["yes", "no"], 1),
+        question_row("<p>Quiz only?</p>", ["a", "b"], 2)
+    ])
+    test_id = loader.load_exam({'title': 'Test'}, [
+        question_row("<p>New?</p>", ["c", "d"], 1),
+        question_row("Shared?", ["no", "yes"], 2)
+    ])
+
+    assert session.query(Question).count() == 3
+    assert session.query(Answer).count() == 6
+    assert loader.stats['questions_linked'] == 1
+
+    test_exam = session.get(Exam, test_id)
+    assert [q.text for q in test_exam.get_exam_questions()] == ["<p>New?</p>", "<p>Shared?</p>"]
+
+    shared = test_exam.get_exam_questions()[1]
+    assert shared.exam_id == quiz_id
+    assert {exam.title for exam in shared.get_exams()} == {'Quiz', 'Test'}
+
+
+def test_repeated_question_within_exam_is_listed_once():
+    """Duplicates inside one file collapse onto the first copy."""
+    session = make_session()
+    loader = BulkExamLoader(session, MODELS)
+
+    exam_id = loader.load_exam({'title': 'Summary Test'}, [
+        question_row("Same?", ["1", "2"], 1),
+        question_row("<p>Same?</p>", ["2", "1"], 2)
+    ])
+
+    assert session.query(Question).count() == 1
+    assert session.query(ExamQuestion).filter(ExamQuestion.exam_id == exam_id).count() == 1
+    assert loader.stats['questions_linked'] == 0
+
+
+if __name__ == "__main__":
+    test_fingerprint_ignores_markup_and_option_order()
+    test_second_exam_links_shared_questions()
+    test_repeated_question_within_exam_is_listed_once()
+    print("✅ All question fingerprint tests passed")
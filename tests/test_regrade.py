@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Tests for vectorized re-grading after an answer key correction.
+
+Usage:
+    python -m pytest tests/test_regrade.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+import numpy as np
+from sqlalchemy import create_engine, event, update
+from sqlalchemy.orm import sessionmaker
+
+from answer_key import AnswerKeyIndex
+from app import create_app
+from database import Base
+from exam_sessions import create_exam_session, submit_responses
+from models import Answer, Exam, ExamSession, Module, Question, Topic, User, UserProgress, UserResponse
+from regrade import grade_selections, regrade_responses
+
+MULTI_SELECT = json.dumps({'type': 'multi-select', 'required_answers': 2})
+
+
+def build_database(questions=6):
+    """Exam imported without a key (every answer incorrect); returns (engine, session, exam id, answers, topic id)."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    module = Module(name="Module 1")
+    session.add(module)
+    session.flush()
+    topic = Topic(name="Operators", module_id=module.id)
+    exam = Exam(title="Module 1 Test", total_questions=questions)
+    session.add_all([topic, exam])
+    session.flush()
+
+    answers = {}
+    for i in range(questions):
+        question = Question(text=f"Q{i}?", exam_id=exam.id, topic_id=topic.id,
+                            question_metadata=MULTI_SELECT if i == 0 else '{}')
+        session.add(question)
+        session.flush()
+        rows = [Answer(text=f"A{j}", is_correct=False, question_id=question.id, answer_order=j) for j in range(3)]
+        session.add_all(rows)
+        session.flush()
+        answers[question.id] = [answer.id for answer in rows]
+    session.commit()
+    return engine, session, exam.id, answers, topic.id
+
+
+def test_vectorized_grades_match_the_scalar_grader():
+    """grade_selections agrees with AnswerKeyIndex.is_correct, including foreign and missing answers."""
+    _, session, _, answers, _ = build_database(questions=20)
+    for question_id, answer_ids in answers.items():
+        session.execute(update(Answer).where(Answer.id == answer_ids[question_id % 3]).values(is_correct=True))
+    session.commit()
+    key = AnswerKeyIndex.build(session)
+
+    rng = np.random.default_rng(7)
+    question_ids = rng.choice(list(answers), size=500)
+    all_answers = [a for ids in answers.values() for a in ids]
+    answer_ids = np.where(rng.random(500) < 0.1, 0, rng.choice(all_answers + [10_000], size=500))
+
+    expected = []
+    for question_id, answer_id in zip(question_ids.tolist(), answer_ids.tolist()):
+        try:
+            selection = key.selection_mask(question_id, [answer_id] if answer_id else [])
+        except ValueError:
+            selection = 0
+        expected.append(key.is_correct(question_id, selection))
+    assert grade_selections(key, question_ids, answer_ids).tolist() == expected
+
+
+def test_regrade_after_key_correction():
+    """Only changed rows are rewritten; sessions and topic progress follow the corrected key."""
+    engine, session, exam_id, answers, topic_id = build_database()
+    question_ids = list(answers)
+    user = User(username="student", email="student@example.com", password_hash="x")
+    session.add(user)
+    session.flush()
+    session.add(UserProgress(user_id=user.id, topic_id=topic_id, questions_attempted=6, questions_correct=0))
+    session.commit()
+
+    # Everyone picks the first answer; the multi-select question gets the first two
+    exam_session = create_exam_session(session, user_id=user.id, question_ids=question_ids)
+    submit_responses(session, exam_session['id'],
+                     [{'question_id': question_ids[0], 'answer_ids': answers[question_ids[0]][:2]}] +
+                     [{'question_id': qid, 'answer_id': answers[qid][0]} for qid in question_ids[1:]])
+    assert session.get(ExamSession, exam_session['id']).correct_answers == 0
+
+    # The key is corrected: first answer right for Q0..Q3 (Q0 needs the second one too)
+    corrected = [answers[qid][0] for qid in question_ids[:4]] + [answers[question_ids[0]][1]]
+    session.execute(update(Answer).where(Answer.id.in_(corrected)).values(is_correct=True))
+    session.commit()
+
+    statements = []
+
+    def count_statement(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    event.listen(engine, 'before_cursor_execute', count_statement)
+    stats = regrade_responses(session, chunk_size=3)
+    event.remove(engine, 'before_cursor_execute', count_statement)
+
+    assert stats['responses'] == 6 and stats['changed'] == 4
+    assert stats['sessions'] == 1 and stats['progress'] == 1
+    updates = [s for s in statements if s.lstrip().upper().startswith('UPDATE USER_RESPONSES')]
+    assert len(updates) == 2  # one executemany per chunk with changes
+
+    session.expire_all()
+    assert session.query(UserResponse).filter_by(is_correct=True).count() == 4
+    graded = session.get(ExamSession, exam_session['id'])
+    assert graded.correct_answers == 4 and graded.score == 66.67
+    progress = session.query(UserProgress).one()
+    assert (progress.questions_attempted, progress.questions_correct) == (6, 4)
+    # Same weighting as completing the session: Q0..Q3 right, then Q4 and Q5 wrong
+    expected = UserProgress(questions_attempted=0, questions_correct=0, proficiency_level=0.0, average_time=0.0)
+    for is_correct in [True] * 4 + [False] * 2:
+        expected.update_progress(is_correct, 1.0)
+    assert abs(progress.proficiency_level - expected.proficiency_level) < 1e-9
+
+    # Nothing left to change
+    assert regrade_responses(session)['changed'] == 0
+
+
+def test_running_server_reloads_the_corrected_key():
+    """After flask regrade, the server grades new answers with the corrected key once reloaded."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        os.environ['DATABASE_URL'] = f"sqlite:///{Path(tmp_dir) / 'pcep_exam.db'}"
+        try:
+            app = create_app()
+        finally:
+            del os.environ['DATABASE_URL']
+        Base.metadata.create_all(app.db_manager.create_engine())
+        session = app.db_manager.get_session()
+        exam = Exam(title="Module 1 Test", total_questions=1)
+        session.add(exam)
+        session.flush()
+        question = Question(text="Q?", exam_id=exam.id)
+        session.add(question)
+        session.flush()
+        answer = Answer(text="A", is_correct=False, question_id=question.id, answer_order=0)
+        session.add(answer)
+        session.commit()
+        question_id, answer_id = question.id, answer.id
+        client = app.test_client()
+        assert client.post('/api/answer-key/reload').get_json() == {'questions': 1}
+
+        def answer_correct():
+            created = client.post('/api/sessions', json={'question_ids': [question_id]}).get_json()
+            done = client.post(f"/api/sessions/{created['id']}/responses",
+                               json={'responses': [{'question_id': question_id, 'answer_id': answer_id}]})
+            return done.get_json()['correct_answers'] == 1
+
+        assert not answer_correct()
+        session.execute(update(Answer).where(Answer.id == answer_id).values(is_correct=True))
+        session.commit()
+        session.close()
+
+        # The CLI runs in another process: its reload does not reach the server's key
+        server_key = app.answer_key
+        result = app.test_cli_runner().invoke(args=['regrade'])
+        assert 'Re-graded 1 responses' in result.output and '/api/answer-key/reload' in result.output
+        app.answer_key = server_key
+        assert not answer_correct()
+
+        assert client.post('/api/answer-key/reload').status_code == 200
+        assert app.answer_key is not server_key
+        assert answer_correct()
+
+
+if __name__ == "__main__":
+    test_vectorized_grades_match_the_scalar_grader()
+    test_regrade_after_key_correction()
+    test_running_server_reloads_the_corrected_key()
+    print("✅ All re-grading tests passed")
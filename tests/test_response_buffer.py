@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the write-behind response buffer.
+
+Usage:
+    python -m pytest tests/test_response_buffer.py
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.exc import IntegrityError, OperationalError
+from sqlalchemy.orm import Session as SQLAlchemySession, sessionmaker
+
+from app import create_app
+from database import Base, DatabaseManager
+from models import ExamSession, User, UserResponse
+from response_buffer import ResponseBuffer
+from test_exam_sessions import add_exam
+
+
+def response_row(session_id, question_id):
+    now = datetime.utcnow()
+    return {'exam_session_id': session_id, 'question_id': question_id, 'answer_id': None, 'is_correct': False,
+            'is_skipped': True, 'is_bookmarked': False, 'time_taken': 1.0, 'response_data': None,
+            'created_at': now, 'updated_at': now}
+
+
+def test_batches_by_size_interval_and_shutdown():
+    """Rows are written K at a time, after the interval, or at close; 'flushed' waits for the commit."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'buffer.db'}")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        session = Session()
+        _, key = add_exam(session, 12)
+        user = User(username="student", email="student@example.com", password_hash="x")
+        session.add(user)
+        session.flush()
+        exam_session = ExamSession(user_id=user.id, exam_id=1, total_questions=12)
+        session.add(exam_session)
+        session.commit()
+        question_ids = list(key)
+
+        inserts = []
+
+        def count_insert(conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('INSERT INTO USER_RESPONSES'):
+                inserts.append(statement)
+
+        event.listen(engine, 'before_cursor_execute', count_insert)
+
+        # Size-triggered: 12 single-row puts with K=5 and a long interval
+        buffer = ResponseBuffer(Session, max_rows=5, interval_ms=60_000)
+        for question_id in question_ids[:10]:
+            assert buffer.put([response_row(exam_session.id, question_id)])['flushed'] is False
+        deadline = time.monotonic() + 5
+        while buffer.depth() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert buffer.depth() == 0 and len(inserts) == 2
+        buffer.put([response_row(exam_session.id, qid) for qid in question_ids[10:]])
+        assert buffer.depth() == 2 and buffer.pending(exam_session.id) == set(question_ids[10:])
+        # A second click on a queued question is rejected; one on a stored question is skipped at insert
+        try:
+            buffer.put([response_row(exam_session.id, question_ids[11])])
+            assert False, "a queued question takes no second answer"
+        except ValueError:
+            pass
+        buffer.put([response_row(exam_session.id, question_ids[0])])
+        buffer.close()
+        assert buffer.depth() == 0 and buffer.pending(exam_session.id) == set() and len(inserts) == 3
+        stats = buffer.stats()
+        assert stats['flushes'] == 3 and stats['max_depth'] >= 5
+        assert stats['flushed_rows'] == 12 and stats['skipped_rows'] == 1
+        assert stats['avg_flush_ms'] > 0 and stats['max_flush_ms'] >= stats['last_flush_ms']
+        try:
+            buffer.put([response_row(exam_session.id, question_ids[0])])
+            assert False, "a closed buffer takes no rows"
+        except RuntimeError:
+            pass
+        assert session.query(UserResponse).count() == 12
+
+        # Interval-triggered, acknowledged after the commit; concurrent callers share batches
+        session.query(UserResponse).delete()
+        session.commit()
+        inserts.clear()
+        buffer = ResponseBuffer(Session, max_rows=100, interval_ms=30, durability='flushed', retry_backoff_ms=1)
+        results = []
+        threads = [threading.Thread(target=lambda qid=qid: results.append(
+            buffer.put([response_row(exam_session.id, qid)]))) for qid in question_ids]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert len(results) == 12 and all(result['flushed'] for result in results)
+        assert session.query(UserResponse).count() == 12 and len(inserts) < 12
+
+        # A failing batch reaches the waiting caller and is counted
+        try:
+            buffer.put([response_row(exam_session.id, None)])
+            failed = None
+        except IntegrityError as e:
+            failed = e
+        assert failed is not None
+        assert buffer.stats()['failed_rows'] == 1 and buffer.stats()['retries'] == 3
+        buffer.close()
+        event.remove(engine, 'before_cursor_execute', count_insert)
+        engine.dispose()
+
+
+def test_flush_waits_for_batches_in_flight_and_retries():
+    """flush() waits for a batch in flight and for retries of a batch that hit a locked database."""
+    class SlowSession(SQLAlchemySession):
+        def commit(self):
+            time.sleep(0.3)
+            super().commit()
+
+    class LockedSession(SQLAlchemySession):
+        """Fails its first two commits like a busy database."""
+        failures = 2
+
+        def commit(self):
+            if LockedSession.failures:
+                LockedSession.failures -= 1
+                raise OperationalError('COMMIT', {}, Exception('database is locked'))
+            super().commit()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        engine = create_engine(f"sqlite:///{Path(tmp_dir) / 'buffer.db'}")
+        Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine)()
+        _, key = add_exam(session, 1)
+        user = User(username="student", email="student@example.com", password_hash="x")
+        session.add(user)
+        session.flush()
+        exam_session = ExamSession(user_id=user.id, exam_id=1, total_questions=1)
+        session.add(exam_session)
+        session.commit()
+        question_id = next(iter(key))
+
+        buffer = ResponseBuffer(sessionmaker(bind=engine, class_=SlowSession), max_rows=1, interval_ms=1)
+        buffer.put([response_row(exam_session.id, question_id)])
+        time.sleep(0.1)  # the flusher thread is inside the slow commit
+        assert buffer.depth() == 1
+        buffer.flush()
+        assert buffer.depth() == 0 and buffer.pending(exam_session.id) == set()
+        assert session.query(UserResponse).count() == 1
+        buffer.close()
+
+        # A locked database delays the rows instead of dropping them
+        session.query(UserResponse).delete()
+        session.commit()
+        buffer = ResponseBuffer(sessionmaker(bind=engine, class_=LockedSession), interval_ms=1, retry_backoff_ms=20)
+        assert buffer.put([response_row(exam_session.id, question_id)])['accepted'] == 1
+        assert buffer.pending(exam_session.id) == {question_id}
+        buffer.flush()
+        stats = buffer.stats()
+        assert stats['retries'] == 2 and stats['failed_rows'] == 0 and stats['flushed_rows'] == 1
+        assert buffer.depth() == 0 and buffer.pending(exam_session.id) == set()
+        assert session.query(UserResponse).count() == 1
+        buffer.close()
+        engine.dispose()
+
+
+def test_answer_endpoint_buffers_until_the_session_completes():
+    """Per-answer posts are queued (202), duplicates rejected, and completion flushes before scoring."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        database_url = f"sqlite:///{Path(tmp_dir) / 'pcep_exam.db'}"
+        os.environ['DATABASE_URL'] = database_url
+        try:
+            app = create_app()
+        finally:
+            del os.environ['DATABASE_URL']
+        Base.metadata.create_all(app.db_manager.create_engine())
+        app.response_buffer = ResponseBuffer(DatabaseManager(database_url=database_url).get_session,
+                                             max_rows=100, interval_ms=60_000)
+        client = app.test_client()
+        _, key = add_exam(app.db_manager.get_session(), 3)
+        (q1, a1), (q2, a2), (q3, _) = list(key.items())
+
+        session_id = client.post('/api/sessions', json={'question_ids': [q1, q2, q3]}).get_json()['id']
+        url = f'/api/sessions/{session_id}/answers'
+        queued = client.post(url, json={'question_id': q1, 'answer_id': a1[1], 'time_taken': 4})
+        assert queued.status_code == 202 and queued.get_json()['accepted'] == 1
+        assert client.post(url, json={'question_id': q2, 'answer_id': a2[0]}).status_code == 202
+        assert client.post(url, json={'question_id': q1, 'answer_id': a1[0]}).status_code == 400
+        assert client.post('/api/sessions/999/answers', json={'question_id': q1}).status_code == 404
+        assert client.get('/api/response-buffer').get_json()['depth'] == 2
+        assert client.get('/health').get_json()['response_buffer_depth'] == 2
+
+        done = client.post(f'/api/sessions/{session_id}/responses',
+                           json={'responses': [{'question_id': q3, 'answer_id': None}]}).get_json()
+        assert done['is_completed'] and done['responses'] == 3 and done['correct_answers'] == 1
+        stats = client.get('/api/response-buffer').get_json()
+        assert stats['depth'] == 0 and stats['flushed_rows'] == 2 and stats['flushes'] == 1
+        assert client.post(url, json={'question_id': q3, 'answer_id': None}).status_code == 409
+        app.response_buffer.close()
+
+
+if __name__ == "__main__":
+    test_batches_by_size_interval_and_shutdown()
+    test_flush_waits_for_batches_in_flight_and_retries()
+    test_answer_endpoint_buffers_until_the_session_completes()
+    print("✅ All response buffer tests passed")
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""
+Tests for the synthetic corpus generator and the benchmark regression check.
+
+Usage:
+    python -m pytest tests/test_synthetic_corpus.py
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+TESTS_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(TESTS_DIR.parent / 'src'))
+sys.path.insert(0, str(TESTS_DIR))
+
+from benchmark_import_throughput import compare
+from ingest.pipeline import ConverterPipeline, ExamSink
+from synthetic_corpus import generate_corpus
+
+
+class RowSink(ExamSink):
+    def write_exam(self, exam, rows):
+        self.results.append(list(rows))
+
+
+def test_corpus_is_deterministic_and_importable():
+    """A seed gives the same files; they validate and carry code, multi-select and duplicates."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        paths, stats = generate_corpus(Path(tmp_dir) / 'a', 500, questions_per_exam=40, html_ratio=0.5, seed=7)
+        again, _ = generate_corpus(Path(tmp_dir) / 'b', 500, questions_per_exam=40, html_ratio=0.5, seed=7)
+
+        assert len(paths) == 13 and stats['questions'] == 500
+        assert {path.suffix for path in paths} == {'.json', '.html'}
+        assert [path.read_bytes() for path in paths] == [path.read_bytes() for path in again]
+        assert stats['code_snippets'] and stats['multi_select'] and stats['duplicates']
+
+        pipeline = ConverterPipeline(RowSink())
+        pipeline.run([Path(tmp_dir) / 'a'])
+        rows = [row for exam in pipeline.sink.results for row in exam]
+        assert len(rows) == 500 and not pipeline.errors and not pipeline.issues
+        assert any(row['code_snippet'] for row in rows)
+        assert len({row['content_fingerprint'] for row in rows}) < 500
+
+
+def test_regressions_are_flagged():
+    """Slower stages and higher peak memory than the tolerance allows are reported."""
+    baseline = {'pipeline': {'extract': 1000.0, 'load': 100.0, 'total': 90.0, 'peak_mib': 50.0}}
+    current = {'pipeline': {'extract': 800.0, 'validate': 1.0, 'detect': 1.0, 'load': 60.0, 'total': 55.0,
+                            'peak_mib': 70.0},
+               'robust': {'extract': 1.0, 'validate': 1.0, 'detect': 1.0, 'load': 1.0, 'total': 1.0,
+                          'peak_mib': 1.0}}
+
+    regressions = compare(current, baseline, tolerance=0.3)
+
+    assert [message.split(':')[0] for message in regressions] == ['pipeline load', 'pipeline total',
+                                                                  'pipeline peak memory']
+
+
+if __name__ == "__main__":
+    test_corpus_is_deterministic_and_importable()
+    test_regressions_are_flagged()
+    print("✅ All synthetic corpus tests passed")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for set-based topic progress updates.
+
+Usage:
+    python -m pytest tests/test_topic_progress.py
+"""
+
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from database import Base
+from exam_sessions import create_exam_session, submit_responses
+from models import Answer, Exam, Module, Question, Topic, User, UserProgress
+from topic_progress import ewma_proficiency
+
+
+def build_database(topics=2, questions_per_topic=4):
+    """Exam with questions spread over topics; returns (engine, session, user id, {question id: (topic id, answers)})."""
+    engine = create_engine('sqlite:///:memory:')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    module = Module(name="Module 1")
+    user = User(username="student", email="student@example.com", password_hash="x")
+    exam = Exam(title="Module 1 Test", total_questions=topics * questions_per_topic)
+    session.add_all([module, user, exam])
+    session.flush()
+
+    questions = {}
+    for t in range(topics):
+        topic = Topic(name=f"Topic {t}", module_id=module.id)
+        session.add(topic)
+        session.flush()
+        for i in range(questions_per_topic):
+            question = Question(text=f"T{t} Q{i}?", exam_id=exam.id, topic_id=topic.id)
+            session.add(question)
+            session.flush()
+            rows = [Answer(text=f"A{j}", is_correct=j == 0, question_id=question.id, answer_order=j)
+                    for j in range(3)]
+            session.add_all(rows)
+            session.flush()
+            questions[question.id] = (topic.id, [answer.id for answer in rows])
+    session.commit()
+    return engine, session, user.id, questions
+
+
+def test_closed_form_matches_update_progress():
+    """Batches folded with ewma_proficiency agree with update_progress applied per attempt."""
+    rng = random.Random(3)
+    for _ in range(200):
+        reference = UserProgress(questions_attempted=0, questions_correct=0, proficiency_level=0.0, average_time=0.0)
+        attempted = correct = 0
+        proficiency = 0.0
+        # Several batches of varying size, crossing the warm-up at different points
+        for _ in range(rng.randint(1, 4)):
+            outcomes = [rng.random() < 0.6 for _ in range(rng.randint(0, 9))]
+            for outcome in outcomes:
+                reference.update_progress(outcome, 10.0)
+            positions = [n for n, outcome in enumerate(outcomes, 1) if outcome]
+            proficiency = ewma_proficiency(attempted, correct, proficiency, len(outcomes), reversed(positions))
+            attempted += len(outcomes)
+            correct += len(positions)
+            assert abs(proficiency - reference.proficiency_level) < 1e-12
+
+
+def test_completed_sessions_upsert_topic_progress():
+    """Completing a session writes O(topics) statements that match per-response updates."""
+    engine, session, user_id, questions = build_database()
+    rng = random.Random(11)
+    reference = {}
+
+    for attempt in range(3):
+        question_ids = list(questions)
+        rng.shuffle(question_ids)
+        entries = []
+        for question_id in question_ids:
+            topic_id, answers = questions[question_id]
+            answer_id = rng.choice(answers)
+            time_taken = float(rng.randint(5, 60))
+            entries.append({'question_id': question_id, 'answer_id': answer_id, 'time_taken': time_taken})
+            progress = reference.setdefault(topic_id, UserProgress(
+                questions_attempted=0, questions_correct=0, proficiency_level=0.0, average_time=0.0))
+            progress.update_progress(answer_id == answers[0], time_taken)
+
+        exam_session = create_exam_session(session, user_id=user_id, question_ids=question_ids)
+        statements = []
+
+        def count_statement(conn, cursor, statement, *args):
+            statements.append(statement.lstrip().upper())
+
+        event.listen(engine, 'before_cursor_execute', count_statement)
+        submit_responses(session, exam_session['id'], entries)
+        event.remove(engine, 'before_cursor_execute', count_statement)
+
+        upserts = [s for s in statements if s.startswith('INSERT INTO USER_PROGRESS')]
+        assert len(upserts) == len(reference)  # one per topic, whether the row exists or not
+        assert not any(s.startswith('UPDATE USER_PROGRESS') for s in statements)
+
+    session.expire_all()
+    rows = session.query(UserProgress).filter_by(user_id=user_id).all()
+    assert len(rows) == len(reference)
+    for row in rows:
+        expected = reference[row.topic_id]
+        assert (row.questions_attempted, row.questions_correct) == (12, expected.questions_correct)
+        assert abs(row.proficiency_level - expected.proficiency_level) < 1e-9
+        assert abs(row.average_time - expected.average_time) < 1e-9
+
+
+if __name__ == "__main__":
+    test_closed_form_matches_update_progress()
+    test_completed_sessions_upsert_topic_progress()
+    print("✅ All topic progress tests passed")
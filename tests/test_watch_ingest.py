@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Tests for the watch-folder ingest: settle-time debounce and extract-then-import.
+
+Usage:
+    python -m pytest tests/test_watch_ingest.py
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+from database import Base, DatabaseManager
+from ingest.jobs import ImportJobQueue
+from ingest.watcher import FolderWatcher, WatchIngestor
+from models import Answer, Exam, ExamQuestion, ImportManifest, Question
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_exam(exam_id, count):
+    """Exam data in the export format."""
+    return {
+        'id': exam_id,
+        'questions': [
+            {'id': exam_id * 100 + i, 'question': f"<p>Exam {exam_id} question {i}?</p>",
+             'options': [{'id': exam_id * 1000 + i * 10 + j, 'option': f"<p>Option {j}</p>"} for j in range(3)]}
+            for i in range(count)
+        ]
+    }
+
+
+def touch(path, text, mtime_ns):
+    """Write a file with a fixed modification time."""
+    path.write_text(text, encoding='utf-8')
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_files_are_reported_once_settled():
+    """Files still changing wait; settled files are reported once and again after a change."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        folder = Path(tmp_dir)
+        clock = FakeClock()
+        watcher = FolderWatcher([folder], settle_seconds=2.0, clock=clock)
+
+        exam = folder / 'module_1.json'
+        touch(exam, '{"questions": [', 1_000_000_000)
+        touch(folder / 'module_2.json.part', '{}', 1_000_000_000)
+        touch(folder / '.module_3.json', '{}', 1_000_000_000)
+        assert watcher.scan() == []
+
+        # Still being written: the settle timer restarts
+        clock.now = 1.5
+        touch(exam, '{"questions": []}', 2_000_000_000)
+        assert watcher.scan() == []
+        clock.now = 3.0
+        assert watcher.scan() == []
+
+        clock.now = 3.6
+        assert watcher.scan() == [exam]
+        clock.now = 10.0
+        assert watcher.scan() == []
+
+        # A later change is reported again after it settles
+        touch(exam, '{"questions": [{}]}', 3_000_000_000)
+        assert watcher.scan() == []
+        clock.now = 12.0
+        assert watcher.scan() == [exam]
+
+        # Files present at start-up can be ignored until they change
+        assert FolderWatcher([folder], clock=clock, include_existing=False).scan() == []
+
+
+def test_settled_html_is_extracted_and_imported():
+    """A settled HTML page is extracted to JSON and imported; its output is not picked up twice."""
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        html_dir = Path(tmp_dir) / 'html'
+        json_dir = Path(tmp_dir) / 'json'
+        html_dir.mkdir()
+        json_dir.mkdir()
+
+        db_manager = DatabaseManager(database_url=f"sqlite:///{Path(tmp_dir) / 'pcep_exam.db'}")
+        Base.metadata.create_all(db_manager.create_engine())
+        models = {'Exam': Exam, 'Question': Question, 'Answer': Answer, 'ExamQuestion': ExamQuestion,
+                  'ImportManifest': ImportManifest}
+        jobs = ImportJobQueue(db_manager.get_session, models, duty_cycle=1.0)
+
+        clock = FakeClock()
+        watcher = FolderWatcher([html_dir, json_dir], settle_seconds=1.0, clock=clock)
+        ingestor = WatchIngestor(jobs, json_dir, watcher=watcher)
+
+        page = html_dir / 'module_1.html'
+        page.write_text(f"<html><script>let data = {json.dumps(make_exam(1, 4))};</script></html>",
+                        encoding='utf-8')
+        (html_dir / 'notes.html').write_text("<html><p>No exam here</p></html>", encoding='utf-8')
+        assert watcher.scan() == []
+        clock.now = 1.0
+        ready = watcher.scan()
+        assert ready == [html_dir / 'module_1.html', html_dir / 'notes.html']
+
+        job = ingestor(ready)
+        assert jobs.join(timeout=30)
+        job = jobs.get(job['id'])
+        assert job['status'] == 'completed'
+        assert [Path(entry['path']).name for entry in job['files']] == ['module_1.json']
+        assert job['files'][0]['status'] == 'imported' and job['files'][0]['questions'] == 4
+        assert ingestor.stats == {'extracted': 1, 'extract_errors': 1, 'jobs': 1}
+
+        # The extracted JSON was marked as handled, so the next cycles find nothing
+        clock.now = 5.0
+        assert watcher.scan() == []
+        assert ingestor([]) is None
+
+        session = db_manager.get_session()
+        assert session.query(Exam).count() == 1 and session.query(Question).count() == 4
+        session.close()
+
+
+if __name__ == "__main__":
+    test_files_are_reported_once_settled()
+    test_settled_html_is_extracted_and_imported()
+    print("✅ All watch ingest tests passed")
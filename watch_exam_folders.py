@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Watch-Folder Ingest Daemon for PCEP Exam Data
+=============================================
+
+Keeps the database in sync with the exam folders without re-running the
+extractor and import scripts by hand:
+
+- Saved HTML exam pages dropped into Exam_HTML_Raw_Data are extracted to
+  Exam_HTML_Raw_Data_JSON_ONLY as soon as they have finished saving.
+- New or changed JSON files in Exam_HTML_Raw_Data_JSON_ONLY are queued as a
+  background import job; the import manifest skips content already imported.
+
+Files are only picked up once their size and modification time have stayed
+the same for the settle time, so half-copied files are never read. With the
+optional ``watchdog`` package installed, file events wake the daemon early;
+otherwise it polls.
+
+Usage:
+    python watch_exam_folders.py [--settle SECONDS] [--poll SECONDS] [--new-only]
+
+Stop with Ctrl+C; the running import job is finished first.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(PROJECT_DIR / "src"))
+
+# The app's default database URL is relative to the working directory
+os.environ.setdefault('DATABASE_URL', f"sqlite:///{PROJECT_DIR / 'instance' / 'pcep_exam.db'}")
+
+from app import create_app
+from ingest.watcher import FolderWatcher, WatchIngestor
+
+HTML_DIR = PROJECT_DIR / "Exam_HTML_Raw_Data"
+JSON_DIR = PROJECT_DIR / "Exam_HTML_Raw_Data_JSON_ONLY"
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Extract and import exam files as they appear")
+    parser.add_argument('--settle', type=float, default=2.0,
+                        help="seconds a file must stay unchanged before it is read (default: 2)")
+    parser.add_argument('--poll', type=float, default=1.0,
+                        help="seconds between folder scans (default: 1)")
+    parser.add_argument('--new-only', action='store_true',
+                        help="ignore files that are already present at start-up")
+    return parser.parse_args()
+
+
+def main():
+    """Run the watcher until interrupted."""
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s %(levelname)s %(name)s: %(message)s')
+
+    app = create_app()
+    JSON_DIR.mkdir(exist_ok=True)
+
+    watcher = FolderWatcher([HTML_DIR, JSON_DIR], settle_seconds=args.settle, poll_interval=args.poll,
+                            include_existing=not args.new_only)
+    ingestor = WatchIngestor(app.import_jobs, JSON_DIR, watcher=watcher)
+
+    print("👀 Watching for exam files:")
+    print(f"   HTML: {HTML_DIR}{'' if HTML_DIR.is_dir() else ' (not created yet)'}")
+    print(f"   JSON: {JSON_DIR}")
+    print(f"   Database: {app.config['DATABASE_URL']}")
+    print("   Press Ctrl+C to stop\n")
+
+    try:
+        watcher.run(ingestor)
+    except KeyboardInterrupt:
+        print("\n⏹️  Stopping, waiting for the running import to finish...")
+        app.import_jobs.join()
+
+    stats = ingestor.stats
+    print(f"✅ Extracted {stats['extracted']} pages ({stats['extract_errors']} failed), "
+          f"queued {stats['jobs']} import jobs")
+
+
+if __name__ == "__main__":
+    main()